@@ -1,4383 +1,7039 @@
-import pygame
-import json
-import os
-import time
-import random
-import requests
-import hashlib
-import shutil
-from datetime import datetime, timedelta
-from typing import List, Dict, Tuple, Optional, Any
-from dataclasses import dataclass
-from collections import deque
-import pickle
-import math
-pygame.init()
-
-# =============================================================================
-# CONSTANTES Y CONFIGURACIÓN
-# =============================================================================
-
-# Constantes - VENTANA OPTIMIZADA PARA MEJOR VISUALIZACIÓN
-WINDOW_WIDTH = 1800
-WINDOW_HEIGHT = 1000
-TILE_SIZE = 32
-FPS = 60
-WHITE = (255, 255, 255)
-BLACK = (0, 0, 0)
-BLUE = (0, 100, 200)
-GREEN = (0, 200, 0)
-RED = (200, 0, 0)
-YELLOW = (255, 200, 0)
-GRAY = (128, 128, 128)
-DARK_GRAY = (64, 64, 64)
-LIGHT_GRAY = (192, 192, 192)
-LIGHT_BLUE = (173, 216, 230)
-PURPLE = (128, 0, 128)
-ORANGE = (255, 165, 0)
-CYAN = (0, 255, 255)
-DARK_GREEN = (0, 150, 0)
-DARK_RED = (150, 0, 0)
-BRIGHT_GREEN = (50, 255, 50)
-BRIGHT_YELLOW = (255, 255, 100)
-BRIGHT_RED = (255, 100, 100)
-UI_BACKGROUND = (245, 245, 250)
-UI_BORDER = (70, 70, 120)
-UI_HIGHLIGHT = (220, 230, 255)
-UI_TEXT_HEADER = (25, 25, 90)
-UI_TEXT_NORMAL = (40, 40, 70)
-UI_TEXT_SECONDARY = (80, 80, 100)
-UI_WARNING = (200, 100, 0)
-UI_CRITICAL = (200, 50, 50)
-UI_SUCCESS = (0, 150, 50)
-
-# =============================================================================
-# CLASES DE DATOS
-# =============================================================================
-
-@dataclass
-class Position:
-    """Representa una posición en la cuadrícula del juego."""
-    x: int
-    y: int
-
-@dataclass
-class Order:
-    """Representa un pedido de entrega en el juego."""
-    id: str
-    pickup: Position
-    dropoff: Position
-    payout: int
-    duration_minutes: float
-    weight: int
-    priority: int
-    release_time: int
-    status: str = "waiting_release"
-    created_at: float = 0.0
-    accepted_at: float = 0.0
-
-@dataclass
-class GameState:
-    """Estado completo del juego para guardado/carga."""
-    player_pos: Position
-    stamina: float
-    reputation: int
-    money: int
-    game_time: float
-    weather_time: float
-    current_weather: str
-    weather_intensity: float
-    inventory: List[Order]
-    available_orders: List[Order]
-    completed_orders: List[Order]
-    goal: int
-    delivery_streak: int
-    pending_orders: List[Order]
-    city_width: int
-    city_height: int
-    tiles: List[List[str]]
-    legend: Dict
-    city_name: str
-    max_game_time: float
-
-# =============================================================================
-# SISTEMA DE API MEJORADO
-# =============================================================================
-
-class TigerAPIManager:
-    """Gestor de API mejorado con mejor manejo de errores."""
-    
-    def __init__(self, base_url="https://tigerds-api.kindflower-ccaf48b6.eastus.azurecontainerapps.io"):
-        self.base_url = base_url
-        self.cache_dir = "api_cache"
-        self.data_dir = "data"
-        self._ensure_directories()
-        self.tile_images = {}
-        self._load_tile_images()
-    
-
-
-    def _load_tile_images(self):
-        """Carga las imágenes para tiles especiales."""
-        try:
-            park_image = pygame.image.load("pixilart-drawing.png")
-            self.tile_images["P"] = pygame.transform.scale(park_image, (TILE_SIZE, TILE_SIZE))
-            print(" Imagen de parque cargada correctamente desde pixilart-drawing.png")
-            
-        except FileNotFoundError as e:
-            print(f" No se pudo cargar imagen: {e}")
-            print(" Asegúrate de que exista la carpeta 'assets/images/' con 'park.png'")
-            self._create_fallback_images()
-        except Exception as e:
-            print(f" Error cargando imágenes: {e}")
-            self._create_fallback_images()
-
-    def _create_fallback_images(self):
-        """Crea imágenes de respaldo si no se pueden cargar las originales."""
-        park_surface = pygame.Surface((TILE_SIZE, TILE_SIZE))
-        park_surface.fill(GREEN)
-        
-        tree_color = (0, 100, 0)
-        for i in range(3):
-            for j in range(3):
-                if (i + j) % 2 == 0:
-                    tree_rect = pygame.Rect(
-                        i * (TILE_SIZE // 3) + 2, 
-                        j * (TILE_SIZE // 3) + 2, 
-                        TILE_SIZE // 3 - 4, 
-                        TILE_SIZE // 3 - 4
-                    )
-                    pygame.draw.ellipse(park_surface, tree_color, tree_rect)
-        
-        self.tile_images["P"] = park_surface
-        print("✅ Imagen de respaldo para parque creada")
-
-
-    def _ensure_directories(self):
-        for directory in [self.cache_dir, self.data_dir]:
-            os.makedirs(directory, exist_ok=True)
-    
-    def make_request(self, endpoint, timeout=30):
-        """Realiza una petición a la API con manejo de errores."""
-        try:
-            resp = requests.get(self.base_url + endpoint, timeout=timeout)
-            if resp.status_code == 200:
-                return resp.json()
-            else:
-                print(f"❌ Error {resp.status_code} en {endpoint}")
-                return None
-        except Exception as e:
-            print(f"❌ Error de conexión en {endpoint}: {e}")
-            return None
-    def get_city_map(self) -> dict:
-        """Obtiene el mapa de la ciudad desde la API real."""
-        print("🚀 Obteniendo mapa de TigerCity desde API...")
-        map_data = self.make_request("/city/map")
-        
-        if map_data and 'data' in map_data:
-            api_data = map_data['data']
-            game_map = {
-                'width': api_data['width'],
-                'height': api_data['height'],
-                'tiles': api_data['tiles'],
-                'legend': self._convert_legend(api_data['legend']),
-                'goal': 3000,
-                'city_name': api_data.get('city_name', 'TigerCity'),
-                'max_time': api_data.get('max_time', 600),
-                'version': api_data.get('version', '1.0')
-            }
-            
-            self._save_to_cache("map.json", game_map)
-            print(f" Mapa cargado: {game_map['width']}x{game_map['height']} - {game_map['city_name']}")
-            return game_map
-        else:
-            print(" No se pudo obtener el mapa de la API, usando datos locales...")
-            return self._get_fallback_map()
-    
-    def get_city_jobs(self) -> list:
-        """Obtiene los trabajos/pedidos desde la API real - MEJORADO PARA MÁS PEDIDOS."""
-        print(" Obteniendo trabajos de TigerCity desde API...")
-        jobs_data = self.make_request("/city/jobs")
-        
-        if jobs_data:
-            orders = self._convert_jobs_to_orders(jobs_data)
-            
-            if len(orders) < 25:
-                print(f" Solo {len(orders)} pedidos de API, generando adicionales para fluidez...")
-                additional_orders = self._generate_additional_orders(25 - len(orders))
-                orders.extend(additional_orders)
-            
-            self._save_to_cache("jobs.json", orders)
-            print(f" {len(orders)} pedidos cargados (API + generados para fluidez)")
-            return orders
-        else:
-            print(" No se pudieron obtener los trabajos de la API, usando datos locales...")
-            return self._get_fallback_orders()
-    
-    def _generate_additional_orders(self, count: int) -> list:
-        """Genera pedidos adicionales para mantener la fluidez del juego - MEJORADO."""
-        additional_orders = []
-        
-        for i in range(count):
-            pickup_x = random.randint(1, 28)
-            pickup_y = random.randint(1, 23)
-            dropoff_x = random.randint(1, 28)
-            dropoff_y = random.randint(1, 23)
-            
-            attempts = 0
-            while abs(pickup_x - dropoff_x) + abs(pickup_y - dropoff_y) < 4 and attempts < 10:
-                dropoff_x = random.randint(1, 28)
-                dropoff_y = random.randint(1, 23)
-                attempts += 1
-            
-            distance = abs(pickup_x - dropoff_x) + abs(pickup_y - dropoff_y)
-            duration = max(1.5, min(4.5, distance * 0.25 + random.uniform(1.0, 2.0)))
-            
-            release_time = random.randint(0, 180)
-            
-            order = Order(
-                id=f"GEN_{i+100:03d}",
-                pickup=Position(pickup_x, pickup_y),
-                dropoff=Position(dropoff_x, dropoff_y),
-                payout=random.randint(120, 280),
-                duration_minutes=duration,
-                weight=random.randint(1, 4),
-                priority=random.choices([0, 1, 2], weights=[50, 35, 15])[0],
-                release_time=release_time
-            )
-            additional_orders.append(order)
-        
-        return additional_orders
-    
-    def _convert_legend(self, api_legend: dict) -> dict:
-        """Convierte la leyenda de la API al formato del juego."""
-        game_legend = {}
-        
-        for tile_type, tile_info in api_legend.items():
-            game_tile = {
-                'name': tile_info['name'],
-                'surface_weight': tile_info.get('surface_weight', 1.0)
-            }
-            
-            if tile_info.get('blocked', False):
-                game_tile['blocked'] = True
-            
-            if tile_info['name'].lower() == 'park':
-                game_tile['rest_bonus'] = 20.0
-            
-            game_legend[tile_type] = game_tile
-        
-        return game_legend
-    
-    def _convert_jobs_to_orders(self, jobs_data: dict) -> list:
-        """Convierte los trabajos de la API a pedidos del juego."""
-        orders = []
-        
-        jobs_list = None
-        
-        try:
-            if isinstance(jobs_data, dict):
-                if 'data' in jobs_data and isinstance(jobs_data['data'], dict) and 'jobs' in jobs_data['data']:
-                    jobs_list = jobs_data['data']['jobs']
-                elif 'jobs' in jobs_data:
-                    jobs_list = jobs_data['jobs']
-                elif 'data' in jobs_data and isinstance(jobs_data['data'], list):
-                    jobs_list = jobs_data['data']
-            elif isinstance(jobs_data, list):
-                jobs_list = jobs_data
-            
-            if not jobs_list or not isinstance(jobs_list, list):
-                print(" Estructura de datos de trabajos inesperada, usando respaldo")
-                return self._get_fallback_orders()
-            
-            for i, job in enumerate(jobs_list):
-                try:
-                    if isinstance(job, str):
-                        order_id = f"STR_{i:03d}"
-                        payout = random.randint(100, 200)
-                    elif isinstance(job, dict):
-                        order_id = job.get('id', f"API_{i:03d}")
-                        payout = job.get('salary', job.get('payout', random.randint(100, 200)))
-                    else:
-                        continue
-                    
-                    if isinstance(payout, str):
-                        try:
-                            payout = int(float(payout.replace('$', '').replace(',', '')))
-                        except:
-                            payout = random.randint(100, 200)
-                    elif not isinstance(payout, int):
-                        payout = random.randint(100, 200)
-                    
-                    pickup_x = random.randint(1, 28)
-                    pickup_y = random.randint(1, 23)
-                    dropoff_x = random.randint(1, 28)
-                    dropoff_y = random.randint(1, 23)
-                    
-                    attempts = 0
-                    while abs(pickup_x - dropoff_x) + abs(pickup_y - dropoff_y) < 5 and attempts < 10:
-                        dropoff_x = random.randint(1, 28)
-                        dropoff_y = random.randint(1, 23)
-                        attempts += 1
-                    
-                    distance = abs(pickup_x - dropoff_x) + abs(pickup_y - dropoff_y)
-                    duration = max(0.3, min(0.8, distance * 0.05 + random.uniform(0.2, 0.5)))
-                    
-                    order = Order(
-                        id=str(order_id),
-                        pickup=Position(pickup_x, pickup_y),
-                        dropoff=Position(dropoff_x, dropoff_y),
-                        payout=int(payout),
-                        duration_minutes=duration,
-                        weight=random.randint(1, 3),
-                        priority=int(api_priority),
-                        release_time=random.randint(0, 180)
-                    )
-                    orders.append(order)
-                    
-                except Exception as e:
-                    print(f" Error procesando trabajo {i}: {e}")
-                    fallback_order = Order(
-                        id=f"FALLBACK_{i:03d}",
-                        pickup=Position(random.randint(1, 28), random.randint(1, 23)),
-                        dropoff=Position(random.randint(1, 28), random.randint(1, 23)),
-                        payout=random.randint(100, 200),
-                        duration_minutes=random.uniform(5.0, 10.0),
-                        weight=random.randint(1, 4),
-                        priority=random.randint(0, 2),
-                        release_time=random.randint(0, 300)
-                    )
-                    orders.append(fallback_order)
-                    continue
-            
-            if not orders:
-                print(" No se pudieron crear pedidos desde la API, usando respaldo completo")
-                return self._get_fallback_orders()
-            
-            print(f" {len(orders)} pedidos procesados correctamente desde API")
-            return orders
-            
-        except Exception as e:
-            print(f" Error general convirtiendo trabajos: {e}")
-            return self._get_fallback_orders()
-    
-    def _save_to_cache(self, filename: str, data: Any):
-        """Guarda datos en la caché local."""
-        try:
-            cache_path = os.path.join(self.cache_dir, filename)
-            with open(cache_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            print(f" Error guardando en caché {filename}: {e}")
-    
-    def _load_from_cache(self, filename: str) -> Optional[Any]:
-        """Carga datos desde la caché local."""
-        try:
-            cache_path = os.path.join(self.cache_dir, filename)
-            if os.path.exists(cache_path):
-                with open(cache_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except Exception as e:
-            print(f" Error cargando de caché {filename}: {e}")
-        return None
-    
-    def _get_fallback_map(self) -> dict:
-        """Mapa de respaldo si la API falla."""
-        fallback_map = self._load_from_cache("map.json")
-        if fallback_map:
-            return fallback_map
-        
-        return {
-            "width": 30,
-            "height": 25,
-            "tiles": [["C"] * 30 for _ in range(25)],
-            "legend": {
-                "C": {"name": "calle", "surface_weight": 1.00},
-                "B": {"name": "edificio", "blocked": True},
-                "P": {"name": "parque", "surface_weight": 0.95, "rest_bonus": 15.0}
-            },
-            "goal": 3000,
-            "city_name": "TigerCity",
-            "max_time": 600,
-            "version": "1.0"
-        }
-    
-    def _get_fallback_orders(self) -> list:
-        """Pedidos de respaldo si la API falla - MÁS PEDIDOS PARA FLUIDEZ."""
-        fallback_orders = self._load_from_cache("jobs.json")
-        if fallback_orders:
-            return fallback_orders
-        
-        orders = []
-        for i in range(35):
-            pickup_x = random.randint(1, 28)
-            pickup_y = random.randint(1, 23)
-            dropoff_x = random.randint(1, 28)
-            dropoff_y = random.randint(1, 23)
-            
-            while abs(pickup_x - dropoff_x) + abs(pickup_y - dropoff_y) < 4:
-                dropoff_x = random.randint(1, 28)
-                dropoff_y = random.randint(1, 23)
-            
-            priority = random.choices([0, 1, 2], weights=[40, 40, 20])[0]
-            base_duration = random.uniform(5.0, 12.0)
-            
-            if priority >= 2:
-                duration = max(0.13, min(0.25, base_duration * 0.05))
-            elif priority == 1:
-                duration = max(0.17, min(0.30, base_duration * 0.07))
-            else:
-                duration = max(0.20, min(0.37, base_duration * 0.09))
-            
-            orders.append(Order(
-                id=f"FALLBACK_{i:03d}",
-                pickup=Position(pickup_x, pickup_y),
-                dropoff=Position(dropoff_x, dropoff_y),
-                payout=random.randint(150, 400) + (50 * priority),
-                duration_minutes=duration,
-                weight=random.randint(1, 3),
-                priority=priority,
-                release_time=random.randint(0, 180) 
-            ))
-        
-        return orders
-
-# =============================================================================
-# ALGORITMOS DE ORDENAMIENTO
-# =============================================================================
-
-class SortingAlgorithms:
-    """Implementación de algoritmos de ordenamiento para el juego."""
-    
-    @staticmethod
-    def quicksort_by_priority(orders: List[Order]) -> List[Order]:
-        """Ordena pedidos por prioridad usando QuickSort."""
-        if len(orders) <= 1:
-            return orders.copy()
-        
-        pivot = orders[len(orders) // 2]
-        left = [x for x in orders if x.priority > pivot.priority]
-        middle = [x for x in orders if x.priority == pivot.priority]
-        right = [x for x in orders if x.priority < pivot.priority]
-        
-        return (SortingAlgorithms.quicksort_by_priority(left) + 
-                middle + 
-                SortingAlgorithms.quicksort_by_priority(right))
-    
-    @staticmethod
-    def mergesort_by_deadline(orders: List[Order], game_time: float) -> List[Order]:
-        """Ordena pedidos por tiempo restante usando MergeSort."""
-        if len(orders) <= 1:
-            return orders.copy()
-        
-        mid = len(orders) // 2
-        left = SortingAlgorithms.mergesort_by_deadline(orders[:mid], game_time)
-        right = SortingAlgorithms.mergesort_by_deadline(orders[mid:], game_time)
-        
-        return SortingAlgorithms._merge_by_deadline(left, right, game_time)
-    
-    @staticmethod
-    def _merge_by_deadline(left: List[Order], right: List[Order], game_time: float) -> List[Order]:
-        """Función auxiliar para merge sort."""
-        result = []
-        i = j = 0
-        
-        def get_time_remaining(order):
-            if order.status == "waiting_release":
-                return order.duration_minutes * 60
-            elapsed = game_time - order.created_at
-            return max(0, order.duration_minutes * 60 - elapsed)
-        
-        while i < len(left) and j < len(right):
-            if get_time_remaining(left[i]) <= get_time_remaining(right[j]):
-                result.append(left[i])
-                i += 1
-            else:
-                result.append(right[j])
-                j += 1
-        
-        result.extend(left[i:])
-        result.extend(right[j:])
-        return result
-    
-    @staticmethod
-    def insertion_sort_by_distance(orders: List[Order], player_pos: Position) -> List[Order]:
-        """Ordena pedidos por distancia usando Insertion Sort."""
-        result = orders.copy()
-        
-        def manhattan_distance(order):
-            return abs(order.pickup.x - player_pos.x) + abs(order.pickup.y - player_pos.y)
-        
-        for i in range(1, len(result)):
-            key = result[i]
-            key_distance = manhattan_distance(key)
-            j = i - 1
-            
-            while j >= 0 and manhattan_distance(result[j]) > key_distance:
-                result[j + 1] = result[j]
-                j -= 1
-            
-            result[j + 1] = key
-        
-        return result
-
-# =============================================================================
-# ESTRUCTURAS DE DATOS OPTIMIZADAS
-# =============================================================================
-
-class OptimizedPriorityQueue:
-    """Cola de prioridad optimizada usando inserción binaria."""
-    
-    def __init__(self):
-        self.items = []
-    
-    def enqueue(self, item: Order):
-        """Inserta un pedido manteniendo el orden por prioridad."""
-        if not self.items:
-            self.items.append(item)
-            return
-        
-        left, right = 0, len(self.items)
-        while left < right:
-            mid = (left + right) // 2
-            if self.items[mid].priority < item.priority:
-                right = mid
-            else:
-                left = mid + 1
-        
-        self.items.insert(left, item)
-    
-    def dequeue(self) -> Optional[Order]:
-        """Extrae el pedido de mayor prioridad."""
-        return self.items.pop(0) if self.items else None
-    
-    def size(self) -> int:
-        return len(self.items)
-    
-    def remove(self, order: Order) -> bool:
-        try:
-            self.items.remove(order)
-            return True
-        except ValueError:
-            return False
-
-class MemoryEfficientHistory:
-    """Sistema de historial eficiente usando diferencias."""
-    
-    def __init__(self, max_size: int = 20):
-        self.diffs = []
-        self.max_size = max_size
-        self.base_state = None
-    
-    def push(self, state: GameState):
-        if self.base_state is None:
-            self.base_state = state
-            return
-        
-        diff = {}
-        if (self.base_state.player_pos.x != state.player_pos.x or 
-            self.base_state.player_pos.y != state.player_pos.y):
-            diff['player_pos'] = (state.player_pos.x, state.player_pos.y)
-        
-        if abs(self.base_state.stamina - state.stamina) > 1.0:
-            diff['stamina'] = state.stamina
-        
-        if self.base_state.money != state.money:
-            diff['money'] = state.money
-            
-        if self.base_state.reputation != state.reputation:
-            diff['reputation'] = state.reputation
-        
-        if diff:
-            self.diffs.append(diff)
-            if len(self.diffs) >= self.max_size:
-                self.diffs.pop(0)
-    
-    def pop(self) -> Optional[GameState]:
-        if not self.diffs:
-            return None
-        
-        diff = self.diffs.pop()
-        new_state = GameState(
-            player_pos=Position(
-                diff.get('player_pos', (self.base_state.player_pos.x, self.base_state.player_pos.y))[0],
-                diff.get('player_pos', (self.base_state.player_pos.x, self.base_state.player_pos.y))[1]
-            ),
-            stamina=diff.get('stamina', self.base_state.stamina),
-            reputation=diff.get('reputation', self.base_state.reputation),
-            money=diff.get('money', self.base_state.money),
-            game_time=self.base_state.game_time,
-            weather_time=self.base_state.weather_time,
-            current_weather=self.base_state.current_weather,
-            weather_intensity=self.base_state.weather_intensity,
-            inventory=list(self.base_state.inventory),
-            available_orders=list(self.base_state.available_orders),
-            completed_orders=list(self.base_state.completed_orders),
-            goal=self.base_state.goal,
-            delivery_streak=0,
-            pending_orders=list(getattr(self.base_state, 'pending_orders', [])),
-            # Campos para guardado/carga correcta
-            city_width=getattr(self.base_state, 'city_width', 30),
-            city_height=getattr(self.base_state, 'city_height', 25),
-            tiles=getattr(self.base_state, 'tiles', []),
-            legend=getattr(self.base_state, 'legend', {}),
-            city_name=getattr(self.base_state, 'city_name', 'TigerCity'),
-            max_game_time=getattr(self.base_state, 'max_game_time', 600.0)
-        )
-        return new_state
-    
-    def size(self) -> int:
-        return len(self.diffs)
-
-# =============================================================================
-# SISTEMA DE CLIMA
-# =============================================================================
-
-class EnhancedWeatherSystem:
-    """Sistema de clima dinámico basado en cadenas de Markov."""
-    
-    TRANSITION_MATRIX = {
-        'clear': {'clear': 0.4, 'clouds': 0.3, 'wind': 0.2, 'heat': 0.1},
-        'clouds': {'clear': 0.2, 'clouds': 0.3, 'rain_light': 0.3, 'fog': 0.2},
-        'rain_light': {'clouds': 0.3, 'rain_light': 0.2, 'rain': 0.3, 'clear': 0.2},
-        'rain': {'rain_light': 0.3, 'rain': 0.2, 'storm': 0.2, 'clouds': 0.3},
-        'storm': {'rain': 0.4, 'storm': 0.2, 'clouds': 0.4},
-        'fog': {'fog': 0.3, 'clouds': 0.4, 'clear': 0.3},
-        'wind': {'wind': 0.2, 'clear': 0.3, 'clouds': 0.3, 'cold': 0.2},
-        'heat': {'heat': 0.3, 'clear': 0.4, 'clouds': 0.3},
-        'cold': {'cold': 0.3, 'clear': 0.2, 'clouds': 0.3, 'wind': 0.2}
-    }
-    
-    SPEED_MULTIPLIERS = {
-        'clear': 1.00, 'clouds': 0.98, 'rain_light': 0.90, 'rain': 0.85,
-        'storm': 0.75, 'fog': 0.88, 'wind': 0.92, 'heat': 0.90, 'cold': 0.92
-    }
-    
-    STAMINA_PENALTIES = {
-        'clear': 0.0, 'clouds': 0.0, 'rain_light': 0.05, 'rain': 0.1,
-        'storm': 0.3, 'fog': 0.0, 'wind': 0.1, 'heat': 0.2, 'cold': 0.05
-    }
-    
-    WEATHER_COLORS = {
-        'clear': (200, 150, 100), 'clouds': (180, 180, 180),
-        'rain_light': (100, 150, 200), 'rain': (70, 120, 180),
-        'storm': (50, 50, 100), 'fog': (200, 200, 200),
-        'wind': (150, 200, 150), 'heat': (255, 100, 100),
-        'cold': (150, 200, 255)
-    }
-    
-    def __init__(self):
-        self.current_condition = 'clear'
-        self.current_intensity = 0.5
-        self.time_in_current = 0
-        self.burst_duration = 30
-        self.weather_memory = deque(maxlen=5)
-        self.transitioning = False
-        self.transition_start_time = 0
-        self.transition_duration = 3.0
-        self.previous_condition = 'clear'
-        self.previous_intensity = 0.5
-        self.target_condition = 'clear'
-        self.target_intensity = 0.5
-        self.weather_notifications = []
-        self.notification_timer = 0
-    
-    def update(self, dt: float):
-        self.time_in_current += dt
-        self.notification_timer += dt
-        self.weather_notifications = [
-            (msg, time_left - dt) for msg, time_left in self.weather_notifications 
-            if time_left - dt > 0
-        ]
-        
-        if self.transitioning:
-            elapsed_transition = time.time() - self.transition_start_time
-            progress = min(1.0, elapsed_transition / self.transition_duration)
-            smooth_progress = (1 - math.cos(progress * math.pi)) / 2
-            self.current_intensity = self.previous_intensity + (self.target_intensity - self.previous_intensity) * smooth_progress
-            
-            if progress >= 1.0:
-                self.transitioning = False
-                self.current_condition = self.target_condition
-                self.current_intensity = self.target_intensity
-                effect_desc = self._get_weather_effect_description()
-                self.weather_notifications.append((f"🌦️ {self.get_weather_description()} - {effect_desc}", 4.0))
-        
-        if self.time_in_current >= self.burst_duration and not self.transitioning:
-            self._initiate_weather_change()
-    
-    def _initiate_weather_change(self):
-        transitions = self.TRANSITION_MATRIX.get(self.current_condition, {'clear': 1.0})
-        conditions = list(transitions.keys())
-        weights = list(transitions.values())
-        
-        new_condition = random.choices(conditions, weights=weights)[0]
-        new_intensity = random.uniform(0.4, 0.9)
-        
-        self.transitioning = True
-        self.transition_start_time = time.time()
-        self.previous_condition = self.current_condition
-        self.previous_intensity = self.current_intensity
-        self.target_condition = new_condition
-        self.target_intensity = new_intensity
-        
-        self.time_in_current = 0
-        self.burst_duration = random.randint(25, 40)
-        self.weather_memory.append(new_condition)
-        
-        transition_desc = f"Cambiando de {self._get_condition_name(self.previous_condition)} a {self._get_condition_name(new_condition)}"
-        self.weather_notifications.append((f"⚡ {transition_desc}", 3.0))
-    
-    def _get_condition_name(self, condition: str) -> str:
-        names = {
-            'clear': 'Despejado', 'clouds': 'Nublado', 'rain_light': 'Llovizna',
-            'rain': 'Lluvia', 'storm': 'Tormenta', 'fog': 'Niebla',
-            'wind': 'Viento', 'heat': 'Calor', 'cold': 'Frío'
-        }
-        return names.get(condition, condition)
-    
-    def _get_weather_effect_description(self) -> str:
-        speed_mult = self.get_speed_multiplier()
-        stamina_penalty = self.get_stamina_penalty()
-        
-        if speed_mult < 0.8:
-            speed_desc = "Velocidad muy reducida"
-        elif speed_mult < 0.9:
-            speed_desc = "Velocidad reducida"
-        elif speed_mult < 0.95:
-            speed_desc = "Velocidad ligeramente reducida"
-        else:
-            speed_desc = "Velocidad normal"
-        
-        if stamina_penalty > 0.2:
-            stamina_desc = "Resistencia se agota muy rápido"
-        elif stamina_penalty > 0.1:
-            stamina_desc = "Resistencia se agota más rápido"
-        elif stamina_penalty > 0.05:
-            stamina_desc = "Resistencia se agota un poco más rápido"
-        else:
-            stamina_desc = "Resistencia normal"
-        
-        return f"{speed_desc} | {stamina_desc}"
-    
-    def get_speed_multiplier(self) -> float:
-        if self.transitioning:
-            elapsed_transition = time.time() - self.transition_start_time
-            progress = min(1.0, elapsed_transition / self.transition_duration)
-            smooth_progress = (1 - math.cos(progress * math.pi)) / 2
-            prev_mult = self.SPEED_MULTIPLIERS[self.previous_condition]
-            target_mult = self.SPEED_MULTIPLIERS[self.target_condition]
-            base_mult = prev_mult + (target_mult - prev_mult) * smooth_progress
-        else:
-            base_mult = self.SPEED_MULTIPLIERS[self.current_condition]
-        
-        return base_mult * (1.0 - (self.current_intensity * 0.2))
-    
-    def get_stamina_penalty(self) -> float:
-        if self.transitioning:
-            elapsed_transition = time.time() - self.transition_start_time
-            progress = min(1.0, elapsed_transition / self.transition_duration)
-            smooth_progress = (1 - math.cos(progress * math.pi)) / 2
-            prev_penalty = self.STAMINA_PENALTIES[self.previous_condition]
-            target_penalty = self.STAMINA_PENALTIES[self.target_condition]
-            base_penalty = prev_penalty + (target_penalty - prev_penalty) * smooth_progress
-        else:
-            base_penalty = self.STAMINA_PENALTIES[self.current_condition]
-        
-        return base_penalty * self.current_intensity
-    
-    def get_weather_description(self) -> str:
-        condition_to_use = self.target_condition if self.transitioning else self.current_condition
-        base_desc = self._get_condition_name(condition_to_use)
-        
-        if self.transitioning:
-            base_desc += " (Cambiando)"
-        
-        if self.current_intensity >= 0.8:
-            return f"{base_desc} (Intenso)"
-        elif self.current_intensity >= 0.6:
-            return f"{base_desc} (Moderado)"
-        else:
-            return f"{base_desc} (Leve)"
-    
-    def get_weather_color(self) -> tuple:
-        condition_to_use = self.target_condition if self.transitioning else self.current_condition
-        return self.WEATHER_COLORS.get(condition_to_use, WHITE)
-
-# =============================================================================
-# SISTEMA DE ARCHIVOS MEJORADO
-# =============================================================================
-
-class RobustFileManager:
-    """Gestor robusto de archivos con validación y backups."""
-    
-    def __init__(self):
-        self._ensure_directory_structure()
-    
-    def _ensure_directory_structure(self):
-        directories = ['data', 'saves', 'api_cache', 'backups']
-        for directory in directories:
-            os.makedirs(directory, exist_ok=True)
-    
-    def save_game_with_validation(self, game_state: GameState, slot: int = 1) -> bool:
-        """GUARDADO CORREGIDO - Incluye todos los datos del mapa."""
-        try:
-            save_file = f"saves/slot{slot}.sav"
-            
-            save_data = {
-                'version': '3.1_map_fixed',
-                'timestamp': time.time(),
-                'game_state': game_state,
-                'metadata': {
-                    'saved_at': datetime.now().isoformat(),
-                    'game_time': game_state.game_time,
-                    'player_position': (game_state.player_pos.x, game_state.player_pos.y),
-                    'completion_percentage': (game_state.money / game_state.goal) * 100,
-                    'city_info': f"{game_state.city_name} ({game_state.city_width}x{game_state.city_height})"
-                }
-            }
-            
-            with open(save_file, 'wb') as f:
-                pickle.dump(save_data, f, protocol=pickle.HIGHEST_PROTOCOL)
-            
-            print(f" Juego guardado en slot {slot} - {game_state.city_name} {game_state.city_width}x{game_state.city_height}")
-            return True
-                
-        except Exception as e:
-            print(f" Error saving game: {e}")
-            return False
-        
-    def load_scores(self) -> list:
-        """Carga los puntajes SIN spam en consola."""
-        scores_file = "data/puntajes.json"
-        
-        try:
-            os.makedirs("data", exist_ok=True)
-            
-            if not os.path.exists(scores_file):
-                with open(scores_file, 'w', encoding='utf-8') as f:
-                    json.dump([], f, indent=2, ensure_ascii=False)
-                return []
-            
-            with open(scores_file, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-                
-                if not content:
-                    return []
-                
-                scores = json.loads(content)
-            
-            if not isinstance(scores, list):
-                with open(scores_file, 'w', encoding='utf-8') as f:
-                    json.dump([], f, indent=2, ensure_ascii=False)
-                return []
-            
-            scores.sort(key=lambda x: x.get('score', 0), reverse=True)
-            
-            scores = scores[:10]
-            
-            return scores
-            
-        except json.JSONDecodeError as e:
-            if os.path.exists(scores_file):
-                try:
-                    backup_file = f"data/puntajes_backup_{int(time.time())}.json"
-                    shutil.copy2(scores_file, backup_file)
-                except:
-                    pass
-                
-                with open(scores_file, 'w', encoding='utf-8') as f:
-                    json.dump([], f, indent=2, ensure_ascii=False)
-            
-            return []
-            
-        except Exception as e:
-            return []
-    
-    def load_game_with_validation(self, slot: int = 1) -> Optional[GameState]:
-        """CARGA CORREGIDA - Valida datos del mapa."""
-        save_file = f"saves/slot{slot}.sav"
-        
-        if not os.path.exists(save_file):
-            return None
-            
-        try:
-            with open(save_file, 'rb') as f:
-                save_data = pickle.load(f)
-            
-            if not isinstance(save_data, dict):
-                return None
-            
-            game_state = save_data['game_state']
-           
-            if not hasattr(game_state, 'city_width') or not hasattr(game_state, 'city_height'):
-                print(" Estado guardado antiguo sin datos de mapa completos")
-                return None
-            
-            print(f" Juego cargado desde slot {slot} - {game_state.city_name} {game_state.city_width}x{game_state.city_height}")
-            return game_state
-                
-        except Exception as e:
-            print(f" Error loading from {save_file}: {e}")
-            return None
-    
-    def get_save_info(self, slot: int) -> Optional[dict]:
-        save_file = f"saves/slot{slot}.sav"
-        
-        if not os.path.exists(save_file):
-            return None
-        
-        try:
-            with open(save_file, 'rb') as f:
-                save_data = pickle.load(f)
-            
-            if 'metadata' in save_data:
-                return save_data['metadata']
-        except:
-            return None
-        return None
-
-# =============================================================================
-# SISTEMA DE MENÚS
-# =============================================================================
-
-class GameMenu:
-    """Sistema de menús del juego."""
-    
-    def __init__(self):
-        self.state = "main_menu"
-        self.main_options = ["Nuevo Juego", "Cargar Partida", "Tutorial", "Ver Puntajes", "Salir"]
-        self.selected = 0
-        self.file_manager = RobustFileManager()
-        
-        self.title_font = pygame.font.Font(None, 48)
-        self.menu_font = pygame.font.Font(None, 32)
-        self.small_font = pygame.font.Font(None, 24)
-    
-    def handle_menu_input(self, event) -> Optional[str]:
-        if event.type == pygame.KEYDOWN:
-            if self.state == "main_menu":
-                return self._handle_main_menu_input(event)
-            elif self.state == "load_menu":
-                return self._handle_load_menu_input(event)
-            elif self.state == "scores_menu": 
-                return self._handle_scores_menu_input(event)
-        return None
-    
-
-    def _handle_scores_menu_input(self, event) -> Optional[str]:
-        """Manejo de menú de puntajes con limpieza de caché."""
-        if event.key == pygame.K_b or event.key == pygame.K_ESCAPE or event.key == pygame.K_RETURN:
-            self.state = "main_menu"
-            self.selected = 3  # Volver a "Ver Puntajes"
-            
-            if hasattr(self, '_cached_scores'):
-                self._cached_scores = None
-        return None
-    
-    def _handle_main_menu_input(self, event) -> Optional[str]:
-        if event.key == pygame.K_UP:
-            self.selected = (self.selected - 1) % len(self.main_options)
-            
-            if hasattr(self, '_cached_scores'):
-                self._cached_scores = None
-        elif event.key == pygame.K_DOWN:
-            self.selected = (self.selected + 1) % len(self.main_options)
-            
-            if hasattr(self, '_cached_scores'):
-                self._cached_scores = None
-        elif event.key == pygame.K_RETURN:
-            option = self.main_options[self.selected]
-            if option == "Nuevo Juego":
-                return "start_new_game"
-            elif option == "Cargar Partida":
-                self.state = "load_menu"
-                self.selected = 0
-                
-                if hasattr(self, '_cached_scores'):
-                    self._cached_scores = None
-            elif option == "Tutorial":
-                return "start_tutorial"
-            elif option == "Ver Puntajes":
-                self.state = "scores_menu"
-                self.selected = 0
-            elif option == "Salir":
-                return "exit"
-        elif event.key == pygame.K_ESCAPE:
-            return "exit"
-        return None
-    
-    def _handle_load_menu_input(self, event) -> Optional[str]:
-       
-        if event.key == pygame.K_UP:
-            self.selected = max(0, self.selected - 1)
-        elif event.key == pygame.K_DOWN:
-            self.selected = min(1, self.selected + 1)  # Solo 2 opciones: slot 1 + volver
-        elif event.key == pygame.K_RETURN:
-            if self.selected == 1:  # Volver
-                self.state = "main_menu"
-                self.selected = 1
-            else:  # Slot 1
-                return "load_slot_1"
-        elif event.key == pygame.K_b or event.key == pygame.K_ESCAPE: 
-            self.state = "main_menu"
-            self.selected = 1
-        return None
-    
-    def draw(self, screen):
-        screen.fill((20, 25, 40))
-        
-        if self.state == "main_menu":
-            self._draw_main_menu(screen)
-        elif self.state == "load_menu":
-            self._draw_load_menu(screen)
-        elif self.state == "scores_menu":  
-            self._draw_scores_menu(screen)
-
-
-
-    def _draw_scores_menu(self, screen):
-        """Pantalla de puntajes CON CACHÉ."""
-        title = self.title_font.render("TABLA DE PUNTAJES", True, (255, 255, 255))
-        title_rect = title.get_rect(center=(WINDOW_WIDTH // 2, 80))
-        screen.blit(title, title_rect)
-        
-        # Solo cargar puntajes una vez cuando entras al menú
-        if not hasattr(self, '_cached_scores') or self._cached_scores is None:
-            self._cached_scores = self.file_manager.load_scores()
-            print(f" {len(self._cached_scores)} puntajes cargados para visualización")
-        
-        scores = self._cached_scores
-        
-        if not scores:
-            no_scores_text = self.menu_font.render("No hay puntajes registrados", True, (150, 150, 150))
-            text_rect = no_scores_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
-            screen.blit(no_scores_text, text_rect)
-        else:
-            # Mostrar los primeros 10 puntajes
-            start_y = 150
-            headers = ["#", "Puntaje", "Dinero", "Rep.", "Pedidos", "Fecha", "Estado"]
-            header_positions = [100, 200, 320, 420, 520, 650, 850]
-            
-            # Dibujar encabezados
-            for i, header in enumerate(headers):
-                header_text = self.menu_font.render(header, True, (200, 200, 255))
-                screen.blit(header_text, (header_positions[i], start_y))
-            
-            # Línea separadora
-            pygame.draw.line(screen, (100, 100, 150), (80, start_y + 35), (WINDOW_WIDTH - 80, start_y + 35), 2)
-            
-            # Mostrar puntajes
-            for i, score in enumerate(scores[:10]):
-                y_pos = start_y + 50 + i * 35
-                rank_color = (255, 215, 0) if i == 0 else (192, 192, 192) if i == 1 else (205, 127, 50) if i == 2 else (255, 255, 255)
-                
-                # Número de ranking
-                rank_text = self.small_font.render(f"{i+1}", True, rank_color)
-                screen.blit(rank_text, (header_positions[0], y_pos))
-                
-                # Puntaje
-                score_text = self.small_font.render(f"{score.get('score', 0)}", True, rank_color)
-                screen.blit(score_text, (header_positions[1], y_pos))
-                
-                # Dinero
-                money_text = self.small_font.render(f"${score.get('money', 0)}", True, (100, 255, 100))
-                screen.blit(money_text, (header_positions[2], y_pos))
-                
-                # Reputación
-                rep = score.get('reputation', 0)
-                rep_color = (100, 255, 100) if rep >= 80 else (255, 255, 100) if rep >= 50 else (255, 100, 100)
-                rep_text = self.small_font.render(f"{rep}", True, rep_color)
-                screen.blit(rep_text, (header_positions[3], y_pos))
-                
-                # Pedidos completados
-                orders_text = self.small_font.render(f"{score.get('completed_orders', 0)}", True, (150, 200, 255))
-                screen.blit(orders_text, (header_positions[4], y_pos))
-                
-                # Fecha (solo día y hora)
-                date_str = score.get('date', '')[:16].replace('T', ' ')
-                date_text = self.small_font.render(date_str, True, (150, 150, 150))
-                screen.blit(date_text, (header_positions[5], y_pos))
-                
-                # Estado (Victoria/Derrota)
-                victory = score.get('victory', False)
-                status_text = "VICTORIA" if victory else "DERROTA"
-                status_color = (100, 255, 100) if victory else (255, 100, 100)
-                status_surface = self.small_font.render(status_text, True, status_color)
-                screen.blit(status_surface, (header_positions[6], y_pos))
-        
-        # Instrucciones para volver
-        back_text = self.small_font.render("Presiona B, ESC o ENTER para volver al menú principal", True, (150, 150, 150))
-        back_rect = back_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT - 50))
-        screen.blit(back_text, back_rect)
-    
-    def _draw_main_menu(self, screen):
-        title = self.title_font.render("COURIER QUEST", True, (255, 255, 255))
-        title_rect = title.get_rect(center=(WINDOW_WIDTH // 2, 150))
-        screen.blit(title, title_rect)
-        
-        subtitle = self.menu_font.render("API REAL INTEGRADA - EIF-207", True, (100, 255, 100))
-        subtitle_rect = subtitle.get_rect(center=(WINDOW_WIDTH // 2, 200))
-        screen.blit(subtitle, subtitle_rect)
-        
-        start_y = 300
-        for i, option in enumerate(self.main_options):
-            color = (255, 255, 100) if i == self.selected else (255, 255, 255)
-            text = self.menu_font.render(option, True, color)
-            text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, start_y + i * 50))
-            
-            if i == self.selected:
-                pygame.draw.rect(screen, (50, 50, 100), 
-                               (text_rect.x - 20, text_rect.y - 5, text_rect.width + 40, text_rect.height + 10))
-            
-            screen.blit(text, text_rect)
-        
-        instructions = self.small_font.render("Usa ↑↓ para navegar, ENTER para seleccionar", True, (150, 150, 150))
-        instructions_rect = instructions.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT - 50))
-        screen.blit(instructions, instructions_rect)
-    
-    def _draw_load_menu(self, screen):
-        """Solo mostrar 1 slot."""
-        title = self.title_font.render("CARGAR PARTIDA", True, (255, 255, 255))
-        title_rect = title.get_rect(center=(WINDOW_WIDTH // 2, 100))
-        screen.blit(title, title_rect)
-        
-        start_y = 250
-        
-        # Solo mostrar Slot 1
-        slot_info = self.file_manager.get_save_info(1)
-        
-        if self.selected == 0:
-            color = (255, 255, 100)
-            bg_color = (50, 50, 100)
-        elif slot_info:
-            color = (255, 255, 255)
-            bg_color = (30, 30, 50)
-        else:
-            color = (100, 100, 100)
-            bg_color = (20, 20, 30)
-        
-        slot_rect = pygame.Rect(WINDOW_WIDTH // 2 - 300, start_y - 5, 600, 70)
-        pygame.draw.rect(screen, bg_color, slot_rect)
-        pygame.draw.rect(screen, color, slot_rect, 2)
-        
-        if slot_info:
-            slot_text = f"Slot 1 - {slot_info.get('saved_at', 'Desconocido')[:19]}"
-            progress_text = f"Progreso: {slot_info.get('completion_percentage', 0):.1f}%"
-            city_text = slot_info.get('city_info', 'Ciudad desconocida')
-            
-            slot_label = self.menu_font.render(slot_text, True, color)
-            progress_label = self.small_font.render(progress_text, True, color)
-            city_label = self.small_font.render(city_text, True, color)
-            
-            screen.blit(slot_label, (WINDOW_WIDTH // 2 - 280, start_y))
-            screen.blit(progress_label, (WINDOW_WIDTH // 2 - 280, start_y + 25))
-            screen.blit(city_label, (WINDOW_WIDTH // 2 - 280, start_y + 45))
-        else:
-            empty_text = "Slot 1 - Vacío"
-            empty_label = self.menu_font.render(empty_text, True, color)
-            screen.blit(empty_label, (WINDOW_WIDTH // 2 - 280, start_y + 20))
-        
-        
-        volver_color = (255, 255, 100) if self.selected == 1 else (255, 255, 255)
-        volver_text = self.menu_font.render("← Volver al menú principal (B)", True, volver_color)
-        volver_rect = volver_text.get_rect(center=(WINDOW_WIDTH // 2, start_y + 120))
-        
-        if self.selected == 1:
-            pygame.draw.rect(screen, (50, 50, 100), 
-                        (volver_rect.x - 20, volver_rect.y - 5, volver_rect.width + 40, volver_rect.height + 10))
-        
-        screen.blit(volver_text, volver_rect)
-
-# =============================================================================
-# SISTEMA DE TUTORIAL
-# =============================================================================
-
-class TutorialSystem:
-    """Sistema de tutorial integrado."""
-    
-    def __init__(self):
-        self.tutorial_steps = [
-            {
-                "title": "Bienvenido a Courier Quest",
-                "message": "Eres un repartidor en bicicleta conectado a la API real de TigerCity. Tu objetivo es ganar $3000 antes de que termine la jornada laboral.",
-                "keys": ["ENTER para continuar"]
-            },
-            {
-                "title": "Movimiento Básico", 
-                "message": "Usa WASD o las flechas para moverte por la ciudad. Solo puedes moverte por calles (grises) y parques. Los edificios están bloqueados.",
-                "keys": ["WASD o ↑↓←→ para moverse", "ENTER para continuar"]
-            },
-            {
-                "title": "Resistencia y Estados",
-                "message": "Tu resistencia (0-100) baja al moverte. Si llega a 0, quedas exhausto. Recupera hasta 30 para moverte de nuevo. Los parques te ayudan a recuperar más rápido.",
-                "keys": ["Resistencia >30: Normal", "10-30: Cansado (x0.8 velocidad)", "≤0: Exhausto (no te mueves)"]
-            },
-            {
-                "title": "Gestión de Pedidos",
-                "message": "Presiona O para ver pedidos disponibles, I para inventario. Usa E en puntos de recogida y entrega. Los pedidos NO aparecen en edificios bloqueados.",
-                "keys": ["O: Ver pedidos", "I: Inventario", "E: Interactuar", "ENTER para continuar"]
-            },
-            {
-                "title": "Algoritmos de Ordenamiento",
-                "message": "Usa algoritmos para organizar pedidos: P (QuickSort por prioridad), T (MergeSort por tiempo), D (Insertion Sort por distancia).",
-                "keys": ["P: Ordenar por prioridad", "T: Ordenar por tiempo", "D: Ordenar por distancia", "ENTER para comenzar"]
-            }
-        ]
-        
-        self.current_step = 0
-        self.tutorial_active = True
-        self.font = pygame.font.Font(None, 28)
-        self.title_font = pygame.font.Font(None, 36)
-        self.small_font = pygame.font.Font(None, 20)
-    
-    def handle_input(self, event) -> bool:
-        if not self.tutorial_active:
-            return False
-            
-        if event.type == pygame.KEYDOWN and event.key == pygame.K_RETURN:
-            self.current_step += 1
-            if self.current_step >= len(self.tutorial_steps):
-                self.tutorial_active = False
-                return False
-        
-        return True
-    
-    def draw(self, screen):
-        if not self.tutorial_active or self.current_step >= len(self.tutorial_steps):
-            return
-        
-        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-        overlay.set_alpha(200)
-        overlay.fill((0, 0, 0))
-        screen.blit(overlay, (0, 0))
-        
-        step = self.tutorial_steps[self.current_step]
-        
-        panel_width = 900
-        panel_height = 500
-        panel_x = (WINDOW_WIDTH - panel_width) // 2
-        panel_y = (WINDOW_HEIGHT - panel_height) // 2
-        
-        panel_rect = pygame.Rect(panel_x, panel_y, panel_width, panel_height)
-        pygame.draw.rect(screen, (40, 50, 70), panel_rect, border_radius=15)
-        pygame.draw.rect(screen, (100, 150, 200), panel_rect, 3, border_radius=15)
-        
-        title = self.title_font.render(step["title"], True, (255, 255, 255))
-        title_rect = title.get_rect(center=(WINDOW_WIDTH // 2, panel_y + 50))
-        screen.blit(title, title_rect)
-        
-        self._draw_wrapped_text(screen, step["message"], 
-                               panel_x + 40, panel_y + 100, 
-                               panel_width - 80, self.font, (220, 220, 220))
-        
-        controls_y = panel_y + panel_height - 150
-        for i, key_info in enumerate(step["keys"]):
-            key_text = self.small_font.render(f"• {key_info}", True, (150, 200, 255))
-            screen.blit(key_text, (panel_x + 40, controls_y + i * 25))
-        
-        progress_text = f"Paso {self.current_step + 1} de {len(self.tutorial_steps)}"
-        progress = self.small_font.render(progress_text, True, (150, 150, 150))
-        progress_rect = progress.get_rect(center=(WINDOW_WIDTH // 2, panel_y + panel_height - 20))
-        screen.blit(progress, progress_rect)
-    
-    def _draw_wrapped_text(self, surface, text, x, y, max_width, font, color):
-        words = text.split(' ')
-        lines = []
-        current_line = []
-        
-        for word in words:
-            test_line = ' '.join(current_line + [word])
-            if font.size(test_line)[0] <= max_width:
-                current_line.append(word)
-            else:
-                if current_line:
-                    lines.append(' '.join(current_line))
-                    current_line = [word]
-                else:
-                    lines.append(word)
-        
-        if current_line:
-            lines.append(' '.join(current_line))
-        
-        for i, line in enumerate(lines):
-            line_surface = font.render(line, True, color)
-            surface.blit(line_surface, (x, y + i * (font.get_height() + 5)))
-    
-    def is_active(self) -> bool:
-        return self.tutorial_active
-
-# =============================================================================
-# CLASE PRINCIPAL DEL JUEGO CORREGIDA
-# =============================================================================
-
-class CourierQuest:
-    """Clase principal del juego Courier Quest - VERSIÓN CON IMÁGENES."""
-    
-    def __init__(self):
-        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-        pygame.display.set_caption("Courier Quest - Versión con Imágenes")
-        self.clock = pygame.time.Clock()
-        
-        # Fuentes optimizadas
-        self.font = pygame.font.Font(None, 24)
-        self.small_font = pygame.font.Font(None, 20)
-        self.large_font = pygame.font.Font(None, 32)
-        self.title_font = pygame.font.Font(None, 38)
-        self.header_font = pygame.font.Font(None, 28)
-
-        # Sistema de imágenes para tiles, clima Y JUGADOR
-        self.tile_images = {}
-        self.weather_images = {}
-        self.player_image = None  # ← NUEVA LÍNEA AGREGADA
-
-        # Sistemas del juego (mantener todo lo existente)
-        self.api_manager = TigerAPIManager()
-        self.weather_system = EnhancedWeatherSystem()
-        self.history = MemoryEfficientHistory()
-        self.file_manager = RobustFileManager()
-        self.sorting_algorithms = SortingAlgorithms()
-        self.menu_system = GameMenu()
-        self.tutorial_system = TutorialSystem()
-
-        # Estados del juego (mantener todo lo existente)
-        self.game_state = "menu"
-        self.running = True
-        self.paused = False
-        self.game_over = False
-        self.victory = False
-
-        # Datos del mundo - DESDE API REAL CON CORRECCIONES
-        self.map_data = {}
-        self.city_width = 30
-        self.city_height = 25
-        self.tiles = []
-        self.legend = {}
-        self.goal = 3000
-        self.city_name = "TigerCity"
-        self.max_game_time = 600.0
-
-        # POSICIÓN DEL MAPA CORREGIDA
-        self.map_offset_x = 20
-        self.map_offset_y = 35
-        self.map_pixel_width = self.city_width * TILE_SIZE
-        self.map_pixel_height = self.city_height * TILE_SIZE
-
-        # Estado del jugador (mantener todo lo existente)
-        self.player_pos = Position(2, 2)
-        self.stamina = 100.0        
-        self.max_stamina = 100.0      
-        self.reputation = 70
-        self.money = 0
-        self.max_weight = 10
-        self.base_speed = 3.0
-
-        # Tiempo del juego
-        self.game_time = 0.0
-
-        # Gestión de pedidos - ESTRUCTURAS DE DATOS CORRECTAS
-        self.pending_orders = deque()
-        self.available_orders = OptimizedPriorityQueue()
-        self.inventory = deque()
-        self.completed_orders = []
-
-        # Estadísticas
-        self.delivery_streak = 0
-        self.last_delivery_was_clean = True
-
-        # Interfaz de usuario
-        self.show_inventory = False
-        self.show_orders = False
-        self.selected_order_index = 0
-        self.selected_inventory_index = 0
-
-        # Control de movimiento
-        self.move_cooldown = 0.08
-        self.last_move_time = 0
-
-        # Mensajes del juego
-        self.game_messages = []
-        self.message_timer = 0
-
-        # Métricas de rendimiento
-        self.fps_counter = 0
-        self.fps_timer = 0
-        self.current_fps = 60
-
-        # Cargar imágenes de tiles, clima Y JUGADOR
-        self._load_tile_images()
-        self._load_weather_images()
-        self._load_player_image()  # ← NUEVA LÍNEA AGREGADA
-        
-        self._ensure_data_files()
-        print(" Courier Quest inicializado - VERSIÓN CON IMÁGENES COMPLETAS + JUGADOR")
-
-
-
-    def _load_player_image(self):
-        """ NUEVO: Carga la imagen del jugador/repartidor."""
-        try:
-            # Cargar imagen del repartidor
-            player_image = pygame.image.load("Repartidor.png")
-            # Redimensionar la imagen al tamaño del tile (con pequeño margen)
-            player_size = TILE_SIZE - 4  # Un poco más pequeño que el tile para mejor visibilidad
-            self.player_image = pygame.transform.scale(player_image, (player_size, player_size))
-            print(" Imagen del repartidor cargada correctamente desde Repartidor.png")
-            
-        except FileNotFoundError as e:
-            print(f" No se pudo cargar imagen del repartidor: {e}")
-            print(" Asegúrate de que exista 'Repartidor.png' en la carpeta del juego")
-            self._create_fallback_player_image()
-        except Exception as e:
-            print(f" Error cargando imagen del repartidor: {e}")
-            self._create_fallback_player_image()
-
-
-
-    def _create_fallback_player_image(self):
-        """Crea una imagen de respaldo para el jugador si no se puede cargar la original."""
-        player_size = TILE_SIZE - 4
-        fallback_surface = pygame.Surface((player_size, player_size), pygame.SRCALPHA)
-        
-        # Crear un repartidor simple usando formas geométricas
-        center_x = player_size // 2
-        center_y = player_size // 2
-        
-        # Cuerpo (círculo azul)
-        pygame.draw.circle(fallback_surface, BLUE, (center_x, center_y), player_size // 3)
-        
-        # Cabeza (círculo más pequeño, color piel)
-        head_color = (255, 220, 177)  # Color piel
-        pygame.draw.circle(fallback_surface, head_color, (center_x, center_y - player_size // 4), player_size // 6)
-        
-        # Casco/gorra (semicírculo)
-        helmet_color = (255, 255, 0)  # Amarillo
-        helmet_rect = pygame.Rect(center_x - player_size // 8, center_y - player_size // 3, player_size // 4, player_size // 6)
-        pygame.draw.ellipse(fallback_surface, helmet_color, helmet_rect)
-        
-        # Borde del jugador
-        pygame.draw.circle(fallback_surface, BLACK, (center_x, center_y), player_size // 3, 2)
-        
-        self.player_image = fallback_surface
-
-    def _load_weather_images(self):
-        """Carga las imágenes para los diferentes estados del clima."""
-        
-        # Mapeo de estados del clima a archivos de imagen
-        weather_files = {
-            'clear': 'Despejado.png',
-            'clouds': 'Nublado.png', 
-            'rain_light': 'Llovizna.png',
-            'rain': 'Lluvioso.png',
-            'storm': 'Tormenta.png',
-            'fog': 'Nublado.png',     
-            'wind': 'Ventoso.png',
-            'heat': 'Despejado.png',  
-            'cold': 'Ventoso.png'     
-        }
-        
-        weather_loaded = 0
-        weather_size = 60  
-        
-        for weather_state, filename in weather_files.items():
-            try:
-                weather_image = pygame.image.load(filename)
-                # Redimensionar al tamaño más grande
-                self.weather_images[weather_state] = pygame.transform.scale(weather_image, (weather_size, weather_size))
-                print(f" Imagen de clima '{weather_state}' cargada desde {filename} (Tamaño: {weather_size}x{weather_size})")
-                weather_loaded += 1
-            except Exception as e:
-                print(f" No se pudo cargar imagen de clima '{weather_state}' desde {filename}: {e}")
-        
-        # Resumen de carga de clima
-        total_weather_states = len(weather_files)
-        if weather_loaded == total_weather_states:
-            print(f" ¡PERFECTO! Todas las {weather_loaded} imágenes de clima cargadas (Tamaño: {weather_size}x{weather_size})")
-        elif weather_loaded > 0:
-            print(f" {weather_loaded}/{total_weather_states} imágenes de clima cargadas (Tamaño: {weather_size}x{weather_size})")
-        else:
-            print(" No se pudieron cargar imágenes de clima. Usando círculos de colores de respaldo")
-        
-        # Crear respaldos para climas sin imagen
-        self._create_weather_fallbacks()
-
-
-    def _create_weather_fallbacks(self):
-        """Crea íconos de respaldo para climas sin imagen."""
-        
-        weather_size = 75  
-        
-        # Colores de respaldo para cada clima
-        weather_colors = {
-            'clear': (200, 150, 100),
-            'clouds': (180, 180, 180),
-            'rain_light': (100, 150, 200),
-            'rain': (70, 120, 180),
-            'storm': (50, 50, 100),
-            'fog': (200, 200, 200),
-            'wind': (150, 200, 150),
-            'heat': (255, 100, 100),
-            'cold': (150, 200, 255)
-        }
-        
-        for weather_state, color in weather_colors.items():
-            if weather_state not in self.weather_images:
-                # Crear superficie circular de respaldo ajustada
-                fallback_surface = pygame.Surface((weather_size, weather_size), pygame.SRCALPHA)
-                pygame.draw.circle(fallback_surface, color, (weather_size//2, weather_size//2), weather_size//2 - 2)
-                pygame.draw.circle(fallback_surface, (100, 100, 100), (weather_size//2, weather_size//2), weather_size//2 - 2, 2)
-                
-                self.weather_images[weather_state] = fallback_surface
-                print(f" Ícono de respaldo creado para clima '{weather_state}' (Tamaño: {weather_size}x{weather_size})")
-
-        
-    def _load_tile_images(self):
-        """Carga las imágenes para todos los tipos de tiles."""
-        images_loaded = 0
-        
-        try:
-            #  Cargar imagen de parque
-            park_image = pygame.image.load("pixilart-drawing.png")
-            self.tile_images["P"] = pygame.transform.scale(park_image, (TILE_SIZE, TILE_SIZE))
-            print(" Imagen de parque cargada desde pixilart-drawing.png")
-            images_loaded += 1
-        except Exception as e:
-            print(f" No se pudo cargar imagen de parque: {e}")
-        
-        try:
-            #  Cargar imagen de calle
-            street_image = pygame.image.load("pixil-frame-0 (1).png")
-            self.tile_images["C"] = pygame.transform.scale(street_image, (TILE_SIZE, TILE_SIZE))
-            print(" Imagen de calle cargada desde pixil-frame-0 (1).png")
-            images_loaded += 1
-        except Exception as e:
-            print(f" No se pudo cargar imagen de calle: {e}")
-        
-        try:
-            # Cargar imagen de edificio
-            building_image = pygame.image.load("pixil-frame-0 (2).png")
-            self.tile_images["B"] = pygame.transform.scale(building_image, (TILE_SIZE, TILE_SIZE))
-            print(" Imagen de edificio cargada desde pixil-frame-0 (2).png")
-            images_loaded += 1
-        except Exception as e:
-            print(f"⚠️ No se pudo cargar imagen de edificio: {e}")
-        
-        # Resumen de carga
-        if images_loaded == 3:
-            print(f" ¡PERFECTO! Todas las {images_loaded} imágenes PNG cargadas correctamente")
-        elif images_loaded > 0:
-            print(f" {images_loaded}/3 imágenes PNG cargadas. Usando respaldo para las faltantes")
-        else:
-            print(" No se pudieron cargar imágenes PNG. Usando gráficos de respaldo")
-        
-        # Crear respaldos para las imágenes que no se pudieron cargar
-        self._create_fallback_images()
-
-
-    def get_complete_image_status(self):
-        """MODIFICADO: Obtiene el estado completo de todas las imágenes cargadas incluyendo jugador."""
-        tile_count = len(self.tile_images)
-        
-        # Contar imágenes únicas de clima (sin contar respaldos)
-        unique_weather_files = set()
-        weather_files = {
-            'clear': 'Despejado.png',
-            'clouds': 'Nublado.png', 
-            'rain_light': 'Llovizna.png',
-            'rain': 'Lluvioso.png',
-            'storm': 'Tormenta.png',
-            'fog': 'Nublado.png',
-            'wind': 'Ventoso.png',
-            'heat': 'Despejado.png',
-            'cold': 'Ventoso.png'
-        }
-        
-        for state in self.weather_images:
-            if state in weather_files:
-                unique_weather_files.add(weather_files[state])
-        
-        weather_count = len(unique_weather_files)
-        
-        # Verificar si se cargó la imagen del jugador
-        has_player_image = self.player_image is not None
-        
-        # Estado completo
-        if tile_count == 3 and weather_count >= 5 and has_player_image:
-            return " Imágenes completas: 3 tiles + clima + jugador"
-        elif tile_count == 3 and has_player_image:
-            return f" 3 tiles PNG + {weather_count} clima + jugador"
-        elif weather_count >= 5 and has_player_image:
-            return f" {tile_count} tiles + clima completo + jugador"
-        elif has_player_image:
-            return f" {tile_count} tiles + {weather_count} clima + jugador + respaldo"
-        elif tile_count > 0 or weather_count > 0:
-            return f" {tile_count} tiles + {weather_count} clima + jugador respaldo"
-        else:
-            return " Solo gráficos de respaldo (incluye jugador)"
-
-    def _create_fallback_images(self):
-        """Crea imágenes de respaldo para los tiles que no tienen imagen PNG."""
-        
-        if "P" not in self.tile_images:
-            park_surface = pygame.Surface((TILE_SIZE, TILE_SIZE))
-            park_surface.fill(GREEN)
-            
-            # Dibujar algunos "árboles" simples
-            tree_color = (0, 100, 0)
-            for i in range(3):
-                for j in range(3):
-                    if (i + j) % 2 == 0:  # Patrón de tablero
-                        tree_rect = pygame.Rect(
-                            i * (TILE_SIZE // 3) + 2, 
-                            j * (TILE_SIZE // 3) + 2, 
-                            TILE_SIZE // 3 - 4, 
-                            TILE_SIZE // 3 - 4
-                        )
-                        pygame.draw.ellipse(park_surface, tree_color, tree_rect)
-            
-            self.tile_images["P"] = park_surface
-            print(" Imagen de respaldo para parque creada")
-        
-        
-        if "C" not in self.tile_images:
-            street_surface = pygame.Surface((TILE_SIZE, TILE_SIZE))
-            street_surface.fill(LIGHT_GRAY)
-            
-            # Dibujar líneas de calle
-            line_color = (180, 180, 180)
-            # Línea central horizontal
-            pygame.draw.line(street_surface, line_color, 
-                        (0, TILE_SIZE // 2), (TILE_SIZE, TILE_SIZE // 2), 2)
-            # Línea central vertical
-            pygame.draw.line(street_surface, line_color, 
-                        (TILE_SIZE // 2, 0), (TILE_SIZE // 2, TILE_SIZE), 2)
-            
-            self.tile_images["C"] = street_surface
-            print(" Imagen de respaldo para calle creada")
-        
-       
-        if "B" not in self.tile_images:
-            building_surface = pygame.Surface((TILE_SIZE, TILE_SIZE))
-            building_surface.fill(DARK_GRAY)
-            
-            # Dibujar ventanas del edificio
-            window_color = (100, 100, 100)
-            for i in range(2):
-                for j in range(2):
-                    window_rect = pygame.Rect(
-                        4 + i * (TILE_SIZE // 2 - 2), 
-                        4 + j * (TILE_SIZE // 2 - 2),
-                        TILE_SIZE // 2 - 8, 
-                        TILE_SIZE // 2 - 8
-                    )
-                    pygame.draw.rect(building_surface, window_color, window_rect)
-            
-            self.tile_images["B"] = building_surface
-            print("✅ Imagen de respaldo para edificio creada")
-
-    # ✅ NUEVO MÉTODO: Obtener colores base
-    def _get_tile_base_color(self, tile_type):
-        """Obtiene el color base para un tipo de tile."""
-        if tile_type == "C":
-            return LIGHT_GRAY  # Calles
-        elif tile_type == "B":
-            return DARK_GRAY   # Edificios bloqueados
-        elif tile_type == "P":
-            return GREEN       # Parques (color de fondo)
-        elif tile_type == "R":
-            return PURPLE      # Puntos de descanso
-        else:
-            return WHITE       # Desconocido
-    
-    def _ensure_data_files(self):
-        os.makedirs("data", exist_ok=True)
-        os.makedirs("saves", exist_ok=True)
-        os.makedirs("api_cache", exist_ok=True)
-        
-        if not os.path.exists("data/puntajes.json"):
-            with open("data/puntajes.json", 'w') as f:
-                json.dump([], f)
-    
-    def initialize_game_data(self):
-        """INICIALIZACIÓN CORREGIDA - Carga datos del mapa correctamente."""
-        try:
-            print("Inicializando datos del juego...")
-            
-            # Obtener mapa desde la API real
-            self.map_data = self.api_manager.get_city_map()
-            
-            # CORRECCIÓN: Extraer datos del mapa correctamente
-            self.city_width = self.map_data.get('width', 30)
-            self.city_height = self.map_data.get('height', 25)
-            self.tiles = self.map_data.get('tiles', [])
-            self.legend = self.map_data.get('legend', {})
-            self.goal = self.map_data.get('goal', 3000)
-            self.city_name = self.map_data.get('city_name', 'TigerCity')
-            self.max_game_time = self.map_data.get('max_time', 600.0)
-            
-            # CORRECCIÓN: Recalcular dimensiones del mapa según datos reales
-            self.map_pixel_width = self.city_width * TILE_SIZE
-            self.map_pixel_height = self.city_height * TILE_SIZE
-            
-            # VALIDAR POSICIÓN INICIAL DEL JUGADOR
-            self.player_pos = self._find_valid_starting_position()
-            
-            # Obtener pedidos desde la API real - MEJORADO PARA MÁS FLUIDEZ
-            orders_data = self.api_manager.get_city_jobs()
-            
-            # APLICAR REGLAS DE VALIDACIÓN DE PEDIDOS
-            for order_data in orders_data:
-                try:
-                    # REGLA: Los pedidos NO pueden estar en edificios bloqueados
-                    if not self._validate_order_positions(order_data):
-                        print(f" Pedido {order_data.id} tiene posiciones inválidas, corrigiendo...")
-                        order_data = self._fix_order_positions(order_data)
-                    
-                    self.pending_orders.append(order_data)
-                except (KeyError, ValueError) as e:
-                    print(f" Error cargando pedido: {e}")
-                    continue
-            
-            # Ordenar pedidos por tiempo de liberación
-            self.pending_orders = deque(sorted(self.pending_orders, key=lambda x: x.release_time))
-            
-            print(f" {self.city_name} cargada: {self.city_width}x{self.city_height}")
-            print(f" {len(self.pending_orders)} pedidos validados cargados")
-            print(f" Meta: ${self.goal} | Tiempo: {self.max_game_time}s")
-            print(f" Jugador iniciado en posición válida: ({self.player_pos.x}, {self.player_pos.y})")
-            
-            # Mensaje de bienvenida
-            self.add_game_message(f"¡Bienvenido a {self.city_name}! Meta: ${self.goal}", 4.0, GREEN)
-            
-        except Exception as e:
-            print(f" Error cargando datos del mundo: {e}")
-            self._create_fallback_data()
-    
-    def _find_valid_starting_position(self) -> Position:
-        """Encuentra una posición inicial válida para el jugador."""
-        # Intentar posiciones comunes primero
-        common_positions = [
-            (2, 2), (3, 3), (1, 1), (4, 4), (5, 5),
-            (2, 3), (3, 2), (1, 2), (2, 1)
-        ]
-        
-        for x, y in common_positions:
-            if self._is_position_walkable(x, y):
-                print(f" Posición inicial válida encontrada: ({x}, {y})")
-                return Position(x, y)
-        
-        # Buscar cualquier posición válida
-        for y in range(min(10, self.city_height)):
-            for x in range(min(10, self.city_width)):
-                if self._is_position_walkable(x, y):
-                    print(f" Posición inicial de respaldo: ({x}, {y})")
-                    return Position(x, y)
-        
-        # Fallback final
-        print(" No se encontró posición válida, usando (1, 1)")
-        return Position(1, 1)
-    
-    def _is_position_walkable(self, x: int, y: int) -> bool:
-        """Verifica si una posición es caminable según las reglas del juego"""
-        if not (0 <= x < self.city_width and 0 <= y < self.city_height):
-            return False
-        
-        if y < len(self.tiles) and x < len(self.tiles[y]):
-            tile_type = self.tiles[y][x]
-            tile_info = self.legend.get(tile_type, {})
-            return not tile_info.get("blocked", False)
-        
-        return True
-    
-    def _validate_order_positions(self, order: Order) -> bool:
-        """Valida que las posiciones del pedido sean válidas."""
-        pickup_valid = self._is_position_walkable(order.pickup.x, order.pickup.y)
-        dropoff_valid = self._is_position_walkable(order.dropoff.x, order.dropoff.y)
-        
-        if not pickup_valid:
-            print(f" Pickup de {order.id} en posición bloqueada: ({order.pickup.x}, {order.pickup.y})")
-        if not dropoff_valid:
-            print(f" Dropoff de {order.id} en posición bloqueada: ({order.dropoff.x}, {order.dropoff.y})")
-        
-        return pickup_valid and dropoff_valid
-    
-    def _fix_order_positions(self, order: Order) -> Order:
-        """Corrige las posiciones de un pedido para que sean válidas"""
-        # Corregir pickup si es necesario
-        if not self._is_position_walkable(order.pickup.x, order.pickup.y):
-            order.pickup = self._find_nearest_walkable_position(order.pickup.x, order.pickup.y)
-            print(f" Pickup corregido a: ({order.pickup.x}, {order.pickup.y})")
-        
-        # Corregir dropoff si es necesario
-        if not self._is_position_walkable(order.dropoff.x, order.dropoff.y):
-            order.dropoff = self._find_nearest_walkable_position(order.dropoff.x, order.dropoff.y)
-            print(f" Dropoff corregido a: ({order.dropoff.x}, {order.dropoff.y})")
-        
-        return order
-    
-    def _find_nearest_walkable_position(self, x: int, y: int) -> Position:
-        """Encuentra la posición caminable más cercana"""
-        # Buscar en espiral desde la posición original
-        for radius in range(1, min(self.city_width, self.city_height) // 2):
-            for dx in range(-radius, radius + 1):
-                for dy in range(-radius, radius + 1):
-                    if abs(dx) == radius or abs(dy) == radius:  # Solo el borde del cuadrado
-                        nx, ny = x + dx, y + dy
-                        if self._is_position_walkable(nx, ny):
-                            return Position(nx, ny)
-        
-        # Fallback: encontrar cualquier posición válida
-        for ty in range(self.city_height):
-            for tx in range(self.city_width):
-                if self._is_position_walkable(tx, ty):
-                    return Position(tx, ty)
-        
-        return Position(1, 1)  # Último recurso
-    
-    def _create_fallback_data(self):
-        """Crea datos por defecto si falla la carga de la API."""
-        self.city_width = 20
-        self.city_height = 15
-        self.tiles = [["C"] * 20 for _ in range(15)]
-        self.legend = {"C": {"name": "calle", "surface_weight": 1.00}}
-        self.goal = 2000
-        self.city_name = "Ciudad de Respaldo"
-        self.max_game_time = 600.0
-        print("🔧 Usando datos de respaldo")
-
-    def add_game_message(self, message: str, duration: float = 3.0, color: tuple = WHITE):
-        """Añade un mensaje temporal al juego."""
-        self.game_messages.append((message, duration, color))
-    
-    # SISTEMA DE TIEMPO Y URGENCIA
-    def get_order_time_remaining(self, order: Order) -> float:
-        """Calcula el tiempo restante de un pedido."""
-        if order.status == "waiting_release":
-            return order.duration_minutes * 60
-        
-        elapsed_since_created = self.game_time - order.created_at
-        total_duration_seconds = order.duration_minutes * 60
-        return max(0, total_duration_seconds - elapsed_since_created)
-    
-    def get_order_urgency_color(self, order: Order) -> tuple:
-        """Determina el color basado en urgencia del pedido."""
-        time_remaining = self.get_order_time_remaining(order)
-        total_duration = order.duration_minutes * 60
-        
-        if time_remaining <= 0:
-            return DARK_RED
-        
-        progress = time_remaining / total_duration
-        
-        if progress > 0.66:
-            return DARK_GREEN
-        elif progress > 0.33:
-            return YELLOW
-        else:
-            return RED
-    
-    def get_order_status_text(self, order: Order) -> str:
-        time_remaining = self.get_order_time_remaining(order)
-        
-        if time_remaining <= 0:
-            return "EXPIRADO"
-        
-        minutes = int(time_remaining // 60)
-        seconds = int(time_remaining % 60)
-        
-        if minutes > 0:
-            return f"{minutes}:{seconds:02d}"
-        else:
-            return f"0:{seconds:02d}"
-    
-    def _get_district_name(self, x: int, y: int) -> str:
-        """Sistema de distritos para mejor organización"""
-        if y < self.city_height // 3:
-            return "Norte"
-        elif y < 2 * self.city_height // 3:
-            return "Centro"  
-        else:
-            return "Sur"
-    
-    def handle_events(self, events):
-        """Maneja eventos de pygame."""
-        for event in events:
-            if event.type == pygame.QUIT:
-                self.running = False
-            elif event.type == pygame.KEYDOWN:
-                if self.game_state == "playing":
-                    self._handle_game_events(event)
-                elif self.game_state == "menu":
-                    self._handle_menu_events(event)
-                elif self.game_state == "tutorial":
-                    self._handle_tutorial_events(event)
-                elif self.game_state == "game_over": 
-                    self._handle_game_over_events(event)
-
-
-    def _handle_game_over_events(self, event):
-        """Maneja eventos durante el game over."""
-        if event.key == pygame.K_ESCAPE:
-            print("\n Volviendo al menú principal...")
-            
-            self.game_state = "menu"
-            self.game_over = False
-            self.victory = False
-            
-            if hasattr(self, '_score_saved'):
-                delattr(self, '_score_saved')
-                print(" Flag _score_saved eliminado")
-            
-            if hasattr(self, '_final_score_display'):
-                delattr(self, '_final_score_display')
-                print("  Flag _final_score_display eliminado")
-            
-            # Resetear el juego para nueva partida
-            print("  Reinicializando juego...")
-            self.__init__()
-    
-    def _handle_game_events(self, event):
-        """Maneja eventos durante el juego."""
-        if event.key == pygame.K_SPACE:
-            self.paused = not self.paused
-        elif event.key == pygame.K_i:
-            self.show_inventory = not self.show_inventory
-            if self.show_inventory:
-                self.selected_inventory_index = 0
-        elif event.key == pygame.K_o:
-            self.show_orders = not self.show_orders
-            if self.show_orders:
-                self.selected_order_index = 0
-        elif event.key == pygame.K_ESCAPE:
-            if self.game_over:
-                self.game_state = "menu"
-                self.game_over = False
-                self.victory = False
-            else:
-                self.paused = not self.paused
-        elif event.key == pygame.K_e:
-            self.interact_at_position()
-        elif event.key == pygame.K_F5:
-            self.save_game()
-        elif event.key == pygame.K_F9:
-            self.load_game()
-        elif event.key == pygame.K_z and pygame.key.get_pressed()[pygame.K_LCTRL]:
-            self.undo_move()
-        elif event.key == pygame.K_p:
-            self._sort_inventory_by_priority()
-        elif event.key == pygame.K_t:
-            self._sort_inventory_by_deadline()
-        elif event.key == pygame.K_d:
-            self._sort_orders_by_distance()
-        
-        # Navegación en menús
-        elif self.show_inventory:
-            if event.key == pygame.K_UP:
-                self.selected_inventory_index = max(0, self.selected_inventory_index - 1)
-            elif event.key == pygame.K_DOWN:
-                max_index = len(self.inventory) - 1
-                self.selected_inventory_index = min(max_index, self.selected_inventory_index + 1)
-            elif event.key == pygame.K_RETURN:
-                self.deliver_selected_order()
-        
-        elif self.show_orders:
-            if event.key == pygame.K_UP:
-                self.selected_order_index = max(0, self.selected_order_index - 1)
-            elif event.key == pygame.K_DOWN:
-                max_index = min(len(self.available_orders.items) - 1, 6)
-                self.selected_order_index = min(max_index, self.selected_order_index + 1)
-            elif event.key == pygame.K_RETURN:
-                self.accept_selected_order()
-    
-    def _handle_menu_events(self, event):
-        """Maneja eventos del menú principal."""
-        action = self.menu_system.handle_menu_input(event)
-        if action == "start_new_game":
-            self.initialize_game_data()
-            self.game_state = "playing"
-        elif action == "start_tutorial":
-            self.tutorial_system = TutorialSystem()
-            self.game_state = "tutorial"
-        elif action == "exit":
-            self.running = False
-        elif action and action.startswith("load_slot_"):
-            slot = int(action.split("_")[-1])
-            if self._load_game(slot):
-                self.game_state = "playing"
-    
-    def _handle_tutorial_events(self, event):
-        """Maneja eventos durante el tutorial."""
-        if not self.tutorial_system.handle_input(event):
-            self.initialize_game_data()
-            self.game_state = "playing"
-    
-    # ALGORITMOS DE ORDENAMIENTO
-    def _sort_inventory_by_priority(self):
-        """Ordena el inventario por prioridad usando QuickSort."""
-        if not self.inventory:
-            self.add_game_message("Inventario vacío", 2.0, YELLOW)
-            return
-        
-        inventory_list = list(self.inventory)
-        sorted_list = self.sorting_algorithms.quicksort_by_priority(inventory_list)
-        self.inventory = deque(sorted_list)
-        self.add_game_message("Inventario ordenado por PRIORIDAD (QuickSort)", 3.0, GREEN)
-    
-    def _sort_inventory_by_deadline(self):
-        """Ordena el inventario por tiempo restante usando MergeSort."""
-        if not self.inventory:
-            self.add_game_message("Inventario vacío", 2.0, YELLOW)
-            return
-        
-        inventory_list = list(self.inventory)
-        sorted_list = self.sorting_algorithms.mergesort_by_deadline(inventory_list, self.game_time)
-        self.inventory = deque(sorted_list)
-        self.add_game_message("Inventario ordenado por TIEMPO RESTANTE (MergeSort)", 3.0, GREEN)
-    
-    def _sort_orders_by_distance(self):
-        """Ordena pedidos disponibles por distancia usando Insertion Sort."""
-        if not self.available_orders.items:
-            self.add_game_message("No hay pedidos disponibles", 2.0, YELLOW)
-            return
-        
-        orders_list = self.available_orders.items.copy()
-        sorted_list = self.sorting_algorithms.insertion_sort_by_distance(orders_list, self.player_pos)
-        self.available_orders.items = sorted_list
-        self.add_game_message("Pedidos ordenados por DISTANCIA (Insertion Sort)", 3.0, GREEN)
-    
-    def handle_input(self, keys, dt):
-        """Maneja entrada del teclado durante el juego."""
-        if self.paused or self.game_over:
-            return
-
-        # ✅ BLOQUEO COMPLETO: Si está exhausto (≤30), no procesar ningún movimiento
-        if self.stamina <= 30:
-            current_time = time.time()
-            if not hasattr(self, '_last_exhausted_message') or current_time - self._last_exhausted_message > 3.0:
-                if self.stamina <= 0:
-                    self.add_game_message("¡EXHAUSTO! Espera a recuperar resistencia hasta 30", 3.0, RED)
-                else:
-                    self.add_game_message(f"Resistencia baja ({self.stamina:.0f}/30). Espera hasta 30 para moverte", 3.0, YELLOW)
-                self._last_exhausted_message = current_time
-            return
-
-        actual_speed = self.calculate_actual_speed()
-        adjusted_cooldown = self.move_cooldown / max(0.1, actual_speed / self.base_speed)
-
-        self.last_move_time += dt
-        if self.last_move_time < adjusted_cooldown:
-            return
-
-        direction = (0, 0)
-        
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            direction = (-1, 0)
-        elif keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            direction = (1, 0)
-        elif keys[pygame.K_UP] or keys[pygame.K_w]:
-            direction = (0, -1)
-        elif keys[pygame.K_DOWN] or keys[pygame.K_s]:
-            direction = (0, 1)
-        
-        if direction != (0, 0):
-            new_pos = Position(
-                self.player_pos.x + direction[0], 
-                self.player_pos.y + direction[1]
-            )
-            if self.is_valid_move(new_pos):
-                self.move_player(new_pos)
-                self.last_move_time = 0
-            else:
-                # ✅ Mensaje específico cuando el movimiento no es válido por resistencia
-                if self.stamina <= 30:
-                    if self.stamina <= 0:
-                        self.add_game_message("No te puedes mover - ¡Estás exhausto!", 1.5, RED)
-                    else:
-                        self.add_game_message(f"No te puedes mover - Resistencia baja ({self.stamina:.0f}/30)", 1.5, YELLOW)
-    
-    def is_valid_move(self, pos: Position) -> bool:
-        """✅ CORREGIDO: Verifica si un movimiento es válido con regla de exhausto."""
-        if not (0 <= pos.x < self.city_width and 0 <= pos.y < self.city_height):
-            return False
-        
-        # REGLA: No se puede caminar en edificios bloqueados
-        if pos.y < len(self.tiles) and pos.x < len(self.tiles[pos.y]):
-            tile_type = self.tiles[pos.y][pos.x]
-            tile_info = self.legend.get(tile_type, {})
-            if tile_info.get("blocked", False):
-                return False
-        
-        
-        if self.stamina <= 0:
-            return False
-        
-        # REGLA: Necesita resistencia mínima para moverse (debe tener suficiente para el costo)
-        stamina_cost = self.calculate_stamina_cost()
-        return self.stamina >= stamina_cost
-    
-    # SISTEMA DE VELOCIDAD
-    def calculate_actual_speed(self) -> float:
-        """Calcula la velocidad actual considerando todos los factores."""
-        
-        if self.stamina <= 0:
-            return 0.0
-        
-        v0 = self.base_speed  # 3 celdas/seg
-        M_clima = self.weather_system.get_speed_multiplier()
-        
-        # Multiplicador de peso según documento
-        total_weight = sum(order.weight for order in self.inventory)
-        M_peso = max(0.8, 1.0 - 0.03 * total_weight)
-        
-        # Multiplicador de reputación según documento
-        M_rep = 1.03 if self.reputation >= 90 else 1.0
-        
-        # Multiplicador de resistencia según documento
-        if self.stamina <= 30:
-            M_resistencia = 0.8  # Cansado (1-30)
-        else:
-            M_resistencia = 1.0  # Normal (>30)
-        
-        # Surface weight del tile actual
-        surface_weight = 1.0
-        if (self.player_pos.y < len(self.tiles) and 
-            self.player_pos.x < len(self.tiles[self.player_pos.y])):
-            tile_type = self.tiles[self.player_pos.y][self.player_pos.x]
-            tile_info = self.legend.get(tile_type, {})
-            surface_weight = tile_info.get("surface_weight", 1.0)
-        
-        # FÓRMULA OFICIAL
-        final_speed = v0 * M_clima * M_peso * M_rep * M_resistencia * surface_weight
-        return max(0.0, final_speed)
-    
-    # SISTEMA DE RESISTENCIA
-    def calculate_stamina_cost(self) -> float:
-        """Calcula el costo de resistencia por movimiento."""
-        base_cost = 0.5  # Base según documento: -0.5 por celda
-        
-        # Penalización por peso según documento
-        total_weight = sum(order.weight for order in self.inventory)
-        if total_weight > 3:
-            weight_penalty = 0.2 * (total_weight - 3)
-            base_cost += weight_penalty
-        
-        # Penalizaciones climáticas según documento
-        if self.weather_system.current_condition in ['rain', 'wind']:
-            base_cost += 0.1
-        elif self.weather_system.current_condition == 'storm':
-            base_cost += 0.3
-        elif self.weather_system.current_condition == 'heat':
-            base_cost += 0.2
-        
-        # Penalización por superficie
-        if (self.player_pos.y < len(self.tiles) and 
-            self.player_pos.x < len(self.tiles[self.player_pos.y])):
-            tile_type = self.tiles[self.player_pos.y][self.player_pos.x]
-            tile_info = self.legend.get(tile_type, {})
-            surface_weight = tile_info.get("surface_weight", 1.0)
-            
-            if surface_weight < 1.0:
-                base_cost += (1.0 - surface_weight) * 0.2
-        
-        return base_cost
-    
-    def move_player(self, new_pos: Position):
-        """Mueve el jugador con regla de exhausto."""
-        
-        if self.stamina <= 0:
-            self.add_game_message("¡Exhausto! Recupera hasta 30 de resistencia para moverte", 2.0, RED)
-            return
-        
-        stamina_cost = self.calculate_stamina_cost()
-        
-        
-        if self.stamina < stamina_cost:
-            self.add_game_message("¡Resistencia insuficiente para moverse!", 2.0, RED)
-            return
-        
-        # Efectos climáticos visuales
-        if self.weather_system.current_condition in ['rain', 'storm']:
-            if random.random() < 0.1:
-                self.add_game_message(f"El {self.weather_system._get_condition_name(self.weather_system.current_condition).lower()} dificulta el movimiento", 2.0, CYAN)
-        
-        self.player_pos = new_pos
-        self.stamina = max(0, self.stamina - stamina_cost)
-        
-        if self.stamina <= 0:
-            self.add_game_message("¡Exhausto! No puedes moverte hasta recuperar 30 de resistencia", 3.0, RED)
-        elif self.stamina <= 30:
-            self.add_game_message(f"Cansado ({self.stamina:.0f}/30) - velocidad reducida", 2.0, YELLOW)
-    
-    def interact_at_position(self):
-        """Maneja interacciones en la posición actual del jugador."""
-        interaction_found = False
-        
-        # Verificar recogida de pedidos
-        for order in self.available_orders.items[:]:
-            if (order.pickup.x == self.player_pos.x and 
-                order.pickup.y == self.player_pos.y and 
-                order.status in ["available", "accepted"]):
-                
-                time_remaining = self.get_order_time_remaining(order)
-                if time_remaining <= 0:
-                    self.add_game_message(f"{order.id} ha expirado!", 3.0, RED)
-                    interaction_found = True
-                    break
-                
-                total_weight = sum(o.weight for o in self.inventory)
-                if total_weight + order.weight <= self.max_weight:
-                    order.status = "picked_up"
-                    order.accepted_at = self.game_time
-                    self.inventory.append(order)
-                    self.available_orders.remove(order)
-                    time_text = self.get_order_status_text(order)
-                    district = self._get_district_name(order.dropoff.x, order.dropoff.y)
-                    self.add_game_message(f"{order.id} recogido ({time_text}) → ({order.dropoff.x},{order.dropoff.y}) [{district}]", 4.0, GREEN)
-                    interaction_found = True
-                else:
-                    self.add_game_message(f"No hay capacidad para {order.id} (necesario: {order.weight}kg)", 3.0, ORANGE)
-                    interaction_found = True
-                break
-        
-        # Verificar entrega de pedidos
-        if not interaction_found:
-            for order in list(self.inventory):
-                if (order.dropoff.x == self.player_pos.x and 
-                    order.dropoff.y == self.player_pos.y and 
-                    order.status == "picked_up"):
-                    
-                    time_remaining = self.get_order_time_remaining(order)
-                    if time_remaining <= 0:
-                        self.add_game_message(f"{order.id} expiró mientras lo transportabas!", 3.0, RED)
-                        interaction_found = True
-                        break
-                    
-                    self.deliver_order(order)
-                    interaction_found = True
-                    break
-        
-        # Mostrar pedidos cercanos si no hay interacción directa
-        if not interaction_found:
-            self._show_nearby_interactions()
-
-    def _show_nearby_interactions(self):
-        """Muestra información sobre pedidos cercanos"""
-        nearby_pickups = []
-        nearby_dropoffs = []
-        
-        for order in self.available_orders.items:
-            if order.status in ["available", "accepted"]:
-                time_remaining = self.get_order_time_remaining(order)
-                if time_remaining > 0:
-                    distance = abs(order.pickup.x - self.player_pos.x) + abs(order.pickup.y - self.player_pos.y)
-                    if distance <= 3:
-                        nearby_pickups.append((order, distance))
-        
-        for order in self.inventory:
-            if order.status == "picked_up":
-                time_remaining = self.get_order_time_remaining(order)
-                if time_remaining > 0:
-                    distance = abs(order.dropoff.x - self.player_pos.x) + abs(order.dropoff.y - self.player_pos.y)
-                    if distance <= 3:
-                        nearby_dropoffs.append((order, distance))
-        
-        if nearby_pickups:
-            closest = min(nearby_pickups, key=lambda x: x[1])
-            order, dist = closest
-            time_text = self.get_order_status_text(order)
-            district = self._get_district_name(order.pickup.x, order.pickup.y)
-            self.add_game_message(f"{order.id} ({time_text}) está a {dist} celdas en ({order.pickup.x}, {order.pickup.y}) [{district}]", 3.0, YELLOW)
-        elif nearby_dropoffs:
-            closest = min(nearby_dropoffs, key=lambda x: x[1])
-            order, dist = closest
-            time_text = self.get_order_status_text(order)
-            district = self._get_district_name(order.dropoff.x, order.dropoff.y)
-            self.add_game_message(f"Entrega {order.id} ({time_text}) está a {dist} celdas en ({order.dropoff.x}, {order.dropoff.y}) [{district}]", 3.0, YELLOW)
-        else:
-            self.add_game_message("No hay nada para interactuar aquí", 2.0, GRAY)
-
-    # SISTEMA DE REPUTACIÓN
-    def deliver_order(self, order: Order):
-        """Entrega un pedido y actualiza reputación."""
-        time_remaining = self.get_order_time_remaining(order)
-        total_duration = order.duration_minutes * 60
-        time_used = total_duration - time_remaining
-        
-        rep_change = 0
-        status_msg = ""
-        delivery_was_clean = True
-        
-        # REGLAS DE REPUTACIÓN SEGÚN DOCUMENTO
-        if time_remaining > total_duration * 0.8:  # Entrega muy temprana (≥20% antes)
-            rep_change = 5
-            status_msg = "Entrega muy temprana"
-        elif time_remaining > total_duration * 0.3:  # Entrega a tiempo
-            rep_change = 3
-            status_msg = "Entrega puntual"
-        elif time_remaining > 0:  # Tarde pero no expirado
-            if time_used <= 30:  # Tarde ≤30s
-                rep_change = -2
-                status_msg = "Entrega ligeramente tarde"
-                delivery_was_clean = False
-            elif time_used <= 120:  # Tarde 31-120s
-                rep_change = -5
-                status_msg = "Entrega tarde"
-                delivery_was_clean = False
-            else:  # Tarde >120s
-                rep_change = -10
-                status_msg = "Entrega muy tarde"
-                delivery_was_clean = False
-        else:
-            rep_change = -10
-            status_msg = "Entrega muy tarde (expirado)"
-            delivery_was_clean = False
-        
-        if rep_change < 0 and self.reputation >= 85 and not hasattr(self, '_first_late_penalty_applied'):
-            rep_change = rep_change // 2
-            status_msg += " (Penalización reducida)"
-            self._first_late_penalty_applied = True
-        
-        self.reputation = max(0, min(100, self.reputation + rep_change))
-        
-        if delivery_was_clean and self.last_delivery_was_clean:
-            self.delivery_streak += 1
-            
-            if self.delivery_streak == 3:
-                self.reputation = min(100, self.reputation + 2)
-                status_msg += " ¡Racha de 3! (+2 reputación extra)"
-                self.delivery_streak = 0
-        else:
-            if not delivery_was_clean:
-                self.delivery_streak = 0
-        
-        self.last_delivery_was_clean = delivery_was_clean
-        
-        # BONUS DE PAGO POR REPUTACIÓN ALTA (≥90)
-        payout = order.payout
-        if self.reputation >= 90:
-            payout = int(payout * 1.05)  # +5% bonus
-            status_msg += " (+5% bonus)"
-        
-        self.money += payout
-        
-        order.status = "delivered"
-        self.inventory.remove(order)
-        self.completed_orders.append(order)
-        
-        time_text = self.get_order_status_text(order)
-        district = self._get_district_name(order.dropoff.x, order.dropoff.y)
-        self.add_game_message(f"{status_msg} - ${payout} (Rep: {self.reputation}) [{district}] [{time_text} restante]", 4.0, GREEN if delivery_was_clean else ORANGE)
-        
-        if self.delivery_streak > 0:
-            self.add_game_message(f"Racha perfecta: {self.delivery_streak}/3", 2.0, ORANGE)
-    
-    def accept_selected_order(self):
-        """Acepta el pedido seleccionado."""
-        if not self.available_orders.items or self.selected_order_index >= len(self.available_orders.items):
-            self.add_game_message("No hay pedidos disponibles para aceptar", 2.0, RED)
-            return
-        
-        order = self.available_orders.items[self.selected_order_index]
-        
-        time_remaining = self.get_order_time_remaining(order)
-        if time_remaining <= 0:
-            self.add_game_message(f"{order.id} ha expirado!", 3.0, RED)
-            return
-        
-        total_weight = sum(o.weight for o in self.inventory)
-        if total_weight + order.weight <= self.max_weight:
-            order.status = "accepted"
-            order.accepted_at = self.game_time
-            time_text = self.get_order_status_text(order)
-            district = self._get_district_name(order.pickup.x, order.pickup.y)
-            self.add_game_message(f"Aceptado {order.id} ({time_text}) - Ve a ({order.pickup.x}, {order.pickup.y}) [{district}]", 4.0, GREEN)
-            
-            if self.selected_order_index >= len(self.available_orders.items):
-                self.selected_order_index = max(0, len(self.available_orders.items) - 1)
-        else:
-            available_capacity = self.max_weight - total_weight
-            self.add_game_message(f"Capacidad insuficiente: {available_capacity}kg disponible, necesario {order.weight}kg", 3.0, ORANGE)
-    
-    def deliver_selected_order(self):
-        """Entrega el pedido seleccionado del inventario."""
-        if not self.inventory or self.selected_inventory_index >= len(self.inventory):
-            return
-        
-        inventory_list = list(self.inventory)
-        order = inventory_list[self.selected_inventory_index]
-        
-        if (order.dropoff.x == self.player_pos.x and 
-            order.dropoff.y == self.player_pos.y):
-            self.deliver_order(order)
-            
-            if self.selected_inventory_index >= len(self.inventory):
-                self.selected_inventory_index = max(0, len(self.inventory) - 1)
-        else:
-            distance = abs(order.dropoff.x - self.player_pos.x) + abs(order.dropoff.y - self.player_pos.y)
-            time_text = self.get_order_status_text(order)
-            district = self._get_district_name(order.dropoff.x, order.dropoff.y)
-            self.add_game_message(f"Ir a ({order.dropoff.x}, {order.dropoff.y}) ({time_text}) [{district}] - {distance} celdas", 3.0, YELLOW)
-    
-    def undo_move(self):
-        """Deshace el último movimiento usando el historial."""
-        if self.history.size() > 0:
-            state = self.history.pop()
-            if state:
-                self.player_pos = state.player_pos
-                self.stamina = state.stamina
-                self.reputation = state.reputation
-                self.money = state.money
-                self.delivery_streak = getattr(state, 'delivery_streak', 0)
-                self.add_game_message(f"Estado restaurado ({self.history.size()} restantes)", 2.0, CYAN)
-            else:
-                self.add_game_message("No hay más estados para deshacer", 2.0, RED)
-        else:
-            self.add_game_message("No hay movimientos para deshacer", 2.0, RED)
-    
-    def save_game(self, slot: int = 1):
-        """GUARDADO CORREGIDO - Incluye todos los datos del mapa."""
-        try:
-            state = GameState(
-                player_pos=self.player_pos,
-                stamina=self.stamina,
-                reputation=self.reputation,
-                money=self.money,
-                game_time=self.game_time,
-                weather_time=self.weather_system.time_in_current,
-                current_weather=self.weather_system.current_condition,
-                weather_intensity=self.weather_system.current_intensity,
-                inventory=list(self.inventory),
-                available_orders=self.available_orders.items,
-                completed_orders=self.completed_orders,
-                goal=self.goal,
-                delivery_streak=self.delivery_streak,
-                pending_orders=list(self.pending_orders),
-                city_width=self.city_width,
-                city_height=self.city_height,
-                tiles=self.tiles,
-                legend=self.legend,
-                city_name=self.city_name,
-                max_game_time=self.max_game_time
-            )
-            
-            if self.file_manager.save_game_with_validation(state, slot):
-                self.add_game_message(f"Juego guardado en slot {slot} ({self.city_name} {self.city_width}x{self.city_height})", 2.0, GREEN)
-            else:
-                self.add_game_message(f"Error guardando en slot {slot}", 3.0, RED)
-            
-        except Exception as e:
-            self.add_game_message(f"Error guardando: {e}", 3.0, RED)
-    
-    def _load_game(self, slot: int = 1) -> bool:
-        """CARGA CORREGIDA - Restaura todos los datos del mapa."""
-        state = self.file_manager.load_game_with_validation(slot)
-        
-        if state is None:
-            self.add_game_message(f"No se pudo cargar el slot {slot}", 3.0, RED)
-            return False
-        
-        self.player_pos = state.player_pos
-        self.stamina = state.stamina
-        self.reputation = state.reputation
-        self.money = state.money
-        self.game_time = state.game_time
-        self.weather_system.time_in_current = state.weather_time
-        self.weather_system.current_condition = state.current_weather
-        self.weather_system.current_intensity = state.weather_intensity
-        self.inventory = deque(state.inventory)
-        self.available_orders.items = state.available_orders
-        self.completed_orders = state.completed_orders
-        self.goal = state.goal
-        self.delivery_streak = getattr(state, 'delivery_streak', 0)
-        self.pending_orders = deque(getattr(state, 'pending_orders', []))
-        
-        self.city_width = getattr(state, 'city_width', 30)
-        self.city_height = getattr(state, 'city_height', 25)
-        self.tiles = getattr(state, 'tiles', [])
-        self.legend = getattr(state, 'legend', {})
-        self.city_name = getattr(state, 'city_name', 'TigerCity')
-        self.max_game_time = getattr(state, 'max_game_time', 600.0)
-        
-        self.map_pixel_width = self.city_width * TILE_SIZE
-        self.map_pixel_height = self.city_height * TILE_SIZE
-        
-        self.add_game_message(f"Juego cargado desde slot {slot} - {self.city_name} {self.city_width}x{self.city_height}", 2.0, GREEN)
-        return True
-    
-    def load_game(self, slot: int = 1):
-        """Función pública para cargar juego."""
-        self._load_game(slot)
-    
-    def _process_order_releases(self, dt: float):
-        """ Liberación de pedidos con límite reducido para mayor enfoque."""
-        MAX_ACTIVE_ORDERS = 10 
-        current_active_orders = len(self.available_orders.items)
-        
-        released_count = 0
-        orders_to_release = 0
-        if current_active_orders < MAX_ACTIVE_ORDERS // 3: 
-            orders_to_release = 3 
-        elif current_active_orders < MAX_ACTIVE_ORDERS // 2:
-            orders_to_release = 2 
-        elif current_active_orders < MAX_ACTIVE_ORDERS:
-            orders_to_release = 1 
-        
-        while (self.pending_orders and 
-               released_count < orders_to_release and
-               self.pending_orders[0].release_time <= self.game_time and
-               current_active_orders < MAX_ACTIVE_ORDERS):
-            
-            order = self.pending_orders.popleft()
-            
-            if not self._validate_order_positions(order):
-                order = self._fix_order_positions(order)
-            
-            order.status = "available"
-            order.created_at = self.game_time
-            self.available_orders.enqueue(order)
-            released_count += 1
-            current_active_orders += 1
-            
-            if released_count <= 3:
-                priority_text = f"P{order.priority}" if order.priority > 0 else "Normal"
-                duration_text = f"{order.duration_minutes * 60:.0f}s"
-                district = getattr(order, 'district', self._get_district_name(order.pickup.x, order.pickup.y))
-                
-                if order.priority >= 2:
-                    urgency_indicator = "RAPIDORAPIDORAPIDO!!!!!!!!" 
-                elif order.priority == 1:
-                    urgency_indicator = "RapidoRapido" 
-                else:
-                    urgency_indicator = "Rapido"
-                self.add_game_message(f"📋 {urgency_indicator}{order.id} ({priority_text}) ${order.payout} ({duration_text}) [{district}]", 2.0, YELLOW)
-        
-        if released_count > 2:
-            self.add_game_message(f"📋 {released_count} pedidos ULTRA URGENTES (8-22s) disponibles", 2.0, BRIGHT_RED)
-    
-    def _check_expired_orders(self, dt: float):
-        """Verifica y maneja pedidos expirados."""
-        expired_orders = []
-        
-        for order in self.available_orders.items[:]:
-            time_remaining = self.get_order_time_remaining(order)
-            if time_remaining <= 0:
-                expired_orders.append(order)
-                self.available_orders.remove(order)
-        
-        for order in list(self.inventory):
-            time_remaining = self.get_order_time_remaining(order)
-            if time_remaining <= 0:
-                expired_orders.append(order)
-                self.inventory.remove(order)
-        
-        for order in expired_orders:
-            self.reputation -= 6 
-            self.delivery_streak = 0
-            self.last_delivery_was_clean = False
-            self.add_game_message(f" {order.id} expiró! (-6 reputación)", 4.0, RED)
-    
-    def _get_stamina_recovery_rate(self) -> float:
-        """Calcula la tasa de recuperación de resistencia."""
-        base_recovery = 5.0 
-        
-        if (self.player_pos.y < len(self.tiles) and 
-            self.player_pos.x < len(self.tiles[self.player_pos.y])):
-            tile_type = self.tiles[self.player_pos.y][self.player_pos.x]
-            tile_info = self.legend.get(tile_type, {})
-            
-            if tile_info.get("rest_bonus", 0) > 0:
-                bonus_recovery = base_recovery + 10.0
-               
-                if not hasattr(self, '_last_bonus_message') or time.time() - self._last_bonus_message > 5.0:
-                    if self.stamina <= 0:
-                        self.add_game_message("¡En un parque! Recuperarás resistencia más rápido", 3.0, GREEN)
-                    self._last_bonus_message = time.time()
-                return bonus_recovery
-        
-        return base_recovery
-    
-    def update(self, dt: float):
-        """Actualiza la lógica del juego SIN guardados múltiples."""
-        
-        if hasattr(self, '_score_saved') and self._score_saved:
-            return
-        
-        if self.game_state != "playing" or self.paused:
-            return
-        
-        self.fps_counter += 1
-        self.fps_timer += dt
-        if self.fps_timer >= 1.0:
-            self.current_fps = self.fps_counter
-            self.fps_counter = 0
-            self.fps_timer = 0
-        
-        if self.history.size() == 0 or self.game_time - getattr(self, '_last_history_save', 0) > 8.0:
-            current_state = GameState(
-                player_pos=Position(self.player_pos.x, self.player_pos.y),
-                stamina=self.stamina,
-                reputation=self.reputation,
-                money=self.money,
-                game_time=self.game_time,
-                weather_time=self.weather_system.time_in_current,
-                current_weather=self.weather_system.current_condition,
-                weather_intensity=self.weather_system.current_intensity,
-                inventory=list(self.inventory),
-                available_orders=self.available_orders.items,
-                completed_orders=self.completed_orders,
-                goal=self.goal,
-                delivery_streak=self.delivery_streak,
-                pending_orders=list(self.pending_orders),
-                city_width=self.city_width,
-                city_height=self.city_height,
-                tiles=self.tiles,
-                legend=self.legend,
-                city_name=self.city_name,
-                max_game_time=self.max_game_time
-            )
-            self.history.push(current_state)
-            self._last_history_save = self.game_time
-        
-        self.game_time += dt
-        self.weather_system.update(dt)
-        
-        self._process_order_releases(dt)
-        self._check_expired_orders(dt)
-        
-        self.message_timer += dt
-        self.game_messages = [
-            (msg, time_left - dt, color) for msg, time_left, color in self.game_messages 
-            if time_left - dt > 0
-        ]
-        
-        # Recuperación de resistencia
-        previous_stamina = getattr(self, '_previous_stamina', self.stamina)
-        
-        if self.stamina < self.max_stamina and self.last_move_time > 1.0:
-            recovery_rate = self._get_stamina_recovery_rate()
-            new_stamina = min(self.max_stamina, self.stamina + recovery_rate * dt)
-            
-            if previous_stamina <= 0 and new_stamina > 0:
-                if new_stamina >= 30:
-                    self.add_game_message("¡Ya puedes moverte de nuevo! (Resistencia recuperada a 30+)", 3.0, GREEN)
-                else:
-                    self.add_game_message(f"Recuperando... {new_stamina:.0f}/30 para moverte", 2.0, YELLOW)
-            elif previous_stamina < 30 and new_stamina >= 30:
-                self.add_game_message("¡Ya puedes moverte! Resistencia: 30/100", 3.0, GREEN)
-            
-            self.stamina = new_stamina
-        
-        self._previous_stamina = self.stamina
-        
-        
-        if self.reputation < 20:  # Derrota por reputación baja
-            if not self.game_over:  
-                print("\n GAME OVER: Reputación baja")
-                self.game_over = True
-                self.victory = False
-                self.game_state = "game_over"
-                self.add_game_message("¡Juego terminado! Reputación muy baja.", 5.0, RED)
-                
-                #  GUARDAR PUNTAJE UNA SOLA VEZ
-                print(" Guardando puntaje por reputación baja...")
-                success = self.save_score()
-                if success:
-                    print(" Puntaje guardado exitosamente")
-                    self._score_saved = True
-                else:
-                    print(" Error guardando puntaje")
-                
-        elif self.money >= self.goal:  # Victoria por alcanzar meta
-            if not self.game_over: 
-                print("\n VICTORIA: Meta alcanzada")
-                self.victory = True
-                self.game_over = True
-                self.game_state = "game_over"
-                self.add_game_message("¡Victoria! Meta de ingresos alcanzada.", 5.0, GREEN)
-                
-                print("💾 Guardando puntaje por victoria...")
-                success = self.save_score()
-                if success:
-                    print("Puntaje guardado exitosamente")
-                    self._score_saved = True
-                else:
-                    print("Error guardando puntaje")
-                
-        elif self.game_time >= self.max_game_time:  # Fin de jornada
-            if not self.game_over:  
-                print("\n GAME OVER: Tiempo agotado")
-                self.game_over = True
-                self.game_state = "game_over"
-                if self.money >= self.goal:
-                    self.victory = True
-                    self.add_game_message("¡Victoria! Tiempo agotado pero meta cumplida.", 5.0, GREEN)
-                else:
-                    self.victory = False
-                    self.add_game_message("¡Tiempo agotado! No se cumplió la meta.", 5.0, RED)
-                
-                print(" Guardando puntaje por tiempo agotado...")
-                success = self.save_score()
-                if success:
-                    print(" Puntaje guardado exitosamente")
-                    self._score_saved = True 
-                else:
-                    print(" Error guardando puntaje")
-    
-    def save_score(self, score: int = None):
-        """Guarda el puntaje UNA SOLA VEZ con protección adicional."""
-        
-        if hasattr(self, '_score_saved') and self._score_saved:
-            print("⚠️ Puntaje ya guardado previamente, ignorando llamada duplicada")
-            return True
-        
-        print("\n" + "="*60)
-        print(" Guardando puntaje...")
-        print("="*60)
-        
-        try:
-            # Calcular puntaje final
-            final_score = self._calculate_final_score()
-            print(f" Puntaje calculado: {final_score}")
-            print(f"   - Dinero: ${self.money}")
-            print(f"   - Reputación: {self.reputation}")
-            print(f"   - Pedidos completados: {len(self.completed_orders)}")
-            print(f"   - Victoria: {self.victory}")
-            
-            # Cargar puntajes existentes
-            scores_file = "data/puntajes.json"
-            os.makedirs("data", exist_ok=True)
-            
-            if os.path.exists(scores_file):
-                try:
-                    with open(scores_file, 'r', encoding='utf-8') as f:
-                        content = f.read().strip()
-                        scores = json.loads(content) if content else []
-                        if not isinstance(scores, list):
-                            scores = []
-                except:
-                    scores = []
-            else:
-                scores = []
-            
-            print(f" Puntajes existentes: {len(scores)}")
-            
-            # Crear nuevo registro
-            new_score = {
-                "score": final_score,
-                "money": self.money,
-                "reputation": self.reputation,
-                "completed_orders": len(self.completed_orders),
-                "game_time": round(self.game_time, 1),
-                "date": datetime.now().isoformat(),
-                "victory": self.victory,
-                "delivery_streak_record": getattr(self, 'delivery_streak', 0),
-                "city_name": self.city_name,
-                "city_size": f"{self.city_width}x{self.city_height}",
-                "api_source": "TigerCity_Real"
-            }
-            
-            # Agregar nuevo puntaje
-            scores.append(new_score)
-            print(f" Nuevo puntaje agregado")
-            
-            # Ordenar y recortar
-            scores.sort(key=lambda x: x.get('score', 0), reverse=True)
-            scores = scores[:10]
-            print(f" Top 10 actualizado")
-            
-            # Guardar
-            with open(scores_file, 'w', encoding='utf-8') as f:
-                json.dump(scores, f, indent=2, ensure_ascii=False)
-            
-            print(f" Archivo guardado exitosamente")
-            
-            # Determinar posición
-            position = next((i+1 for i, s in enumerate(scores) if s == new_score), None)
-            
-            if position:
-                print(f"🏆 POSICIÓN EN RANKING: #{position}")
-                if position <= 10:
-                    self.add_game_message(f"¡Posición #{position} en el ranking!", 4.0, GREEN if position <= 3 else YELLOW)
-            
-            print("="*60 + "\n")
-            
-            return True
-            
-        except Exception as e:
-            print(f"\n ERROR guardando puntaje: {e}")
-            import traceback
-            traceback.print_exc()
-            return False
-    
-    def _calculate_final_score(self) -> int:
-        """Calcula el puntaje final según las reglas del documento."""
-        try:
-            # Base: suma de pagos afectada por reputación alta
-            pay_mult = 1.05 if self.reputation >= 90 else 1.0
-            score_base = self.money * pay_mult
-            
-            # Bonus por tiempo (terminar antes del 80% del tiempo)
-            bonus_tiempo = 0
-            if self.victory and self.game_time < self.max_game_time * 0.8:
-                time_bonus_factor = (self.max_game_time * 0.8 - self.game_time) / (self.max_game_time * 0.8)
-                bonus_tiempo = int(500 * time_bonus_factor)
-            
-            # Bonus por entregas completadas
-            delivery_bonus = len(self.completed_orders) * 10
-            
-            # Bonus por reputación
-            reputation_bonus = max(0, (self.reputation - 70) * 5)
-            
-            # Penalty por derrota
-            defeat_penalty = 0 if self.victory else -500
-            
-            final_score = int(score_base + bonus_tiempo + delivery_bonus + reputation_bonus + defeat_penalty)
-            
-            # El puntaje mínimo es 0
-            return max(0, final_score)
-            
-        except Exception as e:
-            print(f" Error calculando puntaje: {e}")
-            return 0
-
-    def draw(self):
-        """Dibuja toda la interfaz del juego."""
-        if self.game_state == "menu":
-            self.menu_system.draw(self.screen)
-        elif self.game_state == "tutorial":
-            self.screen.fill((20, 25, 40))
-            self.tutorial_system.draw(self.screen)
-        elif self.game_state == "playing":
-            self._draw_game()
-        elif self.game_state == "game_over":
-            self._draw_game()  # Seguir mostrando el juego
-            self.draw_game_over_overlay()  # Y el overlay de fin
-        
-        pygame.display.flip()
-    
-
-
-
-
-    
-    def _draw_game(self):
-        """Dibuja la pantalla principal del juego."""
-        self.screen.fill(UI_BACKGROUND)
-        
-        self.draw_weather_background()
-        self.draw_full_map()  
-        self.draw_orders()
-        self.draw_player()
-        self.draw_ui()
-        
-        if self.show_inventory:
-            self.draw_inventory_overlay()
-        
-        if self.show_orders:
-            self.draw_orders_overlay()
-        
-        self.draw_game_messages()
-        self.draw_weather_notifications()
-        
-        if self.paused:
-            self.draw_pause_overlay()
-        
-        if self.game_over:
-            self.draw_game_over_overlay()
-    
-    def draw_weather_background(self):
-        weather_color = self.weather_system.get_weather_color()
-        alpha = int(25 * self.weather_system.current_intensity)
-        
-        if alpha > 5:
-            overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-            overlay.set_alpha(alpha)
-            overlay.fill(weather_color)
-            self.screen.blit(overlay, (0, 0))
-    
-    def draw_game_messages(self):
-        """ Mensajes en esquina inferior derecha."""
-        # Posición en esquina inferior derecha
-        base_x = WINDOW_WIDTH - 450  # 450 píxeles desde la derecha
-        base_y = WINDOW_HEIGHT - 200  # 200 píxeles desde abajo
-        
-        for i, (message, time_left, color) in enumerate(self.game_messages[-5:]):
-            alpha = min(255, int(255 * (time_left / 3.0)))
-            
-            text_surface = self.small_font.render(message, True, color)
-            y_offset = base_y + i * 22
-            
-            # Fondo semi-transparente
-            bg_rect = pygame.Rect(base_x - 10, y_offset - 2, text_surface.get_width() + 20, 20)
-            bg_surface = pygame.Surface((bg_rect.width, bg_rect.height))
-            bg_surface.set_alpha(120)
-            bg_surface.fill((0, 0, 0))
-            self.screen.blit(bg_surface, bg_rect)
-            
-            # Borde del mensaje
-            pygame.draw.rect(self.screen, (255, 255, 255, 50), bg_rect, 1)
-            
-            text_surface.set_alpha(alpha)
-            self.screen.blit(text_surface, (base_x, y_offset))
-    
-    def draw_weather_notifications(self):
-        """ Notificaciones del clima en esquina inferior derecha."""
-        # Posición en esquina inferior derecha (debajo de los mensajes del juego)
-        base_x = WINDOW_WIDTH - 500  # 500 píxeles desde la derecha
-        base_y = WINDOW_HEIGHT - 120  # 120 píxeles desde abajo (arriba de los mensajes del juego)
-        
-        for i, (notification, time_left) in enumerate(self.weather_system.weather_notifications):
-            alpha = min(255, int(255 * (time_left / 4.0)))
-            
-            text_surface = self.font.render(notification, True, self.weather_system.get_weather_color())
-            y_offset = base_y + i * 28
-            
-            # Fondo semi-transparente
-            bg_rect = pygame.Rect(base_x - 10, y_offset - 2, text_surface.get_width() + 20, 24)
-            bg_surface = pygame.Surface((bg_rect.width, bg_rect.height))
-            bg_surface.set_alpha(120)
-            bg_surface.fill((0, 0, 0))
-            self.screen.blit(bg_surface, bg_rect)
-            
-            # Borde
-            pygame.draw.rect(self.screen, (255, 255, 255, 50), bg_rect, 1)
-            
-            text_surface.set_alpha(alpha)
-            self.screen.blit(text_surface, (base_x, y_offset))
-    
-    def draw_full_map(self):
-        """MEJORADO: Dibuja el mapa completo con imágenes para tiles especiales."""
-        for y in range(self.city_height):
-            for x in range(self.city_width):
-                if y < len(self.tiles) and x < len(self.tiles[y]):
-                    tile_type = self.tiles[y][x]
-                    
-                    screen_x = x * TILE_SIZE + self.map_offset_x
-                    screen_y = y * TILE_SIZE + self.map_offset_y
-                    
-                    rect = pygame.Rect(screen_x, screen_y, TILE_SIZE, TILE_SIZE)
-                    
-                    # ✅ NUEVO: Verificar si hay imagen disponible para este tipo de tile
-                    if tile_type in self.tile_images:
-                        # Dibujar fondo primero
-                        base_color = self._get_tile_base_color(tile_type)
-                        pygame.draw.rect(self.screen, base_color, rect)
-                        
-                        self.screen.blit(self.tile_images[tile_type], (screen_x, screen_y))
-                        
-                        if tile_type == "P":
-                            player_screen_x = self.player_pos.x * TILE_SIZE + self.map_offset_x
-                            player_screen_y = self.player_pos.y * TILE_SIZE + self.map_offset_y
-                            distance = abs(player_screen_x - screen_x) + abs(player_screen_y - screen_y)
-                            
-                            # Si el jugador está en el parque, mostrar bonus
-                            if distance < TILE_SIZE:
-                                bonus_text = self.small_font.render("+15/s", True, (255, 255, 255))
-                                text_rect = bonus_text.get_rect(center=(screen_x + TILE_SIZE//2, screen_y + TILE_SIZE//2))
-                                
-                                # Fondo semi-transparente para el texto
-                                text_bg = pygame.Rect(text_rect.x - 2, text_rect.y - 1, text_rect.width + 4, text_rect.height + 2)
-                                text_bg_surface = pygame.Surface((text_bg.width, text_bg.height))
-                                text_bg_surface.set_alpha(150)
-                                text_bg_surface.fill((0, 100, 0))
-                                self.screen.blit(text_bg_surface, text_bg)
-                                
-                                self.screen.blit(bonus_text, text_rect)
-                    else:
-                        # Dibujar color sólido como antes
-                        color = self._get_tile_base_color(tile_type)
-                        pygame.draw.rect(self.screen, color, rect)
-                    
-                    # Dibujar borde del tile
-                    pygame.draw.rect(self.screen, (100, 100, 100), rect, 1)
-        
-        self.draw_map_info()
-
-    def draw_map_info(self):
-        """Información del mapa con datos reales de la API."""
-        map_rect = pygame.Rect(
-            self.map_offset_x - 3, 
-            self.map_offset_y - 3, 
-            self.map_pixel_width + 6, 
-            self.map_pixel_height + 6
-        )
-        pygame.draw.rect(self.screen, UI_BORDER, map_rect, 3)
-        
-        # Título con nombre real de la ciudad Y DIMENSIONES CORRECTAS
-        title_text = self.title_font.render(f"{self.city_name.upper()} {self.city_width}x{self.city_height}", True, UI_TEXT_HEADER)
-        title_bg = pygame.Rect(
-            self.map_offset_x + self.map_pixel_width // 2 - title_text.get_width() // 2 - 10,
-            2,
-            title_text.get_width() + 20,
-            22
-        )
-        pygame.draw.rect(self.screen, UI_HIGHLIGHT, title_bg, border_radius=5)
-        pygame.draw.rect(self.screen, UI_BORDER, title_bg, 2, border_radius=5)
-        title_rect = title_text.get_rect(center=(
-            self.map_offset_x + self.map_pixel_width // 2,
-            13
-        ))
-        self.screen.blit(title_text, title_rect)
-        
-        # Información de tamaño
-        size_text = self.font.render(f"Tiles: {TILE_SIZE}px | {self.city_width * self.city_height} celdas totales", True, UI_TEXT_SECONDARY)
-        self.screen.blit(size_text, (self.map_offset_x, self.map_offset_y - 12))
-        
-        # ✅ NUEVO: Información de las imágenes (tiles y clima)
-        tile_count = len(self.tile_images)
-        weather_count = len(self.weather_images)
-        
-        if tile_count == 3 and weather_count >= 9:
-            api_text = self.small_font.render("✅ API TigerCity + Imágenes completas (Tiles + Clima)", True, UI_SUCCESS)
-        elif tile_count > 0 or weather_count > 0:
-            status_parts = []
-            if tile_count > 0:
-                tile_types = []
-                if "P" in self.tile_images: tile_types.append("Parques")
-                if "C" in self.tile_images: tile_types.append("Calles")
-                if "B" in self.tile_images: tile_types.append("Edificios")
-                status_parts.append(f"Tiles: {', '.join(tile_types)}")
-            if weather_count > 0:
-                status_parts.append(f"Clima: {weather_count} estados")
-            
-            api_text = self.small_font.render(f"✅ API + PNG: {' | '.join(status_parts)}", True, UI_WARNING)
-        else:
-            api_text = self.small_font.render("✅ API TigerCity REAL + Gráficos de respaldo completos", True, UI_WARNING)
-        self.screen.blit(api_text, (self.map_offset_x, self.map_offset_y - 24))
-
-    def draw_orders(self):
-        """Dibuja todos los marcadores de pedidos."""
-        # Dibujar puntos de recogida
-        for order in self.available_orders.items:
-            if order.status in ["available", "accepted"]:
-                self.draw_order_marker(order, order.pickup, "P")
-        
-        # Dibujar puntos de entrega para pedidos aceptados
-        for order in self.available_orders.items:
-            if order.status == "accepted":
-                self.draw_order_marker(order, order.dropoff, "D", is_dropoff=True)
-        
-        # Dibujar puntos de entrega para pedidos en inventario
-        for order in self.inventory:
-            if order.status == "picked_up":
-                self.draw_order_marker(order, order.dropoff, order.id[-2:], in_inventory=True)
-    
-    def draw_player(self):
-        """Dibuja el jugador con imagen PNG o indicadores de estado."""
-        screen_x = self.player_pos.x * TILE_SIZE + self.map_offset_x + 2
-        screen_y = self.player_pos.y * TILE_SIZE + self.map_offset_y + 2
-        
-        if self.player_image is not None:
-            # Dibujar la imagen del repartidor
-            image_rect = self.player_image.get_rect()
-            image_rect.center = (screen_x + (TILE_SIZE - 4) // 2, screen_y + (TILE_SIZE - 4) // 2)
-            self.screen.blit(self.player_image, image_rect.topleft)
-            
-            # ✅ NUEVO: Borde de estado según resistencia (alrededor de la imagen)
-            border_rect = pygame.Rect(
-                screen_x - 1, screen_y - 1,
-                TILE_SIZE - 2, TILE_SIZE - 2
-            )
-            
-            # Color del borde según estado de resistencia
-            if self.stamina > 30:
-                border_color = (0, 255, 0)     # Verde - Normal
-                border_width = 2
-            elif self.stamina > 0:
-                border_color = (255, 255, 0)   # Amarillo - Cansado
-                border_width = 3
-            else:
-                border_color = (255, 0, 0)     # Rojo - Exhausto
-                border_width = 4
-            
-            pygame.draw.rect(self.screen, border_color, border_rect, border_width)
-            
-            # ✅ NUEVO: Indicador de alerta si está muy cansado (encima de la imagen)
-            if self.stamina <= 30:
-                alert_rect = pygame.Rect(screen_x - 2, screen_y - 8, TILE_SIZE, 4)
-                alert_color = BRIGHT_RED if self.stamina <= 0 else (255, 200, 0)
-                pygame.draw.rect(self.screen, alert_color, alert_rect)
-                
-                # Texto de estado crítico
-                if self.stamina <= 0:
-                    status_text = self.small_font.render("EXHAUSTO!", True, WHITE)
-                    status_rect = status_text.get_rect(center=(screen_x + TILE_SIZE // 2, screen_y - 12))
-                    
-                    # Fondo para el texto
-                    text_bg = pygame.Rect(status_rect.x - 2, status_rect.y - 1, status_rect.width + 4, status_rect.height + 2)
-                    text_bg_surface = pygame.Surface((text_bg.width, text_bg.height))
-                    text_bg_surface.set_alpha(200)
-                    text_bg_surface.fill((200, 0, 0))
-                    self.screen.blit(text_bg_surface, text_bg)
-                    
-                    self.screen.blit(status_text, status_rect)
-        
-        else:
-            # ✅ FALLBACK: Dibujar jugador con formas geométricas (método original)
-            player_rect = pygame.Rect(
-                screen_x, screen_y,
-                TILE_SIZE - 4, TILE_SIZE - 4
-            )
-            
-            # Color según estado de resistencia
-            if self.stamina > 30:
-                color = BLUE       # Normal
-            elif self.stamina > 0:
-                color = YELLOW     # Cansado
-            else:
-                color = RED        # Exhausto
-            
-            pygame.draw.ellipse(self.screen, color, player_rect)
-            pygame.draw.ellipse(self.screen, BLACK, player_rect, 2)
-            
-            # Indicador de alerta si está muy cansado
-            if self.stamina <= 30:
-                alert_rect = pygame.Rect(screen_x - 2, screen_y - 8, TILE_SIZE, 4)
-                pygame.draw.rect(self.screen, BRIGHT_RED, alert_rect)
-                
-                # Texto de estado crítico
-                if self.stamina <= 0:
-                    status_text = self.small_font.render("EXHAUSTO!", True, WHITE)
-                    status_rect = status_text.get_rect(center=(screen_x + TILE_SIZE // 2, screen_y - 12))
-                    
-                    # Fondo para el texto
-                    text_bg = pygame.Rect(status_rect.x - 2, status_rect.y - 1, status_rect.width + 4, status_rect.height + 2)
-                    text_bg_surface = pygame.Surface((text_bg.width, text_bg.height))
-                    text_bg_surface.set_alpha(200)
-                    text_bg_surface.fill((200, 0, 0))
-                    self.screen.blit(text_bg_surface, text_bg)
-                    
-                    self.screen.blit(status_text, status_rect)
-    
-    def handle_input(self, keys, dt):
-        """Maneja entrada del teclado durante el juego."""
-        if self.paused or self.game_over:
-            return
-
-        # ✅ BLOQUEO COMPLETO: Si está exhausto (=0), no procesar ningún movimiento
-        if self.stamina <= 0:
-            current_time = time.time()
-            if not hasattr(self, '_last_exhausted_message') or current_time - self._last_exhausted_message > 3.0:
-                self.add_game_message("¡EXHAUSTO! Espera a recuperar resistencia hasta 30", 3.0, RED)
-                self._last_exhausted_message = current_time
-            return
-
-        actual_speed = self.calculate_actual_speed()
-        adjusted_cooldown = self.move_cooldown / max(0.1, actual_speed / self.base_speed)
-
-        self.last_move_time += dt
-        if self.last_move_time < adjusted_cooldown:
-            return
-
-        direction = (0, 0)
-        
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            direction = (-1, 0)
-        elif keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            direction = (1, 0)
-        elif keys[pygame.K_UP] or keys[pygame.K_w]:
-            direction = (0, -1)
-        elif keys[pygame.K_DOWN] or keys[pygame.K_s]:
-            direction = (0, 1)
-        
-        if direction != (0, 0):
-            new_pos = Position(
-                self.player_pos.x + direction[0], 
-                self.player_pos.y + direction[1]
-            )
-            if self.is_valid_move(new_pos):
-                self.move_player(new_pos)
-                self.last_move_time = 0
-            else:
-                # ✅ Mensaje específico cuando el movimiento no es válido por resistencia
-                if self.stamina <= 0:
-                    self.add_game_message("No te puedes mover - ¡Estás exhausto!", 1.5, RED)
-
-    def draw_order_marker(self, order, position, label, is_dropoff=False, in_inventory=False):
-        """Dibuja un marcador individual de pedido."""
-        screen_x = position.x * TILE_SIZE + self.map_offset_x + 1
-        screen_y = position.y * TILE_SIZE + self.map_offset_y + 1
-        
-        marker_rect = pygame.Rect(screen_x, screen_y, TILE_SIZE - 2, TILE_SIZE - 2)
-        
-        urgency_color = self.get_order_urgency_color(order)
-        time_remaining = self.get_order_time_remaining(order)
-        
-        # Determinar colores según estado y urgencia
-        if in_inventory:
-            if time_remaining <= 0:
-                fill_color = (80, 40, 40)
-                border_color = (120, 0, 0)
-            elif urgency_color == DARK_GREEN:
-                fill_color = (255, 200, 150)
-                border_color = (255, 140, 0)
-            elif urgency_color == YELLOW:
-                fill_color = (255, 180, 255)
-                border_color = (255, 100, 255)
-            else:
-                fill_color = (255, 100, 150)
-                border_color = (255, 0, 100)
-        elif is_dropoff:
-            if urgency_color == DARK_GREEN:
-                fill_color = (150, 200, 255)
-                border_color = (0, 100, 255)
-            elif urgency_color == YELLOW:
-                fill_color = (180, 180, 255)
-                border_color = (100, 100, 255)
-            else:
-                fill_color = (200, 150, 255)
-                border_color = (150, 0, 255)
-        else:
-            if time_remaining <= 0:
-                fill_color = (100, 50, 50)
-                border_color = DARK_RED
-            elif urgency_color == DARK_GREEN:
-                fill_color = (200, 255, 200)
-                border_color = DARK_GREEN
-            elif urgency_color == YELLOW:
-                fill_color = (255, 255, 200)
-                border_color = ORANGE
-            else:
-                fill_color = (255, 200, 200)
-                border_color = RED
-        
-        pygame.draw.rect(self.screen, fill_color, marker_rect)
-        border_width = 3 if time_remaining <= 0 or urgency_color == RED else 2
-        pygame.draw.rect(self.screen, border_color, marker_rect, border_width)
-        
-        text = self.font.render(label, True, BLACK)
-        text_rect = text.get_rect(center=(screen_x + TILE_SIZE // 2, screen_y + TILE_SIZE // 2))
-        self.screen.blit(text, text_rect)
-        
-        if TILE_SIZE >= 28:
-            time_text = self.get_order_status_text(order)
-            time_surface = self.small_font.render(time_text[:6], True, BLACK)
-            time_rect = time_surface.get_rect(center=(screen_x + TILE_SIZE // 2, screen_y + TILE_SIZE // 2 + 12))
-            self.screen.blit(time_surface, time_rect)
-
-    def draw_ui(self):
-        """ Dibuja la interfaz con controles restaurados."""
-        sidebar_x = self.map_offset_x + self.map_pixel_width + 25
-        sidebar_width = WINDOW_WIDTH - sidebar_x - 25
-        panel_spacing = 15
-        
-        col_width = (sidebar_width - panel_spacing) // 2
-        col1_x = sidebar_x
-        col2_x = sidebar_x + col_width + panel_spacing
-        
-        y1 = 30
-        self.draw_compact_header(col1_x, y1, col_width)
-        y1 += 85
-        self.draw_compact_stats(col1_x, y1, col_width)
-        y1 += 140
-        self.draw_compact_player_status(col1_x, y1, col_width)
-        y1 += 140
-        self.draw_compact_reputation(col1_x, y1, col_width)
-        y1 += 120
-        self.draw_compact_weather(col1_x, y1, col_width)
-        
-        y2 = 30
-        self.draw_compact_legend(col2_x, y2, col_width)
-        y2 += 85
-        self.draw_compact_tips(col2_x, y2, col_width)
-        y2 += 100
-        self.draw_compact_progress(col2_x, y2, col_width)
-        y2 += 90
-        self.draw_compact_controls(col2_x, y2, col_width)
-    
-    def draw_compact_reputation(self, x: int, y: int, width: int):
-        """Barra de reputación con mismas dimensiones que Estado Jugador."""
-        reputation_bg = pygame.Rect(x - 8, y - 5, width + 16, 110)
-        pygame.draw.rect(self.screen, (240, 255, 240), reputation_bg, border_radius=6)
-        pygame.draw.rect(self.screen, UI_BORDER, reputation_bg, 2, border_radius=6)
-        
-        title = self.header_font.render("REPUTACIÓN", True, UI_TEXT_HEADER)
-        self.screen.blit(title, (x + 5, y))
-        
-        bar_y = y + 25
-        bar_width = width - 20
-        bar_height = 20
-        
-        label = self.font.render("REPUTACIÓN:", True, UI_TEXT_NORMAL)
-        self.screen.blit(label, (x + 5, bar_y))
-        
-        bar_bg = pygame.Rect(x + 10, bar_y + 20, bar_width - 10, bar_height)
-        pygame.draw.rect(self.screen, DARK_GRAY, bar_bg, border_radius=3)
-        
-        reputation_progress = self.reputation / 100.0
-        fill_width = max(3, int((bar_width - 10) * reputation_progress))
-        
-        if self.reputation >= 90:
-            fill_color = BRIGHT_GREEN
-        elif self.reputation >= 80:
-            fill_color = GREEN
-        elif self.reputation >= 70:
-            fill_color = YELLOW
-        elif self.reputation >= 50:
-            fill_color = ORANGE
-        elif self.reputation >= 20:
-            fill_color = RED
-        else:
-            fill_color = DARK_RED
-        
-        if fill_width > 0:
-            fill_rect = pygame.Rect(x + 12, bar_y + 22, fill_width - 4, bar_height - 4)
-            pygame.draw.rect(self.screen, fill_color, fill_rect, border_radius=2)
-        
-        pygame.draw.rect(self.screen, UI_BORDER, bar_bg, 2, border_radius=3)
-        
-        reputation_text = f"{self.reputation}/100"
-        text_surface = self.small_font.render(reputation_text, True, BLACK)
-        text_rect = text_surface.get_rect(center=(x + bar_width // 2, bar_y + 30))
-        self.screen.blit(text_surface, text_rect)
-        
-        status_y = bar_y + 45
-        if self.reputation < 20:
-            status_text = "CRÍTICA (¡Perderás!)"
-            status_color = UI_CRITICAL
-        elif self.reputation >= 90:
-            status_text = "EXCELENTE (+5%)"
-            status_color = UI_SUCCESS
-        elif self.reputation >= 80:
-            status_text = "MUY BUENA"
-            status_color = UI_SUCCESS
-        elif self.reputation >= 70:
-            status_text = "BUENA"
-            status_color = UI_WARNING
-        else:
-            status_text = "REGULAR"
-            status_color = UI_WARNING
-        
-        status_surface = self.font.render(status_text, True, status_color)
-        self.screen.blit(status_surface, (x + 5, status_y))
-        
-        if self.delivery_streak > 0:
-            streak_text = f"Racha perfecta: {self.delivery_streak}/3"
-            streak_surface = self.small_font.render(streak_text, True, UI_WARNING)
-            self.screen.blit(streak_surface, (x + 5, status_y + 20))
-
-    def draw_compact_progress(self, x: int, y: int, width: int):
-        """Progreso del juego."""
-        progress_bg = pygame.Rect(x - 8, y - 5, width + 16, 80)
-        pygame.draw.rect(self.screen, (255, 255, 240), progress_bg, border_radius=6)
-        pygame.draw.rect(self.screen, UI_BORDER, progress_bg, 2, border_radius=6)
-        
-        title = self.header_font.render("PROGRESO", True, UI_TEXT_HEADER)
-        self.screen.blit(title, (x + 5, y))
-        
-        efficiency = self.calculate_efficiency()
-        
-        progress_info = [
-            f"Completados: {len(self.completed_orders)}",
-            f"Tiempo jugado: {self.format_time(self.game_time)}",
-            f"Eficiencia: {efficiency:.1f}%"
-        ]
-        
-        for i, info in enumerate(progress_info):
-            color = UI_SUCCESS if "Completados" in info else UI_TEXT_NORMAL
-            text = self.small_font.render(info, True, color)
-            self.screen.blit(text, (x + 5, y + 20 + i * 16))
-    
-    def draw_compact_stat(self, x: int, y: int, text: str, color: tuple):
-        """Dibuja una estadística de forma compacta."""
-        text_surface = self.small_font.render(text, True, color)
-        self.screen.blit(text_surface, (x, y))
-    
-    def draw_compact_tips(self, x: int, y: int, width: int):
-        """Consejos basados en las reglas del documento."""
-        tips_bg = pygame.Rect(x - 8, y - 5, width + 16, 90)
-        pygame.draw.rect(self.screen, (240, 255, 240), tips_bg, border_radius=6)
-        pygame.draw.rect(self.screen, UI_BORDER, tips_bg, 2, border_radius=6)
-        
-        title = self.header_font.render("REGLAS DEL JUEGO", True, UI_TEXT_HEADER)
-        self.screen.blit(title, (x + 5, y))
-        
-        # Reglas según documento
-        tips = [
-            "• Resistencia >30 para moverse",
-            "• META: $3000 (Mayor desafío)",
-            "• P2: 4min | P1: 7min | P0: 9min",
-            "• Mayor prioridad = Mayor pago"
-        ]
-        
-        for i, tip in enumerate(tips):
-            text = self.small_font.render(tip, True, UI_TEXT_NORMAL)
-            self.screen.blit(text, (x + 5, y + 20 + i * 15))
-
-    def draw_inventory_overlay(self):
-        """Overlay del inventario con información detallada."""
-        overlay_x = self.map_offset_x + self.map_pixel_width + 40
-        overlay_y = 400
-        overlay_width = 650
-        overlay_height = 520
-        
-        overlay_rect = pygame.Rect(overlay_x, overlay_y, overlay_width, overlay_height)
-        pygame.draw.rect(self.screen, UI_BACKGROUND, overlay_rect, border_radius=12)
-        pygame.draw.rect(self.screen, UI_BORDER, overlay_rect, 3, border_radius=12)
-        
-        # Título
-        title_bg = pygame.Rect(overlay_x, overlay_y, overlay_width, 45)
-        pygame.draw.rect(self.screen, UI_HIGHLIGHT, title_bg, border_radius=12)
-        title = self.large_font.render("INVENTARIO ACTUAL", True, UI_TEXT_HEADER)
-        title_rect = title.get_rect(center=(overlay_x + overlay_width // 2, overlay_y + 22))
-        self.screen.blit(title, title_rect)
-        
-        if not self.inventory:
-            no_items_text = self.font.render("No hay pedidos en inventario", True, UI_TEXT_SECONDARY)
-            text_rect = no_items_text.get_rect(center=(overlay_rect.centerx, overlay_rect.centery))
-            self.screen.blit(no_items_text, text_rect)
-        else:
-            inventory_list = list(self.inventory)
-            
-            for i, order in enumerate(inventory_list[:7]):
-                y_pos = overlay_rect.y + 55 + i * 65
-                
-                if i == self.selected_inventory_index:
-                    selection_rect = pygame.Rect(overlay_rect.x + 8, y_pos - 3, overlay_width - 16, 60)
-                    pygame.draw.rect(self.screen, UI_HIGHLIGHT, selection_rect, border_radius=5)
-                    pygame.draw.rect(self.screen, UI_BORDER, selection_rect, 2, border_radius=5)
-                
-                urgency_color = self.get_order_urgency_color(order)
-                time_text = self.get_order_status_text(order)
-                district = self._get_district_name(order.dropoff.x, order.dropoff.y)
-                
-                priority_text = f"P{order.priority}" if order.priority > 0 else "Normal"
-                
-                text1 = self.font.render(f"{order.id} ({priority_text}) - {time_text}", True, urgency_color)
-                self.screen.blit(text1, (overlay_rect.x + 15, y_pos))
-                
-                text2 = self.small_font.render(f"Peso: {order.weight}kg - Pago: ${order.payout} - {district}", True, UI_TEXT_NORMAL)
-                self.screen.blit(text2, (overlay_rect.x + 15, y_pos + 20))
-                
-                distance = abs(order.dropoff.x - self.player_pos.x) + abs(order.dropoff.y - self.player_pos.y)
-                text3 = self.small_font.render(f"Destino: ({order.dropoff.x}, {order.dropoff.y}) - Distancia: {distance} celdas", True, UI_TEXT_SECONDARY)
-                self.screen.blit(text3, (overlay_rect.x + 15, y_pos + 40))
-        
-        instructions_bg = pygame.Rect(overlay_x, overlay_y + overlay_height - 50, overlay_width, 45)
-        pygame.draw.rect(self.screen, (240, 240, 245), instructions_bg, border_radius=12)
-        
-        instructions = [
-            "↑/↓: Navegar | ENTER: Entregar (si estás en destino) | I: Cerrar",
-            "P/T: Ordenar con QuickSort/MergeSort según algoritmos implementados"
-        ]
-        
-        for i, instruction in enumerate(instructions):
-            color = UI_SUCCESS if "algoritmos" in instruction else UI_TEXT_NORMAL
-            text = self.small_font.render(instruction, True, color)
-            self.screen.blit(text, (overlay_rect.x + 15, overlay_rect.y + overlay_height - 42 + i * 14))
-
-
-    def draw_orders_overlay(self):
-        """Overlay de pedidos con algoritmos de ordenamiento."""
-        overlay_x = self.map_offset_x + self.map_pixel_width + 40
-        overlay_y = 50
-        overlay_width = 750
-        overlay_height = 650
-        
-        overlay_rect = pygame.Rect(overlay_x, overlay_y, overlay_width, overlay_height)
-        pygame.draw.rect(self.screen, UI_BACKGROUND, overlay_rect, border_radius=12)
-        pygame.draw.rect(self.screen, UI_BORDER, overlay_rect, 3, border_radius=12)
-        
-        # Título
-        title_bg = pygame.Rect(overlay_x, overlay_y, overlay_width, 50)
-        pygame.draw.rect(self.screen, UI_HIGHLIGHT, title_bg, border_radius=12)
-        title = self.large_font.render("PEDIDOS - ALGORITMOS IMPLEMENTADOS", True, UI_TEXT_HEADER)
-        title_rect = title.get_rect(center=(overlay_x + overlay_width // 2, overlay_y + 25))
-        self.screen.blit(title, title_rect)
-        
-        if not self.available_orders.items:
-            no_orders_text = self.font.render("No hay pedidos disponibles", True, UI_TEXT_SECONDARY)
-            text_rect = no_orders_text.get_rect(center=(overlay_rect.centerx, overlay_rect.centery))
-            self.screen.blit(no_orders_text, text_rect)
-        else:
-            # Mostrar pedidos disponibles
-            for i, order in enumerate(self.available_orders.items[:7]):
-                y_pos = overlay_rect.y + 60 + i * 80
-                
-                if i == self.selected_order_index:
-                    selection_rect = pygame.Rect(overlay_rect.x + 8, y_pos - 3, overlay_width - 16, 75)
-                    pygame.draw.rect(self.screen, UI_HIGHLIGHT, selection_rect, border_radius=5)
-                    pygame.draw.rect(self.screen, UI_BORDER, selection_rect, 2, border_radius=5)
-                
-                urgency_color = self.get_order_urgency_color(order)
-                time_text = self.get_order_status_text(order)
-                
-                pickup_district = self._get_district_name(order.pickup.x, order.pickup.y)
-                dropoff_district = self._get_district_name(order.dropoff.x, order.dropoff.y)
-                
-                priority_text = f"P{order.priority}" if order.priority > 0 else "Normal"
-                
-                text1 = self.font.render(f"{order.id} ({priority_text}) - ${order.payout} | {time_text}", True, urgency_color)
-                self.screen.blit(text1, (overlay_rect.x + 15, y_pos))
-                
-                text2 = self.small_font.render(f"Peso: {order.weight}kg | Duración: {order.duration_minutes:.1f}min", True, UI_TEXT_NORMAL)
-                self.screen.blit(text2, (overlay_rect.x + 15, y_pos + 20))
-                
-                pickup_distance = abs(order.pickup.x - self.player_pos.x) + abs(order.pickup.y - self.player_pos.y)
-                text3 = self.small_font.render(f"Recoger: ({order.pickup.x}, {order.pickup.y}) [{pickup_district}] - {pickup_distance} celdas", True, UI_TEXT_NORMAL)
-                self.screen.blit(text3, (overlay_rect.x + 15, y_pos + 40))
-                
-                total_route_distance = abs(order.dropoff.x - order.pickup.x) + abs(order.dropoff.y - order.pickup.y)
-                text4 = self.small_font.render(f"Entregar: ({order.dropoff.x}, {order.dropoff.y}) [{dropoff_district}] - Ruta: {total_route_distance} celdas", True, UI_TEXT_SECONDARY)
-                self.screen.blit(text4, (overlay_rect.x + 15, y_pos + 60))
-        
-        instructions_bg = pygame.Rect(overlay_x, overlay_y + overlay_height - 80, overlay_width, 75)
-        pygame.draw.rect(self.screen, (240, 240, 245), instructions_bg, border_radius=12)
-        
-        instructions = [
-            "↑/↓: Navegar | ENTER: Aceptar pedido | O: Cerrar",
-            "",
-            " ALGORITMOS DE ORDENAMIENTO IMPLEMENTADOS:",
-            "D: Ordenar por DISTANCIA (Insertion Sort O(n²)) ",
-            "Usa P/T en inventario para QuickSort/MergeSort "
-        ]
-        
-        for i, instruction in enumerate(instructions):
-            if not instruction:
-                continue
-            if "ALGORITMOS" in instruction:
-                color = UI_SUCCESS
-            elif "Check" in instruction:
-                color = UI_WARNING
-            else:
-                color = UI_TEXT_NORMAL
-            
-            text = self.small_font.render(instruction, True, color)
-            self.screen.blit(text, (overlay_rect.x + 15, overlay_rect.y + overlay_height - 70 + i * 14))
-
-
-    def draw_pause_overlay(self):
-        """Overlay de pausa."""
-        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-        overlay.set_alpha(180)
-        overlay.fill((0, 0, 50))
-        self.screen.blit(overlay, (0, 0))
-        
-        pause_rect = pygame.Rect(WINDOW_WIDTH // 2 - 250, WINDOW_HEIGHT // 2 - 120, 500, 240)
-        pygame.draw.rect(self.screen, UI_BACKGROUND, pause_rect, border_radius=15)
-        pygame.draw.rect(self.screen, UI_BORDER, pause_rect, 4, border_radius=15)
-        
-        pause_text = self.title_font.render("JUEGO PAUSADO", True, UI_TEXT_HEADER)
-        text_rect = pause_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 40))
-        self.screen.blit(pause_text, text_rect)
-        
-        instruction_text = self.large_font.render("Presiona ESPACIO para continuar", True, UI_TEXT_NORMAL)
-        text_rect = instruction_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 10))
-        self.screen.blit(instruction_text, text_rect)
-        
-        state_info = [
-            f"Dinero: ${self.money}/${self.goal}",
-            f"Tiempo restante: {self.format_time(self.max_game_time - self.game_time)}",
-            f"Reputación: {self.reputation}/100"
-        ]
-        
-        for i, info in enumerate(state_info):
-            text = self.font.render(info, True, UI_TEXT_SECONDARY)
-            text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 40 + i * 25))
-            self.screen.blit(text, text_rect)
-    
-    
-    def draw_game_over_overlay(self):
-        """Overlay de fin de juego SIN guardar puntaje (ya se guardó en update)."""
-        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-        overlay.set_alpha(220)
-        overlay.fill((20, 20, 40))
-        self.screen.blit(overlay, (0, 0))
-        
-        game_over_rect = pygame.Rect(WINDOW_WIDTH // 2 - 350, WINDOW_HEIGHT // 2 - 280, 700, 560)
-        pygame.draw.rect(self.screen, UI_BACKGROUND, game_over_rect, border_radius=20)
-        pygame.draw.rect(self.screen, UI_BORDER, game_over_rect, 5, border_radius=20)
-        
-        if self.victory:
-            title_text = self.title_font.render("¡VICTORIA!", True, UI_SUCCESS)
-            message = f"¡Felicidades! Alcanzaste la meta de ${self.goal}"
-        else:
-            title_text = self.title_font.render("JUEGO TERMINADO", True, UI_CRITICAL)
-            if self.reputation < 20:
-                message = "Reputación demasiado baja"
-            else:
-                message = f"Tiempo agotado. Necesitabas ${self.goal - self.money} más"
-        
-        title_rect = title_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 240))
-        self.screen.blit(title_text, title_rect)
-        
-        final_score = self._calculate_final_score()
-        
-        final_district = self._get_district_name(self.player_pos.x, self.player_pos.y)
-        efficiency = self.calculate_efficiency()
-        
-        stats = [
-            message,
-            "",
-            f"PUNTAJE FINAL: {final_score}",
-            f"Dinero obtenido: ${self.money} / ${self.goal}",
-            f"Reputación final: {self.reputation}/100",
-            f"Pedidos completados: {len(self.completed_orders)}",
-            f"Eficiencia: {efficiency:.1f}%",
-            f"Ciudad: {self.city_name} ({self.city_width}x{self.city_height})",
-            f"Posición final: ({self.player_pos.x}, {self.player_pos.y}) - Distrito {final_district}",
-            f"Mejor racha consecutiva: {getattr(self, 'delivery_streak', 0)}",
-            f"Tiempo total jugado: {self.format_time(self.game_time)}"
-        ]
-        
-        for i, stat in enumerate(stats):
-            if not stat:
-                continue
-                
-            if "PUNTAJE FINAL" in stat:
-                color = UI_SUCCESS if self.victory else UI_CRITICAL
-                font = self.large_font
-            elif "Dinero obtenido" in stat:
-                progress = (self.money / self.goal) * 100
-                color = UI_SUCCESS if progress >= 100 else UI_WARNING if progress >= 80 else UI_CRITICAL
-                font = self.font
-            elif "Reputación" in stat:
-                color = UI_SUCCESS if self.reputation >= 80 else UI_WARNING if self.reputation >= 50 else UI_CRITICAL
-                font = self.font
-            else:
-                color = UI_TEXT_NORMAL
-                font = self.font
-            
-            text = font.render(stat, True, color)
-            text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 180 + i * 30))
-            self.screen.blit(text, text_rect)
-        
-        exit_text = self.font.render("Presiona ESC para salir al menú principal", True, UI_TEXT_SECONDARY)
-        exit_rect = exit_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 220))
-        self.screen.blit(exit_text, exit_rect)
-    
-    def format_time(self, seconds: float) -> str:
-        """Formatea el tiempo en MM:SS."""
-        if seconds < 0:
-            seconds = 0
-        minutes = int(seconds // 60)
-        seconds = int(seconds % 60)
-        return f"{minutes:02d}:{seconds:02d}"
-    
-    def calculate_efficiency(self) -> float:
-        """Calcula la eficiencia del jugador."""
-        if self.game_time <= 0:
-            return 0.0
-        
-        completed = len(self.completed_orders)
-        efficiency = (completed / max(1, self.game_time / 60)) * 100
-        
-        return min(100.0, efficiency)
-    
-    def run(self):
-        """Bucle principal del juego."""
-        last_time = time.time()
-        
-        print("=" * 90)
-        print(" COURIER QUEST - VERSIÓN CON REPARTIDOR PNG")
-        print("=" * 90)
-        print()
-        print(" ESTADO DE IMÁGENES CARGADAS:")
-        image_status = self.get_complete_image_status()
-        print(f"   {image_status}")
-        print()
-        print(" Controles del juego:")
-        print("   • WASD o Flechas: Movimiento del repartidor")
-        print("   • E: Interactuar con pedidos (recoger/entregar)")
-        print("   • I: Inventario | O: Pedidos disponibles")
-        print("   • P: Ordenar por prioridad (QuickSort)")
-        print("   • T: Ordenar por tiempo (MergeSort)")
-        print("   • D: Ordenar por distancia (InsertionSort)")
-        print("   • F5: Guardar | F9: Cargar")
-        print("   • Ctrl+Z: Deshacer movimiento")
-        print("   • ESPACIO: Pausar")
-        print()
-        print(" INDICADORES VISUALES DEL REPARTIDOR:")
-        if self.player_image is not None:
-            print("   • 🖼️ IMAGEN PNG: Repartidor.png cargada correctamente")
-            print("   • 🟢 BORDE VERDE: Resistencia normal (>30)")
-            print("   • 🟡 BORDE AMARILLO: Cansado (1-30 resistencia)")
-            print("   • 🔴 BORDE ROJO: Exhausto (0 resistencia)")
-            print("   • ⚠️ ALERTA ROJA: Indicador visual cuando está crítico")
-        else:
-            print("   •  GRÁFICO DE RESPALDO: Círculo con colores de estado")
-            print("   • 🔵 AZUL: Normal | 🟡 AMARILLO: Cansado | 🔴 ROJO: Exhausto")
-        print()
-        
-        while self.running:
-            current_time = time.time()
-            dt = current_time - last_time
-            last_time = current_time
-            dt = min(dt, 1.0 / 30.0)
-            events = pygame.event.get()
-            self.handle_events(events)
-            if self.game_state == "playing":
-                keys = pygame.key.get_pressed()
-                self.handle_input(keys, dt)
-            self.update(dt)
-            self.draw()
-            self.clock.tick(FPS)
-        
-        pygame.quit()
-    
-    def draw_compact_header(self, x: int, y: int, width: int):
-        """Encabezado compacto con información de la API incluyendo estado del jugador."""
-        header_bg = pygame.Rect(x - 8, y - 5, width + 16, 75)
-        pygame.draw.rect(self.screen, UI_HIGHLIGHT, header_bg, border_radius=6)
-        pygame.draw.rect(self.screen, UI_BORDER, header_bg, 2, border_radius=6)
-        
-        title = self.large_font.render(f"COURIER QUEST - {self.city_name.upper()}", True, UI_TEXT_HEADER)
-        title_rect = title.get_rect(center=(x + width // 2, y + 12))
-        self.screen.blit(title, title_rect)
-        
-        tile_count = len(self.tile_images)
-        weather_count = len(self.weather_images)
-        has_player_image = self.player_image is not None
-        
-        if tile_count == 3 and weather_count >= 9 and has_player_image:
-            subtitle = self.font.render("API REAL + IMÁGENES COMPLETAS + JUGADOR ✅", True, UI_SUCCESS)
-        elif tile_count > 0 or weather_count > 0 or has_player_image:
-            components = []
-            if tile_count > 0:
-                components.append(f"{tile_count} TILES")
-            if weather_count > 0:
-                components.append(f"{weather_count} CLIMA")
-            if has_player_image:
-                components.append("JUGADOR")
-            subtitle = self.font.render(f"API + {' + '.join(components)} ✅", True, UI_SUCCESS)
-        else:
-            subtitle = self.font.render("API REAL + GRÁFICOS DE RESPALDO ⚠️", True, UI_WARNING)
-        subtitle_rect = subtitle.get_rect(center=(x + width // 2, y + 32))
-        self.screen.blit(subtitle, subtitle_rect)
-        
-        progress = (self.money / self.goal) * 100
-        meta_color = UI_SUCCESS if progress >= 100 else UI_WARNING if progress >= 80 else UI_CRITICAL
-        meta_text = f"Meta: ${self.money}/${self.goal} ({progress:.1f}%)"
-        meta = self.small_font.render(meta_text, True, meta_color)
-        meta_rect = meta.get_rect(center=(x + width // 2, y + 52))
-        self.screen.blit(meta, meta_rect)
-    
-    def draw_compact_stats(self, x: int, y: int, width: int):
-        """Estadísticas principales con reglas exactas."""
-        stats_bg = pygame.Rect(x - 8, y - 5, width + 16, 130)
-        pygame.draw.rect(self.screen, (250, 250, 255), stats_bg, border_radius=6)
-        pygame.draw.rect(self.screen, UI_BORDER, stats_bg, 2, border_radius=6)
-        
-        title = self.header_font.render("ESTADÍSTICAS", True, UI_TEXT_HEADER)
-        self.screen.blit(title, (x + 5, y))
-        
-        stats_y = y + 25
-        col_left = x + 5
-        col_right = x + width // 2 + 5
-        
-        # Columna izquierda
-        rep_color = UI_SUCCESS if self.reputation >= 80 else UI_WARNING if self.reputation >= 50 else UI_CRITICAL
-        self.draw_compact_stat(col_left, stats_y, f"Reputación: {self.reputation}/100", rep_color)
-        
-        time_left = self.max_game_time - self.game_time
-        time_color = UI_SUCCESS if time_left > 300 else UI_WARNING if time_left > 120 else UI_CRITICAL
-        self.draw_compact_stat(col_left, stats_y + 20, f"Tiempo: {self.format_time(time_left)}", time_color)
-        
-        district = self._get_district_name(self.player_pos.x, self.player_pos.y)
-        self.draw_compact_stat(col_left, stats_y + 40, f"Distrito: {district}", BLUE)
-        
-        speed = self.calculate_actual_speed()
-        speed_color = UI_SUCCESS if speed >= 2.5 else UI_WARNING if speed >= 2.0 else UI_CRITICAL
-        self.draw_compact_stat(col_left, stats_y + 60, f"Velocidad: {speed:.1f} c/s", speed_color)
-        
-        # Columna derecha
-        inv_weight = sum(order.weight for order in self.inventory)
-        inv_color = UI_WARNING if inv_weight >= self.max_weight * 0.8 else UI_TEXT_NORMAL
-        self.draw_compact_stat(col_right, stats_y, f"Inventario: {inv_weight}/{self.max_weight}kg", inv_color)
-        
-        active_orders = self.available_orders.size()
-        orders_color = UI_SUCCESS if active_orders > 0 else UI_TEXT_SECONDARY
-        self.draw_compact_stat(col_right, stats_y + 20, f"Activos: {active_orders}/10", orders_color)
-        
-        self.draw_compact_stat(col_right, stats_y + 40, f"Pendientes: {len(self.pending_orders)}", UI_TEXT_NORMAL)
-        self.draw_compact_stat(col_right, stats_y + 60, f"Completados: {len(self.completed_orders)}", UI_SUCCESS)
-    
-    
-    def draw_compact_player_status(self, x: int, y: int, width: int):
-        """Estado del jugador con reglas exactas del documento."""
-        status_bg = pygame.Rect(x - 8, y - 5, width + 16, 110)
-        pygame.draw.rect(self.screen, (255, 250, 240), status_bg, border_radius=6)
-        pygame.draw.rect(self.screen, UI_BORDER, status_bg, 2, border_radius=6)
-        
-        title = self.header_font.render("ESTADO JUGADOR", True, UI_TEXT_HEADER)
-        self.screen.blit(title, (x + 5, y))
-        
-        bar_y = y + 25
-        bar_width = width - 20
-        bar_height = 20
-        
-        label = self.font.render("RESISTENCIA:", True, UI_TEXT_NORMAL)
-        self.screen.blit(label, (x + 5, bar_y))
-        
-        bar_bg = pygame.Rect(x + 10, bar_y + 20, bar_width - 10, bar_height)
-        pygame.draw.rect(self.screen, DARK_GRAY, bar_bg, border_radius=3)
-        
-        stamina_progress = self.stamina / self.max_stamina
-        fill_width = max(3, int((bar_width - 10) * stamina_progress))
-        
-        if self.stamina > 30: 
-            fill_color = UI_SUCCESS
-        elif self.stamina > 0:
-            fill_color = UI_WARNING
-        else: 
-            fill_color = UI_CRITICAL
-        
-        if fill_width > 0:
-            fill_rect = pygame.Rect(x + 12, bar_y + 22, fill_width - 4, bar_height - 4)
-            pygame.draw.rect(self.screen, fill_color, fill_rect, border_radius=2)
-        
-        threshold_x = x + 10 + int((30 / self.max_stamina) * (bar_width - 10))
-        pygame.draw.line(self.screen, (255, 100, 100), 
-                        (threshold_x, bar_y + 20), 
-                        (threshold_x, bar_y + 20 + bar_height), 2)
-        
-        pygame.draw.rect(self.screen, UI_BORDER, bar_bg, 2, border_radius=3)
-        
-        stamina_text = f"{self.stamina:.0f}/{self.max_stamina}"
-        text_surface = self.small_font.render(stamina_text, True, BLACK)
-        text_rect = text_surface.get_rect(center=(x + bar_width // 2, bar_y + 30))
-        self.screen.blit(text_surface, text_rect)
-        
-        status_y = bar_y + 45
-        if self.stamina <= 0:
-            status_text = "EXHAUSTO (¡BLOQUEADO!)"
-            status_color = UI_CRITICAL
-        elif self.stamina <= 30:
-            status_text = f"CANSADO ({self.stamina:.0f}/30)"
-            status_color = UI_WARNING
-        else:
-            status_text = "NORMAL"
-            status_color = UI_SUCCESS
-        
-        status_surface = self.font.render(status_text, True, status_color)
-        self.screen.blit(status_surface, (x + 5, status_y))
-        
-        if self.stamina <= 0:
-            recovery_text = "Recupera hasta 30 para moverte"
-            recovery_surface = self.small_font.render(recovery_text, True, UI_CRITICAL)
-            self.screen.blit(recovery_surface, (x + 5, status_y + 20))
-        elif self.stamina <= 30:
-            recovery_text = f"Para moverte: {30 - self.stamina:.0f} más"
-            recovery_surface = self.small_font.render(recovery_text, True, UI_WARNING)
-            self.screen.blit(recovery_surface, (x + 5, status_y + 20))
-        
-        if self.delivery_streak > 0 and self.stamina > 0:
-            streak_text = f"Racha: {self.delivery_streak}/3"
-            streak_surface = self.small_font.render(streak_text, True, UI_WARNING)
-            self.screen.blit(streak_surface, (x + width - 80, status_y))
-    
-    def draw_compact_weather(self, x: int, y: int, width: int):
-        """Indicador del clima con imagen ajustada al marco."""
-        weather_bg = pygame.Rect(x - 8, y - 5, width + 16, 110)
-        pygame.draw.rect(self.screen, UI_HIGHLIGHT, weather_bg, border_radius=6)
-        pygame.draw.rect(self.screen, UI_BORDER, weather_bg, 2, border_radius=6)
-        
-        title = self.header_font.render("CLIMA DINÁMICO", True, UI_TEXT_HEADER)
-        self.screen.blit(title, (x + 5, y))
-        
-        current_weather = self.weather_system.current_condition
-        image_size = 75 
-        weather_image_pos = (x + 12, y + 27) 
-        
-        if current_weather in self.weather_images:
-            scaled_image = pygame.transform.scale(self.weather_images[current_weather], (image_size, image_size))
-            self.screen.blit(scaled_image, weather_image_pos)
-            
-            image_rect = pygame.Rect(weather_image_pos[0], weather_image_pos[1], image_size, image_size)
-            pygame.draw.rect(self.screen, UI_BORDER, image_rect, 2, border_radius=5)
-        else:
-            weather_color = self.weather_system.get_weather_color()
-            circle_rect = pygame.Rect(weather_image_pos[0], weather_image_pos[1], image_size, image_size)
-            pygame.draw.ellipse(self.screen, weather_color, circle_rect)
-            pygame.draw.ellipse(self.screen, UI_BORDER, circle_rect, 2)
-        
-        weather_name = self.weather_system.get_weather_description()
-        name_text = self.font.render(weather_name, True, UI_TEXT_NORMAL)
-        self.screen.blit(name_text, (x + image_size + 25, y + 27))
-        
-        speed_mult = self.weather_system.get_speed_multiplier()
-        stamina_penalty = self.weather_system.get_stamina_penalty()
-        
-        speed_color = UI_SUCCESS if speed_mult >= 0.9 else UI_WARNING if speed_mult >= 0.8 else UI_CRITICAL
-        stamina_color = UI_SUCCESS if stamina_penalty <= 0.05 else UI_WARNING if stamina_penalty <= 0.1 else UI_CRITICAL
-        
-        speed_text = f"Velocidad: {speed_mult:.0%}"
-        stamina_text = f"Resistencia: -{stamina_penalty*100:.0f}%"
-        
-        speed_surface = self.small_font.render(speed_text, True, speed_color)
-        stamina_surface = self.small_font.render(stamina_text, True, stamina_color)
-        
-        self.screen.blit(speed_surface, (x + image_size + 25, y + 50))
-        self.screen.blit(stamina_surface, (x + image_size + 25, y + 70))
-    
-    def draw_compact_legend(self, x: int, y: int, width: int):
-        """Leyenda del mapa con reglas del juego."""
-        legend_bg = pygame.Rect(x - 8, y - 5, width + 16, 75)
-        pygame.draw.rect(self.screen, (255, 255, 240), legend_bg, border_radius=6)
-        pygame.draw.rect(self.screen, UI_BORDER, legend_bg, 2, border_radius=6)
-        
-        title = self.header_font.render("LEYENDA DEL MAPA", True, UI_TEXT_HEADER)
-        self.screen.blit(title, (x + 5, y))
-        
-        items = [
-            ("Calles", LIGHT_GRAY, "🖼️ PNG" if "C" in self.tile_images else "Caminable"),
-            ("Parques", GREEN, "🖼️ PNG +15/s" if "P" in self.tile_images else "Recupera +15/s"),
-            ("Edificios", DARK_GRAY, "🖼️ PNG" if "B" in self.tile_images else "BLOQUEADO"),
-            ("Descanso", PURPLE, "Recupera +15/s")
-        ]
-        
-        for i, (name, color, desc) in enumerate(items):
-            row = i % 2
-            col = i // 2
-            item_x = x + 5 + col * (width // 2)
-            item_y = y + 20 + row * 18
-            
-            color_rect = pygame.Rect(item_x, item_y, 10, 10)
-            pygame.draw.rect(self.screen, color, color_rect)
-            pygame.draw.rect(self.screen, UI_BORDER, color_rect, 1)
-            
-            # Color especial para tiles con imágenes
-            if "🖼️" in desc:
-                text = self.small_font.render(f"{name}", True, UI_SUCCESS)
-            else:
-                text = self.small_font.render(f"{name}", True, UI_TEXT_NORMAL)
-            self.screen.blit(text, (item_x + 15, item_y - 2))
-    
-    def draw_compact_controls(self, x: int, y: int, width: int):
-        """Controles únicos sin duplicación."""
-        controls_bg = pygame.Rect(x - 8, y - 5, width + 16, 230)
-        pygame.draw.rect(self.screen, (240, 245, 255), controls_bg, border_radius=6)
-        pygame.draw.rect(self.screen, UI_BORDER, controls_bg, 2, border_radius=6)
-        
-        title = self.header_font.render("CONTROLES & ALGORITMOS", True, UI_TEXT_HEADER)
-        self.screen.blit(title, (x + 5, y))
-        
-        algo_title = self.font.render("Algoritmos:", True, UI_SUCCESS)
-        self.screen.blit(algo_title, (x + 5, y + 25))
-        
-        algorithms = [
-            "P: Prioridad (QuickSort)",
-            "T: Tiempo (MergeSort)", 
-            "D: Distancia (InsertionSort)"
-        ]
-        
-        for i, algo in enumerate(algorithms):
-            text = self.small_font.render(algo, True, UI_TEXT_NORMAL)
-            self.screen.blit(text, (x + 5, y + 45 + i * 16))
-        
-        control_title = self.font.render("Controles:", True, UI_TEXT_HEADER)
-        self.screen.blit(control_title, (x + 5, y + 105))
-        
-        controls = [
-            "WASD/Flechas: Moverse | E: Interactuar",
-            "I: Inventario | O: Pedidos",
-            "F5: Guardar | F9: Cargar",
-            "B: Volver (menú cargar)",
-            "P/T/D: Algoritmos de ordenamiento"
-        ]
-        
-        for i, control in enumerate(controls):
-            text = self.small_font.render(control, True, UI_TEXT_NORMAL)
-            self.screen.blit(text, (x + 5, y + 125 + i * 16))
-
-      
-
-    def draw_compact_progress(self, x: int, y: int, width: int):
-        """Progreso del juego."""
-        progress_bg = pygame.Rect(x - 8, y - 5, width + 16, 80)
-        pygame.draw.rect(self.screen, (255, 255, 240), progress_bg, border_radius=6)
-        pygame.draw.rect(self.screen, UI_BORDER, progress_bg, 2, border_radius=6)
-        
-        title = self.header_font.render("PROGRESO", True, UI_TEXT_HEADER)
-        self.screen.blit(title, (x + 5, y))
-        
-        efficiency = self.calculate_efficiency()
-        
-        progress_info = [
-            f"Completados: {len(self.completed_orders)}",
-            f"Tiempo jugado: {self.format_time(self.game_time)}",
-            f"Eficiencia: {efficiency:.1f}%"
-        ]
-        
-        for i, info in enumerate(progress_info):
-            color = UI_SUCCESS if "Completados" in info else UI_TEXT_NORMAL
-            text = self.small_font.render(info, True, color)
-            self.screen.blit(text, (x + 5, y + 20 + i * 16))
-    
-    def draw_compact_stat(self, x: int, y: int, text: str, color: tuple):
-        """Dibuja una estadística de forma compacta."""
-        text_surface = self.small_font.render(text, True, color)
-        self.screen.blit(text_surface, (x, y))
-    
-    def draw_compact_tips(self, x: int, y: int, width: int):
-        """Consejos basados en las reglas del documento."""
-        tips_bg = pygame.Rect(x - 8, y - 5, width + 16, 90)
-        pygame.draw.rect(self.screen, (240, 255, 240), tips_bg, border_radius=6)
-        pygame.draw.rect(self.screen, UI_BORDER, tips_bg, 2, border_radius=6)
-        
-        title = self.header_font.render("REGLAS DEL JUEGO", True, UI_TEXT_HEADER)
-        self.screen.blit(title, (x + 5, y))
-        
-        tips = [
-            "• Resistencia >30 para moverse",
-            "•  META: $3000 (Mayor desafío)",
-            "•  P2: 4min |  P1: 7min |  P0: 9min",
-            "•  Mayor prioridad = Mayor pago"
-        ]
-        
-        for i, tip in enumerate(tips):
-            text = self.small_font.render(tip, True, UI_TEXT_NORMAL)
-            self.screen.blit(text, (x + 5, y + 20 + i * 15))
-    
-    def draw_compact_progress(self, x: int, y: int, width: int):
-        """Progreso del juego."""
-        progress_bg = pygame.Rect(x - 8, y - 5, width + 16, 80)
-        pygame.draw.rect(self.screen, (255, 255, 240), progress_bg, border_radius=6)
-        pygame.draw.rect(self.screen, UI_BORDER, progress_bg, 2, border_radius=6)
-        
-        title = self.header_font.render("PROGRESO", True, UI_TEXT_HEADER)
-        self.screen.blit(title, (x + 5, y))
-        
-        efficiency = self.calculate_efficiency()
-        
-        progress_info = [
-            f"Completados: {len(self.completed_orders)}",
-            f"Tiempo jugado: {self.format_time(self.game_time)}",
-            f"Eficiencia: {efficiency:.1f}%"
-        ]
-        
-        for i, info in enumerate(progress_info):
-            color = UI_SUCCESS if "Completados" in info else UI_TEXT_NORMAL
-            text = self.small_font.render(info, True, color)
-            self.screen.blit(text, (x + 5, y + 20 + i * 16))
-    
-    def draw_compact_stat(self, x: int, y: int, text: str, color: tuple):
-        """Dibuja una estadística de forma compacta."""
-        text_surface = self.small_font.render(text, True, color)
-        self.screen.blit(text_surface, (x, y))
-
-    def draw_inventory_overlay(self):
-        """Overlay del inventario con información detallada."""
-        overlay_x = self.map_offset_x + self.map_pixel_width + 40
-        overlay_y = 400
-        overlay_width = 650
-        overlay_height = 520
-        
-        overlay_rect = pygame.Rect(overlay_x, overlay_y, overlay_width, overlay_height)
-        pygame.draw.rect(self.screen, UI_BACKGROUND, overlay_rect, border_radius=12)
-        pygame.draw.rect(self.screen, UI_BORDER, overlay_rect, 3, border_radius=12)
-        
-        # Título
-        title_bg = pygame.Rect(overlay_x, overlay_y, overlay_width, 45)
-        pygame.draw.rect(self.screen, UI_HIGHLIGHT, title_bg, border_radius=12)
-        title = self.large_font.render("INVENTARIO ACTUAL", True, UI_TEXT_HEADER)
-        title_rect = title.get_rect(center=(overlay_x + overlay_width // 2, overlay_y + 22))
-        self.screen.blit(title, title_rect)
-        
-        if not self.inventory:
-            no_items_text = self.font.render("No hay pedidos en inventario", True, UI_TEXT_SECONDARY)
-            text_rect = no_items_text.get_rect(center=(overlay_rect.centerx, overlay_rect.centery))
-            self.screen.blit(no_items_text, text_rect)
-        else:
-            inventory_list = list(self.inventory)
-            
-            for i, order in enumerate(inventory_list[:7]):
-                y_pos = overlay_rect.y + 55 + i * 65
-                
-                if i == self.selected_inventory_index:
-                    selection_rect = pygame.Rect(overlay_rect.x + 8, y_pos - 3, overlay_width - 16, 60)
-                    pygame.draw.rect(self.screen, UI_HIGHLIGHT, selection_rect, border_radius=5)
-                    pygame.draw.rect(self.screen, UI_BORDER, selection_rect, 2, border_radius=5)
-                
-                urgency_color = self.get_order_urgency_color(order)
-                time_text = self.get_order_status_text(order)
-                district = self._get_district_name(order.dropoff.x, order.dropoff.y)
-                
-                priority_text = f"P{order.priority}" if order.priority > 0 else "Normal"
-                
-                # Información del pedido
-                text1 = self.font.render(f"{order.id} ({priority_text}) - {time_text}", True, urgency_color)
-                self.screen.blit(text1, (overlay_rect.x + 15, y_pos))
-                
-                text2 = self.small_font.render(f"Peso: {order.weight}kg - Pago: ${order.payout} - {district}", True, UI_TEXT_NORMAL)
-                self.screen.blit(text2, (overlay_rect.x + 15, y_pos + 20))
-                
-                distance = abs(order.dropoff.x - self.player_pos.x) + abs(order.dropoff.y - self.player_pos.y)
-                text3 = self.small_font.render(f"Destino: ({order.dropoff.x}, {order.dropoff.y}) - Distancia: {distance} celdas", True, UI_TEXT_SECONDARY)
-                self.screen.blit(text3, (overlay_rect.x + 15, y_pos + 40))
-        
-        # Instrucciones
-        instructions_bg = pygame.Rect(overlay_x, overlay_y + overlay_height - 50, overlay_width, 45)
-        pygame.draw.rect(self.screen, (240, 240, 245), instructions_bg, border_radius=12)
-        
-        instructions = [
-            "↑/↓: Navegar | ENTER: Entregar (si estás en destino) | I: Cerrar",
-            "P/T: Ordenar con QuickSort/MergeSort según algoritmos implementados"
-        ]
-        
-        for i, instruction in enumerate(instructions):
-            color = UI_SUCCESS if "algoritmos" in instruction else UI_TEXT_NORMAL
-            text = self.small_font.render(instruction, True, color)
-            self.screen.blit(text, (overlay_rect.x + 15, overlay_rect.y + overlay_height - 42 + i * 14))
-
-    def draw_orders_overlay(self):
-        """Overlay de pedidos con algoritmos de ordenamiento."""
-        overlay_x = self.map_offset_x + self.map_pixel_width + 40
-        overlay_y = 50
-        overlay_width = 750
-        overlay_height = 650
-        
-        overlay_rect = pygame.Rect(overlay_x, overlay_y, overlay_width, overlay_height)
-        pygame.draw.rect(self.screen, UI_BACKGROUND, overlay_rect, border_radius=12)
-        pygame.draw.rect(self.screen, UI_BORDER, overlay_rect, 3, border_radius=12)
-        
-        # Título
-        title_bg = pygame.Rect(overlay_x, overlay_y, overlay_width, 50)
-        pygame.draw.rect(self.screen, UI_HIGHLIGHT, title_bg, border_radius=12)
-        title = self.large_font.render("PEDIDOS - ALGORITMOS IMPLEMENTADOS", True, UI_TEXT_HEADER)
-        title_rect = title.get_rect(center=(overlay_x + overlay_width // 2, overlay_y + 25))
-        self.screen.blit(title, title_rect)
-        
-        if not self.available_orders.items:
-            no_orders_text = self.font.render("No hay pedidos disponibles", True, UI_TEXT_SECONDARY)
-            text_rect = no_orders_text.get_rect(center=(overlay_rect.centerx, overlay_rect.centery))
-            self.screen.blit(no_orders_text, text_rect)
-        else:
-            # Mostrar pedidos disponibles
-            for i, order in enumerate(self.available_orders.items[:7]):
-                y_pos = overlay_rect.y + 60 + i * 80
-                
-                if i == self.selected_order_index:
-                    selection_rect = pygame.Rect(overlay_rect.x + 8, y_pos - 3, overlay_width - 16, 75)
-                    pygame.draw.rect(self.screen, UI_HIGHLIGHT, selection_rect, border_radius=5)
-                    pygame.draw.rect(self.screen, UI_BORDER, selection_rect, 2, border_radius=5)
-                
-                urgency_color = self.get_order_urgency_color(order)
-                time_text = self.get_order_status_text(order)
-                
-                pickup_district = self._get_district_name(order.pickup.x, order.pickup.y)
-                dropoff_district = self._get_district_name(order.dropoff.x, order.dropoff.y)
-                
-                priority_text = f"P{order.priority}" if order.priority > 0 else "Normal"
-                
-                # Información del pedido
-                text1 = self.font.render(f"{order.id} ({priority_text}) - ${order.payout} | {time_text}", True, urgency_color)
-                self.screen.blit(text1, (overlay_rect.x + 15, y_pos))
-                
-                text2 = self.small_font.render(f"Peso: {order.weight}kg | Duración: {order.duration_minutes:.1f}min", True, UI_TEXT_NORMAL)
-                self.screen.blit(text2, (overlay_rect.x + 15, y_pos + 20))
-                
-                pickup_distance = abs(order.pickup.x - self.player_pos.x) + abs(order.pickup.y - self.player_pos.y)
-                text3 = self.small_font.render(f"Recoger: ({order.pickup.x}, {order.pickup.y}) [{pickup_district}] - {pickup_distance} celdas", True, UI_TEXT_NORMAL)
-                self.screen.blit(text3, (overlay_rect.x + 15, y_pos + 40))
-                
-                total_route_distance = abs(order.dropoff.x - order.pickup.x) + abs(order.dropoff.y - order.pickup.y)
-                text4 = self.small_font.render(f"Entregar: ({order.dropoff.x}, {order.dropoff.y}) [{dropoff_district}] - Ruta: {total_route_distance} celdas", True, UI_TEXT_SECONDARY)
-                self.screen.blit(text4, (overlay_rect.x + 15, y_pos + 60))
-        
-        instructions_bg = pygame.Rect(overlay_x, overlay_y + overlay_height - 80, overlay_width, 75)
-        pygame.draw.rect(self.screen, (240, 240, 245), instructions_bg, border_radius=12)
-        
-        instructions = [
-            "↑/↓: Navegar | ENTER: Aceptar pedido | O: Cerrar",
-            "",
-            " ALGORITMOS DE ORDENAMIENTO IMPLEMENTADOS:",
-            "D: Ordenar por DISTANCIA (Insertion Sort O(n²)) ",
-            "Usa P/T en inventario para QuickSort/MergeSort "
-        ]
-        
-        for i, instruction in enumerate(instructions):
-            if not instruction:
-                continue
-            if "ALGORITMOS" in instruction:
-                color = UI_SUCCESS
-            elif "✅" in instruction:
-                color = UI_WARNING
-            else:
-                color = UI_TEXT_NORMAL
-            
-            text = self.small_font.render(instruction, True, color)
-            self.screen.blit(text, (overlay_rect.x + 15, overlay_rect.y + overlay_height - 70 + i * 14))
-
-    def draw_pause_overlay(self):
-        """Overlay de pausa."""
-        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-        overlay.set_alpha(180)
-        overlay.fill((0, 0, 50))
-        self.screen.blit(overlay, (0, 0))
-        
-        pause_rect = pygame.Rect(WINDOW_WIDTH // 2 - 250, WINDOW_HEIGHT // 2 - 120, 500, 240)
-        pygame.draw.rect(self.screen, UI_BACKGROUND, pause_rect, border_radius=15)
-        pygame.draw.rect(self.screen, UI_BORDER, pause_rect, 4, border_radius=15)
-        
-        pause_text = self.title_font.render("JUEGO PAUSADO", True, UI_TEXT_HEADER)
-        text_rect = pause_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 40))
-        self.screen.blit(pause_text, text_rect)
-        
-        instruction_text = self.large_font.render("Presiona ESPACIO para continuar", True, UI_TEXT_NORMAL)
-        text_rect = instruction_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 10))
-        self.screen.blit(instruction_text, text_rect)
-        
-        state_info = [
-            f"Dinero: ${self.money}/${self.goal}",
-            f"Tiempo restante: {self.format_time(self.max_game_time - self.game_time)}",
-            f"Reputación: {self.reputation}/100"
-        ]
-        
-        for i, info in enumerate(state_info):
-            text = self.font.render(info, True, UI_TEXT_SECONDARY)
-            text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 40 + i * 25))
-            self.screen.blit(text, text_rect)
-    
-    def draw_game_over_overlay(self):
-        """Overlay de fin de juego con estadísticas completas."""
-        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
-        overlay.set_alpha(220)
-        overlay.fill((20, 20, 40))
-        self.screen.blit(overlay, (0, 0))
-        
-        game_over_rect = pygame.Rect(WINDOW_WIDTH // 2 - 350, WINDOW_HEIGHT // 2 - 280, 700, 560)
-        pygame.draw.rect(self.screen, UI_BACKGROUND, game_over_rect, border_radius=20)
-        pygame.draw.rect(self.screen, UI_BORDER, game_over_rect, 5, border_radius=20)
-        
-        if self.victory:
-            title_text = self.title_font.render("¡VICTORIA!", True, UI_SUCCESS)
-            message = f"¡Felicidades! Alcanzaste la meta de ${self.goal}"
-        else:
-            title_text = self.title_font.render("JUEGO TERMINADO", True, UI_CRITICAL)
-            if self.reputation < 20:
-                message = "Reputación demasiado baja"
-            else:
-                message = f"Tiempo agotado. Necesitabas ${self.goal - self.money} más"
-        
-        title_rect = title_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 240))
-        self.screen.blit(title_text, title_rect)
-        
-        final_score = self._calculate_final_score()
-        self.save_score(final_score)
-        
-        final_district = self._get_district_name(self.player_pos.x, self.player_pos.y)
-        efficiency = self.calculate_efficiency()
-        
-        stats = [
-            message,
-            "",
-            f"PUNTAJE FINAL: {final_score}",
-            f"Dinero obtenido: ${self.money} / ${self.goal}",
-            f"Reputación final: {self.reputation}/100",
-            f"Pedidos completados: {len(self.completed_orders)}",
-            f"Eficiencia: {efficiency:.1f}%",
-            f"Ciudad: {self.city_name} ({self.city_width}x{self.city_height})",
-            f"Posición final: ({self.player_pos.x}, {self.player_pos.y}) - Distrito {final_district}",
-            f"Mejor racha consecutiva: {getattr(self, 'best_streak', self.delivery_streak)}",
-            f"Tiempo total jugado: {self.format_time(self.game_time)}"
-        ]
-        
-        for i, stat in enumerate(stats):
-            if not stat:
-                continue
-                
-            if "PUNTAJE FINAL" in stat:
-                color = UI_SUCCESS if self.victory else UI_CRITICAL
-                font = self.large_font
-            elif "Dinero obtenido" in stat:
-                progress = (self.money / self.goal) * 100
-                color = UI_SUCCESS if progress >= 100 else UI_WARNING if progress >= 80 else UI_CRITICAL
-                font = self.font
-            elif "Reputación" in stat:
-                color = UI_SUCCESS if self.reputation >= 80 else UI_WARNING if self.reputation >= 50 else UI_CRITICAL
-                font = self.font
-            else:
-                color = UI_TEXT_NORMAL
-                font = self.font
-            
-            text = font.render(stat, True, color)
-            text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 180 + i * 30))
-            self.screen.blit(text, text_rect)
-        
-        exit_text = self.font.render("Presiona ESC para salir al menú principal", True, UI_TEXT_SECONDARY)
-        exit_rect = exit_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 220))
-        self.screen.blit(exit_text, exit_rect)
-    
-    def format_time(self, seconds: float) -> str:
-        """Formatea el tiempo en MM:SS."""
-        if seconds < 0:
-            seconds = 0
-        minutes = int(seconds // 60)
-        seconds = int(seconds % 60)
-        return f"{minutes:02d}:{seconds:02d}"
-    
-    def calculate_efficiency(self) -> float:
-        """Calcula la eficiencia del jugador."""
-        if self.game_time <= 0:
-            return 0.0
-        
-        completed = len(self.completed_orders)
-        efficiency = (completed / max(1, self.game_time / 60)) * 100
-        
-        return min(100.0, efficiency)
-    
-    def run(self):
-        """Bucle principal del juego."""
-        last_time = time.time()
-        
-        print("=" * 90)
-        print("COURIER QUEST")
-        print("=" * 90)
-        
-        while self.running:
-            current_time = time.time()
-            dt = current_time - last_time
-            last_time = current_time
-            
-            dt = min(dt, 1.0 / 30.0)
-            events = pygame.event.get()
-            for event in events:
-                if event.type == pygame.QUIT:
-                    self.running = False
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        if self.game_state == "playing":
-                            if self.game_over:
-                                self.game_state = "menu"
-                                self.game_over = False
-                                self.victory = False
-                            else:
-                                self.paused = not self.paused
-                        elif self.game_state == "menu":
-                            self.running = False
-            
-            self.handle_events(events)
-            if self.game_state == "playing":
-                keys = pygame.key.get_pressed()
-                self.handle_input(keys, dt)
-            self.update(dt)
-            self.draw()
-            self.clock.tick(FPS)
-        
-        pygame.quit()
-
-# =============================================================================
-# FUNCIÓN PRINCIPAL
-# =============================================================================
-def main():
-    """Función principal del programa."""
-    print("=" * 90)
-    print(" COURIER QUEST - VERSIÓN ULTRA VELOCIDAD")
-    print("   Proyecto EIF-207 Estructuras de Datos")
-    print("   API REAL + EXTREMA URGENCIA (30 SEGUNDOS)")
-    print("=" * 90)
-    print()
-    
-    try:
-        game = CourierQuest()
-        game.run()
-        
-    except Exception as e:
-        print(f"Error ejecutando el juego: {e}")
-        import traceback
-        traceback.print_exc()
-        input("Presiona ENTER para salir...")
-
-if __name__ == "__main__":
+import pygame
+import json
+import os
+import time
+import random
+import requests
+import hashlib
+import shutil
+from datetime import datetime, timedelta
+from typing import List, Dict, Tuple, Optional, Any
+from dataclasses import dataclass, fields, MISSING
+from collections import deque, OrderedDict
+from itertools import islice
+import pickle
+import math
+import copy
+import contextlib
+import sys
+import statistics
+import multiprocessing
+import heapq
+import queue
+import sqlite3
+import threading
+import struct
+import zlib
+from array import array
+try:
+    import lzma
+except ImportError:  # Algunas compilaciones de Python no incluyen lzma
+    lzma = None
+pygame.init()
+
+# =============================================================================
+# CONSTANTES Y CONFIGURACIÓN
+# =============================================================================
+
+# Constantes - VENTANA OPTIMIZADA PARA MEJOR VISUALIZACIÓN
+WINDOW_WIDTH = 1800
+WINDOW_HEIGHT = 1000
+TILE_SIZE = 32
+FPS = 60
+
+# Paso fijo de la simulación: update() avanza siempre SIM_DT segundos, sin
+# importar cuánto tarde el render; el dibujo interpola entre ticks
+SIM_TICK_RATE = 30
+SIM_DT = 1.0 / SIM_TICK_RATE
+MAX_FRAME_TIME = 0.25  # Evita la espiral de ticks si un frame tarda demasiado
+
+# Autoguardado: un delta al diario cada AUTOSAVE_INTERVAL segundos de juego y
+# un keyframe completo cada AUTOSAVE_KEYFRAME_EVERY deltas
+AUTOSAVE_INTERVAL = 5.0
+AUTOSAVE_KEYFRAME_EVERY = 24
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+BLUE = (0, 100, 200)
+GREEN = (0, 200, 0)
+RED = (200, 0, 0)
+YELLOW = (255, 200, 0)
+GRAY = (128, 128, 128)
+DARK_GRAY = (64, 64, 64)
+LIGHT_GRAY = (192, 192, 192)
+LIGHT_BLUE = (173, 216, 230)
+PURPLE = (128, 0, 128)
+ORANGE = (255, 165, 0)
+CYAN = (0, 255, 255)
+DARK_GREEN = (0, 150, 0)
+DARK_RED = (150, 0, 0)
+BRIGHT_GREEN = (50, 255, 50)
+BRIGHT_YELLOW = (255, 255, 100)
+BRIGHT_RED = (255, 100, 100)
+# Colores por nivel de urgencia (CourierQuest.urgency_level): expirado, <33%, <66%, resto
+URGENCY_COLORS = (DARK_RED, RED, YELLOW, DARK_GREEN)
+UI_BACKGROUND = (245, 245, 250)
+UI_BORDER = (70, 70, 120)
+UI_HIGHLIGHT = (220, 230, 255)
+UI_TEXT_HEADER = (25, 25, 90)
+UI_TEXT_NORMAL = (40, 40, 70)
+UI_TEXT_SECONDARY = (80, 80, 100)
+UI_WARNING = (200, 100, 0)
+UI_CRITICAL = (200, 50, 50)
+UI_SUCCESS = (0, 150, 50)
+
+# =============================================================================
+# CLASES DE DATOS
+# =============================================================================
+
+# __slots__ en las clases de datos (dataclass(slots=True) existe desde Python 3.10)
+SLOTTED_DATACLASS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+def _restore_dataclass_state(obj, state):
+    """Restaura un objeto desde pickle, tanto de partidas nuevas como antiguas.
+
+    Las partidas anteriores guardaron Position/Order con __dict__ (estado como
+    dict); las nuevas sin __dict__ traen (None, slots). Los campos que falten
+    en partidas viejas toman su valor por defecto.
+    """
+    if isinstance(state, tuple) and len(state) == 2:
+        dict_state, slot_state = state
+        state = dict(dict_state or {}, **(slot_state or {}))
+    for field_info in fields(obj):
+        if field_info.name not in state and field_info.default is not MISSING:
+            object.__setattr__(obj, field_info.name, field_info.default)
+    for name, value in state.items():
+        object.__setattr__(obj, name, value)
+
+@dataclass(frozen=True, **SLOTTED_DATACLASS)
+class Position:
+    """Representa una posición en la cuadrícula del juego.
+
+    Es inmutable para poder compartir instancias: CompiledMap.position()
+    devuelve siempre el mismo objeto para cada celda del mapa.
+    """
+    x: int
+    y: int
+
+    def __reduce__(self):
+        return (Position, (self.x, self.y))
+
+    def __setstate__(self, state):
+        _restore_dataclass_state(self, state)
+
+@dataclass(**SLOTTED_DATACLASS)
+class Order:
+    """Representa un pedido de entrega en el juego."""
+    id: str
+    pickup: Position
+    dropoff: Position
+    payout: int
+    duration_minutes: float
+    weight: int
+    priority: int
+    release_time: int
+    status: str = "waiting_release"
+    created_at: float = 0.0
+    accepted_at: float = 0.0
+
+    def __setstate__(self, state):
+        _restore_dataclass_state(self, state)
+
+@dataclass
+class GameState:
+    """Estado completo del juego para guardado/carga."""
+    player_pos: Position
+    stamina: float
+    reputation: int
+    money: int
+    game_time: float
+    weather_time: float
+    current_weather: str
+    weather_intensity: float
+    inventory: List[Order]
+    available_orders: List[Order]
+    completed_orders: List[Order]
+    goal: int
+    delivery_streak: int
+    pending_orders: List[Order]
+    city_width: int
+    city_height: int
+    tiles: List[List[str]]
+    legend: Dict
+    city_name: str
+    max_game_time: float
+
+# =============================================================================
+# SISTEMA DE API MEJORADO
+# =============================================================================
+
+class TigerAPIManager:
+    """Gestor de API mejorado con mejor manejo de errores."""
+    
+    def __init__(self, base_url="https://tigerds-api.kindflower-ccaf48b6.eastus.azurecontainerapps.io", load_images: bool = True):
+        self.base_url = base_url
+        self.cache_dir = "api_cache"
+        self.data_dir = "data"
+        self.tile_images = {}
+        if load_images:
+            self._load_tile_images()
+    
+
+
+    def _load_tile_images(self):
+        """Carga las imágenes para tiles especiales."""
+        try:
+            park_image = pygame.image.load("pixilart-drawing.png")
+            self.tile_images["P"] = pygame.transform.scale(park_image, (TILE_SIZE, TILE_SIZE))
+            print(" Imagen de parque cargada correctamente desde pixilart-drawing.png")
+            
+        except FileNotFoundError as e:
+            print(f" No se pudo cargar imagen: {e}")
+            print(" Asegúrate de que exista la carpeta 'assets/images/' con 'park.png'")
+            self._create_fallback_images()
+        except Exception as e:
+            print(f" Error cargando imágenes: {e}")
+            self._create_fallback_images()
+
+    def _create_fallback_images(self):
+        """Crea imágenes de respaldo si no se pueden cargar las originales."""
+        park_surface = pygame.Surface((TILE_SIZE, TILE_SIZE))
+        park_surface.fill(GREEN)
+        
+        tree_color = (0, 100, 0)
+        for i in range(3):
+            for j in range(3):
+                if (i + j) % 2 == 0:
+                    tree_rect = pygame.Rect(
+                        i * (TILE_SIZE // 3) + 2, 
+                        j * (TILE_SIZE // 3) + 2, 
+                        TILE_SIZE // 3 - 4, 
+                        TILE_SIZE // 3 - 4
+                    )
+                    pygame.draw.ellipse(park_surface, tree_color, tree_rect)
+        
+        self.tile_images["P"] = park_surface
+        print("✅ Imagen de respaldo para parque creada")
+
+
+    def _ensure_directories(self):
+        """Crea las carpetas de caché y datos; se llama al escribir, no al construir."""
+        for directory in [self.cache_dir, self.data_dir]:
+            os.makedirs(directory, exist_ok=True)
+    
+    def make_request(self, endpoint, timeout=30):
+        """Realiza una petición a la API con manejo de errores."""
+        try:
+            resp = requests.get(self.base_url + endpoint, timeout=timeout)
+            if resp.status_code == 200:
+                return resp.json()
+            else:
+                print(f"❌ Error {resp.status_code} en {endpoint}")
+                return None
+        except Exception as e:
+            print(f"❌ Error de conexión en {endpoint}: {e}")
+            return None
+    def get_city_map(self) -> dict:
+        """Obtiene el mapa de la ciudad desde la API real."""
+        print("🚀 Obteniendo mapa de TigerCity desde API...")
+        map_data = self.make_request("/city/map")
+        
+        if map_data and 'data' in map_data:
+            api_data = map_data['data']
+            game_map = {
+                'width': api_data['width'],
+                'height': api_data['height'],
+                'tiles': api_data['tiles'],
+                'legend': self._convert_legend(api_data['legend']),
+                'goal': 3000,
+                'city_name': api_data.get('city_name', 'TigerCity'),
+                'max_time': api_data.get('max_time', 600),
+                'version': api_data.get('version', '1.0')
+            }
+            
+            self._save_to_cache("map.json", game_map)
+            print(f" Mapa cargado: {game_map['width']}x{game_map['height']} - {game_map['city_name']}")
+            return game_map
+        else:
+            print(" No se pudo obtener el mapa de la API, usando datos locales...")
+            return self._get_fallback_map()
+    
+    def get_city_jobs(self, pathfinder: Optional['PathfindingService'] = None) -> list:
+        """Obtiene los trabajos/pedidos desde la API real - MEJORADO PARA MÁS PEDIDOS."""
+        print(" Obteniendo trabajos de TigerCity desde API...")
+        jobs_data = self.make_request("/city/jobs")
+        
+        if jobs_data:
+            orders = self._convert_jobs_to_orders(jobs_data)
+            
+            if len(orders) < 25:
+                print(f" Solo {len(orders)} pedidos de API, generando adicionales para fluidez...")
+                additional_orders = self._generate_additional_orders(25 - len(orders), pathfinder)
+                orders.extend(additional_orders)
+            
+            self._save_to_cache("jobs.json", orders)
+            print(f" {len(orders)} pedidos cargados (API + generados para fluidez)")
+            return orders
+        else:
+            print(" No se pudieron obtener los trabajos de la API, usando datos locales...")
+            return self._get_fallback_orders()
+    
+    def _generate_additional_orders(self, count: int,
+                                    pathfinder: Optional['PathfindingService'] = None) -> list:
+        """Genera pedidos adicionales para mantener la fluidez del juego - MEJORADO.
+
+        Con pathfinder la separación y la duración usan el costo de viaje real.
+        """
+        additional_orders = []
+        
+        def route_distance(px, py, dx, dy):
+            manhattan = abs(px - dx) + abs(py - dy)
+            if pathfinder is None:
+                return manhattan
+            cost = pathfinder.path_cost(Position(px, py), Position(dx, dy))
+            # Sin ruta (p. ej. sobre un edificio) se deja como demasiado cerca para reintentar
+            return cost if cost != math.inf else 0
+        
+        for i in range(count):
+            pickup_x = random.randint(1, 28)
+            pickup_y = random.randint(1, 23)
+            dropoff_x = random.randint(1, 28)
+            dropoff_y = random.randint(1, 23)
+            
+            attempts = 0
+            distance = route_distance(pickup_x, pickup_y, dropoff_x, dropoff_y)
+            while distance < 4 and attempts < 10:
+                dropoff_x = random.randint(1, 28)
+                dropoff_y = random.randint(1, 23)
+                distance = route_distance(pickup_x, pickup_y, dropoff_x, dropoff_y)
+                attempts += 1
+            
+            if distance < 4:
+                distance = abs(pickup_x - dropoff_x) + abs(pickup_y - dropoff_y)
+            duration = max(1.5, min(4.5, distance * 0.25 + random.uniform(1.0, 2.0)))
+            
+            release_time = random.randint(0, 180)
+            
+            order = Order(
+                id=f"GEN_{i+100:03d}",
+                pickup=Position(pickup_x, pickup_y),
+                dropoff=Position(dropoff_x, dropoff_y),
+                payout=random.randint(120, 280),
+                duration_minutes=duration,
+                weight=random.randint(1, 4),
+                priority=random.choices([0, 1, 2], weights=[50, 35, 15])[0],
+                release_time=release_time
+            )
+            additional_orders.append(order)
+        
+        return additional_orders
+    
+    def _convert_legend(self, api_legend: dict) -> dict:
+        """Convierte la leyenda de la API al formato del juego."""
+        game_legend = {}
+        
+        for tile_type, tile_info in api_legend.items():
+            game_tile = {
+                'name': tile_info['name'],
+                'surface_weight': tile_info.get('surface_weight', 1.0)
+            }
+            
+            if tile_info.get('blocked', False):
+                game_tile['blocked'] = True
+            
+            if tile_info['name'].lower() == 'park':
+                game_tile['rest_bonus'] = 20.0
+            
+            game_legend[tile_type] = game_tile
+        
+        return game_legend
+    
+    def _convert_jobs_to_orders(self, jobs_data: dict) -> list:
+        """Convierte los trabajos de la API a pedidos del juego."""
+        orders = []
+        
+        jobs_list = None
+        
+        try:
+            if isinstance(jobs_data, dict):
+                if 'data' in jobs_data and isinstance(jobs_data['data'], dict) and 'jobs' in jobs_data['data']:
+                    jobs_list = jobs_data['data']['jobs']
+                elif 'jobs' in jobs_data:
+                    jobs_list = jobs_data['jobs']
+                elif 'data' in jobs_data and isinstance(jobs_data['data'], list):
+                    jobs_list = jobs_data['data']
+            elif isinstance(jobs_data, list):
+                jobs_list = jobs_data
+            
+            if not jobs_list or not isinstance(jobs_list, list):
+                print(" Estructura de datos de trabajos inesperada, usando respaldo")
+                return self._get_fallback_orders()
+            
+            for i, job in enumerate(jobs_list):
+                try:
+                    if isinstance(job, str):
+                        order_id = f"STR_{i:03d}"
+                        payout = random.randint(100, 200)
+                    elif isinstance(job, dict):
+                        order_id = job.get('id', f"API_{i:03d}")
+                        payout = job.get('salary', job.get('payout', random.randint(100, 200)))
+                    else:
+                        continue
+                    
+                    if isinstance(payout, str):
+                        try:
+                            payout = int(float(payout.replace('$', '').replace(',', '')))
+                        except:
+                            payout = random.randint(100, 200)
+                    elif not isinstance(payout, int):
+                        payout = random.randint(100, 200)
+                    
+                    pickup_x = random.randint(1, 28)
+                    pickup_y = random.randint(1, 23)
+                    dropoff_x = random.randint(1, 28)
+                    dropoff_y = random.randint(1, 23)
+                    
+                    attempts = 0
+                    while abs(pickup_x - dropoff_x) + abs(pickup_y - dropoff_y) < 5 and attempts < 10:
+                        dropoff_x = random.randint(1, 28)
+                        dropoff_y = random.randint(1, 23)
+                        attempts += 1
+                    
+                    distance = abs(pickup_x - dropoff_x) + abs(pickup_y - dropoff_y)
+                    duration = max(0.3, min(0.8, distance * 0.05 + random.uniform(0.2, 0.5)))
+                    
+                    order = Order(
+                        id=str(order_id),
+                        pickup=Position(pickup_x, pickup_y),
+                        dropoff=Position(dropoff_x, dropoff_y),
+                        payout=int(payout),
+                        duration_minutes=duration,
+                        weight=random.randint(1, 3),
+                        priority=int(api_priority),
+                        release_time=random.randint(0, 180)
+                    )
+                    orders.append(order)
+                    
+                except Exception as e:
+                    print(f" Error procesando trabajo {i}: {e}")
+                    fallback_order = Order(
+                        id=f"FALLBACK_{i:03d}",
+                        pickup=Position(random.randint(1, 28), random.randint(1, 23)),
+                        dropoff=Position(random.randint(1, 28), random.randint(1, 23)),
+                        payout=random.randint(100, 200),
+                        duration_minutes=random.uniform(5.0, 10.0),
+                        weight=random.randint(1, 4),
+                        priority=random.randint(0, 2),
+                        release_time=random.randint(0, 300)
+                    )
+                    orders.append(fallback_order)
+                    continue
+            
+            if not orders:
+                print(" No se pudieron crear pedidos desde la API, usando respaldo completo")
+                return self._get_fallback_orders()
+            
+            print(f" {len(orders)} pedidos procesados correctamente desde API")
+            return orders
+            
+        except Exception as e:
+            print(f" Error general convirtiendo trabajos: {e}")
+            return self._get_fallback_orders()
+    
+    def _save_to_cache(self, filename: str, data: Any):
+        """Guarda datos en la caché local."""
+        try:
+            self._ensure_directories()
+            cache_path = os.path.join(self.cache_dir, filename)
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+        except Exception as e:
+            print(f" Error guardando en caché {filename}: {e}")
+    
+    def _load_from_cache(self, filename: str) -> Optional[Any]:
+        """Carga datos desde la caché local."""
+        try:
+            cache_path = os.path.join(self.cache_dir, filename)
+            if os.path.exists(cache_path):
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f" Error cargando de caché {filename}: {e}")
+        return None
+    
+    def _get_fallback_map(self) -> dict:
+        """Mapa de respaldo si la API falla."""
+        fallback_map = self._load_from_cache("map.json")
+        if fallback_map:
+            return fallback_map
+        
+        return {
+            "width": 30,
+            "height": 25,
+            "tiles": [["C"] * 30 for _ in range(25)],
+            "legend": {
+                "C": {"name": "calle", "surface_weight": 1.00},
+                "B": {"name": "edificio", "blocked": True},
+                "P": {"name": "parque", "surface_weight": 0.95, "rest_bonus": 15.0}
+            },
+            "goal": 3000,
+            "city_name": "TigerCity",
+            "max_time": 600,
+            "version": "1.0"
+        }
+    
+    def _get_fallback_orders(self) -> list:
+        """Pedidos de respaldo si la API falla - MÁS PEDIDOS PARA FLUIDEZ."""
+        fallback_orders = self._load_from_cache("jobs.json")
+        if fallback_orders:
+            return fallback_orders
+        
+        orders = []
+        for i in range(35):
+            pickup_x = random.randint(1, 28)
+            pickup_y = random.randint(1, 23)
+            dropoff_x = random.randint(1, 28)
+            dropoff_y = random.randint(1, 23)
+            
+            while abs(pickup_x - dropoff_x) + abs(pickup_y - dropoff_y) < 4:
+                dropoff_x = random.randint(1, 28)
+                dropoff_y = random.randint(1, 23)
+            
+            priority = random.choices([0, 1, 2], weights=[40, 40, 20])[0]
+            base_duration = random.uniform(5.0, 12.0)
+            
+            if priority >= 2:
+                duration = max(0.13, min(0.25, base_duration * 0.05))
+            elif priority == 1:
+                duration = max(0.17, min(0.30, base_duration * 0.07))
+            else:
+                duration = max(0.20, min(0.37, base_duration * 0.09))
+            
+            orders.append(Order(
+                id=f"FALLBACK_{i:03d}",
+                pickup=Position(pickup_x, pickup_y),
+                dropoff=Position(dropoff_x, dropoff_y),
+                payout=random.randint(150, 400) + (50 * priority),
+                duration_minutes=duration,
+                weight=random.randint(1, 3),
+                priority=priority,
+                release_time=random.randint(0, 180) 
+            ))
+        
+        return orders
+
+# =============================================================================
+# ALGORITMOS DE ORDENAMIENTO
+# =============================================================================
+
+class SortingAlgorithms:
+    """Ordenamientos de pedidos para el juego.
+
+    Ordenan en el lugar con claves precalculadas (cada clave se calcula una
+    vez por pedido, no en cada comparación), sin recursión, y son estables:
+    los empates conservan el orden actual de la lista.
+    """
+    
+    @staticmethod
+    def sorted_rows(count: int, keys) -> List[int]:
+        """Índices 0..count-1 ordenados por varias columnas (valores, descendente).
+
+        La primera clave es la más significativa; se aplica un sort estable por
+        clave, de la menos a la más significativa.
+        """
+        rows = list(range(count))
+        for values, descending in reversed(keys):
+            rows.sort(key=values.__getitem__, reverse=descending)
+        return rows
+    
+    @staticmethod
+    def sort_orders(orders: List[Order], *keys) -> List[Order]:
+        """Ordena orders en el lugar por columnas precalculadas y lo devuelve.
+
+        Cada clave es (valores, descendente) con un valor por pedido, p. ej.
+        prioridad, luego tiempo restante, luego distancia.
+        """
+        if len(orders) > 1:
+            rows = SortingAlgorithms.sorted_rows(len(orders), keys)
+            orders[:] = [orders[i] for i in rows]
+        return orders
+    
+    @staticmethod
+    def sort_by_priority(orders: List[Order]) -> List[Order]:
+        """Ordena en el lugar por prioridad, de mayor a menor."""
+        return SortingAlgorithms.sort_orders(orders, ([order.priority for order in orders], True))
+    
+    @staticmethod
+    def sort_by_deadline(orders: List[Order], game_time: float) -> List[Order]:
+        """Ordena en el lugar por tiempo restante, de menor a mayor."""
+        def time_remaining(order):
+            if order.status == "waiting_release":
+                return order.duration_minutes * 60
+            return max(0, order.duration_minutes * 60 - (game_time - order.created_at))
+        
+        return SortingAlgorithms.sort_orders(orders, ([time_remaining(order) for order in orders], False))
+    
+    @staticmethod
+    def insertion_sort_by_distance(orders: List[Order], player_pos: Position,
+                                   distance_fn=None) -> List[Order]:
+        """Ordena pedidos por distancia usando Insertion Sort.
+
+        distance_fn(order) permite usar el costo de viaje real; por defecto Manhattan.
+        Cada distancia se calcula una sola vez; sobre una lista casi ordenada
+        (p. ej. la anterior tras un paso del jugador) cuesta O(n + inversiones).
+        """
+        result = orders.copy()
+        if distance_fn is None:
+            distance_fn = lambda order: abs(order.pickup.x - player_pos.x) + abs(order.pickup.y - player_pos.y)
+        
+        keys = [distance_fn(order) for order in result]
+        SortingAlgorithms.insertion_sort_in_place(result, keys)
+        return result
+    
+    @staticmethod
+    def insertion_sort_in_place(items: list, keys: list) -> int:
+        """Insertion sort estable de items según keys (misma longitud), ambos en el lugar.
+
+        Devuelve cuántos desplazamientos hizo, es decir, las inversiones reparadas.
+        """
+        shifts = 0
+        for i in range(1, len(items)):
+            item, key = items[i], keys[i]
+            j = i - 1
+            while j >= 0 and keys[j] > key:
+                items[j + 1] = items[j]
+                keys[j + 1] = keys[j]
+                j -= 1
+            items[j + 1] = item
+            keys[j + 1] = key
+            shifts += i - 1 - j
+        return shifts
+
+# =============================================================================
+# ESTRUCTURAS DE DATOS OPTIMIZADAS
+# =============================================================================
+
+class OptimizedPriorityQueue:
+    """Cola de prioridad sobre un heap binario con borrado perezoso.
+
+    Cada entrada del heap es [-prioridad, secuencia, pedido]; la secuencia
+    desempata para que prioridades iguales salgan en orden FIFO. Un mapa
+    id(pedido) -> entrada permite borrar un pedido marcando su entrada (el
+    pedido pasa a None) y el heap se compacta cuando las marcas superan a los
+    vivos. Las claves son por identidad, como en ReleaseScheduler e Inventory:
+    los ids de la API no garantizan ser únicos, así que dos pedidos con el
+    mismo id conviven en la cola.
+
+    items es una vista ordenada para la interfaz, cacheada hasta la siguiente
+    modificación. Por defecto sigue el orden de prioridad; asignarle una lista
+    (p. ej. ordenada por distancia) fija ese orden de presentación y los
+    pedidos que lleguen después se muestran al final.
+    """
+    
+    def __init__(self):
+        self._heap = []
+        self._entries = {}
+        self._sequence = 0
+        self._removed = 0
+        self._view = None
+        self._display_rank = None
+    
+    def enqueue(self, item: Order):
+        """Inserta un pedido en O(log n); si ya estaba en la cola se reinserta."""
+        if id(item) in self._entries:
+            self.remove(item)
+        
+        entry = [-item.priority, self._sequence, item]
+        self._sequence += 1
+        self._entries[id(item)] = entry
+        heapq.heappush(self._heap, entry)
+        
+        if self._display_rank is not None:
+            self._display_rank[id(item)] = entry[1]
+        self._view = None
+    
+    def _discard_removed_top(self):
+        heap = self._heap
+        while heap and heap[0][2] is None:
+            heapq.heappop(heap)
+            self._removed -= 1
+    
+    def dequeue(self) -> Optional[Order]:
+        """Extrae el pedido de mayor prioridad en O(log n)."""
+        self._discard_removed_top()
+        if not self._heap:
+            return None
+        
+        order = heapq.heappop(self._heap)[2]
+        del self._entries[id(order)]
+        if self._display_rank is not None:
+            self._display_rank.pop(id(order), None)
+        self._view = None
+        return order
+    
+    def peek(self) -> Optional[Order]:
+        self._discard_removed_top()
+        return self._heap[0][2] if self._heap else None
+    
+    def size(self) -> int:
+        return len(self._entries)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, order: Order) -> bool:
+        return id(order) in self._entries
+    
+    def __iter__(self):
+        return iter(self.items)
+    
+    def display_key(self, order: Order):
+        """Clave con la que order se ordena en items, sin construir la vista."""
+        entry = self._entries[id(order)]
+        if self._display_rank is None:
+            return (entry[0], entry[1])
+        return self._display_rank[id(order)]
+    
+    def remove(self, order: Order) -> bool:
+        """Borra el pedido (por identidad) marcando su entrada del heap en O(1)."""
+        entry = self._entries.pop(id(order), None)
+        if entry is None:
+            return False
+        
+        entry[2] = None
+        self._removed += 1
+        if self._display_rank is not None:
+            self._display_rank.pop(id(order), None)
+        self._view = None
+        
+        if self._removed > len(self._entries):
+            self._heap = [e for e in self._heap if e[2] is not None]
+            heapq.heapify(self._heap)
+            self._removed = 0
+        return True
+    
+    def remove_by_id(self, order_id: str) -> bool:
+        """Borra un pedido con ese id en O(n); con ids repetidos borra solo el más prioritario."""
+        matches = [entry for entry in self._entries.values() if entry[2].id == order_id]
+        if not matches:
+            return False
+        return self.remove(min(matches, key=lambda entry: (entry[0], entry[1]))[2])
+    
+    def clear(self):
+        self._heap = []
+        self._entries = {}
+        self._removed = 0
+        self._view = None
+        self._display_rank = None
+    
+    @property
+    def items(self) -> List[Order]:
+        """Pedidos vivos en orden de presentación (no modificar la lista devuelta)."""
+        if self._view is None:
+            live = list(self._entries.values())
+            if self._display_rank is None:
+                live.sort(key=lambda entry: (entry[0], entry[1]))
+            else:
+                rank = self._display_rank
+                live.sort(key=lambda entry: rank[id(entry[2])])
+            self._view = [entry[2] for entry in live]
+        return self._view
+    
+    def window(self, offset: int, count: int) -> List[Order]:
+        """items[offset:offset + count] sin construir la vista completa si no está cacheada."""
+        if self._view is not None:
+            return self._view[offset:offset + count]
+        if count <= 0:
+            return []
+        if self._display_rank is None:
+            key = lambda entry: (entry[0], entry[1])
+        else:
+            rank = self._display_rank
+            key = lambda entry: rank[id(entry[2])]
+        entries = heapq.nsmallest(offset + count, self._entries.values(), key=key)
+        return [entry[2] for entry in entries[offset:]]
+    
+    def reorder(self, orders: List[Order]):
+        """Fija el orden de presentación de los mismos pedidos en O(n), sin tocar el heap."""
+        if len(orders) != len(self._entries):
+            raise ValueError("reorder espera exactamente los pedidos de la cola")
+        # Las secuencias futuras son >= len(orders), así lo nuevo sigue apareciendo al final
+        self._display_rank = {id(order): rank for rank, order in enumerate(orders)}
+        self._view = list(orders)
+    
+    @items.setter
+    def items(self, orders: List[Order]):
+        """Reemplaza el contenido y fija el orden de presentación dado."""
+        self.clear()
+        for order in orders:
+            self.enqueue(order)
+        # La secuencia de inserción coincide con el orden de la lista recibida
+        self._display_rank = {key: entry[1] for key, entry in self._entries.items()}
+
+class DeadlineScheduler:
+    """Min-heap de eventos por tiempo absoluto con cancelación por clave.
+
+    Las entradas del heap son (tiempo, secuencia, clave); una entrada es válida
+    solo si la clave sigue programada con esa misma secuencia, así cancelar o
+    reprogramar es O(1) y las entradas obsoletas se descartan al llegar arriba.
+    Con claves id(objeto) el objeto debe ser el item: mientras está programado
+    su id no se recicla, y la secuencia invalida las entradas viejas de un id
+    que se recicle después.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._scheduled = {}
+        self._sequence = 0
+
+    def schedule(self, key, when: float, item):
+        """Programa (o reprograma) item para el instante when en O(log n)."""
+        entry = (when, self._sequence, key)
+        self._sequence += 1
+        self._scheduled[key] = (when, entry[1], item)
+        heapq.heappush(self._heap, entry)
+
+        # Compactar si se acumularon demasiadas entradas obsoletas
+        if len(self._heap) > 2 * len(self._scheduled) + 32:
+            self._heap = [(due_at, sequence, pending_key)
+                          for pending_key, (due_at, sequence, _) in self._scheduled.items()]
+            heapq.heapify(self._heap)
+
+    def cancel(self, key) -> bool:
+        return self._scheduled.pop(key, None) is not None
+
+    def clear(self):
+        self._heap = []
+        self._scheduled = {}
+
+    def __len__(self) -> int:
+        return len(self._scheduled)
+
+    def __contains__(self, key) -> bool:
+        return key in self._scheduled
+
+    def __iter__(self):
+        """Items programados en orden de tiempo (empates por orden de programación)."""
+        for _, _, item in sorted(self._scheduled.values(), key=lambda entry: entry[:2]):
+            yield item
+
+    def _discard_stale_top(self):
+        heap = self._heap
+        scheduled = self._scheduled
+        while heap:
+            when, sequence, key = heap[0]
+            current = scheduled.get(key)
+            if current is not None and current[1] == sequence:
+                return
+            heapq.heappop(heap)
+
+    def next_time(self) -> Optional[float]:
+        """Instante del próximo evento programado, o None."""
+        self._discard_stale_top()
+        return self._heap[0][0] if self._heap else None
+
+    def peek_due(self, now: float):
+        """Próximo item vencido (tiempo <= now) sin extraerlo, o None."""
+        self._discard_stale_top()
+        if self._heap and self._heap[0][0] <= now:
+            return self._scheduled[self._heap[0][2]][2]
+        return None
+
+    def pop_due(self, now: float, limit: Optional[int] = None) -> list:
+        """Extrae en orden los items vencidos (tiempo <= now), hasta limit."""
+        due = []
+        while limit is None or len(due) < limit:
+            self._discard_stale_top()
+            if not self._heap or self._heap[0][0] > now:
+                break
+            key = heapq.heappop(self._heap)[2]
+            due.append(self._scheduled.pop(key)[2])
+        return due
+
+class ReleaseScheduler:
+    """Pedidos en espera de liberación, ordenados por release_time.
+
+    Acepta pedidos en cualquier momento del turno (API, generador, feeds) y
+    entrega los ya vencidos en O(log n) cada uno, respetando el límite de
+    pedidos activos en el tablero.
+    """
+
+    MAX_ACTIVE_ORDERS = 10
+
+    def __init__(self, orders=()):
+        self._scheduler = DeadlineScheduler()
+        for order in orders:
+            self.add(order)
+
+    def add(self, order: Order):
+        """Agrega un pedido pendiente; los empates conservan el orden de llegada."""
+        # Clave por identidad: los ids de la API no garantizan ser únicos
+        self._scheduler.schedule(id(order), order.release_time, order)
+
+    append = add
+
+    def remove(self, order: Order) -> bool:
+        return self._scheduler.cancel(id(order))
+
+    def clear(self):
+        self._scheduler.clear()
+
+    def __len__(self) -> int:
+        return len(self._scheduler)
+
+    def __iter__(self):
+        return iter(self._scheduler)
+
+    def next_release_time(self) -> Optional[float]:
+        return self._scheduler.next_time()
+
+    @classmethod
+    def release_quota(cls, active_orders: int) -> int:
+        """Cuántos pedidos pueden liberarse este tick según los activos actuales."""
+        if active_orders < cls.MAX_ACTIVE_ORDERS // 3:
+            return 3
+        if active_orders < cls.MAX_ACTIVE_ORDERS // 2:
+            return 2
+        if active_orders < cls.MAX_ACTIVE_ORDERS:
+            return 1
+        return 0
+
+    def release_due(self, now: float, active_orders: int) -> List[Order]:
+        """Extrae los pedidos con release_time <= now permitidos por la cuota."""
+        quota = self.release_quota(active_orders)
+        if quota <= 0:
+            return []
+        return self._scheduler.pop_due(now, quota)
+
+class OrderSpatialIndex:
+    """Índice de celdas -> pedidos para recogidas y entregas por separado.
+
+    Las recogidas contienen los pedidos del tablero y las entregas los del
+    inventario; así una consulta de celda exacta cuesta O(1) más los
+    resultados y una de radio Manhattan r cuesta O(r²) más los resultados,
+    sin recorrer todos los pedidos.
+    """
+
+    def __init__(self):
+        self.pickups = {}
+        self.dropoffs = {}
+
+    @staticmethod
+    def _add(buckets: dict, pos: Position, order: Order):
+        buckets.setdefault((pos.x, pos.y), []).append(order)
+
+    @staticmethod
+    def _remove(buckets: dict, pos: Position, order: Order) -> bool:
+        cell = (pos.x, pos.y)
+        bucket = buckets.get(cell)
+        if not bucket:
+            return False
+        for i, candidate in enumerate(bucket):
+            if candidate is order:
+                del bucket[i]
+                if not bucket:
+                    del buckets[cell]
+                return True
+        return False
+
+    @staticmethod
+    def _within(buckets: dict, x: int, y: int, radius: int) -> List[Order]:
+        found = []
+        for dy in range(-radius, radius + 1):
+            span = radius - abs(dy)
+            for dx in range(-span, span + 1):
+                bucket = buckets.get((x + dx, y + dy))
+                if bucket:
+                    found.extend(bucket)
+        return found
+
+    def add_pickup(self, order: Order):
+        self._add(self.pickups, order.pickup, order)
+
+    def remove_pickup(self, order: Order) -> bool:
+        return self._remove(self.pickups, order.pickup, order)
+
+    def add_dropoff(self, order: Order):
+        self._add(self.dropoffs, order.dropoff, order)
+
+    def remove_dropoff(self, order: Order) -> bool:
+        return self._remove(self.dropoffs, order.dropoff, order)
+
+    def pickups_at(self, x: int, y: int) -> List[Order]:
+        return self.pickups.get((x, y), [])
+
+    def dropoffs_at(self, x: int, y: int) -> List[Order]:
+        return self.dropoffs.get((x, y), [])
+
+    def pickups_within(self, x: int, y: int, radius: int) -> List[Order]:
+        return self._within(self.pickups, x, y, radius)
+
+    def dropoffs_within(self, x: int, y: int, radius: int) -> List[Order]:
+        return self._within(self.dropoffs, x, y, radius)
+
+    def rebuild(self, available_orders, inventory):
+        """Reconstruye el índice completo (p. ej. al cargar una partida)."""
+        self.pickups = {}
+        self.dropoffs = {}
+        for order in available_orders:
+            self.add_pickup(order)
+        for order in inventory:
+            self.add_dropoff(order)
+
+class Inventory:
+    """Inventario del jugador (deque) con totales acumulados.
+
+    Mantiene peso total, cantidad por prioridad, pago en juego y vencimiento
+    más cercano, actualizados en O(1) al agregar o quitar pedidos en lugar de
+    recorrer el inventario en cada movimiento. El vencimiento más cercano usa
+    un heap con borrado perezoso: cada entrada guarda el pedido y la generación
+    con que se agregó, y solo vale si ese pedido sigue cargado con esa misma
+    generación (así un id() reciclado o un pedido quitado y vuelto a agregar
+    no reviven entradas viejas).
+    """
+
+    def __init__(self, orders, deadline_fn):
+        self._orders = deque()
+        # id(pedido) -> generación con la que está cargado
+        self._generations = {}
+        self._generation = 0
+        self._deadline_fn = deadline_fn
+        self._deadlines = []
+        self.total_weight = 0
+        self.total_payout = 0
+        self.priority_counts = {}
+        for order in orders:
+            self.append(order)
+
+    def append(self, order: Order):
+        self._orders.append(order)
+        self._generation += 1
+        self._generations[id(order)] = self._generation
+        self.total_weight += order.weight
+        self.total_payout += order.payout
+        self.priority_counts[order.priority] = self.priority_counts.get(order.priority, 0) + 1
+        heapq.heappush(self._deadlines, (self._deadline_fn(order), self._generation, order))
+
+    def remove(self, order: Order):
+        """Quita order del inventario; ValueError si no está (como deque.remove)."""
+        if id(order) not in self._generations:
+            raise ValueError(f"{order.id} no está en el inventario")
+        for i, candidate in enumerate(self._orders):
+            if candidate is order:
+                del self._orders[i]
+                break
+        del self._generations[id(order)]
+        self.total_weight -= order.weight
+        self.total_payout -= order.payout
+        remaining = self.priority_counts[order.priority] - 1
+        if remaining:
+            self.priority_counts[order.priority] = remaining
+        else:
+            del self.priority_counts[order.priority]
+
+    @property
+    def earliest_deadline(self) -> Optional[float]:
+        """Instante de vencimiento más cercano entre los pedidos cargados, o None."""
+        deadlines = self._deadlines
+        while deadlines and self._generations.get(id(deadlines[0][2])) != deadlines[0][1]:
+            heapq.heappop(deadlines)
+        return deadlines[0][0] if deadlines else None
+
+    def remaining_capacity(self, max_weight: float) -> float:
+        return max_weight - self.total_weight
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def __iter__(self):
+        return iter(self._orders)
+
+    def __contains__(self, order: Order) -> bool:
+        return id(order) in self._generations
+
+class MemoryEfficientHistory:
+    """Sistema de historial eficiente usando diferencias."""
+    
+    def __init__(self, max_size: int = 20):
+        self.diffs = []
+        self.max_size = max_size
+        self.base_state = None
+    
+    def push(self, state: GameState):
+        if self.base_state is None:
+            self.base_state = state
+            return
+        
+        diff = {}
+        if (self.base_state.player_pos.x != state.player_pos.x or 
+            self.base_state.player_pos.y != state.player_pos.y):
+            diff['player_pos'] = (state.player_pos.x, state.player_pos.y)
+        
+        if abs(self.base_state.stamina - state.stamina) > 1.0:
+            diff['stamina'] = state.stamina
+        
+        if self.base_state.money != state.money:
+            diff['money'] = state.money
+            
+        if self.base_state.reputation != state.reputation:
+            diff['reputation'] = state.reputation
+        
+        if diff:
+            self.diffs.append(diff)
+            if len(self.diffs) >= self.max_size:
+                self.diffs.pop(0)
+    
+    def pop(self) -> Optional[GameState]:
+        if not self.diffs:
+            return None
+        
+        diff = self.diffs.pop()
+        new_state = GameState(
+            player_pos=Position(
+                diff.get('player_pos', (self.base_state.player_pos.x, self.base_state.player_pos.y))[0],
+                diff.get('player_pos', (self.base_state.player_pos.x, self.base_state.player_pos.y))[1]
+            ),
+            stamina=diff.get('stamina', self.base_state.stamina),
+            reputation=diff.get('reputation', self.base_state.reputation),
+            money=diff.get('money', self.base_state.money),
+            game_time=self.base_state.game_time,
+            weather_time=self.base_state.weather_time,
+            current_weather=self.base_state.current_weather,
+            weather_intensity=self.base_state.weather_intensity,
+            inventory=list(self.base_state.inventory),
+            available_orders=list(self.base_state.available_orders),
+            completed_orders=list(self.base_state.completed_orders),
+            goal=self.base_state.goal,
+            delivery_streak=0,
+            pending_orders=list(getattr(self.base_state, 'pending_orders', [])),
+            # Campos para guardado/carga correcta
+            city_width=getattr(self.base_state, 'city_width', 30),
+            city_height=getattr(self.base_state, 'city_height', 25),
+            tiles=getattr(self.base_state, 'tiles', []),
+            legend=getattr(self.base_state, 'legend', {}),
+            city_name=getattr(self.base_state, 'city_name', 'TigerCity'),
+            max_game_time=getattr(self.base_state, 'max_game_time', 600.0)
+        )
+        return new_state
+    
+    def size(self) -> int:
+        return len(self.diffs)
+
+# =============================================================================
+# MAPA COMPILADO Y PATHFINDING
+# =============================================================================
+
+class CompiledMap:
+    """Representación compacta del mapa construida una vez al cargarlo.
+
+    Guarda por celda (en orden y * width + x) un bitmap de celdas caminables y
+    arreglos de surface_weight y rest_bonus, para no repetir tiles[y][x] y
+    legend.get(...) en cada movimiento. Las celdas dentro de los límites sin
+    tile definido se consideran calle normal, igual que antes.
+    """
+
+    def __init__(self, tiles, legend, width: int, height: int):
+        self.width = width
+        self.height = height
+        size = width * height
+        self.walkable = bytearray(b"\x01") * size
+        self.surface_weight = array('d', [1.0]) * size
+        self.rest_bonus = array('d', [0.0]) * size
+
+        # Cada tipo de tile se resuelve contra la leyenda una sola vez
+        resolved = {}
+        for tile_type, tile_info in legend.items():
+            resolved[tile_type] = (
+                0 if tile_info.get("blocked", False) else 1,
+                tile_info.get("surface_weight", 1.0),
+                tile_info.get("rest_bonus", 0)
+            )
+
+        for y in range(min(height, len(tiles))):
+            row = tiles[y]
+            base = y * width
+            for x in range(min(width, len(row))):
+                walkable, weight, bonus = resolved.get(row[x], (1, 1.0, 0))
+                self.walkable[base + x] = walkable
+                self.surface_weight[base + x] = weight
+                self.rest_bonus[base + x] = bonus
+
+        # Tabla de la celda caminable más cercana; se calcula al primer uso
+        self._nearest_walkable = None
+        # Flyweight de Position por celda; se llena a medida que se usan
+        self._positions = [None] * size
+
+    def position(self, x: int, y: int) -> Position:
+        """Position compartida de la celda (x, y); fuera del mapa crea una nueva."""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            index = y * self.width + x
+            pos = self._positions[index]
+            if pos is None:
+                pos = self._positions[index] = Position(x, y)
+            return pos
+        return Position(x, y)
+
+    def intern_order(self, order: Order) -> Order:
+        """Hace que recogida y entrega de order usen las Position compartidas."""
+        order.pickup = self.position(order.pickup.x, order.pickup.y)
+        order.dropoff = self.position(order.dropoff.x, order.dropoff.y)
+        return order
+
+    def is_walkable(self, x: int, y: int) -> bool:
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.walkable[y * self.width + x] == 1
+        return False
+
+    def surface_weight_at(self, x: int, y: int) -> float:
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.surface_weight[y * self.width + x]
+        return 1.0
+
+    def rest_bonus_at(self, x: int, y: int) -> float:
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.rest_bonus[y * self.width + x]
+        return 0.0
+
+    def _build_nearest_walkable(self) -> array:
+        """BFS multi-origen desde todas las celdas caminables (vecindad de 8).
+
+        Cada celda hereda el origen de la celda que la alcanzó, así que guarda
+        el índice de la celda caminable más cercana en distancia Chebyshev,
+        la misma métrica que la búsqueda en espiral anterior.
+        """
+        width, height = self.width, self.height
+        nearest = array('i', [-1]) * (width * height)
+        frontier = deque()
+        for index, walkable in enumerate(self.walkable):
+            if walkable:
+                nearest[index] = index
+                frontier.append(index)
+
+        while frontier:
+            current = frontier.popleft()
+            source = nearest[current]
+            cx, cy = current % width, current // width
+            for ny in range(max(0, cy - 1), min(height, cy + 2)):
+                for nx in range(max(0, cx - 1), min(width, cx + 2)):
+                    neighbor = ny * width + nx
+                    if nearest[neighbor] == -1:
+                        nearest[neighbor] = source
+                        frontier.append(neighbor)
+        return nearest
+
+    def nearest_walkable_index(self, x: int, y: int) -> Optional[int]:
+        """Índice de la celda caminable más cercana a (x, y) en O(1), o None si no hay."""
+        if self.width <= 0 or self.height <= 0:
+            return None
+        if self._nearest_walkable is None:
+            self._nearest_walkable = self._build_nearest_walkable()
+        # Las posiciones fuera del mapa se acercan primero al borde
+        x = min(max(x, 0), self.width - 1)
+        y = min(max(y, 0), self.height - 1)
+        index = self._nearest_walkable[y * self.width + x]
+        return index if index >= 0 else None
+
+
+class PathfindingService:
+    """Distancias de viaje reales sobre la cuadrícula (edificios bloqueados).
+
+    Se construye a partir de un CompiledMap. Entrar a una celda cuesta
+    1 / surface_weight, así que las superficies lentas pesan más.
+
+    Ofrece consultas A* punto a punto y campos de distancia hacia un destino
+    (BFS si todos los costos son iguales, Dijkstra si no), guardados en un
+    caché LRU que se vacía cuando cambia el mapa.
+    """
+
+    MAX_CACHED_FIELDS = 256
+
+    def __init__(self):
+        self.width = 0
+        self.height = 0
+        self.costs = []
+        self.min_cost = 1.0
+        self.uniform_cost = True
+        self.fields = OrderedDict()
+        self.compiled_map = None
+
+    def sync(self, compiled_map: CompiledMap):
+        """Reconstruye los costos si cambió el mapa compilado."""
+        if compiled_map is self.compiled_map:
+            return
+        self.compiled_map = compiled_map
+        self.width = compiled_map.width
+        self.height = compiled_map.height
+        self.costs = self._build_costs(compiled_map)
+        walkable_costs = {cost for cost in self.costs if cost is not None}
+        self.min_cost = min(walkable_costs) if walkable_costs else 1.0
+        self.uniform_cost = len(walkable_costs) <= 1
+        self.fields.clear()
+
+    @staticmethod
+    def _build_costs(compiled_map: CompiledMap) -> list:
+        """Costo de entrar a cada celda (None si está bloqueada), en orden y * width + x."""
+        return [1.0 / max(0.05, weight) if walkable else None
+                for walkable, weight in zip(compiled_map.walkable, compiled_map.surface_weight)]
+
+    def _index(self, pos: Position) -> Optional[int]:
+        if 0 <= pos.x < self.width and 0 <= pos.y < self.height:
+            return pos.y * self.width + pos.x
+        return None
+
+    def _neighbors(self, index: int):
+        width = self.width
+        x = index % width
+        if x > 0:
+            yield index - 1
+        if x < width - 1:
+            yield index + 1
+        if index >= width:
+            yield index - width
+        if index + width < len(self.costs):
+            yield index + width
+
+    def distance_field(self, target: Position) -> list:
+        """Costo de viaje desde cada celda hasta target (math.inf si no hay ruta)."""
+        key = (target.x, target.y)
+        field = self.fields.get(key)
+        if field is not None:
+            self.fields.move_to_end(key)
+            return field
+
+        costs = self.costs
+        field = [math.inf] * len(costs)
+        start = self._index(target)
+        if start is not None and costs[start] is not None:
+            field[start] = 0.0
+            if self.uniform_cost:
+                step = self.min_cost
+                frontier = deque([start])
+                while frontier:
+                    current = frontier.popleft()
+                    next_distance = field[current] + step
+                    for neighbor in self._neighbors(current):
+                        if costs[neighbor] is not None and field[neighbor] == math.inf:
+                            field[neighbor] = next_distance
+                            frontier.append(neighbor)
+            else:
+                heap = [(0.0, start)]
+                while heap:
+                    distance, current = heapq.heappop(heap)
+                    if distance > field[current]:
+                        continue
+                    # Se recorre al revés: llegar a current desde neighbor cuesta entrar a current
+                    next_distance = distance + costs[current]
+                    for neighbor in self._neighbors(current):
+                        if costs[neighbor] is not None and next_distance < field[neighbor]:
+                            field[neighbor] = next_distance
+                            heapq.heappush(heap, (next_distance, neighbor))
+
+        self.fields[key] = field
+        if len(self.fields) > self.MAX_CACHED_FIELDS:
+            self.fields.popitem(last=False)
+        return field
+
+    def travel_cost(self, start: Position, target: Position) -> float:
+        """Costo de viaje usando (y cacheando) el campo de distancia de target."""
+        index = self._index(start)
+        if index is None:
+            return math.inf
+        return self.distance_field(target)[index]
+
+    def shortest_path(self, start: Position, target: Position) -> Optional[List[Position]]:
+        """Ruta A* de start a target (ambos incluidos), o None si no existe."""
+        start_index = self._index(start)
+        target_index = self._index(target)
+        costs = self.costs
+        if (start_index is None or target_index is None or
+                costs[start_index] is None or costs[target_index] is None):
+            return None
+
+        width = self.width
+        tx, ty = target.x, target.y
+        min_cost = self.min_cost
+        best = {start_index: 0.0}
+        came_from = {}
+        counter = 0
+        heap = [(0.0, counter, start_index)]
+
+        while heap:
+            _, _, current = heapq.heappop(heap)
+            if current == target_index:
+                path = [current]
+                while current in came_from:
+                    current = came_from[current]
+                    path.append(current)
+                path.reverse()
+                return [Position(i % width, i // width) for i in path]
+
+            current_cost = best[current]
+            for neighbor in self._neighbors(current):
+                step = costs[neighbor]
+                if step is None:
+                    continue
+                new_cost = current_cost + step
+                if new_cost < best.get(neighbor, math.inf):
+                    best[neighbor] = new_cost
+                    came_from[neighbor] = current
+                    heuristic = (abs(neighbor % width - tx) + abs(neighbor // width - ty)) * min_cost
+                    counter += 1
+                    heapq.heappush(heap, (new_cost + heuristic, counter, neighbor))
+
+        return None
+
+    def path_cost(self, start: Position, target: Position) -> float:
+        """Costo de la ruta A* (math.inf si no hay ruta); no toca el caché de campos."""
+        path = self.shortest_path(start, target)
+        if path is None:
+            return math.inf
+        return sum(self.costs[self._index(pos)] for pos in path[1:])
+
+# =============================================================================
+# SISTEMA DE CLIMA
+# =============================================================================
+
+class EnhancedWeatherSystem:
+    """Sistema de clima dinámico basado en cadenas de Markov."""
+    
+    TRANSITION_MATRIX = {
+        'clear': {'clear': 0.4, 'clouds': 0.3, 'wind': 0.2, 'heat': 0.1},
+        'clouds': {'clear': 0.2, 'clouds': 0.3, 'rain_light': 0.3, 'fog': 0.2},
+        'rain_light': {'clouds': 0.3, 'rain_light': 0.2, 'rain': 0.3, 'clear': 0.2},
+        'rain': {'rain_light': 0.3, 'rain': 0.2, 'storm': 0.2, 'clouds': 0.3},
+        'storm': {'rain': 0.4, 'storm': 0.2, 'clouds': 0.4},
+        'fog': {'fog': 0.3, 'clouds': 0.4, 'clear': 0.3},
+        'wind': {'wind': 0.2, 'clear': 0.3, 'clouds': 0.3, 'cold': 0.2},
+        'heat': {'heat': 0.3, 'clear': 0.4, 'clouds': 0.3},
+        'cold': {'cold': 0.3, 'clear': 0.2, 'clouds': 0.3, 'wind': 0.2}
+    }
+    
+    SPEED_MULTIPLIERS = {
+        'clear': 1.00, 'clouds': 0.98, 'rain_light': 0.90, 'rain': 0.85,
+        'storm': 0.75, 'fog': 0.88, 'wind': 0.92, 'heat': 0.90, 'cold': 0.92
+    }
+    
+    STAMINA_PENALTIES = {
+        'clear': 0.0, 'clouds': 0.0, 'rain_light': 0.05, 'rain': 0.1,
+        'storm': 0.3, 'fog': 0.0, 'wind': 0.1, 'heat': 0.2, 'cold': 0.05
+    }
+    
+    WEATHER_COLORS = {
+        'clear': (200, 150, 100), 'clouds': (180, 180, 180),
+        'rain_light': (100, 150, 200), 'rain': (70, 120, 180),
+        'storm': (50, 50, 100), 'fog': (200, 200, 200),
+        'wind': (150, 200, 150), 'heat': (255, 100, 100),
+        'cold': (150, 200, 255)
+    }
+    
+    def __init__(self, clock=None):
+        # Las transiciones se miden con el reloj de la simulación (tiempo
+        # acumulado en update), no con el reloj de pared
+        self.elapsed = 0.0
+        self.clock = clock or (lambda: self.elapsed)
+        self.current_condition = 'clear'
+        self.current_intensity = 0.5
+        self.time_in_current = 0
+        self.burst_duration = 30
+        self.weather_memory = deque(maxlen=5)
+        self.transitioning = False
+        self.transition_start_time = 0
+        self.transition_duration = 3.0
+        self.previous_condition = 'clear'
+        self.previous_intensity = 0.5
+        self.target_condition = 'clear'
+        self.target_intensity = 0.5
+        self.weather_notifications = []
+        self.notification_timer = 0
+    
+    def update(self, dt: float):
+        self.elapsed += dt
+        self.time_in_current += dt
+        self.notification_timer += dt
+        self.weather_notifications = [
+            (msg, time_left - dt) for msg, time_left in self.weather_notifications 
+            if time_left - dt > 0
+        ]
+        
+        if self.transitioning:
+            elapsed_transition = self.clock() - self.transition_start_time
+            progress = min(1.0, elapsed_transition / self.transition_duration)
+            smooth_progress = (1 - math.cos(progress * math.pi)) / 2
+            self.current_intensity = self.previous_intensity + (self.target_intensity - self.previous_intensity) * smooth_progress
+            
+            if progress >= 1.0:
+                self.transitioning = False
+                self.current_condition = self.target_condition
+                self.current_intensity = self.target_intensity
+                effect_desc = self._get_weather_effect_description()
+                self.weather_notifications.append((f"🌦️ {self.get_weather_description()} - {effect_desc}", 4.0))
+        
+        if self.time_in_current >= self.burst_duration and not self.transitioning:
+            self._initiate_weather_change()
+    
+    def _initiate_weather_change(self):
+        transitions = self.TRANSITION_MATRIX.get(self.current_condition, {'clear': 1.0})
+        conditions = list(transitions.keys())
+        weights = list(transitions.values())
+        
+        new_condition = random.choices(conditions, weights=weights)[0]
+        new_intensity = random.uniform(0.4, 0.9)
+        
+        self.transitioning = True
+        self.transition_start_time = self.clock()
+        self.previous_condition = self.current_condition
+        self.previous_intensity = self.current_intensity
+        self.target_condition = new_condition
+        self.target_intensity = new_intensity
+        
+        self.time_in_current = 0
+        self.burst_duration = random.randint(25, 40)
+        self.weather_memory.append(new_condition)
+        
+        transition_desc = f"Cambiando de {self._get_condition_name(self.previous_condition)} a {self._get_condition_name(new_condition)}"
+        self.weather_notifications.append((f"⚡ {transition_desc}", 3.0))
+    
+    def _get_condition_name(self, condition: str) -> str:
+        names = {
+            'clear': 'Despejado', 'clouds': 'Nublado', 'rain_light': 'Llovizna',
+            'rain': 'Lluvia', 'storm': 'Tormenta', 'fog': 'Niebla',
+            'wind': 'Viento', 'heat': 'Calor', 'cold': 'Frío'
+        }
+        return names.get(condition, condition)
+    
+    def _get_weather_effect_description(self) -> str:
+        speed_mult = self.get_speed_multiplier()
+        stamina_penalty = self.get_stamina_penalty()
+        
+        if speed_mult < 0.8:
+            speed_desc = "Velocidad muy reducida"
+        elif speed_mult < 0.9:
+            speed_desc = "Velocidad reducida"
+        elif speed_mult < 0.95:
+            speed_desc = "Velocidad ligeramente reducida"
+        else:
+            speed_desc = "Velocidad normal"
+        
+        if stamina_penalty > 0.2:
+            stamina_desc = "Resistencia se agota muy rápido"
+        elif stamina_penalty > 0.1:
+            stamina_desc = "Resistencia se agota más rápido"
+        elif stamina_penalty > 0.05:
+            stamina_desc = "Resistencia se agota un poco más rápido"
+        else:
+            stamina_desc = "Resistencia normal"
+        
+        return f"{speed_desc} | {stamina_desc}"
+    
+    def get_speed_multiplier(self) -> float:
+        if self.transitioning:
+            elapsed_transition = self.clock() - self.transition_start_time
+            progress = min(1.0, elapsed_transition / self.transition_duration)
+            smooth_progress = (1 - math.cos(progress * math.pi)) / 2
+            prev_mult = self.SPEED_MULTIPLIERS[self.previous_condition]
+            target_mult = self.SPEED_MULTIPLIERS[self.target_condition]
+            base_mult = prev_mult + (target_mult - prev_mult) * smooth_progress
+        else:
+            base_mult = self.SPEED_MULTIPLIERS[self.current_condition]
+        
+        return base_mult * (1.0 - (self.current_intensity * 0.2))
+    
+    def get_stamina_penalty(self) -> float:
+        if self.transitioning:
+            elapsed_transition = self.clock() - self.transition_start_time
+            progress = min(1.0, elapsed_transition / self.transition_duration)
+            smooth_progress = (1 - math.cos(progress * math.pi)) / 2
+            prev_penalty = self.STAMINA_PENALTIES[self.previous_condition]
+            target_penalty = self.STAMINA_PENALTIES[self.target_condition]
+            base_penalty = prev_penalty + (target_penalty - prev_penalty) * smooth_progress
+        else:
+            base_penalty = self.STAMINA_PENALTIES[self.current_condition]
+        
+        return base_penalty * self.current_intensity
+    
+    def get_weather_description(self) -> str:
+        condition_to_use = self.target_condition if self.transitioning else self.current_condition
+        base_desc = self._get_condition_name(condition_to_use)
+        
+        if self.transitioning:
+            base_desc += " (Cambiando)"
+        
+        if self.current_intensity >= 0.8:
+            return f"{base_desc} (Intenso)"
+        elif self.current_intensity >= 0.6:
+            return f"{base_desc} (Moderado)"
+        else:
+            return f"{base_desc} (Leve)"
+    
+    def get_weather_color(self) -> tuple:
+        condition_to_use = self.target_condition if self.transitioning else self.current_condition
+        return self.WEATHER_COLORS.get(condition_to_use, WHITE)
+
+# =============================================================================
+# SISTEMA DE ARCHIVOS MEJORADO
+# =============================================================================
+
+class SaveFormat:
+    """Formato binario versionado y compacto para las partidas guardadas.
+
+    Estructura del archivo:
+        MAGIC | versión, compresión, largo del encabezado ('<BBI') |
+        encabezado JSON | sección 'state' | una sección por grupo de pedidos
+
+    El encabezado lleva la metadata del slot, la referencia al mapa (hash de
+    contenido, el mapa se guarda una sola vez en saves/maps/) y la tabla de
+    secciones (posición, tamaño y CRC32 de cada una), así que la metadata se
+    lee sin descomprimir nada. 'state' guarda los escalares en JSON y cada
+    grupo de pedidos sus columnas array little-endian; cada sección se
+    comprime aparte y decode_sections lee solo las que se pidan. Todo se
+    valida contra el esquema al leer.
+    """
+
+    MAGIC = b"CQSV"
+    # Versión del formato binario; las partidas pickle anteriores no llevan número
+    VERSION = 1
+    COMPRESSION = {"none": 0, "zlib": 1, "lzma": 2}
+    ORDER_GROUPS = ("inventory", "available_orders", "completed_orders", "pending_orders")
+    SECTIONS = ("state",) + ORDER_GROUPS
+    NUMERIC_COLUMNS = ("pickup_x", "pickup_y", "dropoff_x", "dropoff_y", "payout",
+                       "duration_minutes", "weight", "priority", "release_time",
+                       "created_at", "accepted_at")
+    # Campos escalares de GameState y los tipos aceptados
+    STATE_SCHEMA = {
+        "player_pos": list, "stamina": (int, float), "reputation": (int, float),
+        "money": (int, float), "game_time": (int, float), "weather_time": (int, float),
+        "current_weather": str, "weather_intensity": (int, float), "goal": (int, float),
+        "delivery_streak": int, "city_width": int, "city_height": int,
+        "city_name": str, "max_game_time": (int, float),
+    }
+    _PREFIX = struct.Struct('<4sBBI')
+    _LENGTH = struct.Struct('<I')
+
+    @staticmethod
+    def map_hash(tiles, legend, width: int, height: int) -> str:
+        """Hash de contenido del mapa: mismo mapa, misma referencia."""
+        canonical = json.dumps({"tiles": tiles, "legend": legend, "width": width, "height": height},
+                               sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def _compress(cls, raw: bytes, compression: str) -> bytes:
+        if compression == "zlib":
+            return zlib.compress(raw, 6)
+        if compression == "lzma":
+            if lzma is None:
+                raise ValueError("lzma no está disponible en este Python")
+            return lzma.compress(raw)
+        return raw
+
+    @classmethod
+    def _decompress(cls, data: bytes, code: int) -> bytes:
+        if code == cls.COMPRESSION["zlib"]:
+            return zlib.decompress(data)
+        if code == cls.COMPRESSION["lzma"]:
+            if lzma is None:
+                raise ValueError("Partida comprimida con lzma, no disponible en este Python")
+            return lzma.decompress(data)
+        if code == cls.COMPRESSION["none"]:
+            return data
+        raise ValueError(f"Compresión desconocida: {code}")
+
+    @staticmethod
+    def _column(values: list) -> array:
+        """Columna entera ('q') si todos los valores son enteros; si no, 'd'."""
+        if all(isinstance(value, int) and not isinstance(value, bool) for value in values):
+            column = array('q', values)
+        else:
+            column = array('d', values)
+        if sys.byteorder == 'big':
+            column.byteswap()
+        return column
+
+    @classmethod
+    def _encode_orders(cls, orders: List[Order]):
+        statuses = sorted({order.status for order in orders})
+        status_codes = {status: code for code, status in enumerate(statuses)}
+        values = {
+            "pickup_x": [o.pickup.x for o in orders], "pickup_y": [o.pickup.y for o in orders],
+            "dropoff_x": [o.dropoff.x for o in orders], "dropoff_y": [o.dropoff.y for o in orders],
+            "payout": [o.payout for o in orders], "duration_minutes": [o.duration_minutes for o in orders],
+            "weight": [o.weight for o in orders], "priority": [o.priority for o in orders],
+            "release_time": [o.release_time for o in orders], "created_at": [o.created_at for o in orders],
+            "accepted_at": [o.accepted_at for o in orders],
+        }
+        columns = [cls._column(values[name]) for name in cls.NUMERIC_COLUMNS]
+        status_column = array('B', [status_codes[o.status] for o in orders])
+        description = {
+            "count": len(orders),
+            "ids": [o.id for o in orders],
+            "statuses": statuses,
+            "types": [column.typecode for column in columns],
+        }
+        return description, columns + [status_column]
+
+    @classmethod
+    def encode(cls, game_state: GameState, metadata: dict, map_hash: str,
+               compression: str = "zlib") -> bytes:
+        if compression not in cls.COMPRESSION:
+            raise ValueError(f"Compresión desconocida: {compression}")
+
+        state = {name: getattr(game_state, name) for name in cls.STATE_SCHEMA}
+        state["player_pos"] = [game_state.player_pos.x, game_state.player_pos.y]
+        sections = {"state": json.dumps(state, separators=(',', ':'), ensure_ascii=False).encode('utf-8')}
+        for group in cls.ORDER_GROUPS:
+            description, columns = cls._encode_orders(list(getattr(game_state, group)))
+            body = json.dumps(description, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+            sections[group] = cls._LENGTH.pack(len(body)) + body + b"".join(column.tobytes() for column in columns)
+
+        # Cada sección se comprime por separado para poder leerla sola
+        table = {}
+        blobs = []
+        offset = 0
+        for name in cls.SECTIONS:
+            raw = sections[name]
+            blob = cls._compress(raw, compression)
+            table[name] = {"offset": offset, "size": len(blob), "raw_size": len(raw), "crc32": zlib.crc32(raw)}
+            blobs.append(blob)
+            offset += len(blob)
+
+        header = json.dumps({
+            "metadata": metadata,
+            "map": {"hash": map_hash, "width": game_state.city_width, "height": game_state.city_height},
+            "sections": table,
+        }, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        return (cls._PREFIX.pack(cls.MAGIC, cls.VERSION, cls.COMPRESSION[compression], len(header))
+                + header + b"".join(blobs))
+
+    @classmethod
+    def is_save_format(cls, f) -> bool:
+        """True si el archivo abierto empieza con MAGIC; no mueve la posición de lectura."""
+        start = f.tell()
+        magic = f.read(len(cls.MAGIC))
+        f.seek(start)
+        return magic == cls.MAGIC
+
+    @classmethod
+    def read_header(cls, f) -> Tuple[dict, int]:
+        """Lee solo el encabezado (sin tocar las secciones); devuelve (encabezado, compresión).
+
+        Al volver, f queda al inicio de los datos de las secciones.
+        """
+        prefix = f.read(cls._PREFIX.size)
+        if len(prefix) != cls._PREFIX.size:
+            raise ValueError("Archivo de partida truncado")
+        magic, version, compression, header_size = cls._PREFIX.unpack(prefix)
+        if magic != cls.MAGIC:
+            raise ValueError("No es una partida en formato binario")
+        if version > cls.VERSION:
+            raise ValueError(f"Partida de una versión más nueva ({version})")
+        header = json.loads(f.read(header_size).decode('utf-8'))
+        if (not isinstance(header, dict) or not isinstance(header.get("map"), dict)
+                or not isinstance(header.get("sections"), dict)):
+            raise ValueError("Encabezado de partida inválido")
+        return header, compression
+
+    @classmethod
+    def _read_section(cls, f, header: dict, compression: int, data_start: int, name: str) -> bytes:
+        """Lee, descomprime y verifica (tamaño y CRC32) una sola sección."""
+        entry = header["sections"].get(name)
+        if not isinstance(entry, dict) or not all(
+                isinstance(entry.get(key), int) and entry[key] >= 0
+                for key in ("offset", "size", "raw_size", "crc32")):
+            raise ValueError(f"Sección ausente o inválida: {name}")
+        f.seek(data_start + entry["offset"])
+        blob = f.read(entry["size"])
+        if len(blob) != entry["size"]:
+            raise ValueError(f"Sección truncada: {name}")
+        raw = cls._decompress(blob, compression)
+        if len(raw) != entry["raw_size"] or zlib.crc32(raw) != entry["crc32"]:
+            raise ValueError(f"Sección corrupta: {name}")
+        return raw
+
+    @classmethod
+    def decode_sections(cls, f, names) -> Dict[str, Any]:
+        """Decodifica solo las secciones pedidas ('state' y/o grupos de ORDER_GROUPS).
+
+        Las demás no se leen ni se descomprimen: p. ej. las herramientas que
+        solo necesitan el estado del jugador no pagan por completed_orders.
+        """
+        header, compression = cls.read_header(f)
+        return cls._decode_sections(f, header, compression, names)
+
+    @classmethod
+    def _decode_sections(cls, f, header: dict, compression: int, names) -> Dict[str, Any]:
+        data_start = f.tell()
+        decoded = {}
+        for name in names:
+            if name not in cls.SECTIONS:
+                raise ValueError(f"Sección desconocida: {name}")
+            raw = cls._read_section(f, header, compression, data_start, name)
+            decoded[name] = cls._decode_state(raw) if name == "state" else cls._decode_group(raw)
+        return decoded
+
+    @classmethod
+    def decode(cls, f, map_loader) -> GameState:
+        """Lee y valida una partida; map_loader(hash) devuelve el mapa referenciado."""
+        header, compression = cls.read_header(f)
+        sections = cls._decode_sections(f, header, compression, cls.SECTIONS)
+        state = sections["state"]
+
+        map_ref = header["map"]
+        map_data = map_loader(map_ref.get("hash"))
+        if map_data is None:
+            raise ValueError("El mapa referenciado por la partida no está disponible")
+        if (map_data["width"], map_data["height"]) != (state["city_width"], state["city_height"]):
+            raise ValueError("El mapa referenciado no coincide con la partida")
+
+        x, y = state["player_pos"]
+        return GameState(
+            player_pos=Position(x, y),
+            stamina=state["stamina"],
+            reputation=state["reputation"],
+            money=state["money"],
+            game_time=state["game_time"],
+            weather_time=state["weather_time"],
+            current_weather=state["current_weather"],
+            weather_intensity=state["weather_intensity"],
+            inventory=sections["inventory"],
+            available_orders=sections["available_orders"],
+            completed_orders=sections["completed_orders"],
+            goal=state["goal"],
+            delivery_streak=state["delivery_streak"],
+            pending_orders=sections["pending_orders"],
+            city_width=state["city_width"],
+            city_height=state["city_height"],
+            tiles=map_data["tiles"],
+            legend=map_data["legend"],
+            city_name=state["city_name"],
+            max_game_time=state["max_game_time"]
+        )
+
+    @classmethod
+    def _decode_state(cls, raw: bytes) -> dict:
+        state = json.loads(raw.decode('utf-8'))
+        if not isinstance(state, dict):
+            raise ValueError("Estado de partida inválido")
+        for name, expected in cls.STATE_SCHEMA.items():
+            if not isinstance(state.get(name), expected) or isinstance(state.get(name), bool):
+                raise ValueError(f"Campo inválido en la partida: {name}")
+        if len(state["player_pos"]) != 2:
+            raise ValueError("Posición del jugador inválida")
+        return state
+
+    @classmethod
+    def _decode_group(cls, raw: bytes) -> List[Order]:
+        if len(raw) < cls._LENGTH.size:
+            raise ValueError("Grupo de pedidos truncado")
+        (body_size,) = cls._LENGTH.unpack_from(raw, 0)
+        offset = cls._LENGTH.size + body_size
+        description = json.loads(raw[cls._LENGTH.size:offset].decode('utf-8'))
+        orders, offset = cls._decode_orders(description, raw, offset)
+        if offset != len(raw):
+            raise ValueError("Datos sobrantes en la partida")
+        return orders
+
+    @classmethod
+    def _decode_orders(cls, description, raw: bytes, offset: int) -> Tuple[List[Order], int]:
+        if not isinstance(description, dict):
+            raise ValueError("Grupo de pedidos ausente")
+        count = description.get("count")
+        ids = description.get("ids")
+        statuses = description.get("statuses")
+        types = description.get("types")
+        if (not isinstance(count, int) or count < 0 or not isinstance(ids, list) or len(ids) != count
+                or not isinstance(statuses, list) or not isinstance(types, list)
+                or len(types) != len(cls.NUMERIC_COLUMNS) or any(t not in ('q', 'd') for t in types)):
+            raise ValueError("Descripción de pedidos inválida")
+
+        columns = []
+        for typecode in types + ['B']:
+            column = array(typecode)
+            size = column.itemsize * count
+            if offset + size > len(raw):
+                raise ValueError("Columnas de pedidos truncadas")
+            column.frombytes(raw[offset:offset + size])
+            if sys.byteorder == 'big' and typecode != 'B':
+                column.byteswap()
+            columns.append(column)
+            offset += size
+
+        (pickup_x, pickup_y, dropoff_x, dropoff_y, payout, duration, weight,
+         priority, release_time, created_at, accepted_at, status) = columns
+        if any(code >= len(statuses) for code in status):
+            raise ValueError("Estado de pedido inválido")
+
+        orders = [
+            Order(
+                id=str(ids[i]),
+                pickup=Position(int(pickup_x[i]), int(pickup_y[i])),
+                dropoff=Position(int(dropoff_x[i]), int(dropoff_y[i])),
+                payout=payout[i],
+                duration_minutes=duration[i],
+                weight=weight[i],
+                priority=int(priority[i]),
+                release_time=release_time[i],
+                status=statuses[status[i]],
+                created_at=created_at[i],
+                accepted_at=accepted_at[i]
+            )
+            for i in range(count)
+        ]
+        return orders, offset
+
+class _LegacySaveUnpickler(pickle.Unpickler):
+    """Lee partidas pickle anteriores permitiendo solo las clases de datos del juego."""
+
+    ALLOWED = {"GameState", "Order", "Position"}
+
+    def find_class(self, module, name):
+        if name in self.ALLOWED and module in (__name__, "__main__"):
+            return globals()[name]
+        raise pickle.UnpicklingError(f"Clase no permitida en la partida: {module}.{name}")
+
+class ScoreBoard:
+    """Tabla de puntajes en SQLite (data/puntajes.db) con historial completo.
+
+    Cada partida es una fila; nada se recorta ni se reescribe. Los índices
+    compuestos terminan en (score DESC, id), así el top-k global o filtrado por
+    ciudad, tamaño de ciudad o victoria lee solo k entradas del índice. Cada
+    inserción es una transacción propia (BEGIN IMMEDIATE) y la conexión espera
+    hasta TIMEOUT segundos si otra instancia está escribiendo, así varios
+    procesos de la misma máquina pueden compartir el archivo. Los bloqueos de
+    SQLite no son fiables en sistemas de archivos de red (NFS, SMB): abrir la
+    misma base desde varias máquinas no está soportado.
+    La primera vez se importan los puntajes de data/puntajes.json.
+    """
+
+    DB_FILE = "data/puntajes.db"
+    LEGACY_FILE = "data/puntajes.json"
+    SCHEMA_VERSION = 1
+    TIMEOUT = 10.0
+    # Campos de cada registro, iguales a los del antiguo puntajes.json
+    COLUMNS = ("score", "money", "reputation", "completed_orders", "game_time", "date",
+               "victory", "delivery_streak_record", "city_name", "city_size", "api_source")
+    _SCHEMA = (
+        """CREATE TABLE IF NOT EXISTS scores (
+               id INTEGER PRIMARY KEY,
+               score INTEGER NOT NULL DEFAULT 0,
+               money,
+               reputation,
+               completed_orders INTEGER,
+               game_time REAL,
+               date TEXT NOT NULL DEFAULT '',
+               victory INTEGER NOT NULL DEFAULT 0,
+               delivery_streak_record INTEGER,
+               city_name TEXT,
+               city_size TEXT,
+               api_source TEXT)""",
+        "CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score DESC, id)",
+        "CREATE INDEX IF NOT EXISTS scores_by_city ON scores (city_name, score DESC, id)",
+        "CREATE INDEX IF NOT EXISTS scores_by_size ON scores (city_size, score DESC, id)",
+        "CREATE INDEX IF NOT EXISTS scores_by_victory ON scores (victory, score DESC, id)",
+        "CREATE INDEX IF NOT EXISTS scores_by_date ON scores (date)",
+    )
+
+    def __init__(self, db_file: Optional[str] = None, legacy_file: Optional[str] = None):
+        self.db_file = db_file or self.DB_FILE
+        self.legacy_file = self.LEGACY_FILE if legacy_file is None else legacy_file
+        os.makedirs(os.path.dirname(self.db_file) or '.', exist_ok=True)
+        with contextlib.closing(self._connect()) as conn:
+            self._migrate(conn)
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: las transacciones se abren explícitamente
+        conn = sqlite3.connect(self.db_file, timeout=self.TIMEOUT, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _migrate(self, conn: sqlite3.Connection):
+        """Crea el esquema e importa el JSON anterior, una sola vez aunque haya varias instancias."""
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= self.SCHEMA_VERSION:
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("PRAGMA user_version").fetchone()[0] < self.SCHEMA_VERSION:
+                for statement in self._SCHEMA:
+                    conn.execute(statement)
+                for entry in self._read_legacy_scores():
+                    self._insert(conn, entry)
+                conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _read_legacy_scores(self) -> list:
+        if not self.legacy_file or not os.path.exists(self.legacy_file):
+            return []
+        try:
+            with open(self.legacy_file, 'r', encoding='utf-8') as f:
+                content = f.read().strip()
+            scores = json.loads(content) if content else []
+        except (OSError, ValueError):
+            return []
+        return [entry for entry in scores if isinstance(entry, dict)] if isinstance(scores, list) else []
+
+    @classmethod
+    def _insert(cls, conn: sqlite3.Connection, entry: dict) -> int:
+        values = [entry.get(column) for column in cls.COLUMNS]
+        values[cls.COLUMNS.index("score")] = entry.get("score") or 0
+        values[cls.COLUMNS.index("date")] = entry.get("date") or ""
+        values[cls.COLUMNS.index("victory")] = 1 if entry.get("victory") else 0
+        cursor = conn.execute(
+            f"INSERT INTO scores ({', '.join(cls.COLUMNS)}) VALUES ({', '.join('?' * len(cls.COLUMNS))})",
+            values)
+        return cursor.lastrowid
+
+    def add(self, entry: dict) -> int:
+        """Agrega una partida al historial y devuelve su id."""
+        with contextlib.closing(self._connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                score_id = self._insert(conn, entry)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return score_id
+
+    def top(self, k: int = 10, city_name: Optional[str] = None, city_size: Optional[str] = None,
+            date_from: Optional[str] = None, date_to: Optional[str] = None,
+            victory: Optional[bool] = None) -> List[dict]:
+        """Mejores k puntajes, opcionalmente filtrados.
+
+        date_from/date_to son fechas ISO (date_to exclusiva). Los empates se
+        ordenan por antigüedad, como el ordenamiento estable del JSON anterior.
+        """
+        conditions, params = [], []
+        for column, value in (("city_name", city_name), ("city_size", city_size)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if victory is not None:
+            conditions.append("victory = ?")
+            params.append(1 if victory else 0)
+        if date_from is not None:
+            conditions.append("date >= ?")
+            params.append(date_from)
+        if date_to is not None:
+            conditions.append("date < ?")
+            params.append(date_to)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        params.append(k)
+        with contextlib.closing(self._connect()) as conn:
+            rows = conn.execute(f"SELECT id, {', '.join(self.COLUMNS)} FROM scores {where} "
+                                f"ORDER BY score DESC, id LIMIT ?", params).fetchall()
+        return [self._row_to_entry(row) for row in rows]
+
+    def count(self) -> int:
+        with contextlib.closing(self._connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    @classmethod
+    def _row_to_entry(cls, row: sqlite3.Row) -> dict:
+        entry = {column: row[column] for column in cls.COLUMNS if row[column] is not None}
+        entry["victory"] = bool(row["victory"])
+        entry["id"] = row["id"]
+        return entry
+
+class RobustFileManager:
+    """Gestor robusto de archivos con validación y backups."""
+    
+    # Catálogo de slots: metadata de cada partida, escrito junto con cada guardado
+    SAVE_INDEX_FILE = "saves/index.json"
+    # Mapas referenciados por las partidas, guardados una vez por hash de contenido
+    MAP_STORE_DIR = "saves/maps"
+    # Copias rotativas del guardado anterior de cada slot
+    BACKUP_DIR = "backups"
+    BACKUPS_PER_SLOT = 3
+    
+    def __init__(self, save_compression: str = "zlib"):
+        self.save_compression = save_compression
+        self._map_cache = {}
+        # slot -> (mtime_ns, tamaño, metadata) del archivo de guardado ya consultado
+        self._save_info_cache = {}
+        self._save_index = {}
+        self._save_index_mtime = None
+        
+        # Guardado en segundo plano: el hilo escribe, el juego consulta los resultados
+        # _io_lock serializa las escrituras (solo el hilo de guardado la retiene
+        # durante el disco); _jobs_lock protege la cola de trabajos y es breve
+        self._io_lock = threading.RLock()
+        self._jobs_lock = threading.Lock()
+        self._pending_jobs = {}
+        self._running_job = None  # Clave del trabajo que el hilo está ejecutando
+        self._save_queue = queue.Queue()
+        self._save_results = deque()
+        self._save_worker = None
+        self._scoreboard = None
+    
+    def _ensure_directory_structure(self):
+        """Crea las carpetas del juego al primer guardado; construir el gestor no toca el disco."""
+        directories = ['data', 'saves', 'saves/maps', 'saves/autosave', 'api_cache', 'backups']
+        for directory in directories:
+            os.makedirs(directory, exist_ok=True)
+    
+    def save_game_with_validation(self, game_state: GameState, slot: int = 1) -> bool:
+        """Guarda en formato binario versionado; el mapa se referencia por hash.
+
+        El archivo se reemplaza de forma atómica y la versión anterior pasa a
+        backups/, así un corte a mitad de escritura nunca deja el slot truncado.
+        """
+        try:
+            save_file = f"saves/slot{slot}.sav"
+            
+            metadata = {
+                'saved_at': datetime.now().isoformat(),
+                'game_time': game_state.game_time,
+                'player_position': (game_state.player_pos.x, game_state.player_pos.y),
+                'completion_percentage': (game_state.money / game_state.goal) * 100,
+                'city_info': f"{game_state.city_name} ({game_state.city_width}x{game_state.city_height})"
+            }
+            with self._io_lock:
+                self._ensure_directory_structure()
+                map_hash = self._store_map(game_state)
+                data = SaveFormat.encode(game_state, metadata, map_hash, self.save_compression)
+                
+                self._backup_save(slot)
+                self._write_bytes_atomic(save_file, data)
+                
+                try:
+                    self._record_save_info(slot, metadata)
+                except OSError as e:
+                    print(f" No se pudo actualizar el índice de partidas: {e}")
+            
+            print(f" Juego guardado en slot {slot} - {game_state.city_name} {game_state.city_width}x{game_state.city_height}")
+            return True
+                
+        except Exception as e:
+            print(f" Error saving game: {e}")
+            return False
+        
+    def save_game_async(self, game_state: GameState, slot: int = 1):
+        """Encola el guardado; la codificación y escritura ocurren en un hilo aparte.
+
+        game_state debe ser una copia que el juego ya no modifique. Si el slot
+        tenía un guardado pendiente se reemplaza por este (solo cuenta el último).
+        El resultado se obtiene con poll_save_results().
+        """
+        def job():
+            ok = self.save_game_with_validation(game_state, slot)
+            self._save_results.append((slot, ok, game_state))
+        
+        self.submit_background(("slot", slot), job)
+    
+    def submit_background(self, key, job):
+        """Ejecuta job() en el hilo de guardado; un trabajo pendiente con la misma clave se reemplaza.
+
+        No espera a un guardado en curso: solo toma el lock de la cola de trabajos.
+        """
+        with self._jobs_lock:
+            already_queued = key in self._pending_jobs
+            self._pending_jobs[key] = job
+            if self._save_worker is None or not self._save_worker.is_alive():
+                self._save_worker = threading.Thread(target=self._save_worker_loop,
+                                                     name="save-worker", daemon=True)
+                self._save_worker.start()
+        if not already_queued:
+            self._save_queue.put(key)
+    
+    def poll_save_results(self) -> List[Tuple[int, bool, GameState]]:
+        """Guardados terminados desde la última consulta: (slot, éxito, estado)."""
+        results = []
+        while self._save_results:
+            results.append(self._save_results.popleft())
+        return results
+    
+    def flush_saves(self, timeout: Optional[float] = None) -> bool:
+        """Espera a que terminen los guardados encolados (p. ej. al cerrar el juego)."""
+        if self._save_worker is None:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._save_queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+    
+    def wait_for_job(self, key, timeout: Optional[float] = None) -> bool:
+        """Espera a que el trabajo con esa clave (encolado o en curso) termine."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._jobs_lock:
+                if key not in self._pending_jobs and self._running_job != key:
+                    return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+    
+    def _save_worker_loop(self):
+        while True:
+            key = self._save_queue.get()
+            try:
+                with self._jobs_lock:
+                    job = self._pending_jobs.pop(key, None)
+                    self._running_job = key
+                if job is not None:
+                    job()
+            except Exception as e:
+                print(f" Error en guardado en segundo plano ({key}): {e}")
+            finally:
+                with self._jobs_lock:
+                    self._running_job = None
+                self._save_queue.task_done()
+    
+    def _backup_path(self, slot: int, stamp: int) -> str:
+        return os.path.join(self.BACKUP_DIR, f"slot{slot}_{stamp}.sav")
+    
+    def _list_backups(self, slot: int) -> List[str]:
+        """Backups del slot, del más reciente al más antiguo."""
+        prefix = f"slot{slot}_"
+        try:
+            names = os.listdir(self.BACKUP_DIR)
+        except OSError:
+            return []
+        stamps = []
+        for name in names:
+            stamp = name[len(prefix):-len(".sav")]
+            if name.startswith(prefix) and name.endswith(".sav") and stamp.isdigit():
+                stamps.append(int(stamp))
+        return [self._backup_path(slot, stamp) for stamp in sorted(stamps, reverse=True)]
+    
+    def _backup_save(self, slot: int):
+        """Conserva el guardado actual del slot en backups/ antes de reemplazarlo."""
+        save_file = f"saves/slot{slot}.sav"
+        if not os.path.exists(save_file):
+            return
+        try:
+            os.makedirs(self.BACKUP_DIR, exist_ok=True)
+            backup_file = self._backup_path(slot, time.time_ns())
+            try:
+                # El reemplazo atómico crea un inodo nuevo: el enlace conserva el anterior
+                os.link(save_file, backup_file)
+            except OSError:
+                shutil.copy2(save_file, backup_file)
+            for old_backup in self._list_backups(slot)[self.BACKUPS_PER_SLOT:]:
+                os.remove(old_backup)
+        except OSError as e:
+            print(f" No se pudo crear el backup del slot {slot}: {e}")
+    
+    @property
+    def scoreboard(self) -> ScoreBoard:
+        """Tabla de puntajes; la base se abre (y migra) la primera vez que se usa."""
+        if self._scoreboard is None:
+            self._scoreboard = ScoreBoard()
+        return self._scoreboard
+    
+    def save_score(self, entry: dict) -> int:
+        """Agrega el puntaje al historial y devuelve su id."""
+        return self.scoreboard.add(entry)
+    
+    def load_scores(self, limit: int = 10, **filters) -> list:
+        """Mejores puntajes (filtros: city_name, city_size, date_from, date_to, victory)."""
+        try:
+            return self.scoreboard.top(limit, **filters)
+        except sqlite3.Error as e:
+            print(f" Error leyendo puntajes: {e}")
+            return []
+    
+    def load_game_with_validation(self, slot: int = 1) -> Optional[GameState]:
+        """CARGA CORREGIDA - Valida datos del mapa.
+
+        Si el slot está dañado se intenta con sus backups, del más reciente al más antiguo.
+        Un guardado del mismo slot aún en cola o en curso termina antes de leer.
+        """
+        save_file = f"saves/slot{slot}.sav"
+        if not self.wait_for_job(("slot", slot), timeout=5.0):
+            print(f" El guardado pendiente del slot {slot} no terminó; se carga la versión anterior")
+        
+        if not os.path.exists(save_file):
+            return None
+        
+        game_state = self._load_save_file(save_file, slot)
+        if game_state is None:
+            for backup_file in self._list_backups(slot):
+                game_state = self._load_save_file(backup_file, slot)
+                if game_state is not None:
+                    print(f" Slot {slot} dañado; se recuperó desde {backup_file}")
+                    break
+        return game_state
+    
+    def _load_save_file(self, save_file: str, slot: int) -> Optional[GameState]:
+        try:
+            with open(save_file, 'rb') as f:
+                if SaveFormat.is_save_format(f):
+                    game_state = SaveFormat.decode(f, self._load_map)
+                else:
+                    # Partidas pickle de versiones anteriores
+                    save_data = _LegacySaveUnpickler(f).load()
+                    if not isinstance(save_data, dict):
+                        return None
+                    game_state = save_data['game_state']
+           
+            if not hasattr(game_state, 'city_width') or not hasattr(game_state, 'city_height'):
+                print(" Estado guardado antiguo sin datos de mapa completos")
+                return None
+            
+            print(f" Juego cargado desde slot {slot} - {game_state.city_name} {game_state.city_width}x{game_state.city_height}")
+            return game_state
+                
+        except Exception as e:
+            print(f" Error loading from {save_file}: {e}")
+            return None
+    
+    def get_save_info(self, slot: int) -> Optional[dict]:
+        """Metadata del slot sin deserializar la partida.
+
+        Se sirve desde memoria mientras el archivo no cambie (mtime y tamaño);
+        si cambió se consulta el índice, y solo las partidas que no figuran en
+        él (guardadas por versiones anteriores) se leen completas una vez.
+        """
+        save_file = f"saves/slot{slot}.sav"
+        
+        try:
+            stat = os.stat(save_file)
+        except OSError:
+            self._save_info_cache.pop(slot, None)
+            return None
+        
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._save_info_cache.get(slot)
+        if cached is not None and cached[:2] == signature:
+            return cached[2]
+        
+        entry = self._load_save_index().get(str(slot))
+        if entry and (entry.get('mtime_ns'), entry.get('size')) == signature:
+            metadata = entry.get('metadata')
+        else:
+            metadata = self._read_save_metadata(save_file)
+            if metadata is not None:
+                try:
+                    self._record_save_info(slot, metadata)
+                except OSError:
+                    pass
+        
+        self._save_info_cache[slot] = signature + (metadata,)
+        return metadata
+    
+    def get_all_save_info(self) -> Dict[int, dict]:
+        """Metadata de todos los slots del índice que siguen existiendo."""
+        slots = {}
+        for key in self._load_save_index():
+            if key.isdigit():
+                metadata = self.get_save_info(int(key))
+                if metadata is not None:
+                    slots[int(key)] = metadata
+        return slots
+    
+    @staticmethod
+    def _read_save_metadata(save_file: str) -> Optional[dict]:
+        """Lee la metadata de una partida que no está en el índice.
+
+        En el formato binario basta el encabezado; las partidas pickle
+        anteriores se deserializan completas.
+        """
+        try:
+            with open(save_file, 'rb') as f:
+                if SaveFormat.is_save_format(f):
+                    header, _ = SaveFormat.read_header(f)
+                    metadata = header.get('metadata')
+                    return metadata if isinstance(metadata, dict) else None
+                save_data = _LegacySaveUnpickler(f).load()
+            if isinstance(save_data, dict) and 'metadata' in save_data:
+                return save_data['metadata']
+        except Exception:
+            return None
+        return None
+    
+    def _map_path(self, map_hash: str) -> str:
+        return os.path.join(self.MAP_STORE_DIR, f"{map_hash}.json")
+    
+    def _store_map(self, game_state: GameState) -> str:
+        """Guarda el mapa de la partida una sola vez por contenido y devuelve su hash."""
+        map_hash = SaveFormat.map_hash(game_state.tiles, game_state.legend,
+                                       game_state.city_width, game_state.city_height)
+        if map_hash not in self._map_cache:
+            map_data = {
+                'tiles': game_state.tiles,
+                'legend': game_state.legend,
+                'width': game_state.city_width,
+                'height': game_state.city_height
+            }
+            if not os.path.exists(self._map_path(map_hash)):
+                self._write_json_atomic(self._map_path(map_hash), map_data)
+            self._map_cache[map_hash] = map_data
+        return map_hash
+    
+    def _load_map(self, map_hash: str) -> Optional[dict]:
+        """Mapa guardado con ese hash, verificado contra su contenido (None si falta)."""
+        if not isinstance(map_hash, str) or not all(c in '0123456789abcdef' for c in map_hash):
+            return None
+        cached = self._map_cache.get(map_hash)
+        if cached is not None:
+            return cached
+        try:
+            with open(self._map_path(map_hash), 'r', encoding='utf-8') as f:
+                map_data = json.load(f)
+            if SaveFormat.map_hash(map_data['tiles'], map_data['legend'],
+                                   map_data['width'], map_data['height']) != map_hash:
+                return None
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        self._map_cache[map_hash] = map_data
+        return map_data
+    
+    def _load_save_index(self) -> dict:
+        """Devuelve el índice de slots, releyendo el archivo solo si cambió."""
+        try:
+            mtime = os.stat(self.SAVE_INDEX_FILE).st_mtime_ns
+        except OSError:
+            self._save_index, self._save_index_mtime = {}, None
+            return self._save_index
+        
+        if mtime != self._save_index_mtime:
+            try:
+                with open(self.SAVE_INDEX_FILE, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+            except (OSError, ValueError):
+                index = {}
+            self._save_index = index if isinstance(index, dict) else {}
+            self._save_index_mtime = mtime
+        return self._save_index
+    
+    def _record_save_info(self, slot: int, metadata: dict):
+        """Registra la metadata del slot ligada al mtime/tamaño del archivo recién escrito."""
+        with self._io_lock:
+            stat = os.stat(f"saves/slot{slot}.sav")
+            index = dict(self._load_save_index())
+            index[str(slot)] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'metadata': metadata}
+            self._write_json_atomic(self.SAVE_INDEX_FILE, index)
+            
+            self._save_index = index
+            self._save_index_mtime = os.stat(self.SAVE_INDEX_FILE).st_mtime_ns
+            self._save_info_cache[slot] = (stat.st_mtime_ns, stat.st_size, metadata)
+    
+    @classmethod
+    def _write_json_atomic(cls, path: str, data):
+        """Escribe JSON en un temporal y lo renombra: el archivo nunca queda a medias."""
+        cls._write_bytes_atomic(path, json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8'))
+    
+    @staticmethod
+    def _write_bytes_atomic(path: str, data: bytes):
+        """Temporal + fsync + rename; tras un corte queda el archivo viejo o el nuevo completo."""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+        if hasattr(os, 'O_DIRECTORY'):
+            # Persistir también la entrada del directorio (POSIX)
+            try:
+                dir_fd = os.open(os.path.dirname(path) or '.', os.O_RDONLY | os.O_DIRECTORY)
+            except OSError:
+                return
+            try:
+                os.fsync(dir_fd)
+            except OSError:
+                pass
+            finally:
+                os.close(dir_fd)
+
+class AutosaveJournal:
+    """Autoguardado incremental: keyframes completos más un diario de deltas.
+
+    Cada segmento N tiene un keyframe (saves/autosave/keyframe_N.sav, mismo
+    formato que los slots) y un diario (journal_N.log) con los deltas tomados
+    después de él: escalares del jugador y las transiciones de pedidos entre
+    grupos o de estado. Cada registro lleva largo y CRC32, así que la cola
+    cortada por un cierre abrupto se descarta al recuperar. Los deltas se
+    escriben en el hilo principal (unos cientos de bytes, sin fsync); los
+    keyframes y la compactación de segmentos viejos van al hilo de guardado.
+    Todos los segmentos de una misma partida comparten un id de cadena.
+
+    Los pedidos se identifican por un número de secuencia de la cadena, no por
+    order.id (la API puede repetir ids); cada keyframe guarda en sus metadatos
+    los números de sus pedidos en el orden de SaveFormat.
+    """
+
+    DIRECTORY = "saves/autosave"
+    JOURNAL_MAGIC = b"CQJL"
+    JOURNAL_VERSION = 2
+    GONE = 255  # El pedido salió de todos los grupos (expiró)
+    INVENTORY_UNCHANGED = 0xFFFF
+    SCALAR_FIELDS = ("game_time", "weather_time", "stamina", "reputation", "money",
+                     "weather_intensity", "player_x", "player_y", "delivery_streak")
+    _JOURNAL_HEADER = struct.Struct('<4sBQI')  # magia, versión, cadena, segmento
+    _RECORD = struct.Struct('<II')  # largo y CRC32 del registro
+    # Números como double + máscara de cuáles eran enteros
+    _SCALARS = struct.Struct(f'<{len(SCALAR_FIELDS)}dH')
+    _ORDER = struct.Struct(f'<{len(SaveFormat.NUMERIC_COLUMNS)}dHB')
+    _COUNT = struct.Struct('<H')
+    _HANDLE = struct.Struct('<I')
+
+    def __init__(self, file_manager: 'RobustFileManager', interval: float = AUTOSAVE_INTERVAL,
+                 keyframe_every: int = AUTOSAVE_KEYFRAME_EVERY, directory: Optional[str] = None):
+        self.file_manager = file_manager
+        self.interval = interval
+        self.keyframe_every = keyframe_every
+        self.directory = directory or self.DIRECTORY
+        self._journal = None
+        self._chain = 0
+        self._segment = 0
+        self._deltas = 0
+        self._next_due = 0.0
+        # número -> firma del pedido en el último registro; lo que cambie es una transición
+        self._orders = {}
+        # id(pedido) -> (número, pedido); guardar el pedido evita que su id se reutilice
+        self._handles = {}
+        self._next_handle = 0
+        self._inventory_handles = ()
+
+    def tick(self, game):
+        """Se llama cada tick de simulación; fuera del intervalo solo compara un número."""
+        if self._journal is None:
+            self._start_segment(game, new_chain=True)
+        elif game.game_time >= self._next_due:
+            self.record(game)
+
+    def close(self):
+        """Cierra el diario; el próximo tick empieza una cadena nueva con su keyframe."""
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def record(self, game):
+        """Agrega un delta al diario y, cada keyframe_every deltas, inicia un segmento."""
+        current = self._current_orders(game)
+        changed = [(handle, order, group) for handle, (group, order, signature) in current.items()
+                   if self._orders.get(handle) != signature]
+        gone = [handle for handle in self._orders if handle not in current]
+        inventory_handles = tuple(self._handle(order) for order in game.inventory)
+
+        weather = game.weather_system
+        numbers, mask = self._pack_numbers((
+            game.game_time, weather.time_in_current, game.stamina, game.reputation, game.money,
+            weather.current_intensity, game.player_pos.x, game.player_pos.y, game.delivery_streak))
+        parts = [self._SCALARS.pack(*numbers, mask), self._pack_str(weather.current_condition),
+                 self._COUNT.pack(len(changed))]
+        for handle, order, group in changed:
+            numbers, mask = self._pack_numbers(self._order_numbers(order))
+            parts += [self._HANDLE.pack(handle), self._ORDER.pack(*numbers, mask, group),
+                      self._pack_str(order.id), self._pack_str(order.status)]
+        parts.append(self._COUNT.pack(len(gone)))
+        parts.extend(self._HANDLE.pack(handle) for handle in gone)
+        if inventory_handles != self._inventory_handles:
+            parts.append(self._COUNT.pack(len(inventory_handles)))
+            parts.extend(self._HANDLE.pack(handle) for handle in inventory_handles)
+        else:
+            parts.append(self._COUNT.pack(self.INVENTORY_UNCHANGED))
+
+        payload = b"".join(parts)
+        self._journal.write(self._RECORD.pack(len(payload), zlib.crc32(payload)) + payload)
+        self._journal.flush()
+
+        self._orders = {handle: entry[2] for handle, entry in current.items()}
+        self._handles = {id(entry[1]): (handle, entry[1]) for handle, entry in current.items()}
+        self._inventory_handles = inventory_handles
+        self._deltas += 1
+        self._next_due = game.game_time + self.interval
+        if self._deltas >= self.keyframe_every:
+            self._start_segment(game, new_chain=False)
+
+    def recover(self) -> Optional[GameState]:
+        """Último keyframe legible más los deltas de su cadena (None si no hay autoguardado)."""
+        segments = self._list_segments()
+        for segment in sorted((s for s, files in segments.items() if 'keyframe' in files), reverse=True):
+            try:
+                with open(segments[segment]['keyframe'], 'rb') as f:
+                    header, _ = SaveFormat.read_header(f)
+                    f.seek(0)
+                    game_state = SaveFormat.decode(f, self.file_manager._load_map)
+                chain = header.get('metadata', {}).get('autosave_chain')
+                groups = [game_state.inventory, game_state.available_orders,
+                          game_state.completed_orders, game_state.pending_orders]
+                orders = [(group, order) for group, group_orders in enumerate(groups) for order in group_orders]
+                handles = header.get('metadata', {}).get('autosave_handles', range(len(orders)))
+                if len(handles) != len(orders):
+                    raise ValueError("Numeración de pedidos del keyframe incompleta")
+                located = dict(zip(handles, orders))
+            except Exception as e:
+                print(f" Keyframe de autoguardado {segment} ilegible: {e}")
+                continue
+
+            replayed = 0
+            journal_segment = segment
+            while 'journal' in segments.get(journal_segment, {}):
+                complete, count = self._replay_journal(segments[journal_segment]['journal'], chain,
+                                                       journal_segment, game_state, groups, located)
+                replayed += count
+                if not complete:
+                    break
+                journal_segment += 1
+
+            print(f" Autoguardado recuperado: keyframe {segment} + {replayed} deltas")
+            return game_state
+        return None
+
+    # -- segmentos -----------------------------------------------------------
+
+    def _keyframe_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"keyframe_{segment}.sav")
+
+    def _journal_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"journal_{segment}.log")
+
+    def _list_segments(self) -> Dict[int, Dict[str, str]]:
+        """segmento -> {'keyframe': ruta, 'journal': ruta} con los archivos que existan."""
+        segments = {}
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return segments
+        for name in names:
+            for kind, prefix, suffix in (('keyframe', 'keyframe_', '.sav'), ('journal', 'journal_', '.log')):
+                number = name[len(prefix):-len(suffix)]
+                if name.startswith(prefix) and name.endswith(suffix) and number.isdigit():
+                    segments.setdefault(int(number), {})[kind] = os.path.join(self.directory, name)
+        return segments
+
+    def _start_segment(self, game, new_chain: bool):
+        """Abre el diario del segmento siguiente y encola su keyframe en segundo plano."""
+        self.close()
+        if new_chain:
+            os.makedirs(self.directory, exist_ok=True)
+            self._chain = time.time_ns() & 0xFFFFFFFFFFFFFFFF
+            self._segment = max(self._list_segments(), default=0) + 1
+        else:
+            self._segment += 1
+
+        if new_chain:
+            self._handles = {}
+            self._next_handle = 0
+        snapshot = game._snapshot_game_state()
+        current = self._current_orders(game)
+        self._orders = {handle: entry[2] for handle, entry in current.items()}
+        self._handles = {id(entry[1]): (handle, entry[1]) for handle, entry in current.items()}
+        self._inventory_handles = tuple(self._handle(order) for order in game.inventory)
+        handles = [self._handle(order) for orders in (game.inventory, game.available_orders.items,
+                                                       game.completed_orders, game.pending_orders)
+                   for order in orders]
+        self._deltas = 0
+        self._next_due = game.game_time + self.interval
+
+        self._journal = open(self._journal_path(self._segment), 'wb')
+        self._journal.write(self._JOURNAL_HEADER.pack(self.JOURNAL_MAGIC, self.JOURNAL_VERSION,
+                                                      self._chain, self._segment))
+        self._journal.flush()
+
+        chain, segment = self._chain, self._segment
+        self.file_manager.submit_background(("autosave", self.directory),
+                                            lambda: self._write_keyframe(snapshot, chain, segment, handles))
+
+    def _write_keyframe(self, game_state: GameState, chain: int, segment: int, handles: List[int]):
+        """(Hilo de guardado) Escribe el keyframe y compacta los segmentos que ya no hacen falta."""
+        metadata = {
+            'saved_at': datetime.now().isoformat(),
+            'game_time': game_state.game_time,
+            'city_info': f"{game_state.city_name} ({game_state.city_width}x{game_state.city_height})",
+            'autosave_chain': chain,
+            'autosave_segment': segment,
+            'autosave_handles': handles,
+        }
+        with self.file_manager._io_lock:
+            self.file_manager._ensure_directory_structure()
+            map_hash = self.file_manager._store_map(game_state)
+        data = SaveFormat.encode(game_state, metadata, map_hash, self.file_manager.save_compression)
+        self.file_manager._write_bytes_atomic(self._keyframe_path(segment), data)
+        self._compact(chain, segment)
+
+    def _compact(self, chain: int, segment: int):
+        """Borra los segmentos anteriores al keyframe recién escrito.
+
+        Se conserva el inmediatamente anterior de la misma cadena como respaldo
+        por si el keyframe nuevo resultara ilegible.
+        """
+        for old_segment, files in self._list_segments().items():
+            if old_segment >= segment:
+                continue
+            if old_segment == segment - 1 and self._journal_chain(files.get('journal')) == chain:
+                continue
+            for path in files.values():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def _journal_chain(self, path: Optional[str]) -> Optional[int]:
+        if path is None:
+            return None
+        try:
+            with open(path, 'rb') as f:
+                magic, version, chain, _ = self._JOURNAL_HEADER.unpack(f.read(self._JOURNAL_HEADER.size))
+        except (OSError, struct.error):
+            return None
+        return chain if magic == self.JOURNAL_MAGIC and version == self.JOURNAL_VERSION else None
+
+    # -- deltas --------------------------------------------------------------
+
+    def _handle(self, order: Order) -> int:
+        """Número del pedido en la cadena; uno nuevo si el diario aún no lo conocía."""
+        entry = self._handles.get(id(order))
+        if entry is None or entry[1] is not order:
+            entry = (self._next_handle, order)
+            self._handles[id(order)] = entry
+            self._next_handle += 1
+        return entry[0]
+
+    def _current_orders(self, game) -> Dict[int, tuple]:
+        """número -> (grupo, pedido, firma) de todos los pedidos del juego, en el orden de SaveFormat."""
+        current = {}
+        order_groups = (game.inventory, game.available_orders.items, game.completed_orders, game.pending_orders)
+        for group, orders in enumerate(order_groups):
+            for order in orders:
+                current[self._handle(order)] = (group, order, (group, order.status, order.pickup, order.dropoff,
+                                                               order.created_at, order.accepted_at))
+        return current
+
+    @staticmethod
+    def _order_numbers(order: Order) -> tuple:
+        """Campos numéricos del pedido en el orden de SaveFormat.NUMERIC_COLUMNS."""
+        return (order.pickup.x, order.pickup.y, order.dropoff.x, order.dropoff.y, order.payout,
+                order.duration_minutes, order.weight, order.priority, order.release_time,
+                order.created_at, order.accepted_at)
+
+    @staticmethod
+    def _pack_numbers(values) -> Tuple[List[float], int]:
+        mask = 0
+        for bit, value in enumerate(values):
+            if isinstance(value, int) and not isinstance(value, bool):
+                mask |= 1 << bit
+        return [float(value) for value in values], mask
+
+    @staticmethod
+    def _unpack_numbers(values, mask: int) -> list:
+        return [int(value) if mask >> bit & 1 else value for bit, value in enumerate(values)]
+
+    @classmethod
+    def _pack_str(cls, text: str) -> bytes:
+        data = text.encode('utf-8')
+        return cls._COUNT.pack(len(data)) + data
+
+    @classmethod
+    def _read_str(cls, payload: bytes, offset: int) -> Tuple[str, int]:
+        (size,) = cls._COUNT.unpack_from(payload, offset)
+        offset += cls._COUNT.size
+        if offset + size > len(payload):
+            raise ValueError("Texto truncado en el diario")
+        return payload[offset:offset + size].decode('utf-8'), offset + size
+
+    def _replay_journal(self, path: str, chain, segment: int, game_state: GameState,
+                        groups: List[List[Order]], located: dict) -> Tuple[bool, int]:
+        """Aplica los registros del diario; (completo, registros aplicados)."""
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            magic, version, journal_chain, journal_segment = self._JOURNAL_HEADER.unpack_from(data, 0)
+        except (OSError, struct.error):
+            return False, 0
+        if (magic != self.JOURNAL_MAGIC or version != self.JOURNAL_VERSION
+                or journal_chain != chain or journal_segment != segment):
+            return False, 0
+
+        offset = self._JOURNAL_HEADER.size
+        count = 0
+        while offset < len(data):
+            if offset + self._RECORD.size > len(data):
+                return False, count
+            size, crc = self._RECORD.unpack_from(data, offset)
+            start = offset + self._RECORD.size
+            payload = data[start:start + size]
+            if len(payload) != size or zlib.crc32(payload) != crc:
+                return False, count
+            try:
+                self._apply_record(payload, game_state, groups, located)
+            except (ValueError, struct.error, UnicodeDecodeError):
+                return False, count
+            offset = start + size
+            count += 1
+        return True, count
+
+    def _apply_record(self, payload: bytes, game_state: GameState,
+                      groups: List[List[Order]], located: dict):
+        values = self._SCALARS.unpack_from(payload, 0)
+        offset = self._SCALARS.size
+        (game_state.game_time, game_state.weather_time, game_state.stamina, game_state.reputation,
+         game_state.money, game_state.weather_intensity, x, y,
+         game_state.delivery_streak) = self._unpack_numbers(values[:-1], values[-1])
+        game_state.player_pos = Position(x, y)
+        game_state.current_weather, offset = self._read_str(payload, offset)
+
+        (changed,) = self._COUNT.unpack_from(payload, offset)
+        offset += self._COUNT.size
+        for _ in range(changed):
+            (handle,) = self._HANDLE.unpack_from(payload, offset)
+            offset += self._HANDLE.size
+            values = self._ORDER.unpack_from(payload, offset)
+            offset += self._ORDER.size
+            order_id, offset = self._read_str(payload, offset)
+            status, offset = self._read_str(payload, offset)
+            group = values[-1]
+            if group >= len(groups):
+                raise ValueError(f"Grupo de pedidos inválido en el diario: {group}")
+            (pickup_x, pickup_y, dropoff_x, dropoff_y, payout, duration, weight, priority,
+             release_time, created_at, accepted_at) = self._unpack_numbers(values[:-2], values[-2])
+            order = Order(order_id, Position(pickup_x, pickup_y), Position(dropoff_x, dropoff_y),
+                          payout, duration, weight, priority, release_time, status, created_at, accepted_at)
+            self._move_order(handle, order, group, groups, located)
+
+        (gone,) = self._COUNT.unpack_from(payload, offset)
+        offset += self._COUNT.size
+        for _ in range(gone):
+            (handle,) = self._HANDLE.unpack_from(payload, offset)
+            offset += self._HANDLE.size
+            self._move_order(handle, None, self.GONE, groups, located)
+
+        (inventory_count,) = self._COUNT.unpack_from(payload, offset)
+        offset += self._COUNT.size
+        if inventory_count != self.INVENTORY_UNCHANGED:
+            handles = []
+            for _ in range(inventory_count):
+                (handle,) = self._HANDLE.unpack_from(payload, offset)
+                offset += self._HANDLE.size
+                handles.append(handle)
+            groups[0][:] = [located[handle][1] for handle in handles
+                            if handle in located and located[handle][0] == 0]
+        if offset != len(payload):
+            raise ValueError("Datos sobrantes en el registro del diario")
+
+    def _move_order(self, handle: int, order: Optional[Order], group: int,
+                    groups: List[List[Order]], located: dict):
+        previous = located.pop(handle, None)
+        if previous is not None:
+            previous_group, previous_order = previous
+            orders = groups[previous_group]
+            for index, candidate in enumerate(orders):
+                if candidate is previous_order:
+                    del orders[index]
+                    break
+        if order is not None and group != self.GONE:
+            groups[group].append(order)
+            located[handle] = (group, order)
+
+# =============================================================================
+# SISTEMA DE MENÚS
+# =============================================================================
+
+class GameMenu:
+    """Sistema de menús del juego."""
+    
+    def __init__(self):
+        self.state = "main_menu"
+        self.main_options = ["Nuevo Juego", "Cargar Partida", "Tutorial", "Ver Puntajes", "Salir"]
+        self.selected = 0
+        self.file_manager = RobustFileManager()
+        
+        self.title_font = pygame.font.Font(None, 48)
+        self.menu_font = pygame.font.Font(None, 32)
+        self.small_font = pygame.font.Font(None, 24)
+    
+    def handle_menu_input(self, event) -> Optional[str]:
+        if event.type == pygame.KEYDOWN:
+            if self.state == "main_menu":
+                return self._handle_main_menu_input(event)
+            elif self.state == "load_menu":
+                return self._handle_load_menu_input(event)
+            elif self.state == "scores_menu": 
+                return self._handle_scores_menu_input(event)
+        return None
+    
+
+    def _handle_scores_menu_input(self, event) -> Optional[str]:
+        """Manejo de menú de puntajes con limpieza de caché."""
+        if event.key == pygame.K_b or event.key == pygame.K_ESCAPE or event.key == pygame.K_RETURN:
+            self.state = "main_menu"
+            self.selected = 3  # Volver a "Ver Puntajes"
+            
+            if hasattr(self, '_cached_scores'):
+                self._cached_scores = None
+        return None
+    
+    def _handle_main_menu_input(self, event) -> Optional[str]:
+        if event.key == pygame.K_UP:
+            self.selected = (self.selected - 1) % len(self.main_options)
+            
+            if hasattr(self, '_cached_scores'):
+                self._cached_scores = None
+        elif event.key == pygame.K_DOWN:
+            self.selected = (self.selected + 1) % len(self.main_options)
+            
+            if hasattr(self, '_cached_scores'):
+                self._cached_scores = None
+        elif event.key == pygame.K_RETURN:
+            option = self.main_options[self.selected]
+            if option == "Nuevo Juego":
+                return "start_new_game"
+            elif option == "Cargar Partida":
+                self.state = "load_menu"
+                self.selected = 0
+                
+                if hasattr(self, '_cached_scores'):
+                    self._cached_scores = None
+            elif option == "Tutorial":
+                return "start_tutorial"
+            elif option == "Ver Puntajes":
+                self.state = "scores_menu"
+                self.selected = 0
+            elif option == "Salir":
+                return "exit"
+        elif event.key == pygame.K_ESCAPE:
+            return "exit"
+        return None
+    
+    def _handle_load_menu_input(self, event) -> Optional[str]:
+       
+        if event.key == pygame.K_UP:
+            self.selected = max(0, self.selected - 1)
+        elif event.key == pygame.K_DOWN:
+            self.selected = min(1, self.selected + 1)  # Solo 2 opciones: slot 1 + volver
+        elif event.key == pygame.K_RETURN:
+            if self.selected == 1:  # Volver
+                self.state = "main_menu"
+                self.selected = 1
+            else:  # Slot 1
+                return "load_slot_1"
+        elif event.key == pygame.K_a:
+            return "load_autosave"
+        elif event.key == pygame.K_b or event.key == pygame.K_ESCAPE: 
+            self.state = "main_menu"
+            self.selected = 1
+        return None
+    
+    def draw(self, screen):
+        screen.fill((20, 25, 40))
+        
+        if self.state == "main_menu":
+            self._draw_main_menu(screen)
+        elif self.state == "load_menu":
+            self._draw_load_menu(screen)
+        elif self.state == "scores_menu":  
+            self._draw_scores_menu(screen)
+
+
+
+    def _draw_scores_menu(self, screen):
+        """Pantalla de puntajes CON CACHÉ."""
+        title = self.title_font.render("TABLA DE PUNTAJES", True, (255, 255, 255))
+        title_rect = title.get_rect(center=(WINDOW_WIDTH // 2, 80))
+        screen.blit(title, title_rect)
+        
+        # Solo cargar puntajes una vez cuando entras al menú
+        if not hasattr(self, '_cached_scores') or self._cached_scores is None:
+            self._cached_scores = self.file_manager.load_scores()
+            print(f" {len(self._cached_scores)} puntajes cargados para visualización")
+        
+        scores = self._cached_scores
+        
+        if not scores:
+            no_scores_text = self.menu_font.render("No hay puntajes registrados", True, (150, 150, 150))
+            text_rect = no_scores_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
+            screen.blit(no_scores_text, text_rect)
+        else:
+            # Mostrar los primeros 10 puntajes
+            start_y = 150
+            headers = ["#", "Puntaje", "Dinero", "Rep.", "Pedidos", "Fecha", "Estado"]
+            header_positions = [100, 200, 320, 420, 520, 650, 850]
+            
+            # Dibujar encabezados
+            for i, header in enumerate(headers):
+                header_text = self.menu_font.render(header, True, (200, 200, 255))
+                screen.blit(header_text, (header_positions[i], start_y))
+            
+            # Línea separadora
+            pygame.draw.line(screen, (100, 100, 150), (80, start_y + 35), (WINDOW_WIDTH - 80, start_y + 35), 2)
+            
+            # Mostrar puntajes
+            for i, score in enumerate(scores[:10]):
+                y_pos = start_y + 50 + i * 35
+                rank_color = (255, 215, 0) if i == 0 else (192, 192, 192) if i == 1 else (205, 127, 50) if i == 2 else (255, 255, 255)
+                
+                # Número de ranking
+                rank_text = self.small_font.render(f"{i+1}", True, rank_color)
+                screen.blit(rank_text, (header_positions[0], y_pos))
+                
+                # Puntaje
+                score_text = self.small_font.render(f"{score.get('score', 0)}", True, rank_color)
+                screen.blit(score_text, (header_positions[1], y_pos))
+                
+                # Dinero
+                money_text = self.small_font.render(f"${score.get('money', 0)}", True, (100, 255, 100))
+                screen.blit(money_text, (header_positions[2], y_pos))
+                
+                # Reputación
+                rep = score.get('reputation', 0)
+                rep_color = (100, 255, 100) if rep >= 80 else (255, 255, 100) if rep >= 50 else (255, 100, 100)
+                rep_text = self.small_font.render(f"{rep}", True, rep_color)
+                screen.blit(rep_text, (header_positions[3], y_pos))
+                
+                # Pedidos completados
+                orders_text = self.small_font.render(f"{score.get('completed_orders', 0)}", True, (150, 200, 255))
+                screen.blit(orders_text, (header_positions[4], y_pos))
+                
+                # Fecha (solo día y hora)
+                date_str = score.get('date', '')[:16].replace('T', ' ')
+                date_text = self.small_font.render(date_str, True, (150, 150, 150))
+                screen.blit(date_text, (header_positions[5], y_pos))
+                
+                # Estado (Victoria/Derrota)
+                victory = score.get('victory', False)
+                status_text = "VICTORIA" if victory else "DERROTA"
+                status_color = (100, 255, 100) if victory else (255, 100, 100)
+                status_surface = self.small_font.render(status_text, True, status_color)
+                screen.blit(status_surface, (header_positions[6], y_pos))
+        
+        # Instrucciones para volver
+        back_text = self.small_font.render("Presiona B, ESC o ENTER para volver al menú principal", True, (150, 150, 150))
+        back_rect = back_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT - 50))
+        screen.blit(back_text, back_rect)
+    
+    def _draw_main_menu(self, screen):
+        title = self.title_font.render("COURIER QUEST", True, (255, 255, 255))
+        title_rect = title.get_rect(center=(WINDOW_WIDTH // 2, 150))
+        screen.blit(title, title_rect)
+        
+        subtitle = self.menu_font.render("API REAL INTEGRADA - EIF-207", True, (100, 255, 100))
+        subtitle_rect = subtitle.get_rect(center=(WINDOW_WIDTH // 2, 200))
+        screen.blit(subtitle, subtitle_rect)
+        
+        start_y = 300
+        for i, option in enumerate(self.main_options):
+            color = (255, 255, 100) if i == self.selected else (255, 255, 255)
+            text = self.menu_font.render(option, True, color)
+            text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, start_y + i * 50))
+            
+            if i == self.selected:
+                pygame.draw.rect(screen, (50, 50, 100), 
+                               (text_rect.x - 20, text_rect.y - 5, text_rect.width + 40, text_rect.height + 10))
+            
+            screen.blit(text, text_rect)
+        
+        instructions = self.small_font.render("Usa ↑↓ para navegar, ENTER para seleccionar", True, (150, 150, 150))
+        instructions_rect = instructions.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT - 50))
+        screen.blit(instructions, instructions_rect)
+    
+    def _draw_load_menu(self, screen):
+        """Solo mostrar 1 slot."""
+        title = self.title_font.render("CARGAR PARTIDA", True, (255, 255, 255))
+        title_rect = title.get_rect(center=(WINDOW_WIDTH // 2, 100))
+        screen.blit(title, title_rect)
+        
+        start_y = 250
+        
+        # Solo mostrar Slot 1
+        slot_info = self.file_manager.get_save_info(1)
+        
+        if self.selected == 0:
+            color = (255, 255, 100)
+            bg_color = (50, 50, 100)
+        elif slot_info:
+            color = (255, 255, 255)
+            bg_color = (30, 30, 50)
+        else:
+            color = (100, 100, 100)
+            bg_color = (20, 20, 30)
+        
+        slot_rect = pygame.Rect(WINDOW_WIDTH // 2 - 300, start_y - 5, 600, 70)
+        pygame.draw.rect(screen, bg_color, slot_rect)
+        pygame.draw.rect(screen, color, slot_rect, 2)
+        
+        if slot_info:
+            slot_text = f"Slot 1 - {slot_info.get('saved_at', 'Desconocido')[:19]}"
+            progress_text = f"Progreso: {slot_info.get('completion_percentage', 0):.1f}%"
+            city_text = slot_info.get('city_info', 'Ciudad desconocida')
+            
+            slot_label = self.menu_font.render(slot_text, True, color)
+            progress_label = self.small_font.render(progress_text, True, color)
+            city_label = self.small_font.render(city_text, True, color)
+            
+            screen.blit(slot_label, (WINDOW_WIDTH // 2 - 280, start_y))
+            screen.blit(progress_label, (WINDOW_WIDTH // 2 - 280, start_y + 25))
+            screen.blit(city_label, (WINDOW_WIDTH // 2 - 280, start_y + 45))
+        else:
+            empty_text = "Slot 1 - Vacío"
+            empty_label = self.menu_font.render(empty_text, True, color)
+            screen.blit(empty_label, (WINDOW_WIDTH // 2 - 280, start_y + 20))
+        
+        
+        volver_color = (255, 255, 100) if self.selected == 1 else (255, 255, 255)
+        volver_text = self.menu_font.render("← Volver al menú principal (B)", True, volver_color)
+        volver_rect = volver_text.get_rect(center=(WINDOW_WIDTH // 2, start_y + 120))
+        
+        if self.selected == 1:
+            pygame.draw.rect(screen, (50, 50, 100), 
+                        (volver_rect.x - 20, volver_rect.y - 5, volver_rect.width + 40, volver_rect.height + 10))
+        
+        screen.blit(volver_text, volver_rect)
+        
+        autosave_text = self.small_font.render("A - Recuperar autoguardado", True, (180, 180, 180))
+        screen.blit(autosave_text, autosave_text.get_rect(center=(WINDOW_WIDTH // 2, start_y + 170)))
+
+# =============================================================================
+# SISTEMA DE TUTORIAL
+# =============================================================================
+
+class TutorialSystem:
+    """Sistema de tutorial integrado."""
+    
+    def __init__(self):
+        self.tutorial_steps = [
+            {
+                "title": "Bienvenido a Courier Quest",
+                "message": "Eres un repartidor en bicicleta conectado a la API real de TigerCity. Tu objetivo es ganar $3000 antes de que termine la jornada laboral.",
+                "keys": ["ENTER para continuar"]
+            },
+            {
+                "title": "Movimiento Básico", 
+                "message": "Usa WASD o las flechas para moverte por la ciudad. Solo puedes moverte por calles (grises) y parques. Los edificios están bloqueados.",
+                "keys": ["WASD o ↑↓←→ para moverse", "ENTER para continuar"]
+            },
+            {
+                "title": "Resistencia y Estados",
+                "message": "Tu resistencia (0-100) baja al moverte. Si llega a 0, quedas exhausto. Recupera hasta 30 para moverte de nuevo. Los parques te ayudan a recuperar más rápido.",
+                "keys": ["Resistencia >30: Normal", "10-30: Cansado (x0.8 velocidad)", "≤0: Exhausto (no te mueves)"]
+            },
+            {
+                "title": "Gestión de Pedidos",
+                "message": "Presiona O para ver pedidos disponibles, I para inventario. Usa E en puntos de recogida y entrega. Los pedidos NO aparecen en edificios bloqueados.",
+                "keys": ["O: Ver pedidos", "I: Inventario", "E: Interactuar", "ENTER para continuar"]
+            },
+            {
+                "title": "Algoritmos de Ordenamiento",
+                "message": "Usa algoritmos para organizar pedidos: P (por prioridad), T (por tiempo restante), D (Insertion Sort por distancia).",
+                "keys": ["P: Ordenar por prioridad", "T: Ordenar por tiempo", "D: Ordenar por distancia", "ENTER para comenzar"]
+            }
+        ]
+        
+        self.current_step = 0
+        self.tutorial_active = True
+        self.font = pygame.font.Font(None, 28)
+        self.title_font = pygame.font.Font(None, 36)
+        self.small_font = pygame.font.Font(None, 20)
+    
+    def handle_input(self, event) -> bool:
+        if not self.tutorial_active:
+            return False
+            
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_RETURN:
+            self.current_step += 1
+            if self.current_step >= len(self.tutorial_steps):
+                self.tutorial_active = False
+                return False
+        
+        return True
+    
+    def draw(self, screen):
+        if not self.tutorial_active or self.current_step >= len(self.tutorial_steps):
+            return
+        
+        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+        overlay.set_alpha(200)
+        overlay.fill((0, 0, 0))
+        screen.blit(overlay, (0, 0))
+        
+        step = self.tutorial_steps[self.current_step]
+        
+        panel_width = 900
+        panel_height = 500
+        panel_x = (WINDOW_WIDTH - panel_width) // 2
+        panel_y = (WINDOW_HEIGHT - panel_height) // 2
+        
+        panel_rect = pygame.Rect(panel_x, panel_y, panel_width, panel_height)
+        pygame.draw.rect(screen, (40, 50, 70), panel_rect, border_radius=15)
+        pygame.draw.rect(screen, (100, 150, 200), panel_rect, 3, border_radius=15)
+        
+        title = self.title_font.render(step["title"], True, (255, 255, 255))
+        title_rect = title.get_rect(center=(WINDOW_WIDTH // 2, panel_y + 50))
+        screen.blit(title, title_rect)
+        
+        self._draw_wrapped_text(screen, step["message"], 
+                               panel_x + 40, panel_y + 100, 
+                               panel_width - 80, self.font, (220, 220, 220))
+        
+        controls_y = panel_y + panel_height - 150
+        for i, key_info in enumerate(step["keys"]):
+            key_text = self.small_font.render(f"• {key_info}", True, (150, 200, 255))
+            screen.blit(key_text, (panel_x + 40, controls_y + i * 25))
+        
+        progress_text = f"Paso {self.current_step + 1} de {len(self.tutorial_steps)}"
+        progress = self.small_font.render(progress_text, True, (150, 150, 150))
+        progress_rect = progress.get_rect(center=(WINDOW_WIDTH // 2, panel_y + panel_height - 20))
+        screen.blit(progress, progress_rect)
+    
+    def _draw_wrapped_text(self, surface, text, x, y, max_width, font, color):
+        words = text.split(' ')
+        lines = []
+        current_line = []
+        
+        for word in words:
+            test_line = ' '.join(current_line + [word])
+            if font.size(test_line)[0] <= max_width:
+                current_line.append(word)
+            else:
+                if current_line:
+                    lines.append(' '.join(current_line))
+                    current_line = [word]
+                else:
+                    lines.append(word)
+        
+        if current_line:
+            lines.append(' '.join(current_line))
+        
+        for i, line in enumerate(lines):
+            line_surface = font.render(line, True, color)
+            surface.blit(line_surface, (x, y + i * (font.get_height() + 5)))
+    
+    def is_active(self) -> bool:
+        return self.tutorial_active
+
+# =============================================================================
+# SISTEMA DE RENDERIZADO
+# =============================================================================
+
+class DirtyRectRenderer:
+    """Publica en pantalla solo las regiones que cambiaron desde el frame anterior.
+
+    Cada capa registra con mark() la región que ocupa un elemento y una firma
+    de su contenido. Una región se publica si el elemento es nuevo, desapareció,
+    se movió o cambió su firma; una firma None la marca como sucia siempre.
+    """
+
+    # Con demasiadas regiones sale más barato publicar la pantalla completa
+    MAX_DIRTY_RECTS = 48
+
+    def __init__(self):
+        self.previous_regions = {}
+        self.current_regions = {}
+        self.full_redraw = True
+
+    def invalidate(self):
+        """Fuerza a publicar la pantalla completa en el próximo frame."""
+        self.full_redraw = True
+
+    def begin_frame(self):
+        self.current_regions = {}
+
+    def mark(self, layer: str, key, rect, signature=None):
+        """Registra la región de un elemento de una capa y la firma de su contenido."""
+        self.current_regions[(layer, key)] = (pygame.Rect(rect), signature)
+
+    def end_frame(self) -> List[pygame.Rect]:
+        """Compara con el frame anterior y devuelve las regiones sucias."""
+        dirty = []
+        previous_regions = self.previous_regions
+
+        for region_key, (rect, signature) in self.current_regions.items():
+            previous = previous_regions.get(region_key)
+            if previous is None:
+                dirty.append(rect)
+            elif previous[0] != rect:
+                dirty.append(rect)
+                dirty.append(previous[0])
+            elif signature is None or previous[1] != signature:
+                dirty.append(rect)
+
+        for region_key, (rect, _) in previous_regions.items():
+            if region_key not in self.current_regions:
+                dirty.append(rect)
+
+        self.previous_regions = self.current_regions
+        self.current_regions = {}
+        return dirty
+
+    def present(self, screen_rect: pygame.Rect):
+        """Publica las regiones sucias (o la pantalla completa si hace falta)."""
+        dirty = self.end_frame()
+
+        if self.full_redraw or len(dirty) > self.MAX_DIRTY_RECTS:
+            pygame.display.flip()
+            self.full_redraw = False
+        elif dirty:
+            pygame.display.update([rect.clip(screen_rect) for rect in dirty])
+
+
+class RetainedPanel:
+    """Panel de interfaz que conserva su propia superficie ya dibujada.
+
+    Solo se vuelve a rasterizar cuando cambia el snapshot de los valores que
+    muestra o la región que ocupa; el resto de frames se reutiliza tal cual.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.rect = None
+        self.surface = None
+        self.snapshot = None
+        self.redraws = 0
+
+    def needs_redraw(self, rect: pygame.Rect, snapshot) -> bool:
+        return self.surface is None or self.rect != rect or self.snapshot != snapshot
+
+    def redraw(self, rect: pygame.Rect, snapshot, draw_fn):
+        """Rasteriza el panel llamando a draw_fn(surface) en coordenadas locales."""
+        if self.surface is None or self.surface.get_size() != rect.size:
+            self.surface = pygame.Surface(rect.size, pygame.SRCALPHA)
+        else:
+            self.surface.fill((0, 0, 0, 0))
+        draw_fn(self.surface)
+        self.rect = pygame.Rect(rect)
+        self.snapshot = snapshot
+        self.redraws += 1
+
+    def invalidate(self):
+        self.snapshot = None
+        self.surface = None
+
+
+class TextSurfaceCache:
+    """Caché LRU acotado de superficies de texto ya renderizadas.
+
+    La clave es (fuente, texto, antialias, color, fondo). Las superficies
+    devueltas son compartidas: quien necesite modificarlas (p. ej. set_alpha)
+    debe trabajar sobre una copia.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font: pygame.font.Font, text: str, antialias: bool,
+               color, background=None) -> pygame.Surface:
+        key = (font, text, bool(antialias), tuple(color),
+               tuple(background) if background is not None else None)
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        if background is None:
+            surface = font.render(text, antialias, color)
+        else:
+            surface = font.render(text, antialias, color, background)
+        self.entries[key] = surface
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return surface
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate()
+        }
+
+    def clear(self):
+        self.entries.clear()
+
+
+class CachedFont:
+    """Envoltorio de pygame.font.Font cuyo render() pasa por un TextSurfaceCache."""
+
+    def __init__(self, font: pygame.font.Font, cache: TextSurfaceCache):
+        self._font = font
+        self._cache = cache
+
+    def render(self, text: str, antialias: bool, color, background=None) -> pygame.Surface:
+        return self._cache.render(self._font, text, antialias, color, background)
+
+    def __getattr__(self, name):
+        # size(), get_height(), etc. se delegan a la fuente real
+        return getattr(self._font, name)
+
+# =============================================================================
+# CLASE PRINCIPAL DEL JUEGO CORREGIDA
+# =============================================================================
+
+class CourierQuest:
+    """Clase principal del juego Courier Quest - VERSIÓN CON IMÁGENES."""
+    
+    # Filas visibles en los overlays de pedidos e inventario
+    OVERLAY_ROWS = 7
+    # Diario de autoguardado; solo el juego con ventana lo usa
+    autosave = None
+    
+    def __init__(self):
+        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        pygame.display.set_caption("Courier Quest - Versión con Imágenes")
+        self.clock = pygame.time.Clock()
+        
+        # Fuentes optimizadas (comparten un caché de superficies de texto)
+        self.text_cache = TextSurfaceCache()
+        self.font = CachedFont(pygame.font.Font(None, 24), self.text_cache)
+        self.small_font = CachedFont(pygame.font.Font(None, 20), self.text_cache)
+        self.large_font = CachedFont(pygame.font.Font(None, 32), self.text_cache)
+        self.title_font = CachedFont(pygame.font.Font(None, 38), self.text_cache)
+        self.header_font = CachedFont(pygame.font.Font(None, 28), self.text_cache)
+
+        # Sistema de imágenes para tiles, clima Y JUGADOR
+        self.tile_images = {}
+        self.weather_images = {}
+        self.player_image = None  # ← NUEVA LÍNEA AGREGADA
+
+        # Sistemas del juego (mantener todo lo existente)
+        self.api_manager = TigerAPIManager()
+        self.weather_system = EnhancedWeatherSystem()
+        self.menu_system = GameMenu()
+        self.tutorial_system = TutorialSystem()
+
+        self._init_simulation_state()
+        self.autosave = AutosaveJournal(self.file_manager)
+
+        # Capa estática del mapa: se pre-renderiza una vez y se reconstruye
+        # solo cuando cambian tiles, legend o tile_images
+        self._map_surface = None
+        self._map_surface_sources = None
+
+        # Renderizado por rectángulos sucios y paneles laterales retenidos
+        self.renderer = DirtyRectRenderer()
+        self.sidebar_panels = {}
+
+        # Interpolación del dibujo entre ticks de la simulación
+        self.previous_player_pos = None
+        self.render_alpha = 1.0
+
+        # Cargar imágenes de tiles, clima Y JUGADOR
+        self._load_tile_images()
+        self._load_weather_images()
+        self._load_player_image()  # ← NUEVA LÍNEA AGREGADA
+        
+        self._ensure_data_files()
+        print(" Courier Quest inicializado - VERSIÓN CON IMÁGENES COMPLETAS + JUGADOR")
+
+    def _init_simulation_state(self):
+        """Estado de la simulación (mundo, jugador, pedidos) sin nada de pantalla.
+
+        Lo comparten el juego con ventana y HeadlessCourierQuest; api_manager y
+        weather_system deben existir antes de llamarlo.
+        """
+        self.history = MemoryEfficientHistory()
+        self.file_manager = RobustFileManager()
+        self.sorting_algorithms = SortingAlgorithms()
+        self.pathfinder = PathfindingService()
+
+        # Estados del juego (mantener todo lo existente)
+        self.game_state = "menu"
+        self.running = True
+        self.paused = False
+        self.game_over = False
+        self.victory = False
+
+        # Datos del mundo - DESDE API REAL CON CORRECCIONES
+        self.map_data = {}
+        self.city_width = 30
+        self.city_height = 25
+        self.tiles = []
+        self.legend = {}
+        self.goal = 3000
+        self.city_name = "TigerCity"
+        self.max_game_time = 600.0
+        self.compile_map()
+
+        # POSICIÓN DEL MAPA CORREGIDA
+        self.map_offset_x = 20
+        self.map_offset_y = 35
+        self.map_pixel_width = self.city_width * TILE_SIZE
+        self.map_pixel_height = self.city_height * TILE_SIZE
+
+        # Estado del jugador (mantener todo lo existente)
+        self.player_pos = Position(2, 2)
+        self.stamina = 100.0        
+        self.max_stamina = 100.0      
+        self.reputation = 70
+        self.money = 0
+        self.max_weight = 10
+        self.base_speed = 3.0
+
+        # Tiempo del juego
+        self.game_time = 0.0
+
+        # Gestión de pedidos - ESTRUCTURAS DE DATOS CORRECTAS
+        self.pending_orders = ReleaseScheduler()
+        self.available_orders = OptimizedPriorityQueue()
+        self.inventory = self._new_inventory()
+        self.completed_orders = []
+        # Vencimientos de pedidos activos (disponibles o en inventario), por
+        # identidad del pedido como la cola y el inventario
+        self.expiry_scheduler = DeadlineScheduler()
+        # Recogidas del tablero y entregas del inventario por celda
+        self.order_index = OrderSpatialIndex()
+
+        # Estadísticas
+        self.delivery_streak = 0
+        self.last_delivery_was_clean = True
+        self.expired_orders_count = 0
+
+        # Interfaz de usuario
+        self.show_inventory = False
+        self.show_orders = False
+        self.selected_order_index = 0
+        self.selected_inventory_index = 0
+        # Primera fila visible de cada overlay (se desplaza con la selección)
+        self.orders_scroll = 0
+        self.inventory_scroll = 0
+        # Mantiene los pedidos ordenados por distancia mientras el jugador se mueve
+        self.auto_sort_by_distance = False
+
+        # Control de movimiento
+        self.move_cooldown = 0.08
+        self.last_move_time = 0
+
+        # Mensajes del juego
+        self.game_messages = []
+        self.message_timer = 0
+
+        # Métricas de rendimiento
+        self.fps_counter = 0
+        self.fps_timer = 0
+        self.current_fps = 60
+
+
+
+    def _load_player_image(self):
+        """ NUEVO: Carga la imagen del jugador/repartidor."""
+        try:
+            # Cargar imagen del repartidor
+            player_image = pygame.image.load("Repartidor.png")
+            # Redimensionar la imagen al tamaño del tile (con pequeño margen)
+            player_size = TILE_SIZE - 4  # Un poco más pequeño que el tile para mejor visibilidad
+            self.player_image = pygame.transform.scale(player_image, (player_size, player_size))
+            print(" Imagen del repartidor cargada correctamente desde Repartidor.png")
+            
+        except FileNotFoundError as e:
+            print(f" No se pudo cargar imagen del repartidor: {e}")
+            print(" Asegúrate de que exista 'Repartidor.png' en la carpeta del juego")
+            self._create_fallback_player_image()
+        except Exception as e:
+            print(f" Error cargando imagen del repartidor: {e}")
+            self._create_fallback_player_image()
+
+
+
+    def _create_fallback_player_image(self):
+        """Crea una imagen de respaldo para el jugador si no se puede cargar la original."""
+        player_size = TILE_SIZE - 4
+        fallback_surface = pygame.Surface((player_size, player_size), pygame.SRCALPHA)
+        
+        # Crear un repartidor simple usando formas geométricas
+        center_x = player_size // 2
+        center_y = player_size // 2
+        
+        # Cuerpo (círculo azul)
+        pygame.draw.circle(fallback_surface, BLUE, (center_x, center_y), player_size // 3)
+        
+        # Cabeza (círculo más pequeño, color piel)
+        head_color = (255, 220, 177)  # Color piel
+        pygame.draw.circle(fallback_surface, head_color, (center_x, center_y - player_size // 4), player_size // 6)
+        
+        # Casco/gorra (semicírculo)
+        helmet_color = (255, 255, 0)  # Amarillo
+        helmet_rect = pygame.Rect(center_x - player_size // 8, center_y - player_size // 3, player_size // 4, player_size // 6)
+        pygame.draw.ellipse(fallback_surface, helmet_color, helmet_rect)
+        
+        # Borde del jugador
+        pygame.draw.circle(fallback_surface, BLACK, (center_x, center_y), player_size // 3, 2)
+        
+        self.player_image = fallback_surface
+
+    def _load_weather_images(self):
+        """Carga las imágenes para los diferentes estados del clima."""
+        
+        # Mapeo de estados del clima a archivos de imagen
+        weather_files = {
+            'clear': 'Despejado.png',
+            'clouds': 'Nublado.png', 
+            'rain_light': 'Llovizna.png',
+            'rain': 'Lluvioso.png',
+            'storm': 'Tormenta.png',
+            'fog': 'Nublado.png',     
+            'wind': 'Ventoso.png',
+            'heat': 'Despejado.png',  
+            'cold': 'Ventoso.png'     
+        }
+        
+        weather_loaded = 0
+        weather_size = 60  
+        
+        for weather_state, filename in weather_files.items():
+            try:
+                weather_image = pygame.image.load(filename)
+                # Redimensionar al tamaño más grande
+                self.weather_images[weather_state] = pygame.transform.scale(weather_image, (weather_size, weather_size))
+                print(f" Imagen de clima '{weather_state}' cargada desde {filename} (Tamaño: {weather_size}x{weather_size})")
+                weather_loaded += 1
+            except Exception as e:
+                print(f" No se pudo cargar imagen de clima '{weather_state}' desde {filename}: {e}")
+        
+        # Resumen de carga de clima
+        total_weather_states = len(weather_files)
+        if weather_loaded == total_weather_states:
+            print(f" ¡PERFECTO! Todas las {weather_loaded} imágenes de clima cargadas (Tamaño: {weather_size}x{weather_size})")
+        elif weather_loaded > 0:
+            print(f" {weather_loaded}/{total_weather_states} imágenes de clima cargadas (Tamaño: {weather_size}x{weather_size})")
+        else:
+            print(" No se pudieron cargar imágenes de clima. Usando círculos de colores de respaldo")
+        
+        # Crear respaldos para climas sin imagen
+        self._create_weather_fallbacks()
+
+
+    def _create_weather_fallbacks(self):
+        """Crea íconos de respaldo para climas sin imagen."""
+        
+        weather_size = 75  
+        
+        # Colores de respaldo para cada clima
+        weather_colors = {
+            'clear': (200, 150, 100),
+            'clouds': (180, 180, 180),
+            'rain_light': (100, 150, 200),
+            'rain': (70, 120, 180),
+            'storm': (50, 50, 100),
+            'fog': (200, 200, 200),
+            'wind': (150, 200, 150),
+            'heat': (255, 100, 100),
+            'cold': (150, 200, 255)
+        }
+        
+        for weather_state, color in weather_colors.items():
+            if weather_state not in self.weather_images:
+                # Crear superficie circular de respaldo ajustada
+                fallback_surface = pygame.Surface((weather_size, weather_size), pygame.SRCALPHA)
+                pygame.draw.circle(fallback_surface, color, (weather_size//2, weather_size//2), weather_size//2 - 2)
+                pygame.draw.circle(fallback_surface, (100, 100, 100), (weather_size//2, weather_size//2), weather_size//2 - 2, 2)
+                
+                self.weather_images[weather_state] = fallback_surface
+                print(f" Ícono de respaldo creado para clima '{weather_state}' (Tamaño: {weather_size}x{weather_size})")
+
+        
+    def _load_tile_images(self):
+        """Carga las imágenes para todos los tipos de tiles."""
+        images_loaded = 0
+        
+        try:
+            #  Cargar imagen de parque
+            park_image = pygame.image.load("pixilart-drawing.png")
+            self.tile_images["P"] = pygame.transform.scale(park_image, (TILE_SIZE, TILE_SIZE))
+            print(" Imagen de parque cargada desde pixilart-drawing.png")
+            images_loaded += 1
+        except Exception as e:
+            print(f" No se pudo cargar imagen de parque: {e}")
+        
+        try:
+            #  Cargar imagen de calle
+            street_image = pygame.image.load("pixil-frame-0 (1).png")
+            self.tile_images["C"] = pygame.transform.scale(street_image, (TILE_SIZE, TILE_SIZE))
+            print(" Imagen de calle cargada desde pixil-frame-0 (1).png")
+            images_loaded += 1
+        except Exception as e:
+            print(f" No se pudo cargar imagen de calle: {e}")
+        
+        try:
+            # Cargar imagen de edificio
+            building_image = pygame.image.load("pixil-frame-0 (2).png")
+            self.tile_images["B"] = pygame.transform.scale(building_image, (TILE_SIZE, TILE_SIZE))
+            print(" Imagen de edificio cargada desde pixil-frame-0 (2).png")
+            images_loaded += 1
+        except Exception as e:
+            print(f"⚠️ No se pudo cargar imagen de edificio: {e}")
+        
+        # Resumen de carga
+        if images_loaded == 3:
+            print(f" ¡PERFECTO! Todas las {images_loaded} imágenes PNG cargadas correctamente")
+        elif images_loaded > 0:
+            print(f" {images_loaded}/3 imágenes PNG cargadas. Usando respaldo para las faltantes")
+        else:
+            print(" No se pudieron cargar imágenes PNG. Usando gráficos de respaldo")
+        
+        # Crear respaldos para las imágenes que no se pudieron cargar
+        self._create_fallback_images()
+
+
+    def get_complete_image_status(self):
+        """MODIFICADO: Obtiene el estado completo de todas las imágenes cargadas incluyendo jugador."""
+        tile_count = len(self.tile_images)
+        
+        # Contar imágenes únicas de clima (sin contar respaldos)
+        unique_weather_files = set()
+        weather_files = {
+            'clear': 'Despejado.png',
+            'clouds': 'Nublado.png', 
+            'rain_light': 'Llovizna.png',
+            'rain': 'Lluvioso.png',
+            'storm': 'Tormenta.png',
+            'fog': 'Nublado.png',
+            'wind': 'Ventoso.png',
+            'heat': 'Despejado.png',
+            'cold': 'Ventoso.png'
+        }
+        
+        for state in self.weather_images:
+            if state in weather_files:
+                unique_weather_files.add(weather_files[state])
+        
+        weather_count = len(unique_weather_files)
+        
+        # Verificar si se cargó la imagen del jugador
+        has_player_image = self.player_image is not None
+        
+        # Estado completo
+        if tile_count == 3 and weather_count >= 5 and has_player_image:
+            return " Imágenes completas: 3 tiles + clima + jugador"
+        elif tile_count == 3 and has_player_image:
+            return f" 3 tiles PNG + {weather_count} clima + jugador"
+        elif weather_count >= 5 and has_player_image:
+            return f" {tile_count} tiles + clima completo + jugador"
+        elif has_player_image:
+            return f" {tile_count} tiles + {weather_count} clima + jugador + respaldo"
+        elif tile_count > 0 or weather_count > 0:
+            return f" {tile_count} tiles + {weather_count} clima + jugador respaldo"
+        else:
+            return " Solo gráficos de respaldo (incluye jugador)"
+
+    def _create_fallback_images(self):
+        """Crea imágenes de respaldo para los tiles que no tienen imagen PNG."""
+        
+        if "P" not in self.tile_images:
+            park_surface = pygame.Surface((TILE_SIZE, TILE_SIZE))
+            park_surface.fill(GREEN)
+            
+            # Dibujar algunos "árboles" simples
+            tree_color = (0, 100, 0)
+            for i in range(3):
+                for j in range(3):
+                    if (i + j) % 2 == 0:  # Patrón de tablero
+                        tree_rect = pygame.Rect(
+                            i * (TILE_SIZE // 3) + 2, 
+                            j * (TILE_SIZE // 3) + 2, 
+                            TILE_SIZE // 3 - 4, 
+                            TILE_SIZE // 3 - 4
+                        )
+                        pygame.draw.ellipse(park_surface, tree_color, tree_rect)
+            
+            self.tile_images["P"] = park_surface
+            print(" Imagen de respaldo para parque creada")
+        
+        
+        if "C" not in self.tile_images:
+            street_surface = pygame.Surface((TILE_SIZE, TILE_SIZE))
+            street_surface.fill(LIGHT_GRAY)
+            
+            # Dibujar líneas de calle
+            line_color = (180, 180, 180)
+            # Línea central horizontal
+            pygame.draw.line(street_surface, line_color, 
+                        (0, TILE_SIZE // 2), (TILE_SIZE, TILE_SIZE // 2), 2)
+            # Línea central vertical
+            pygame.draw.line(street_surface, line_color, 
+                        (TILE_SIZE // 2, 0), (TILE_SIZE // 2, TILE_SIZE), 2)
+            
+            self.tile_images["C"] = street_surface
+            print(" Imagen de respaldo para calle creada")
+        
+       
+        if "B" not in self.tile_images:
+            building_surface = pygame.Surface((TILE_SIZE, TILE_SIZE))
+            building_surface.fill(DARK_GRAY)
+            
+            # Dibujar ventanas del edificio
+            window_color = (100, 100, 100)
+            for i in range(2):
+                for j in range(2):
+                    window_rect = pygame.Rect(
+                        4 + i * (TILE_SIZE // 2 - 2), 
+                        4 + j * (TILE_SIZE // 2 - 2),
+                        TILE_SIZE // 2 - 8, 
+                        TILE_SIZE // 2 - 8
+                    )
+                    pygame.draw.rect(building_surface, window_color, window_rect)
+            
+            self.tile_images["B"] = building_surface
+            print("✅ Imagen de respaldo para edificio creada")
+
+    # ✅ NUEVO MÉTODO: Obtener colores base
+    def _get_tile_base_color(self, tile_type):
+        """Obtiene el color base para un tipo de tile."""
+        if tile_type == "C":
+            return LIGHT_GRAY  # Calles
+        elif tile_type == "B":
+            return DARK_GRAY   # Edificios bloqueados
+        elif tile_type == "P":
+            return GREEN       # Parques (color de fondo)
+        elif tile_type == "R":
+            return PURPLE      # Puntos de descanso
+        else:
+            return WHITE       # Desconocido
+    
+    def _ensure_data_files(self):
+        os.makedirs("data", exist_ok=True)
+        os.makedirs("saves", exist_ok=True)
+        os.makedirs("api_cache", exist_ok=True)
+    
+    def initialize_game_data(self):
+        """INICIALIZACIÓN CORREGIDA - Carga datos del mapa correctamente."""
+        try:
+            print("Inicializando datos del juego...")
+            
+            # Obtener mapa y pedidos desde la API real
+            map_data = self.api_manager.get_city_map()
+            self.pathfinder.sync(CompiledMap(map_data.get('tiles', []), map_data.get('legend', {}),
+                                             map_data.get('width', 30), map_data.get('height', 25)))
+            orders_data = self.api_manager.get_city_jobs(self.pathfinder)
+            self._apply_world_data(map_data, orders_data)
+            
+            # Mensaje de bienvenida
+            self.add_game_message(f"¡Bienvenido a {self.city_name}! Meta: ${self.goal}", 4.0, GREEN)
+            
+        except Exception as e:
+            print(f" Error cargando datos del mundo: {e}")
+            self._create_fallback_data()
+        
+        if self.autosave is not None:
+            self.autosave.close()
+    
+    def _apply_world_data(self, map_data: dict, orders_data: List[Order]):
+        """Aplica un mapa y su lista de pedidos validando posiciones."""
+        self.map_data = map_data
+        
+        # CORRECCIÓN: Extraer datos del mapa correctamente
+        self.city_width = self.map_data.get('width', 30)
+        self.city_height = self.map_data.get('height', 25)
+        self.tiles = self.map_data.get('tiles', [])
+        self.legend = self.map_data.get('legend', {})
+        self.goal = self.map_data.get('goal', 3000)
+        self.city_name = self.map_data.get('city_name', 'TigerCity')
+        self.max_game_time = self.map_data.get('max_time', 600.0)
+        
+        # CORRECCIÓN: Recalcular dimensiones del mapa según datos reales
+        self.map_pixel_width = self.city_width * TILE_SIZE
+        self.map_pixel_height = self.city_height * TILE_SIZE
+        self.compile_map()
+        self.invalidate_map_surface()
+
+        # VALIDAR POSICIÓN INICIAL DEL JUGADOR
+        self.player_pos = self._find_valid_starting_position()
+        
+        # APLICAR REGLAS DE VALIDACIÓN DE PEDIDOS
+        for order_data in orders_data:
+            try:
+                # REGLA: Los pedidos NO pueden estar en edificios bloqueados
+                if not self._validate_order_positions(order_data):
+                    print(f" Pedido {order_data.id} tiene posiciones inválidas, corrigiendo...")
+                    order_data = self._fix_order_positions(order_data)
+                
+                self.pending_orders.add(self.compiled_map.intern_order(order_data))
+            except (KeyError, ValueError) as e:
+                print(f" Error cargando pedido: {e}")
+                continue
+        
+        print(f" {self.city_name} cargada: {self.city_width}x{self.city_height}")
+        print(f" {len(self.pending_orders)} pedidos validados cargados")
+        print(f" Meta: ${self.goal} | Tiempo: {self.max_game_time}s")
+        print(f" Jugador iniciado en posición válida: ({self.player_pos.x}, {self.player_pos.y})")
+
+    def _find_valid_starting_position(self) -> Position:
+        """Encuentra una posición inicial válida para el jugador."""
+        # Intentar posiciones comunes primero
+        common_positions = [
+            (2, 2), (3, 3), (1, 1), (4, 4), (5, 5),
+            (2, 3), (3, 2), (1, 2), (2, 1)
+        ]
+        
+        for x, y in common_positions:
+            if self._is_position_walkable(x, y):
+                print(f" Posición inicial válida encontrada: ({x}, {y})")
+                return self.compiled_map.position(x, y)
+        
+        # Buscar cualquier posición válida
+        for y in range(min(10, self.city_height)):
+            for x in range(min(10, self.city_width)):
+                if self._is_position_walkable(x, y):
+                    print(f" Posición inicial de respaldo: ({x}, {y})")
+                    return self.compiled_map.position(x, y)
+        
+        # Fallback final
+        print(" No se encontró posición válida, usando (1, 1)")
+        return self.compiled_map.position(1, 1)
+    
+    def _is_position_walkable(self, x: int, y: int) -> bool:
+        """Verifica si una posición es caminable según las reglas del juego"""
+        return self.compiled_map.is_walkable(x, y)
+    
+    def _validate_order_positions(self, order: Order) -> bool:
+        """Valida que las posiciones del pedido sean válidas."""
+        pickup_valid = self._is_position_walkable(order.pickup.x, order.pickup.y)
+        dropoff_valid = self._is_position_walkable(order.dropoff.x, order.dropoff.y)
+        
+        if not pickup_valid:
+            print(f" Pickup de {order.id} en posición bloqueada: ({order.pickup.x}, {order.pickup.y})")
+        if not dropoff_valid:
+            print(f" Dropoff de {order.id} en posición bloqueada: ({order.dropoff.x}, {order.dropoff.y})")
+        
+        return pickup_valid and dropoff_valid
+    
+    def _fix_order_positions(self, order: Order) -> Order:
+        """Corrige las posiciones de un pedido para que sean válidas"""
+        # Corregir pickup si es necesario
+        if not self._is_position_walkable(order.pickup.x, order.pickup.y):
+            order.pickup = self._find_nearest_walkable_position(order.pickup.x, order.pickup.y)
+            print(f" Pickup corregido a: ({order.pickup.x}, {order.pickup.y})")
+        
+        # Corregir dropoff si es necesario
+        if not self._is_position_walkable(order.dropoff.x, order.dropoff.y):
+            order.dropoff = self._find_nearest_walkable_position(order.dropoff.x, order.dropoff.y)
+            print(f" Dropoff corregido a: ({order.dropoff.x}, {order.dropoff.y})")
+        
+        return order
+    
+    def _find_nearest_walkable_position(self, x: int, y: int) -> Position:
+        """Encuentra la posición caminable más cercana (tabla precalculada por mapa)"""
+        index = self.compiled_map.nearest_walkable_index(x, y)
+        if index is None:
+            return self.compiled_map.position(1, 1)  # Último recurso: el mapa no tiene celdas caminables
+        
+        width = self.compiled_map.width
+        return self.compiled_map.position(index % width, index // width)
+    
+    def _create_fallback_data(self):
+        """Crea datos por defecto si falla la carga de la API."""
+        self.city_width = 20
+        self.city_height = 15
+        self.tiles = [["C"] * 20 for _ in range(15)]
+        self.legend = {"C": {"name": "calle", "surface_weight": 1.00}}
+        self.goal = 2000
+        self.city_name = "Ciudad de Respaldo"
+        self.max_game_time = 600.0
+        self.map_pixel_width = self.city_width * TILE_SIZE
+        self.map_pixel_height = self.city_height * TILE_SIZE
+        self.compile_map()
+        self.invalidate_map_surface()
+        print("🔧 Usando datos de respaldo")
+
+    def add_game_message(self, message: str, duration: float = 3.0, color: tuple = WHITE):
+        """Añade un mensaje temporal al juego."""
+        self.game_messages.append((message, duration, color))
+    
+    # SISTEMA DE TIEMPO Y URGENCIA
+    def get_order_time_remaining(self, order: Order) -> float:
+        """Calcula el tiempo restante de un pedido."""
+        if order.status == "waiting_release":
+            return order.duration_minutes * 60
+        
+        elapsed_since_created = self.game_time - order.created_at
+        total_duration_seconds = order.duration_minutes * 60
+        return max(0, total_duration_seconds - elapsed_since_created)
+    
+    def get_order_urgency_color(self, order: Order) -> tuple:
+        """Determina el color basado en urgencia del pedido."""
+        time_remaining = self.get_order_time_remaining(order)
+        return URGENCY_COLORS[self.urgency_level(time_remaining, order.duration_minutes * 60)]
+    
+    @staticmethod
+    def urgency_level(time_remaining: float, duration: float) -> int:
+        """0 expirado, 1 queda <= 33%, 2 queda <= 66%, 3 el resto."""
+        if time_remaining <= 0:
+            return 0
+        progress = time_remaining / duration if duration > 0 else 0.0
+        if progress > 0.66:
+            return 3
+        if progress > 0.33:
+            return 2
+        return 1
+    
+    def get_order_status_text(self, order: Order) -> str:
+        return self.format_time_remaining(self.get_order_time_remaining(order))
+    
+    @staticmethod
+    def format_time_remaining(time_remaining: float) -> str:
+        if time_remaining <= 0:
+            return "EXPIRADO"
+        
+        minutes = int(time_remaining // 60)
+        seconds = int(time_remaining % 60)
+        
+        if minutes > 0:
+            return f"{minutes}:{seconds:02d}"
+        else:
+            return f"0:{seconds:02d}"
+    
+    def get_pathfinder(self) -> PathfindingService:
+        """Servicio de rutas sincronizado con el mapa actual."""
+        self.pathfinder.sync(self.compiled_map)
+        return self.pathfinder
+    
+    def compile_map(self):
+        """Reconstruye el mapa compilado; llamar siempre que cambien tiles o legend."""
+        self.compiled_map = CompiledMap(self.tiles, self.legend, self.city_width, self.city_height)
+    
+    def travel_distance(self, start: Position, target: Position) -> float:
+        """Costo de viaje real entre dos celdas; Manhattan si no hay ruta."""
+        cost = self.get_pathfinder().travel_cost(start, target)
+        if cost == math.inf:
+            return abs(target.x - start.x) + abs(target.y - start.y)
+        return cost
+    
+    def _get_district_name(self, x: int, y: int) -> str:
+        """Sistema de distritos para mejor organización"""
+        if y < self.city_height // 3:
+            return "Norte"
+        elif y < 2 * self.city_height // 3:
+            return "Centro"  
+        else:
+            return "Sur"
+    
+    def handle_events(self, events):
+        """Maneja eventos de pygame."""
+        for event in events:
+            if event.type == pygame.QUIT:
+                self.running = False
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                # La ventana se volvió a mostrar: hay que publicarla completa
+                self.renderer.invalidate()
+            elif event.type == pygame.KEYDOWN:
+                if self.game_state == "playing":
+                    self._handle_game_events(event)
+                elif self.game_state == "menu":
+                    self._handle_menu_events(event)
+                elif self.game_state == "tutorial":
+                    self._handle_tutorial_events(event)
+                elif self.game_state == "game_over": 
+                    self._handle_game_over_events(event)
+
+
+    def _handle_game_over_events(self, event):
+        """Maneja eventos durante el game over."""
+        if event.key == pygame.K_ESCAPE:
+            print("\n Volviendo al menú principal...")
+            
+            self.game_state = "menu"
+            self.game_over = False
+            self.victory = False
+            
+            if hasattr(self, '_score_saved'):
+                delattr(self, '_score_saved')
+                print(" Flag _score_saved eliminado")
+            
+            if hasattr(self, '_final_score_display'):
+                delattr(self, '_final_score_display')
+                print("  Flag _final_score_display eliminado")
+            
+            # Resetear el juego para nueva partida
+            print("  Reinicializando juego...")
+            self.__init__()
+    
+    def _handle_game_events(self, event):
+        """Maneja eventos durante el juego."""
+        if event.key == pygame.K_SPACE:
+            self.paused = not self.paused
+        elif event.key == pygame.K_i:
+            self.show_inventory = not self.show_inventory
+            if self.show_inventory:
+                self.selected_inventory_index = 0
+                self.inventory_scroll = 0
+        elif event.key == pygame.K_o:
+            self.show_orders = not self.show_orders
+            if self.show_orders:
+                self.selected_order_index = 0
+                self.orders_scroll = 0
+        elif event.key == pygame.K_ESCAPE:
+            if self.game_over:
+                self.game_state = "menu"
+                self.game_over = False
+                self.victory = False
+            else:
+                self.paused = not self.paused
+        elif event.key == pygame.K_e:
+            self.interact_at_position()
+        elif event.key == pygame.K_F5:
+            self.save_game()
+        elif event.key == pygame.K_F9:
+            if event.mod & pygame.KMOD_SHIFT:
+                self.recover_autosave()
+            else:
+                self.load_game()
+        elif event.key == pygame.K_z and pygame.key.get_pressed()[pygame.K_LCTRL]:
+            self.undo_move()
+        elif event.key == pygame.K_p:
+            self._sort_inventory_by_priority()
+        elif event.key == pygame.K_t:
+            self._sort_inventory_by_deadline()
+        elif event.key == pygame.K_d:
+            if event.mod & pygame.KMOD_SHIFT:
+                self._toggle_auto_sort_by_distance()
+            else:
+                self._sort_orders_by_distance()
+        
+        # Navegación en menús
+        elif self.show_inventory:
+            if event.key == pygame.K_UP:
+                self.selected_inventory_index = max(0, self.selected_inventory_index - 1)
+            elif event.key == pygame.K_DOWN:
+                max_index = len(self.inventory) - 1
+                self.selected_inventory_index = min(max_index, self.selected_inventory_index + 1)
+            elif event.key == pygame.K_RETURN:
+                self.deliver_selected_order()
+            self.inventory_scroll = self._scroll_to_selection(self.selected_inventory_index, self.inventory_scroll)
+        
+        elif self.show_orders:
+            if event.key == pygame.K_UP:
+                self.selected_order_index = max(0, self.selected_order_index - 1)
+            elif event.key == pygame.K_DOWN:
+                max_index = self.available_orders.size() - 1
+                self.selected_order_index = min(max_index, self.selected_order_index + 1)
+            elif event.key == pygame.K_RETURN:
+                self.accept_selected_order()
+            self.orders_scroll = self._scroll_to_selection(self.selected_order_index, self.orders_scroll)
+    
+    def _scroll_to_selection(self, selected: int, scroll: int) -> int:
+        """Primera fila visible para que selected quede dentro de la ventana del overlay."""
+        if selected < scroll:
+            return max(0, selected)
+        if selected >= scroll + self.OVERLAY_ROWS:
+            return selected - self.OVERLAY_ROWS + 1
+        return scroll
+    
+    def _handle_menu_events(self, event):
+        """Maneja eventos del menú principal."""
+        action = self.menu_system.handle_menu_input(event)
+        if action == "start_new_game":
+            self.initialize_game_data()
+            self.game_state = "playing"
+        elif action == "start_tutorial":
+            self.tutorial_system = TutorialSystem()
+            self.game_state = "tutorial"
+        elif action == "exit":
+            self.running = False
+        elif action and action.startswith("load_slot_"):
+            slot = int(action.split("_")[-1])
+            if self._load_game(slot):
+                self.game_state = "playing"
+        elif action == "load_autosave":
+            if self.recover_autosave():
+                self.game_state = "playing"
+    
+    def _handle_tutorial_events(self, event):
+        """Maneja eventos durante el tutorial."""
+        if not self.tutorial_system.handle_input(event):
+            self.initialize_game_data()
+            self.game_state = "playing"
+    
+    # ALGORITMOS DE ORDENAMIENTO
+    def _sort_inventory_by_priority(self):
+        """Ordena el inventario por prioridad (estable, claves precalculadas)."""
+        if not self.inventory:
+            self.add_game_message("Inventario vacío", 2.0, YELLOW)
+            return
+        
+        inventory_list = list(self.inventory)
+        self.sorting_algorithms.sort_by_priority(inventory_list)
+        self.inventory = self._new_inventory(inventory_list)
+        self.add_game_message("Inventario ordenado por PRIORIDAD", 3.0, GREEN)
+    
+    def _sort_inventory_by_deadline(self):
+        """Ordena el inventario por tiempo restante (estable, claves precalculadas)."""
+        if not self.inventory:
+            self.add_game_message("Inventario vacío", 2.0, YELLOW)
+            return
+        
+        inventory_list = list(self.inventory)
+        self.sorting_algorithms.sort_by_deadline(inventory_list, self.game_time)
+        self.inventory = self._new_inventory(inventory_list)
+        self.add_game_message("Inventario ordenado por TIEMPO RESTANTE", 3.0, GREEN)
+    
+    def _sort_orders_by_distance(self):
+        """Ordena pedidos disponibles por distancia usando Insertion Sort."""
+        if not self.available_orders.items:
+            self.add_game_message("No hay pedidos disponibles", 2.0, YELLOW)
+            return
+        
+        self._resort_orders_by_distance()
+        self.add_game_message("Pedidos ordenados por DISTANCIA (Insertion Sort)", 3.0, GREEN)
+    
+    def _resort_orders_by_distance(self):
+        """Reordena por distancia partiendo del orden actual.
+
+        Tras un paso del jugador o la llegada de pocos pedidos la lista ya está
+        casi ordenada, así que Insertion Sort solo repara las inversiones.
+        """
+        if self.available_orders.size() < 2:
+            return
+        sorted_list = self.sorting_algorithms.insertion_sort_by_distance(
+            self.available_orders.items, self.player_pos,
+            lambda order: self.travel_distance(self.player_pos, order.pickup))
+        self.available_orders.reorder(sorted_list)
+    
+    def _toggle_auto_sort_by_distance(self):
+        self.auto_sort_by_distance = not self.auto_sort_by_distance
+        if self.auto_sort_by_distance:
+            self._resort_orders_by_distance()
+            self.add_game_message("Orden automático por DISTANCIA activado", 2.0, GREEN)
+        else:
+            self.add_game_message("Orden automático por DISTANCIA desactivado", 2.0, GRAY)
+    
+    def handle_input(self, keys, dt):
+        """Maneja entrada del teclado durante el juego."""
+        if self.paused or self.game_over:
+            return
+
+        # ✅ BLOQUEO COMPLETO: Si está exhausto (≤30), no procesar ningún movimiento
+        if self.stamina <= 30:
+            current_time = time.time()
+            if not hasattr(self, '_last_exhausted_message') or current_time - self._last_exhausted_message > 3.0:
+                if self.stamina <= 0:
+                    self.add_game_message("¡EXHAUSTO! Espera a recuperar resistencia hasta 30", 3.0, RED)
+                else:
+                    self.add_game_message(f"Resistencia baja ({self.stamina:.0f}/30). Espera hasta 30 para moverte", 3.0, YELLOW)
+                self._last_exhausted_message = current_time
+            return
+
+        actual_speed = self.calculate_actual_speed()
+        adjusted_cooldown = self.move_cooldown / max(0.1, actual_speed / self.base_speed)
+
+        self.last_move_time += dt
+        if self.last_move_time < adjusted_cooldown:
+            return
+
+        direction = (0, 0)
+        
+        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+            direction = (-1, 0)
+        elif keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+            direction = (1, 0)
+        elif keys[pygame.K_UP] or keys[pygame.K_w]:
+            direction = (0, -1)
+        elif keys[pygame.K_DOWN] or keys[pygame.K_s]:
+            direction = (0, 1)
+        
+        if direction != (0, 0):
+            new_pos = Position(
+                self.player_pos.x + direction[0], 
+                self.player_pos.y + direction[1]
+            )
+            if self.is_valid_move(new_pos):
+                self.move_player(new_pos)
+                self.last_move_time = 0
+            else:
+                # ✅ Mensaje específico cuando el movimiento no es válido por resistencia
+                if self.stamina <= 30:
+                    if self.stamina <= 0:
+                        self.add_game_message("No te puedes mover - ¡Estás exhausto!", 1.5, RED)
+                    else:
+                        self.add_game_message(f"No te puedes mover - Resistencia baja ({self.stamina:.0f}/30)", 1.5, YELLOW)
+    
+    def is_valid_move(self, pos: Position) -> bool:
+        """✅ CORREGIDO: Verifica si un movimiento es válido con regla de exhausto."""
+        # REGLA: No se puede salir del mapa ni caminar en edificios bloqueados
+        if not self.compiled_map.is_walkable(pos.x, pos.y):
+            return False
+        
+        
+        if self.stamina <= 0:
+            return False
+        
+        # REGLA: Necesita resistencia mínima para moverse (debe tener suficiente para el costo)
+        stamina_cost = self.calculate_stamina_cost()
+        return self.stamina >= stamina_cost
+    
+    # SISTEMA DE VELOCIDAD
+    def calculate_actual_speed(self) -> float:
+        """Calcula la velocidad actual considerando todos los factores."""
+        
+        if self.stamina <= 0:
+            return 0.0
+        
+        v0 = self.base_speed  # 3 celdas/seg
+        M_clima = self.weather_system.get_speed_multiplier()
+        
+        # Multiplicador de peso según documento
+        total_weight = self.inventory.total_weight
+        M_peso = max(0.8, 1.0 - 0.03 * total_weight)
+        
+        # Multiplicador de reputación según documento
+        M_rep = 1.03 if self.reputation >= 90 else 1.0
+        
+        # Multiplicador de resistencia según documento
+        if self.stamina <= 30:
+            M_resistencia = 0.8  # Cansado (1-30)
+        else:
+            M_resistencia = 1.0  # Normal (>30)
+        
+        # Surface weight del tile actual
+        surface_weight = self.compiled_map.surface_weight_at(self.player_pos.x, self.player_pos.y)
+        
+        # FÓRMULA OFICIAL
+        final_speed = v0 * M_clima * M_peso * M_rep * M_resistencia * surface_weight
+        return max(0.0, final_speed)
+    
+    # SISTEMA DE RESISTENCIA
+    def calculate_stamina_cost(self) -> float:
+        """Calcula el costo de resistencia por movimiento."""
+        base_cost = 0.5  # Base según documento: -0.5 por celda
+        
+        # Penalización por peso según documento
+        total_weight = self.inventory.total_weight
+        if total_weight > 3:
+            weight_penalty = 0.2 * (total_weight - 3)
+            base_cost += weight_penalty
+        
+        # Penalizaciones climáticas según documento
+        if self.weather_system.current_condition in ['rain', 'wind']:
+            base_cost += 0.1
+        elif self.weather_system.current_condition == 'storm':
+            base_cost += 0.3
+        elif self.weather_system.current_condition == 'heat':
+            base_cost += 0.2
+        
+        # Penalización por superficie
+        surface_weight = self.compiled_map.surface_weight_at(self.player_pos.x, self.player_pos.y)
+        if surface_weight < 1.0:
+            base_cost += (1.0 - surface_weight) * 0.2
+        
+        return base_cost
+    
+    def move_player(self, new_pos: Position):
+        """Mueve el jugador con regla de exhausto."""
+        
+        if self.stamina <= 0:
+            self.add_game_message("¡Exhausto! Recupera hasta 30 de resistencia para moverte", 2.0, RED)
+            return
+        
+        stamina_cost = self.calculate_stamina_cost()
+        
+        
+        if self.stamina < stamina_cost:
+            self.add_game_message("¡Resistencia insuficiente para moverse!", 2.0, RED)
+            return
+        
+        # Efectos climáticos visuales
+        if self.weather_system.current_condition in ['rain', 'storm']:
+            if random.random() < 0.1:
+                self.add_game_message(f"El {self.weather_system._get_condition_name(self.weather_system.current_condition).lower()} dificulta el movimiento", 2.0, CYAN)
+        
+        self.player_pos = new_pos
+        self.stamina = max(0, self.stamina - stamina_cost)
+        
+        if self.auto_sort_by_distance:
+            self._resort_orders_by_distance()
+        
+        if self.stamina <= 0:
+            self.add_game_message("¡Exhausto! No puedes moverte hasta recuperar 30 de resistencia", 3.0, RED)
+        elif self.stamina <= 30:
+            self.add_game_message(f"Cansado ({self.stamina:.0f}/30) - velocidad reducida", 2.0, YELLOW)
+    
+    def interact_at_position(self):
+        """Maneja interacciones en la posición actual del jugador."""
+        interaction_found = False
+        px, py = self.player_pos.x, self.player_pos.y
+        
+        # Verificar recogida de pedidos (el primero en orden de presentación)
+        pickups = [order for order in self.order_index.pickups_at(px, py)
+                   if order.status in ["available", "accepted"]]
+        if pickups:
+            order = min(pickups, key=self.available_orders.display_key)
+            interaction_found = True
+            
+            time_remaining = self.get_order_time_remaining(order)
+            if time_remaining <= 0:
+                self.add_game_message(f"{order.id} ha expirado!", 3.0, RED)
+            else:
+                total_weight = self.inventory.total_weight
+                if total_weight + order.weight <= self.max_weight:
+                    order.status = "picked_up"
+                    order.accepted_at = self.game_time
+                    self.inventory.append(order)
+                    self.available_orders.remove(order)
+                    self.order_index.remove_pickup(order)
+                    self.order_index.add_dropoff(order)
+                    time_text = self.get_order_status_text(order)
+                    district = self._get_district_name(order.dropoff.x, order.dropoff.y)
+                    self.add_game_message(f"{order.id} recogido ({time_text}) → ({order.dropoff.x},{order.dropoff.y}) [{district}]", 4.0, GREEN)
+                else:
+                    self.add_game_message(f"No hay capacidad para {order.id} (necesario: {order.weight}kg)", 3.0, ORANGE)
+        
+        # Verificar entrega de pedidos (el primero en orden del inventario)
+        if not interaction_found:
+            dropoffs = [order for order in self.order_index.dropoffs_at(px, py)
+                        if order.status == "picked_up"]
+            if dropoffs:
+                order = min(dropoffs, key=self._inventory_rank(dropoffs))
+                interaction_found = True
+                
+                time_remaining = self.get_order_time_remaining(order)
+                if time_remaining <= 0:
+                    self.add_game_message(f"{order.id} expiró mientras lo transportabas!", 3.0, RED)
+                else:
+                    self.deliver_order(order)
+        
+        # Mostrar pedidos cercanos si no hay interacción directa
+        if not interaction_found:
+            self._show_nearby_interactions()
+
+    def _inventory_rank(self, orders: List[Order]):
+        """Clave de posición en el inventario; solo recorre el inventario si hay empate."""
+        if len(orders) <= 1:
+            return lambda order: 0
+        rank = {id(order): i for i, order in enumerate(self.inventory)}
+        return lambda order: rank.get(id(order), len(rank))
+
+    def _show_nearby_interactions(self, radius: float = 3):
+        """Muestra información sobre pedidos cercanos"""
+        nearby_pickups = []
+        nearby_dropoffs = []
+        px, py = self.player_pos.x, self.player_pos.y
+        
+        # El costo de viaje nunca es menor que Manhattan * costo mínimo por celda,
+        # así que basta consultar las celdas dentro de ese radio Manhattan
+        min_step = min(1.0, self.get_pathfinder().min_cost)
+        cell_radius = int(radius / min_step)
+        
+        for order in self.order_index.pickups_within(px, py, cell_radius):
+            if order.status in ["available", "accepted"]:
+                time_remaining = self.get_order_time_remaining(order)
+                if time_remaining > 0:
+                    distance = self.travel_distance(self.player_pos, order.pickup)
+                    if distance <= radius:
+                        nearby_pickups.append((order, distance))
+        
+        for order in self.order_index.dropoffs_within(px, py, cell_radius):
+            if order.status == "picked_up":
+                time_remaining = self.get_order_time_remaining(order)
+                if time_remaining > 0:
+                    distance = self.travel_distance(self.player_pos, order.dropoff)
+                    if distance <= radius:
+                        nearby_dropoffs.append((order, distance))
+        
+        if nearby_pickups:
+            display_key = self.available_orders.display_key
+            closest = min(nearby_pickups, key=lambda x: (x[1], display_key(x[0])))
+            order, dist = closest
+            time_text = self.get_order_status_text(order)
+            district = self._get_district_name(order.pickup.x, order.pickup.y)
+            self.add_game_message(f"{order.id} ({time_text}) está a {dist:.0f} celdas en ({order.pickup.x}, {order.pickup.y}) [{district}]", 3.0, YELLOW)
+        elif nearby_dropoffs:
+            inventory_rank = self._inventory_rank([order for order, _ in nearby_dropoffs])
+            closest = min(nearby_dropoffs, key=lambda x: (x[1], inventory_rank(x[0])))
+            order, dist = closest
+            time_text = self.get_order_status_text(order)
+            district = self._get_district_name(order.dropoff.x, order.dropoff.y)
+            self.add_game_message(f"Entrega {order.id} ({time_text}) está a {dist:.0f} celdas en ({order.dropoff.x}, {order.dropoff.y}) [{district}]", 3.0, YELLOW)
+        else:
+            self.add_game_message("No hay nada para interactuar aquí", 2.0, GRAY)
+
+    # SISTEMA DE REPUTACIÓN
+    def deliver_order(self, order: Order):
+        """Entrega un pedido y actualiza reputación."""
+        time_remaining = self.get_order_time_remaining(order)
+        total_duration = order.duration_minutes * 60
+        time_used = total_duration - time_remaining
+        
+        rep_change = 0
+        status_msg = ""
+        delivery_was_clean = True
+        
+        # REGLAS DE REPUTACIÓN SEGÚN DOCUMENTO
+        if time_remaining > total_duration * 0.8:  # Entrega muy temprana (≥20% antes)
+            rep_change = 5
+            status_msg = "Entrega muy temprana"
+        elif time_remaining > total_duration * 0.3:  # Entrega a tiempo
+            rep_change = 3
+            status_msg = "Entrega puntual"
+        elif time_remaining > 0:  # Tarde pero no expirado
+            if time_used <= 30:  # Tarde ≤30s
+                rep_change = -2
+                status_msg = "Entrega ligeramente tarde"
+                delivery_was_clean = False
+            elif time_used <= 120:  # Tarde 31-120s
+                rep_change = -5
+                status_msg = "Entrega tarde"
+                delivery_was_clean = False
+            else:  # Tarde >120s
+                rep_change = -10
+                status_msg = "Entrega muy tarde"
+                delivery_was_clean = False
+        else:
+            rep_change = -10
+            status_msg = "Entrega muy tarde (expirado)"
+            delivery_was_clean = False
+        
+        if rep_change < 0 and self.reputation >= 85 and not hasattr(self, '_first_late_penalty_applied'):
+            rep_change = rep_change // 2
+            status_msg += " (Penalización reducida)"
+            self._first_late_penalty_applied = True
+        
+        self.reputation = max(0, min(100, self.reputation + rep_change))
+        
+        if delivery_was_clean and self.last_delivery_was_clean:
+            self.delivery_streak += 1
+            
+            if self.delivery_streak == 3:
+                self.reputation = min(100, self.reputation + 2)
+                status_msg += " ¡Racha de 3! (+2 reputación extra)"
+                self.delivery_streak = 0
+        else:
+            if not delivery_was_clean:
+                self.delivery_streak = 0
+        
+        self.last_delivery_was_clean = delivery_was_clean
+        
+        # BONUS DE PAGO POR REPUTACIÓN ALTA (≥90)
+        payout = order.payout
+        if self.reputation >= 90:
+            payout = int(payout * 1.05)  # +5% bonus
+            status_msg += " (+5% bonus)"
+        
+        self.money += payout
+        
+        order.status = "delivered"
+        self.inventory.remove(order)
+        self.order_index.remove_dropoff(order)
+        self.completed_orders.append(order)
+        self.expiry_scheduler.cancel(id(order))
+        
+        time_text = self.get_order_status_text(order)
+        district = self._get_district_name(order.dropoff.x, order.dropoff.y)
+        self.add_game_message(f"{status_msg} - ${payout} (Rep: {self.reputation}) [{district}] [{time_text} restante]", 4.0, GREEN if delivery_was_clean else ORANGE)
+        
+        if self.delivery_streak > 0:
+            self.add_game_message(f"Racha perfecta: {self.delivery_streak}/3", 2.0, ORANGE)
+    
+    def accept_selected_order(self):
+        """Acepta el pedido seleccionado."""
+        if self.selected_order_index >= self.available_orders.size():
+            self.add_game_message("No hay pedidos disponibles para aceptar", 2.0, RED)
+            return
+        
+        order = self.available_orders.window(self.selected_order_index, 1)[0]
+        
+        time_remaining = self.get_order_time_remaining(order)
+        if time_remaining <= 0:
+            self.add_game_message(f"{order.id} ha expirado!", 3.0, RED)
+            return
+        
+        total_weight = self.inventory.total_weight
+        if total_weight + order.weight <= self.max_weight:
+            order.status = "accepted"
+            order.accepted_at = self.game_time
+            time_text = self.get_order_status_text(order)
+            district = self._get_district_name(order.pickup.x, order.pickup.y)
+            self.add_game_message(f"Aceptado {order.id} ({time_text}) - Ve a ({order.pickup.x}, {order.pickup.y}) [{district}]", 4.0, GREEN)
+            
+            if self.selected_order_index >= self.available_orders.size():
+                self.selected_order_index = max(0, self.available_orders.size() - 1)
+        else:
+            available_capacity = self.max_weight - total_weight
+            self.add_game_message(f"Capacidad insuficiente: {available_capacity}kg disponible, necesario {order.weight}kg", 3.0, ORANGE)
+    
+    def deliver_selected_order(self):
+        """Entrega el pedido seleccionado del inventario."""
+        if not self.inventory or self.selected_inventory_index >= len(self.inventory):
+            return
+        
+        order = next(islice(self.inventory, self.selected_inventory_index, None))
+        
+        if (order.dropoff.x == self.player_pos.x and 
+            order.dropoff.y == self.player_pos.y):
+            self.deliver_order(order)
+            
+            if self.selected_inventory_index >= len(self.inventory):
+                self.selected_inventory_index = max(0, len(self.inventory) - 1)
+        else:
+            distance = self.travel_distance(self.player_pos, order.dropoff)
+            time_text = self.get_order_status_text(order)
+            district = self._get_district_name(order.dropoff.x, order.dropoff.y)
+            self.add_game_message(f"Ir a ({order.dropoff.x}, {order.dropoff.y}) ({time_text}) [{district}] - {distance:.0f} celdas", 3.0, YELLOW)
+    
+    def undo_move(self):
+        """Deshace el último movimiento usando el historial."""
+        if self.history.size() > 0:
+            state = self.history.pop()
+            if state:
+                self.player_pos = state.player_pos
+                self.stamina = state.stamina
+                self.reputation = state.reputation
+                self.money = state.money
+                self.delivery_streak = getattr(state, 'delivery_streak', 0)
+                self.add_game_message(f"Estado restaurado ({self.history.size()} restantes)", 2.0, CYAN)
+            else:
+                self.add_game_message("No hay más estados para deshacer", 2.0, RED)
+        else:
+            self.add_game_message("No hay movimientos para deshacer", 2.0, RED)
+    
+    def _snapshot_game_state(self) -> GameState:
+        """Copia del estado que el juego puede seguir modificando sin afectarla.
+
+        Los pedidos se copian (cambian de estado al jugar); Position es inmutable
+        y se comparte.
+        """
+        def copy_orders(orders):
+            return [copy.copy(order) for order in orders]
+        
+        return GameState(
+            player_pos=self.player_pos,
+            stamina=self.stamina,
+            reputation=self.reputation,
+            money=self.money,
+            game_time=self.game_time,
+            weather_time=self.weather_system.time_in_current,
+            current_weather=self.weather_system.current_condition,
+            weather_intensity=self.weather_system.current_intensity,
+            inventory=copy_orders(self.inventory),
+            available_orders=copy_orders(self.available_orders.items),
+            completed_orders=copy_orders(self.completed_orders),
+            goal=self.goal,
+            delivery_streak=self.delivery_streak,
+            pending_orders=copy_orders(self.pending_orders),
+            city_width=self.city_width,
+            city_height=self.city_height,
+            tiles=[list(row) for row in self.tiles],
+            legend=dict(self.legend),
+            city_name=self.city_name,
+            max_game_time=self.max_game_time
+        )
+    
+    def save_game(self, slot: int = 1):
+        """GUARDADO CORREGIDO - Incluye todos los datos del mapa.
+
+        Aquí solo se toma la instantánea; la serialización y escritura corren
+        en segundo plano y el resultado llega por _collect_save_results().
+        """
+        try:
+            self.file_manager.save_game_async(self._snapshot_game_state(), slot)
+            self.add_game_message(f"Guardando en slot {slot}...", 1.5, CYAN)
+        except Exception as e:
+            self.add_game_message(f"Error guardando: {e}", 3.0, RED)
+    
+    def _collect_save_results(self):
+        """Informa los guardados en segundo plano que terminaron."""
+        for slot, ok, state in self.file_manager.poll_save_results():
+            if ok:
+                self.add_game_message(f"Juego guardado en slot {slot} ({state.city_name} {state.city_width}x{state.city_height})", 2.0, GREEN)
+            else:
+                self.add_game_message(f"Error guardando en slot {slot}", 3.0, RED)
+    
+    def _load_game(self, slot: int = 1) -> bool:
+        """CARGA CORREGIDA - Restaura todos los datos del mapa."""
+        state = self.file_manager.load_game_with_validation(slot)
+        
+        if state is None:
+            self.add_game_message(f"No se pudo cargar el slot {slot}", 3.0, RED)
+            return False
+        
+        self._apply_game_state(state)
+        self.add_game_message(f"Juego cargado desde slot {slot} - {self.city_name} {self.city_width}x{self.city_height}", 2.0, GREEN)
+        return True
+    
+    def recover_autosave(self) -> bool:
+        """Restaura el último autoguardado (keyframe + deltas del diario)."""
+        if self.autosave is None:
+            return False
+        self.autosave.close()
+        # Un keyframe todavía en cola se escribe antes de leer
+        self.file_manager.flush_saves(timeout=5.0)
+        state = self.autosave.recover()
+        
+        if state is None:
+            self.add_game_message("No hay autoguardado para recuperar", 3.0, RED)
+            return False
+        
+        self._apply_game_state(state)
+        self.add_game_message(f"Autoguardado recuperado - {self.city_name} ({self.format_time(self.game_time)})", 2.0, GREEN)
+        return True
+    
+    def _apply_game_state(self, state: GameState):
+        """Reemplaza el estado de la simulación por el de una partida guardada."""
+        self.player_pos = state.player_pos
+        self.stamina = state.stamina
+        self.reputation = state.reputation
+        self.money = state.money
+        self.game_time = state.game_time
+        self.weather_system.time_in_current = state.weather_time
+        self.weather_system.current_condition = state.current_weather
+        self.weather_system.current_intensity = state.weather_intensity
+        self.inventory = self._new_inventory(state.inventory)
+        self.available_orders.items = state.available_orders
+        self._rebuild_expiry_schedule()
+        self.order_index.rebuild(self.available_orders.items, self.inventory)
+        self.completed_orders = state.completed_orders
+        self.goal = state.goal
+        self.delivery_streak = getattr(state, 'delivery_streak', 0)
+        self.pending_orders = ReleaseScheduler(getattr(state, 'pending_orders', []))
+        
+        self.city_width = getattr(state, 'city_width', 30)
+        self.city_height = getattr(state, 'city_height', 25)
+        self.tiles = getattr(state, 'tiles', [])
+        self.legend = getattr(state, 'legend', {})
+        self.city_name = getattr(state, 'city_name', 'TigerCity')
+        self.max_game_time = getattr(state, 'max_game_time', 600.0)
+        
+        self.map_pixel_width = self.city_width * TILE_SIZE
+        self.map_pixel_height = self.city_height * TILE_SIZE
+        self.compile_map()
+        self.invalidate_map_surface()
+
+        # Las Position de la partida cargada pasan a ser las compartidas del mapa
+        self.player_pos = self.compiled_map.position(self.player_pos.x, self.player_pos.y)
+        for order in list(self.inventory) + self.available_orders.items + list(self.pending_orders):
+            self.compiled_map.intern_order(order)
+        
+        if self.autosave is not None:
+            self.autosave.close()
+    
+    def load_game(self, slot: int = 1):
+        """Función pública para cargar juego."""
+        self._load_game(slot)
+    
+    def schedule_order(self, order: Order):
+        """Agrega un pedido pendiente en cualquier momento del turno."""
+        order.status = "waiting_release"
+        self.pending_orders.add(order)
+    
+    def _process_order_releases(self, dt: float):
+        """ Liberación de pedidos con límite reducido para mayor enfoque."""
+        current_active_orders = self.available_orders.size()
+        
+        released_count = 0
+        for order in self.pending_orders.release_due(self.game_time, current_active_orders):
+            if not self._validate_order_positions(order):
+                order = self._fix_order_positions(order)
+            
+            order.status = "available"
+            order.created_at = self.game_time
+            self.available_orders.enqueue(order)
+            self.expiry_scheduler.schedule(id(order), self._order_deadline(order), order)
+            self.order_index.add_pickup(order)
+            released_count += 1
+            current_active_orders += 1
+            
+            if released_count <= 3:
+                priority_text = f"P{order.priority}" if order.priority > 0 else "Normal"
+                duration_text = f"{order.duration_minutes * 60:.0f}s"
+                district = getattr(order, 'district', self._get_district_name(order.pickup.x, order.pickup.y))
+                
+                if order.priority >= 2:
+                    urgency_indicator = "RAPIDORAPIDORAPIDO!!!!!!!!" 
+                elif order.priority == 1:
+                    urgency_indicator = "RapidoRapido" 
+                else:
+                    urgency_indicator = "Rapido"
+                self.add_game_message(f"📋 {urgency_indicator}{order.id} ({priority_text}) ${order.payout} ({duration_text}) [{district}]", 2.0, YELLOW)
+        
+        if released_count and self.auto_sort_by_distance:
+            self._resort_orders_by_distance()
+        
+        if released_count > 2:
+            self.add_game_message(f"📋 {released_count} pedidos ULTRA URGENTES (8-22s) disponibles", 2.0, BRIGHT_RED)
+    
+    def _order_deadline(self, order: Order) -> float:
+        """Instante absoluto del juego en que vence un pedido ya liberado."""
+        return order.created_at + order.duration_minutes * 60
+    
+    def _new_inventory(self, orders=()) -> Inventory:
+        return Inventory(orders, self._order_deadline)
+    
+    def _rebuild_expiry_schedule(self):
+        """Reprograma los vencimientos de todos los pedidos activos (p. ej. al cargar)."""
+        self.expiry_scheduler.clear()
+        for order in list(self.available_orders.items) + list(self.inventory):
+            self.expiry_scheduler.schedule(id(order), self._order_deadline(order), order)
+    
+    def _check_expired_orders(self, dt: float):
+        """Verifica y maneja pedidos expirados; solo se extraen los que vencieron."""
+        expired_orders = []
+        
+        for order in self.expiry_scheduler.pop_due(self.game_time):
+            if order in self.available_orders:
+                self.available_orders.remove(order)
+                self.order_index.remove_pickup(order)
+            elif order in self.inventory:
+                self.inventory.remove(order)
+                self.order_index.remove_dropoff(order)
+            else:
+                continue
+            expired_orders.append(order)
+        
+        self.expired_orders_count += len(expired_orders)
+        for order in expired_orders:
+            self.reputation -= 6 
+            self.delivery_streak = 0
+            self.last_delivery_was_clean = False
+            self.add_game_message(f" {order.id} expiró! (-6 reputación)", 4.0, RED)
+    
+    def _get_stamina_recovery_rate(self) -> float:
+        """Calcula la tasa de recuperación de resistencia."""
+        base_recovery = 5.0 
+        
+        if self.compiled_map.rest_bonus_at(self.player_pos.x, self.player_pos.y) > 0:
+            bonus_recovery = base_recovery + 10.0
+           
+            if not hasattr(self, '_last_bonus_message') or self.game_time - self._last_bonus_message > 5.0:
+                if self.stamina <= 0:
+                    self.add_game_message("¡En un parque! Recuperarás resistencia más rápido", 3.0, GREEN)
+                self._last_bonus_message = self.game_time
+            return bonus_recovery
+        
+        return base_recovery
+    
+    def update(self, dt: float):
+        """Actualiza la lógica del juego SIN guardados múltiples."""
+        
+        if hasattr(self, '_score_saved') and self._score_saved:
+            return
+        
+        if self.game_state != "playing" or self.paused:
+            return
+        
+        self.fps_counter += 1
+        self.fps_timer += dt
+        if self.fps_timer >= 1.0:
+            self.current_fps = self.fps_counter
+            self.fps_counter = 0
+            self.fps_timer = 0
+        
+        if self.history.size() == 0 or self.game_time - getattr(self, '_last_history_save', 0) > 8.0:
+            current_state = GameState(
+                player_pos=self.player_pos,
+                stamina=self.stamina,
+                reputation=self.reputation,
+                money=self.money,
+                game_time=self.game_time,
+                weather_time=self.weather_system.time_in_current,
+                current_weather=self.weather_system.current_condition,
+                weather_intensity=self.weather_system.current_intensity,
+                inventory=list(self.inventory),
+                available_orders=self.available_orders.items,
+                completed_orders=self.completed_orders,
+                goal=self.goal,
+                delivery_streak=self.delivery_streak,
+                pending_orders=list(self.pending_orders),
+                city_width=self.city_width,
+                city_height=self.city_height,
+                tiles=self.tiles,
+                legend=self.legend,
+                city_name=self.city_name,
+                max_game_time=self.max_game_time
+            )
+            self.history.push(current_state)
+            self._last_history_save = self.game_time
+        
+        self.game_time += dt
+        self.weather_system.update(dt)
+        
+        self._process_order_releases(dt)
+        self._check_expired_orders(dt)
+        
+        self.message_timer += dt
+        self.game_messages = [
+            (msg, time_left - dt, color) for msg, time_left, color in self.game_messages 
+            if time_left - dt > 0
+        ]
+        
+        # Recuperación de resistencia
+        previous_stamina = getattr(self, '_previous_stamina', self.stamina)
+        
+        if self.stamina < self.max_stamina and self.last_move_time > 1.0:
+            recovery_rate = self._get_stamina_recovery_rate()
+            new_stamina = min(self.max_stamina, self.stamina + recovery_rate * dt)
+            
+            if previous_stamina <= 0 and new_stamina > 0:
+                if new_stamina >= 30:
+                    self.add_game_message("¡Ya puedes moverte de nuevo! (Resistencia recuperada a 30+)", 3.0, GREEN)
+                else:
+                    self.add_game_message(f"Recuperando... {new_stamina:.0f}/30 para moverte", 2.0, YELLOW)
+            elif previous_stamina < 30 and new_stamina >= 30:
+                self.add_game_message("¡Ya puedes moverte! Resistencia: 30/100", 3.0, GREEN)
+            
+            self.stamina = new_stamina
+        
+        self._previous_stamina = self.stamina
+        
+        
+        if self.reputation < 20:  # Derrota por reputación baja
+            if not self.game_over:  
+                print("\n GAME OVER: Reputación baja")
+                self.game_over = True
+                self.victory = False
+                self.game_state = "game_over"
+                self.add_game_message("¡Juego terminado! Reputación muy baja.", 5.0, RED)
+                
+                #  GUARDAR PUNTAJE UNA SOLA VEZ
+                print(" Guardando puntaje por reputación baja...")
+                success = self.save_score()
+                if success:
+                    print(" Puntaje guardado exitosamente")
+                    self._score_saved = True
+                else:
+                    print(" Error guardando puntaje")
+                
+        elif self.money >= self.goal:  # Victoria por alcanzar meta
+            if not self.game_over: 
+                print("\n VICTORIA: Meta alcanzada")
+                self.victory = True
+                self.game_over = True
+                self.game_state = "game_over"
+                self.add_game_message("¡Victoria! Meta de ingresos alcanzada.", 5.0, GREEN)
+                
+                print("💾 Guardando puntaje por victoria...")
+                success = self.save_score()
+                if success:
+                    print("Puntaje guardado exitosamente")
+                    self._score_saved = True
+                else:
+                    print("Error guardando puntaje")
+                
+        elif self.game_time >= self.max_game_time:  # Fin de jornada
+            if not self.game_over:  
+                print("\n GAME OVER: Tiempo agotado")
+                self.game_over = True
+                self.game_state = "game_over"
+                if self.money >= self.goal:
+                    self.victory = True
+                    self.add_game_message("¡Victoria! Tiempo agotado pero meta cumplida.", 5.0, GREEN)
+                else:
+                    self.victory = False
+                    self.add_game_message("¡Tiempo agotado! No se cumplió la meta.", 5.0, RED)
+                
+                print(" Guardando puntaje por tiempo agotado...")
+                success = self.save_score()
+                if success:
+                    print(" Puntaje guardado exitosamente")
+                    self._score_saved = True 
+                else:
+                    print(" Error guardando puntaje")
+    
+    def save_score(self, score: int = None):
+        """Guarda el puntaje UNA SOLA VEZ con protección adicional."""
+        
+        if hasattr(self, '_score_saved') and self._score_saved:
+            print("⚠️ Puntaje ya guardado previamente, ignorando llamada duplicada")
+            return True
+        
+        print("\n" + "="*60)
+        print(" Guardando puntaje...")
+        print("="*60)
+        
+        try:
+            # Calcular puntaje final
+            final_score = self._calculate_final_score()
+            print(f" Puntaje calculado: {final_score}")
+            print(f"   - Dinero: ${self.money}")
+            print(f"   - Reputación: {self.reputation}")
+            print(f"   - Pedidos completados: {len(self.completed_orders)}")
+            print(f"   - Victoria: {self.victory}")
+            
+            # Crear nuevo registro
+            new_score = {
+                "score": final_score,
+                "money": self.money,
+                "reputation": self.reputation,
+                "completed_orders": len(self.completed_orders),
+                "game_time": round(self.game_time, 1),
+                "date": datetime.now().isoformat(),
+                "victory": self.victory,
+                "delivery_streak_record": getattr(self, 'delivery_streak', 0),
+                "city_name": self.city_name,
+                "city_size": f"{self.city_width}x{self.city_height}",
+                "api_source": "TigerCity_Real"
+            }
+            
+            # Agregar al historial (no se reescribe ni se recorta nada)
+            score_id = self.file_manager.save_score(new_score)
+            print(f" Puntaje guardado (#{score_id} en el historial)")
+            
+            # Determinar posición dentro del top 10
+            top_scores = self.file_manager.load_scores(10)
+            position = next((i+1 for i, s in enumerate(top_scores) if s['id'] == score_id), None)
+            
+            if position:
+                print(f"🏆 POSICIÓN EN RANKING: #{position}")
+                if position <= 10:
+                    self.add_game_message(f"¡Posición #{position} en el ranking!", 4.0, GREEN if position <= 3 else YELLOW)
+            
+            print("="*60 + "\n")
+            
+            return True
+            
+        except Exception as e:
+            print(f"\n ERROR guardando puntaje: {e}")
+            import traceback
+            traceback.print_exc()
+            return False
+    
+    def _calculate_final_score(self) -> int:
+        """Calcula el puntaje final según las reglas del documento."""
+        try:
+            components = self._final_score_components()
+            final_score = int(sum(components.values()))
+            
+            # El puntaje mínimo es 0
+            return max(0, final_score)
+            
+        except Exception as e:
+            print(f" Error calculando puntaje: {e}")
+            return 0
+    
+    def _final_score_components(self) -> Dict[str, float]:
+        """Desglose del puntaje final (antes de truncar y aplicar el mínimo 0)."""
+        # Base: suma de pagos afectada por reputación alta
+        pay_mult = 1.05 if self.reputation >= 90 else 1.0
+        score_base = self.money * pay_mult
+        
+        # Bonus por tiempo (terminar antes del 80% del tiempo)
+        bonus_tiempo = 0
+        if self.victory and self.game_time < self.max_game_time * 0.8:
+            time_bonus_factor = (self.max_game_time * 0.8 - self.game_time) / (self.max_game_time * 0.8)
+            bonus_tiempo = int(500 * time_bonus_factor)
+        
+        # Bonus por entregas completadas
+        delivery_bonus = len(self.completed_orders) * 10
+        
+        # Bonus por reputación
+        reputation_bonus = max(0, (self.reputation - 70) * 5)
+        
+        # Penalty por derrota
+        defeat_penalty = 0 if self.victory else -500
+        
+        return {
+            "score_base": score_base,
+            "bonus_tiempo": bonus_tiempo,
+            "delivery_bonus": delivery_bonus,
+            "reputation_bonus": reputation_bonus,
+            "defeat_penalty": defeat_penalty
+        }
+
+    def draw(self):
+        """Dibuja toda la interfaz del juego."""
+        if self.game_state == "menu":
+            self.menu_system.draw(self.screen)
+        elif self.game_state == "tutorial":
+            self.screen.fill((20, 25, 40))
+            self.tutorial_system.draw(self.screen)
+        elif self.game_state == "playing":
+            self._draw_game()
+        elif self.game_state == "game_over":
+            self._draw_game()  # Seguir mostrando el juego
+            self.draw_game_over_overlay()  # Y el overlay de fin
+
+        if self.game_state in ("playing", "game_over"):
+            self.renderer.present(self.screen.get_rect())
+        else:
+            # Menú y tutorial se publican completos; al volver al juego se redibuja todo
+            self.renderer.invalidate()
+            pygame.display.flip()
+    
+
+
+
+
+    
+    def _draw_game(self):
+        """Dibuja la pantalla principal del juego."""
+        self.renderer.begin_frame()
+        self.screen.fill(UI_BACKGROUND)
+        
+        self.draw_weather_background()
+        self.draw_full_map()  
+        self.draw_orders()
+        self.draw_player()
+        self.draw_ui()
+        
+        if self.show_inventory:
+            self.draw_inventory_overlay()
+        
+        if self.show_orders:
+            self.draw_orders_overlay()
+        
+        self.draw_game_messages()
+        self.draw_weather_notifications()
+        
+        if self.paused:
+            self.draw_pause_overlay()
+        
+        if self.game_over:
+            self.draw_game_over_overlay()
+    
+    def draw_weather_background(self):
+        weather_color = self.weather_system.get_weather_color()
+        alpha = int(25 * self.weather_system.current_intensity)
+        
+        if alpha > 5:
+            overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+            overlay.set_alpha(alpha)
+            overlay.fill(weather_color)
+            self.screen.blit(overlay, (0, 0))
+        else:
+            alpha = 0
+
+        # El tinte cubre toda la ventana: si cambia, se publica completa
+        self.renderer.mark("background", "weather", self.screen.get_rect(), (weather_color, alpha))
+    
+    def draw_game_messages(self):
+        """ Mensajes en esquina inferior derecha."""
+        # Posición en esquina inferior derecha
+        base_x = WINDOW_WIDTH - 450  # 450 píxeles desde la derecha
+        base_y = WINDOW_HEIGHT - 200  # 200 píxeles desde abajo
+        
+        for i, (message, time_left, color) in enumerate(self.game_messages[-5:]):
+            alpha = min(255, int(255 * (time_left / 3.0)))
+            
+            text_surface = self.small_font.render(message, True, color)
+            y_offset = base_y + i * 22
+            
+            # Fondo semi-transparente
+            bg_rect = pygame.Rect(base_x - 10, y_offset - 2, text_surface.get_width() + 20, 20)
+            bg_surface = pygame.Surface((bg_rect.width, bg_rect.height))
+            bg_surface.set_alpha(120)
+            bg_surface.fill((0, 0, 0))
+            self.screen.blit(bg_surface, bg_rect)
+            
+            # Borde del mensaje
+            pygame.draw.rect(self.screen, (255, 255, 255, 50), bg_rect, 1)
+            
+            if alpha < 255:
+                text_surface = text_surface.copy()
+                text_surface.set_alpha(alpha)
+            self.screen.blit(text_surface, (base_x, y_offset))
+            self.renderer.mark("messages", i, bg_rect, (message, color, alpha))
+    
+    def draw_weather_notifications(self):
+        """ Notificaciones del clima en esquina inferior derecha."""
+        # Posición en esquina inferior derecha (debajo de los mensajes del juego)
+        base_x = WINDOW_WIDTH - 500  # 500 píxeles desde la derecha
+        base_y = WINDOW_HEIGHT - 120  # 120 píxeles desde abajo (arriba de los mensajes del juego)
+        
+        for i, (notification, time_left) in enumerate(self.weather_system.weather_notifications):
+            alpha = min(255, int(255 * (time_left / 4.0)))
+            
+            text_surface = self.font.render(notification, True, self.weather_system.get_weather_color())
+            y_offset = base_y + i * 28
+            
+            # Fondo semi-transparente
+            bg_rect = pygame.Rect(base_x - 10, y_offset - 2, text_surface.get_width() + 20, 24)
+            bg_surface = pygame.Surface((bg_rect.width, bg_rect.height))
+            bg_surface.set_alpha(120)
+            bg_surface.fill((0, 0, 0))
+            self.screen.blit(bg_surface, bg_rect)
+            
+            # Borde
+            pygame.draw.rect(self.screen, (255, 255, 255, 50), bg_rect, 1)
+            
+            if alpha < 255:
+                text_surface = text_surface.copy()
+                text_surface.set_alpha(alpha)
+            self.screen.blit(text_surface, (base_x, y_offset))
+            self.renderer.mark("weather_notifications", i, bg_rect,
+                               (notification, self.weather_system.get_weather_color(), alpha))
+    
+    def invalidate_map_surface(self):
+        """Descarta la capa estática del mapa para reconstruirla en el próximo frame."""
+        self._map_surface = None
+        self._map_surface_sources = None
+
+    def _get_map_surface(self) -> pygame.Surface:
+        """Devuelve la capa estática del mapa, reconstruyéndola si cambió el mapa."""
+        sources = (self.tiles, self.legend, self.tile_images, self.city_width, self.city_height)
+        cached = self._map_surface_sources
+        if (self._map_surface is None or cached is None or
+                any(a is not b for a, b in zip(sources[:3], cached[:3])) or
+                sources[3:] != cached[3:]):
+            self._map_surface = self._build_map_surface()
+            self._map_surface_sources = sources
+        return self._map_surface
+
+    def _build_map_surface(self) -> pygame.Surface:
+        """Pre-renderiza todos los tiles del mapa en una sola superficie."""
+        surface = pygame.Surface((max(1, self.map_pixel_width), max(1, self.map_pixel_height)))
+        surface.fill(UI_BACKGROUND)
+
+        for y in range(self.city_height):
+            if y >= len(self.tiles):
+                break
+            row = self.tiles[y]
+            for x in range(min(self.city_width, len(row))):
+                tile_type = row[x]
+                rect = pygame.Rect(x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+
+                # Fondo primero y luego la imagen del tile si existe
+                pygame.draw.rect(surface, self._get_tile_base_color(tile_type), rect)
+                if tile_type in self.tile_images:
+                    surface.blit(self.tile_images[tile_type], rect.topleft)
+
+                # Dibujar borde del tile
+                pygame.draw.rect(surface, (100, 100, 100), rect, 1)
+
+        return surface
+
+    def draw_full_map(self):
+        """MEJORADO: Dibuja el mapa desde la capa pre-renderizada y el bonus del parque."""
+        map_surface = self._get_map_surface()
+        map_rect = self.screen.blit(map_surface, (self.map_offset_x, self.map_offset_y))
+        self.renderer.mark("map", "tiles", map_rect, map_surface)
+
+        # Si el jugador está en un parque, mostrar bonus sobre su tile
+        px, py = self.player_pos.x, self.player_pos.y
+        if (py < len(self.tiles) and px < len(self.tiles[py]) and
+                self.tiles[py][px] == "P" and "P" in self.tile_images):
+            screen_x = px * TILE_SIZE + self.map_offset_x
+            screen_y = py * TILE_SIZE + self.map_offset_y
+            bonus_text = self.small_font.render("+15/s", True, (255, 255, 255))
+            text_rect = bonus_text.get_rect(center=(screen_x + TILE_SIZE//2, screen_y + TILE_SIZE//2))
+
+            # Fondo semi-transparente para el texto
+            text_bg = pygame.Rect(text_rect.x - 2, text_rect.y - 1, text_rect.width + 4, text_rect.height + 2)
+            text_bg_surface = pygame.Surface((text_bg.width, text_bg.height))
+            text_bg_surface.set_alpha(150)
+            text_bg_surface.fill((0, 100, 0))
+            self.screen.blit(text_bg_surface, text_bg)
+
+            self.screen.blit(bonus_text, text_rect)
+            self.renderer.mark("map", "park_bonus", text_bg.union(text_rect), (px, py))
+
+        self.draw_map_info()
+
+    def draw_map_info(self):
+        """Información del mapa con datos reales de la API."""
+        map_rect = pygame.Rect(
+            self.map_offset_x - 3, 
+            self.map_offset_y - 3, 
+            self.map_pixel_width + 6, 
+            self.map_pixel_height + 6
+        )
+        pygame.draw.rect(self.screen, UI_BORDER, map_rect, 3)
+        
+        # Título con nombre real de la ciudad Y DIMENSIONES CORRECTAS
+        title_text = self.title_font.render(f"{self.city_name.upper()} {self.city_width}x{self.city_height}", True, UI_TEXT_HEADER)
+        title_bg = pygame.Rect(
+            self.map_offset_x + self.map_pixel_width // 2 - title_text.get_width() // 2 - 10,
+            2,
+            title_text.get_width() + 20,
+            22
+        )
+        pygame.draw.rect(self.screen, UI_HIGHLIGHT, title_bg, border_radius=5)
+        pygame.draw.rect(self.screen, UI_BORDER, title_bg, 2, border_radius=5)
+        title_rect = title_text.get_rect(center=(
+            self.map_offset_x + self.map_pixel_width // 2,
+            13
+        ))
+        self.screen.blit(title_text, title_rect)
+        
+        # Información de tamaño
+        size_text = self.font.render(f"Tiles: {TILE_SIZE}px | {self.city_width * self.city_height} celdas totales", True, UI_TEXT_SECONDARY)
+        self.screen.blit(size_text, (self.map_offset_x, self.map_offset_y - 12))
+        
+        # ✅ NUEVO: Información de las imágenes (tiles y clima)
+        tile_count = len(self.tile_images)
+        weather_count = len(self.weather_images)
+        
+        if tile_count == 3 and weather_count >= 9:
+            api_text = self.small_font.render("✅ API TigerCity + Imágenes completas (Tiles + Clima)", True, UI_SUCCESS)
+        elif tile_count > 0 or weather_count > 0:
+            status_parts = []
+            if tile_count > 0:
+                tile_types = []
+                if "P" in self.tile_images: tile_types.append("Parques")
+                if "C" in self.tile_images: tile_types.append("Calles")
+                if "B" in self.tile_images: tile_types.append("Edificios")
+                status_parts.append(f"Tiles: {', '.join(tile_types)}")
+            if weather_count > 0:
+                status_parts.append(f"Clima: {weather_count} estados")
+            
+            api_text = self.small_font.render(f"✅ API + PNG: {' | '.join(status_parts)}", True, UI_WARNING)
+        else:
+            api_text = self.small_font.render("✅ API TigerCity REAL + Gráficos de respaldo completos", True, UI_WARNING)
+        api_rect = self.screen.blit(api_text, (self.map_offset_x, self.map_offset_y - 24))
+
+        info_rect = map_rect.unionall([title_bg, title_rect, api_rect,
+                                       size_text.get_rect(topleft=(self.map_offset_x, self.map_offset_y - 12))])
+        self.renderer.mark("map", "info", info_rect,
+                           (self.city_name, self.city_width, self.city_height,
+                            tuple(self.tile_images), weather_count))
+
+    def draw_orders(self):
+        """Dibuja todos los marcadores de pedidos."""
+        # Dibujar puntos de recogida
+        for order in self.available_orders.items:
+            if order.status in ["available", "accepted"]:
+                self.draw_order_marker(order, order.pickup, "P")
+        
+        # Dibujar puntos de entrega para pedidos aceptados
+        for order in self.available_orders.items:
+            if order.status == "accepted":
+                self.draw_order_marker(order, order.dropoff, "D", is_dropoff=True)
+        
+        # Dibujar puntos de entrega para pedidos en inventario
+        for order in self.inventory:
+            if order.status == "picked_up":
+                self.draw_order_marker(order, order.dropoff, order.id[-2:], in_inventory=True)
+    
+    def _interpolated_player_tile(self) -> Tuple[float, float]:
+        """Posición del jugador interpolada entre el tick anterior y el actual."""
+        previous = self.previous_player_pos
+        current = self.player_pos
+        # Saltos (carga, deshacer) no se interpolan
+        if previous is None or abs(current.x - previous.x) + abs(current.y - previous.y) != 1:
+            return current.x, current.y
+
+        alpha = self.render_alpha
+        return (previous.x + (current.x - previous.x) * alpha,
+                previous.y + (current.y - previous.y) * alpha)
+
+    def draw_player(self):
+        """Dibuja el jugador con imagen PNG o indicadores de estado."""
+        tile_x, tile_y = self._interpolated_player_tile()
+        screen_x = int(round(tile_x * TILE_SIZE)) + self.map_offset_x + 2
+        screen_y = int(round(tile_y * TILE_SIZE)) + self.map_offset_y + 2
+
+        # Región del jugador: casilla + barra de alerta + texto "EXHAUSTO!" encima
+        stamina_state = 2 if self.stamina > 30 else 1 if self.stamina > 0 else 0
+        player_region = pygame.Rect(0, 0, max(TILE_SIZE + 8, 90), TILE_SIZE + 28)
+        player_region.midbottom = (screen_x + TILE_SIZE // 2, screen_y + TILE_SIZE + 2)
+        self.renderer.mark("player", "player", player_region, (screen_x, screen_y, stamina_state))
+        
+        if self.player_image is not None:
+            # Dibujar la imagen del repartidor
+            image_rect = self.player_image.get_rect()
+            image_rect.center = (screen_x + (TILE_SIZE - 4) // 2, screen_y + (TILE_SIZE - 4) // 2)
+            self.screen.blit(self.player_image, image_rect.topleft)
+            
+            # ✅ NUEVO: Borde de estado según resistencia (alrededor de la imagen)
+            border_rect = pygame.Rect(
+                screen_x - 1, screen_y - 1,
+                TILE_SIZE - 2, TILE_SIZE - 2
+            )
+            
+            # Color del borde según estado de resistencia
+            if self.stamina > 30:
+                border_color = (0, 255, 0)     # Verde - Normal
+                border_width = 2
+            elif self.stamina > 0:
+                border_color = (255, 255, 0)   # Amarillo - Cansado
+                border_width = 3
+            else:
+                border_color = (255, 0, 0)     # Rojo - Exhausto
+                border_width = 4
+            
+            pygame.draw.rect(self.screen, border_color, border_rect, border_width)
+            
+            # ✅ NUEVO: Indicador de alerta si está muy cansado (encima de la imagen)
+            if self.stamina <= 30:
+                alert_rect = pygame.Rect(screen_x - 2, screen_y - 8, TILE_SIZE, 4)
+                alert_color = BRIGHT_RED if self.stamina <= 0 else (255, 200, 0)
+                pygame.draw.rect(self.screen, alert_color, alert_rect)
+                
+                # Texto de estado crítico
+                if self.stamina <= 0:
+                    status_text = self.small_font.render("EXHAUSTO!", True, WHITE)
+                    status_rect = status_text.get_rect(center=(screen_x + TILE_SIZE // 2, screen_y - 12))
+                    
+                    # Fondo para el texto
+                    text_bg = pygame.Rect(status_rect.x - 2, status_rect.y - 1, status_rect.width + 4, status_rect.height + 2)
+                    text_bg_surface = pygame.Surface((text_bg.width, text_bg.height))
+                    text_bg_surface.set_alpha(200)
+                    text_bg_surface.fill((200, 0, 0))
+                    self.screen.blit(text_bg_surface, text_bg)
+                    
+                    self.screen.blit(status_text, status_rect)
+        
+        else:
+            # ✅ FALLBACK: Dibujar jugador con formas geométricas (método original)
+            player_rect = pygame.Rect(
+                screen_x, screen_y,
+                TILE_SIZE - 4, TILE_SIZE - 4
+            )
+            
+            # Color según estado de resistencia
+            if self.stamina > 30:
+                color = BLUE       # Normal
+            elif self.stamina > 0:
+                color = YELLOW     # Cansado
+            else:
+                color = RED        # Exhausto
+            
+            pygame.draw.ellipse(self.screen, color, player_rect)
+            pygame.draw.ellipse(self.screen, BLACK, player_rect, 2)
+            
+            # Indicador de alerta si está muy cansado
+            if self.stamina <= 30:
+                alert_rect = pygame.Rect(screen_x - 2, screen_y - 8, TILE_SIZE, 4)
+                pygame.draw.rect(self.screen, BRIGHT_RED, alert_rect)
+                
+                # Texto de estado crítico
+                if self.stamina <= 0:
+                    status_text = self.small_font.render("EXHAUSTO!", True, WHITE)
+                    status_rect = status_text.get_rect(center=(screen_x + TILE_SIZE // 2, screen_y - 12))
+                    
+                    # Fondo para el texto
+                    text_bg = pygame.Rect(status_rect.x - 2, status_rect.y - 1, status_rect.width + 4, status_rect.height + 2)
+                    text_bg_surface = pygame.Surface((text_bg.width, text_bg.height))
+                    text_bg_surface.set_alpha(200)
+                    text_bg_surface.fill((200, 0, 0))
+                    self.screen.blit(text_bg_surface, text_bg)
+                    
+                    self.screen.blit(status_text, status_rect)
+    
+    def handle_input(self, keys, dt):
+        """Maneja entrada del teclado durante el juego."""
+        direction = (0, 0)
+        
+        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+            direction = (-1, 0)
+        elif keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+            direction = (1, 0)
+        elif keys[pygame.K_UP] or keys[pygame.K_w]:
+            direction = (0, -1)
+        elif keys[pygame.K_DOWN] or keys[pygame.K_s]:
+            direction = (0, 1)
+        
+        self.apply_move_input(direction, dt)
+
+    def apply_move_input(self, direction: Tuple[int, int], dt: float):
+        """Aplica una dirección de movimiento (dx, dy) respetando cooldown y resistencia.
+
+        Es el equivalente de handle_input sin teclado; lo usa también el modo headless.
+        """
+        if self.paused or self.game_over:
+            return
+
+        # ✅ BLOQUEO COMPLETO: Si está exhausto (=0), no procesar ningún movimiento
+        if self.stamina <= 0:
+            current_time = self.game_time
+            if not hasattr(self, '_last_exhausted_message') or current_time - self._last_exhausted_message > 3.0:
+                self.add_game_message("¡EXHAUSTO! Espera a recuperar resistencia hasta 30", 3.0, RED)
+                self._last_exhausted_message = current_time
+            return
+
+        actual_speed = self.calculate_actual_speed()
+        adjusted_cooldown = self.move_cooldown / max(0.1, actual_speed / self.base_speed)
+
+        self.last_move_time += dt
+        if self.last_move_time < adjusted_cooldown:
+            return
+
+        if direction != (0, 0):
+            new_pos = self.compiled_map.position(
+                self.player_pos.x + direction[0], 
+                self.player_pos.y + direction[1]
+            )
+            if self.is_valid_move(new_pos):
+                self.move_player(new_pos)
+                self.last_move_time = 0
+            else:
+                # ✅ Mensaje específico cuando el movimiento no es válido por resistencia
+                if self.stamina <= 0:
+                    self.add_game_message("No te puedes mover - ¡Estás exhausto!", 1.5, RED)
+
+    def draw_order_marker(self, order, position, label, is_dropoff=False, in_inventory=False):
+        """Dibuja un marcador individual de pedido."""
+        screen_x = position.x * TILE_SIZE + self.map_offset_x + 1
+        screen_y = position.y * TILE_SIZE + self.map_offset_y + 1
+        
+        marker_rect = pygame.Rect(screen_x, screen_y, TILE_SIZE - 2, TILE_SIZE - 2)
+        
+        urgency_color = self.get_order_urgency_color(order)
+        time_remaining = self.get_order_time_remaining(order)
+        
+        # Determinar colores según estado y urgencia
+        if in_inventory:
+            if time_remaining <= 0:
+                fill_color = (80, 40, 40)
+                border_color = (120, 0, 0)
+            elif urgency_color == DARK_GREEN:
+                fill_color = (255, 200, 150)
+                border_color = (255, 140, 0)
+            elif urgency_color == YELLOW:
+                fill_color = (255, 180, 255)
+                border_color = (255, 100, 255)
+            else:
+                fill_color = (255, 100, 150)
+                border_color = (255, 0, 100)
+        elif is_dropoff:
+            if urgency_color == DARK_GREEN:
+                fill_color = (150, 200, 255)
+                border_color = (0, 100, 255)
+            elif urgency_color == YELLOW:
+                fill_color = (180, 180, 255)
+                border_color = (100, 100, 255)
+            else:
+                fill_color = (200, 150, 255)
+                border_color = (150, 0, 255)
+        else:
+            if time_remaining <= 0:
+                fill_color = (100, 50, 50)
+                border_color = DARK_RED
+            elif urgency_color == DARK_GREEN:
+                fill_color = (200, 255, 200)
+                border_color = DARK_GREEN
+            elif urgency_color == YELLOW:
+                fill_color = (255, 255, 200)
+                border_color = ORANGE
+            else:
+                fill_color = (255, 200, 200)
+                border_color = RED
+        
+        pygame.draw.rect(self.screen, fill_color, marker_rect)
+        border_width = 3 if time_remaining <= 0 or urgency_color == RED else 2
+        pygame.draw.rect(self.screen, border_color, marker_rect, border_width)
+        
+        text = self.font.render(label, True, BLACK)
+        text_rect = text.get_rect(center=(screen_x + TILE_SIZE // 2, screen_y + TILE_SIZE // 2))
+        self.screen.blit(text, text_rect)
+        marker_region = marker_rect.union(text_rect)
+        
+        time_text = ""
+        if TILE_SIZE >= 28:
+            time_text = self.get_order_status_text(order)
+            time_surface = self.small_font.render(time_text[:6], True, BLACK)
+            time_rect = time_surface.get_rect(center=(screen_x + TILE_SIZE // 2, screen_y + TILE_SIZE // 2 + 12))
+            self.screen.blit(time_surface, time_rect)
+            marker_region.union_ip(time_rect)
+
+        self.renderer.mark("orders", (order.id, label), marker_region,
+                           (screen_x, screen_y, fill_color, border_color, border_width, time_text[:6]))
+
+    def draw_ui(self):
+        """ Dibuja la interfaz con controles restaurados."""
+        sidebar_x = self.map_offset_x + self.map_pixel_width + 25
+        sidebar_width = WINDOW_WIDTH - sidebar_x - 25
+        panel_spacing = 15
+        
+        col_width = (sidebar_width - panel_spacing) // 2
+        col1_x = sidebar_x
+        col2_x = sidebar_x + col_width + panel_spacing
+        
+        for name, draw_panel, x, y, height in self._sidebar_layout(col1_x, col2_x):
+            # Marco del panel ampliado para cubrir textos que sobresalen
+            panel_rect = pygame.Rect(x - 8, y - 5, col_width + 16, height).inflate(40, 0)
+            snapshot = self._panel_snapshot(name, col_width)
+
+            panel = self.sidebar_panels.get(name)
+            if panel is None:
+                panel = self.sidebar_panels[name] = RetainedPanel(name)
+            if panel.needs_redraw(panel_rect, snapshot):
+                local_x, local_y = x - panel_rect.x, y - panel_rect.y
+                panel.redraw(panel_rect, snapshot,
+                             lambda surface: self._draw_onto(surface, draw_panel, local_x, local_y, col_width))
+
+            self.screen.blit(panel.surface, panel_rect)
+            self.renderer.mark("panels", name, panel_rect, snapshot)
+
+    def _draw_onto(self, surface: pygame.Surface, draw_fn, *args):
+        """Ejecuta una función draw_* dirigiendo su salida a otra superficie."""
+        screen = self.screen
+        self.screen = surface
+        try:
+            draw_fn(*args)
+        finally:
+            self.screen = screen
+
+    def _sidebar_layout(self, col1_x: int, col2_x: int) -> List[tuple]:
+        """Posición y alto de cada panel lateral: (nombre, función, x, y, alto)."""
+        return [
+            ("header", self.draw_compact_header, col1_x, 30, 75),
+            ("stats", self.draw_compact_stats, col1_x, 115, 130),
+            ("player_status", self.draw_compact_player_status, col1_x, 255, 110),
+            ("reputation", self.draw_compact_reputation, col1_x, 395, 110),
+            ("weather", self.draw_compact_weather, col1_x, 515, 110),
+            ("legend", self.draw_compact_legend, col2_x, 30, 75),
+            ("tips", self.draw_compact_tips, col2_x, 115, 90),
+            ("progress", self.draw_compact_progress, col2_x, 215, 80),
+            ("controls", self.draw_compact_controls, col2_x, 305, 230),
+        ]
+
+    def _panel_snapshot(self, name: str, width: int) -> tuple:
+        """Valores visibles de un panel lateral; si no cambian, el panel tampoco."""
+        if name == "header":
+            return (self.city_name, len(self.tile_images), len(self.weather_images),
+                    self.player_image is not None, self.money, self.goal)
+        if name == "stats":
+            return (self.reputation, self.format_time(self.max_game_time - self.game_time),
+                    self.player_pos.x, self.player_pos.y, f"{self.calculate_actual_speed():.1f}",
+                    self.inventory.total_weight, self.max_weight,
+                    self.available_orders.size(), len(self.pending_orders), len(self.completed_orders))
+        if name == "player_status":
+            fill_width = int((width - 30) * self.stamina / self.max_stamina)
+            # Tramo de resistencia: decide color, estado (EXHAUSTO/CANSADO/NORMAL) y texto de recuperación
+            stamina_bucket = 0 if self.stamina <= 0 else 1 if self.stamina <= 30 else 2
+            return (f"{self.stamina:.0f}", f"{30 - self.stamina:.0f}", stamina_bucket,
+                    fill_width, self.max_stamina, self.delivery_streak)
+        if name == "reputation":
+            return (self.reputation, self.delivery_streak)
+        if name == "weather":
+            ws = self.weather_system
+            return (ws.current_condition, ws.get_weather_description(),
+                    f"{ws.get_speed_multiplier():.0%}", f"{ws.get_stamina_penalty() * 100:.0f}",
+                    ws.get_weather_color())
+        if name == "legend":
+            return tuple(sorted(self.tile_images))
+        if name == "progress":
+            return (len(self.completed_orders), self.format_time(self.game_time),
+                    f"{self.calculate_efficiency():.1f}")
+        # Paneles estáticos (reglas, controles)
+        return ()
+    
+    def draw_compact_reputation(self, x: int, y: int, width: int):
+        """Barra de reputación con mismas dimensiones que Estado Jugador."""
+        reputation_bg = pygame.Rect(x - 8, y - 5, width + 16, 110)
+        pygame.draw.rect(self.screen, (240, 255, 240), reputation_bg, border_radius=6)
+        pygame.draw.rect(self.screen, UI_BORDER, reputation_bg, 2, border_radius=6)
+        
+        title = self.header_font.render("REPUTACIÓN", True, UI_TEXT_HEADER)
+        self.screen.blit(title, (x + 5, y))
+        
+        bar_y = y + 25
+        bar_width = width - 20
+        bar_height = 20
+        
+        label = self.font.render("REPUTACIÓN:", True, UI_TEXT_NORMAL)
+        self.screen.blit(label, (x + 5, bar_y))
+        
+        bar_bg = pygame.Rect(x + 10, bar_y + 20, bar_width - 10, bar_height)
+        pygame.draw.rect(self.screen, DARK_GRAY, bar_bg, border_radius=3)
+        
+        reputation_progress = self.reputation / 100.0
+        fill_width = max(3, int((bar_width - 10) * reputation_progress))
+        
+        if self.reputation >= 90:
+            fill_color = BRIGHT_GREEN
+        elif self.reputation >= 80:
+            fill_color = GREEN
+        elif self.reputation >= 70:
+            fill_color = YELLOW
+        elif self.reputation >= 50:
+            fill_color = ORANGE
+        elif self.reputation >= 20:
+            fill_color = RED
+        else:
+            fill_color = DARK_RED
+        
+        if fill_width > 0:
+            fill_rect = pygame.Rect(x + 12, bar_y + 22, fill_width - 4, bar_height - 4)
+            pygame.draw.rect(self.screen, fill_color, fill_rect, border_radius=2)
+        
+        pygame.draw.rect(self.screen, UI_BORDER, bar_bg, 2, border_radius=3)
+        
+        reputation_text = f"{self.reputation}/100"
+        text_surface = self.small_font.render(reputation_text, True, BLACK)
+        text_rect = text_surface.get_rect(center=(x + bar_width // 2, bar_y + 30))
+        self.screen.blit(text_surface, text_rect)
+        
+        status_y = bar_y + 45
+        if self.reputation < 20:
+            status_text = "CRÍTICA (¡Perderás!)"
+            status_color = UI_CRITICAL
+        elif self.reputation >= 90:
+            status_text = "EXCELENTE (+5%)"
+            status_color = UI_SUCCESS
+        elif self.reputation >= 80:
+            status_text = "MUY BUENA"
+            status_color = UI_SUCCESS
+        elif self.reputation >= 70:
+            status_text = "BUENA"
+            status_color = UI_WARNING
+        else:
+            status_text = "REGULAR"
+            status_color = UI_WARNING
+        
+        status_surface = self.font.render(status_text, True, status_color)
+        self.screen.blit(status_surface, (x + 5, status_y))
+        
+        if self.delivery_streak > 0:
+            streak_text = f"Racha perfecta: {self.delivery_streak}/3"
+            streak_surface = self.small_font.render(streak_text, True, UI_WARNING)
+            self.screen.blit(streak_surface, (x + 5, status_y + 20))
+
+    def draw_compact_progress(self, x: int, y: int, width: int):
+        """Progreso del juego."""
+        progress_bg = pygame.Rect(x - 8, y - 5, width + 16, 80)
+        pygame.draw.rect(self.screen, (255, 255, 240), progress_bg, border_radius=6)
+        pygame.draw.rect(self.screen, UI_BORDER, progress_bg, 2, border_radius=6)
+        
+        title = self.header_font.render("PROGRESO", True, UI_TEXT_HEADER)
+        self.screen.blit(title, (x + 5, y))
+        
+        efficiency = self.calculate_efficiency()
+        
+        progress_info = [
+            f"Completados: {len(self.completed_orders)}",
+            f"Tiempo jugado: {self.format_time(self.game_time)}",
+            f"Eficiencia: {efficiency:.1f}%"
+        ]
+        
+        for i, info in enumerate(progress_info):
+            color = UI_SUCCESS if "Completados" in info else UI_TEXT_NORMAL
+            text = self.small_font.render(info, True, color)
+            self.screen.blit(text, (x + 5, y + 20 + i * 16))
+    
+    def draw_compact_stat(self, x: int, y: int, text: str, color: tuple):
+        """Dibuja una estadística de forma compacta."""
+        text_surface = self.small_font.render(text, True, color)
+        self.screen.blit(text_surface, (x, y))
+    
+    def draw_compact_tips(self, x: int, y: int, width: int):
+        """Consejos basados en las reglas del documento."""
+        tips_bg = pygame.Rect(x - 8, y - 5, width + 16, 90)
+        pygame.draw.rect(self.screen, (240, 255, 240), tips_bg, border_radius=6)
+        pygame.draw.rect(self.screen, UI_BORDER, tips_bg, 2, border_radius=6)
+        
+        title = self.header_font.render("REGLAS DEL JUEGO", True, UI_TEXT_HEADER)
+        self.screen.blit(title, (x + 5, y))
+        
+        # Reglas según documento
+        tips = [
+            "• Resistencia >30 para moverse",
+            "• META: $3000 (Mayor desafío)",
+            "• P2: 4min | P1: 7min | P0: 9min",
+            "• Mayor prioridad = Mayor pago"
+        ]
+        
+        for i, tip in enumerate(tips):
+            text = self.small_font.render(tip, True, UI_TEXT_NORMAL)
+            self.screen.blit(text, (x + 5, y + 20 + i * 15))
+
+    def draw_inventory_overlay(self):
+        """Overlay del inventario con información detallada."""
+        overlay_x = self.map_offset_x + self.map_pixel_width + 40
+        overlay_y = 400
+        overlay_width = 650
+        overlay_height = 520
+        
+        overlay_rect = pygame.Rect(overlay_x, overlay_y, overlay_width, overlay_height)
+        pygame.draw.rect(self.screen, UI_BACKGROUND, overlay_rect, border_radius=12)
+        pygame.draw.rect(self.screen, UI_BORDER, overlay_rect, 3, border_radius=12)
+        
+        # Título
+        title_bg = pygame.Rect(overlay_x, overlay_y, overlay_width, 45)
+        pygame.draw.rect(self.screen, UI_HIGHLIGHT, title_bg, border_radius=12)
+        title = self.large_font.render("INVENTARIO ACTUAL", True, UI_TEXT_HEADER)
+        title_rect = title.get_rect(center=(overlay_x + overlay_width // 2, overlay_y + 22))
+        self.screen.blit(title, title_rect)
+        
+        if not self.inventory:
+            no_items_text = self.font.render("No hay pedidos en inventario", True, UI_TEXT_SECONDARY)
+            text_rect = no_items_text.get_rect(center=(overlay_rect.centerx, overlay_rect.centery))
+            self.screen.blit(no_items_text, text_rect)
+        else:
+            inventory_list = list(self.inventory)
+            
+            for i, order in enumerate(inventory_list[:7]):
+                y_pos = overlay_rect.y + 55 + i * 65
+                
+                if i == self.selected_inventory_index:
+                    selection_rect = pygame.Rect(overlay_rect.x + 8, y_pos - 3, overlay_width - 16, 60)
+                    pygame.draw.rect(self.screen, UI_HIGHLIGHT, selection_rect, border_radius=5)
+                    pygame.draw.rect(self.screen, UI_BORDER, selection_rect, 2, border_radius=5)
+                
+                urgency_color = self.get_order_urgency_color(order)
+                time_text = self.get_order_status_text(order)
+                district = self._get_district_name(order.dropoff.x, order.dropoff.y)
+                
+                priority_text = f"P{order.priority}" if order.priority > 0 else "Normal"
+                
+                text1 = self.font.render(f"{order.id} ({priority_text}) - {time_text}", True, urgency_color)
+                self.screen.blit(text1, (overlay_rect.x + 15, y_pos))
+                
+                text2 = self.small_font.render(f"Peso: {order.weight}kg - Pago: ${order.payout} - {district}", True, UI_TEXT_NORMAL)
+                self.screen.blit(text2, (overlay_rect.x + 15, y_pos + 20))
+                
+                distance = abs(order.dropoff.x - self.player_pos.x) + abs(order.dropoff.y - self.player_pos.y)
+                text3 = self.small_font.render(f"Destino: ({order.dropoff.x}, {order.dropoff.y}) - Distancia: {distance} celdas", True, UI_TEXT_SECONDARY)
+                self.screen.blit(text3, (overlay_rect.x + 15, y_pos + 40))
+        
+        instructions_bg = pygame.Rect(overlay_x, overlay_y + overlay_height - 50, overlay_width, 45)
+        pygame.draw.rect(self.screen, (240, 240, 245), instructions_bg, border_radius=12)
+        
+        instructions = [
+            "↑/↓: Navegar | ENTER: Entregar (si estás en destino) | I: Cerrar",
+            "P/T: Ordenar por prioridad/tiempo restante según algoritmos implementados"
+        ]
+        
+        for i, instruction in enumerate(instructions):
+            color = UI_SUCCESS if "algoritmos" in instruction else UI_TEXT_NORMAL
+            text = self.small_font.render(instruction, True, color)
+            self.screen.blit(text, (overlay_rect.x + 15, overlay_rect.y + overlay_height - 42 + i * 14))
+
+
+    def draw_orders_overlay(self):
+        """Overlay de pedidos con algoritmos de ordenamiento."""
+        overlay_x = self.map_offset_x + self.map_pixel_width + 40
+        overlay_y = 50
+        overlay_width = 750
+        overlay_height = 650
+        
+        overlay_rect = pygame.Rect(overlay_x, overlay_y, overlay_width, overlay_height)
+        pygame.draw.rect(self.screen, UI_BACKGROUND, overlay_rect, border_radius=12)
+        pygame.draw.rect(self.screen, UI_BORDER, overlay_rect, 3, border_radius=12)
+        
+        # Título
+        title_bg = pygame.Rect(overlay_x, overlay_y, overlay_width, 50)
+        pygame.draw.rect(self.screen, UI_HIGHLIGHT, title_bg, border_radius=12)
+        title = self.large_font.render("PEDIDOS - ALGORITMOS IMPLEMENTADOS", True, UI_TEXT_HEADER)
+        title_rect = title.get_rect(center=(overlay_x + overlay_width // 2, overlay_y + 25))
+        self.screen.blit(title, title_rect)
+        
+        if not self.available_orders.items:
+            no_orders_text = self.font.render("No hay pedidos disponibles", True, UI_TEXT_SECONDARY)
+            text_rect = no_orders_text.get_rect(center=(overlay_rect.centerx, overlay_rect.centery))
+            self.screen.blit(no_orders_text, text_rect)
+        else:
+            # Mostrar pedidos disponibles
+            for i, order in enumerate(self.available_orders.items[:7]):
+                y_pos = overlay_rect.y + 60 + i * 80
+                
+                if i == self.selected_order_index:
+                    selection_rect = pygame.Rect(overlay_rect.x + 8, y_pos - 3, overlay_width - 16, 75)
+                    pygame.draw.rect(self.screen, UI_HIGHLIGHT, selection_rect, border_radius=5)
+                    pygame.draw.rect(self.screen, UI_BORDER, selection_rect, 2, border_radius=5)
+                
+                urgency_color = self.get_order_urgency_color(order)
+                time_text = self.get_order_status_text(order)
+                
+                pickup_district = self._get_district_name(order.pickup.x, order.pickup.y)
+                dropoff_district = self._get_district_name(order.dropoff.x, order.dropoff.y)
+                
+                priority_text = f"P{order.priority}" if order.priority > 0 else "Normal"
+                
+                text1 = self.font.render(f"{order.id} ({priority_text}) - ${order.payout} | {time_text}", True, urgency_color)
+                self.screen.blit(text1, (overlay_rect.x + 15, y_pos))
+                
+                text2 = self.small_font.render(f"Peso: {order.weight}kg | Duración: {order.duration_minutes:.1f}min", True, UI_TEXT_NORMAL)
+                self.screen.blit(text2, (overlay_rect.x + 15, y_pos + 20))
+                
+                pickup_distance = abs(order.pickup.x - self.player_pos.x) + abs(order.pickup.y - self.player_pos.y)
+                text3 = self.small_font.render(f"Recoger: ({order.pickup.x}, {order.pickup.y}) [{pickup_district}] - {pickup_distance} celdas", True, UI_TEXT_NORMAL)
+                self.screen.blit(text3, (overlay_rect.x + 15, y_pos + 40))
+                
+                total_route_distance = abs(order.dropoff.x - order.pickup.x) + abs(order.dropoff.y - order.pickup.y)
+                text4 = self.small_font.render(f"Entregar: ({order.dropoff.x}, {order.dropoff.y}) [{dropoff_district}] - Ruta: {total_route_distance} celdas", True, UI_TEXT_SECONDARY)
+                self.screen.blit(text4, (overlay_rect.x + 15, y_pos + 60))
+        
+        instructions_bg = pygame.Rect(overlay_x, overlay_y + overlay_height - 80, overlay_width, 75)
+        pygame.draw.rect(self.screen, (240, 240, 245), instructions_bg, border_radius=12)
+        
+        instructions = [
+            "↑/↓: Navegar | ENTER: Aceptar pedido | O: Cerrar",
+            "",
+            " ALGORITMOS DE ORDENAMIENTO IMPLEMENTADOS:",
+            "D: Ordenar por DISTANCIA (Insertion Sort) | Shift+D: automático",
+            "Usa P/T en inventario para ordenar por prioridad/tiempo "
+        ]
+        
+        for i, instruction in enumerate(instructions):
+            if not instruction:
+                continue
+            if "ALGORITMOS" in instruction:
+                color = UI_SUCCESS
+            elif "Check" in instruction:
+                color = UI_WARNING
+            else:
+                color = UI_TEXT_NORMAL
+            
+            text = self.small_font.render(instruction, True, color)
+            self.screen.blit(text, (overlay_rect.x + 15, overlay_rect.y + overlay_height - 70 + i * 14))
+
+
+    def draw_pause_overlay(self):
+        """Overlay de pausa."""
+        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+        overlay.set_alpha(180)
+        overlay.fill((0, 0, 50))
+        self.screen.blit(overlay, (0, 0))
+        
+        pause_rect = pygame.Rect(WINDOW_WIDTH // 2 - 250, WINDOW_HEIGHT // 2 - 120, 500, 240)
+        pygame.draw.rect(self.screen, UI_BACKGROUND, pause_rect, border_radius=15)
+        pygame.draw.rect(self.screen, UI_BORDER, pause_rect, 4, border_radius=15)
+        
+        pause_text = self.title_font.render("JUEGO PAUSADO", True, UI_TEXT_HEADER)
+        text_rect = pause_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 40))
+        self.screen.blit(pause_text, text_rect)
+        
+        instruction_text = self.large_font.render("Presiona ESPACIO para continuar", True, UI_TEXT_NORMAL)
+        text_rect = instruction_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 10))
+        self.screen.blit(instruction_text, text_rect)
+        
+        state_info = [
+            f"Dinero: ${self.money}/${self.goal}",
+            f"Tiempo restante: {self.format_time(self.max_game_time - self.game_time)}",
+            f"Reputación: {self.reputation}/100"
+        ]
+        
+        for i, info in enumerate(state_info):
+            text = self.font.render(info, True, UI_TEXT_SECONDARY)
+            text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 40 + i * 25))
+            self.screen.blit(text, text_rect)
+    
+    
+    def draw_game_over_overlay(self):
+        """Overlay de fin de juego SIN guardar puntaje (ya se guardó en update)."""
+        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+        overlay.set_alpha(220)
+        overlay.fill((20, 20, 40))
+        self.screen.blit(overlay, (0, 0))
+        
+        game_over_rect = pygame.Rect(WINDOW_WIDTH // 2 - 350, WINDOW_HEIGHT // 2 - 280, 700, 560)
+        pygame.draw.rect(self.screen, UI_BACKGROUND, game_over_rect, border_radius=20)
+        pygame.draw.rect(self.screen, UI_BORDER, game_over_rect, 5, border_radius=20)
+        
+        if self.victory:
+            title_text = self.title_font.render("¡VICTORIA!", True, UI_SUCCESS)
+            message = f"¡Felicidades! Alcanzaste la meta de ${self.goal}"
+        else:
+            title_text = self.title_font.render("JUEGO TERMINADO", True, UI_CRITICAL)
+            if self.reputation < 20:
+                message = "Reputación demasiado baja"
+            else:
+                message = f"Tiempo agotado. Necesitabas ${self.goal - self.money} más"
+        
+        title_rect = title_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 240))
+        self.screen.blit(title_text, title_rect)
+        
+        final_score = self._calculate_final_score()
+        
+        final_district = self._get_district_name(self.player_pos.x, self.player_pos.y)
+        efficiency = self.calculate_efficiency()
+        
+        stats = [
+            message,
+            "",
+            f"PUNTAJE FINAL: {final_score}",
+            f"Dinero obtenido: ${self.money} / ${self.goal}",
+            f"Reputación final: {self.reputation}/100",
+            f"Pedidos completados: {len(self.completed_orders)}",
+            f"Eficiencia: {efficiency:.1f}%",
+            f"Ciudad: {self.city_name} ({self.city_width}x{self.city_height})",
+            f"Posición final: ({self.player_pos.x}, {self.player_pos.y}) - Distrito {final_district}",
+            f"Mejor racha consecutiva: {getattr(self, 'delivery_streak', 0)}",
+            f"Tiempo total jugado: {self.format_time(self.game_time)}"
+        ]
+        
+        for i, stat in enumerate(stats):
+            if not stat:
+                continue
+                
+            if "PUNTAJE FINAL" in stat:
+                color = UI_SUCCESS if self.victory else UI_CRITICAL
+                font = self.large_font
+            elif "Dinero obtenido" in stat:
+                progress = (self.money / self.goal) * 100
+                color = UI_SUCCESS if progress >= 100 else UI_WARNING if progress >= 80 else UI_CRITICAL
+                font = self.font
+            elif "Reputación" in stat:
+                color = UI_SUCCESS if self.reputation >= 80 else UI_WARNING if self.reputation >= 50 else UI_CRITICAL
+                font = self.font
+            else:
+                color = UI_TEXT_NORMAL
+                font = self.font
+            
+            text = font.render(stat, True, color)
+            text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 180 + i * 30))
+            self.screen.blit(text, text_rect)
+        
+        exit_text = self.font.render("Presiona ESC para salir al menú principal", True, UI_TEXT_SECONDARY)
+        exit_rect = exit_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 220))
+        self.screen.blit(exit_text, exit_rect)
+    
+    def format_time(self, seconds: float) -> str:
+        """Formatea el tiempo en MM:SS."""
+        if seconds < 0:
+            seconds = 0
+        minutes = int(seconds // 60)
+        seconds = int(seconds % 60)
+        return f"{minutes:02d}:{seconds:02d}"
+    
+    def calculate_efficiency(self) -> float:
+        """Calcula la eficiencia del jugador."""
+        if self.game_time <= 0:
+            return 0.0
+        
+        completed = len(self.completed_orders)
+        efficiency = (completed / max(1, self.game_time / 60)) * 100
+        
+        return min(100.0, efficiency)
+    
+    def run(self):
+        """Bucle principal del juego."""
+        last_time = time.time()
+        
+        print("=" * 90)
+        print(" COURIER QUEST - VERSIÓN CON REPARTIDOR PNG")
+        print("=" * 90)
+        print()
+        print(" ESTADO DE IMÁGENES CARGADAS:")
+        image_status = self.get_complete_image_status()
+        print(f"   {image_status}")
+        print()
+        print(" Controles del juego:")
+        print("   • WASD o Flechas: Movimiento del repartidor")
+        print("   • E: Interactuar con pedidos (recoger/entregar)")
+        print("   • I: Inventario | O: Pedidos disponibles")
+        print("   • P: Ordenar por prioridad")
+        print("   • T: Ordenar por tiempo restante")
+        print("   • D: Ordenar por distancia (InsertionSort)")
+        print("   • F5: Guardar | F9: Cargar")
+        print("   • Ctrl+Z: Deshacer movimiento")
+        print("   • ESPACIO: Pausar")
+        print()
+        print(" INDICADORES VISUALES DEL REPARTIDOR:")
+        if self.player_image is not None:
+            print("   • 🖼️ IMAGEN PNG: Repartidor.png cargada correctamente")
+            print("   • 🟢 BORDE VERDE: Resistencia normal (>30)")
+            print("   • 🟡 BORDE AMARILLO: Cansado (1-30 resistencia)")
+            print("   • 🔴 BORDE ROJO: Exhausto (0 resistencia)")
+            print("   • ⚠️ ALERTA ROJA: Indicador visual cuando está crítico")
+        else:
+            print("   •  GRÁFICO DE RESPALDO: Círculo con colores de estado")
+            print("   • 🔵 AZUL: Normal | 🟡 AMARILLO: Cansado | 🔴 ROJO: Exhausto")
+        print()
+        
+        while self.running:
+            current_time = time.time()
+            dt = current_time - last_time
+            last_time = current_time
+            dt = min(dt, 1.0 / 30.0)
+            events = pygame.event.get()
+            self.handle_events(events)
+            if self.game_state == "playing":
+                keys = pygame.key.get_pressed()
+                self.handle_input(keys, dt)
+            self.update(dt)
+            self.draw()
+            self.clock.tick(FPS)
+        
+        pygame.quit()
+    
+    def draw_compact_header(self, x: int, y: int, width: int):
+        """Encabezado compacto con información de la API incluyendo estado del jugador."""
+        header_bg = pygame.Rect(x - 8, y - 5, width + 16, 75)
+        pygame.draw.rect(self.screen, UI_HIGHLIGHT, header_bg, border_radius=6)
+        pygame.draw.rect(self.screen, UI_BORDER, header_bg, 2, border_radius=6)
+        
+        title = self.large_font.render(f"COURIER QUEST - {self.city_name.upper()}", True, UI_TEXT_HEADER)
+        title_rect = title.get_rect(center=(x + width // 2, y + 12))
+        self.screen.blit(title, title_rect)
+        
+        tile_count = len(self.tile_images)
+        weather_count = len(self.weather_images)
+        has_player_image = self.player_image is not None
+        
+        if tile_count == 3 and weather_count >= 9 and has_player_image:
+            subtitle = self.font.render("API REAL + IMÁGENES COMPLETAS + JUGADOR ✅", True, UI_SUCCESS)
+        elif tile_count > 0 or weather_count > 0 or has_player_image:
+            components = []
+            if tile_count > 0:
+                components.append(f"{tile_count} TILES")
+            if weather_count > 0:
+                components.append(f"{weather_count} CLIMA")
+            if has_player_image:
+                components.append("JUGADOR")
+            subtitle = self.font.render(f"API + {' + '.join(components)} ✅", True, UI_SUCCESS)
+        else:
+            subtitle = self.font.render("API REAL + GRÁFICOS DE RESPALDO ⚠️", True, UI_WARNING)
+        subtitle_rect = subtitle.get_rect(center=(x + width // 2, y + 32))
+        self.screen.blit(subtitle, subtitle_rect)
+        
+        progress = (self.money / self.goal) * 100
+        meta_color = UI_SUCCESS if progress >= 100 else UI_WARNING if progress >= 80 else UI_CRITICAL
+        meta_text = f"Meta: ${self.money}/${self.goal} ({progress:.1f}%)"
+        meta = self.small_font.render(meta_text, True, meta_color)
+        meta_rect = meta.get_rect(center=(x + width // 2, y + 52))
+        self.screen.blit(meta, meta_rect)
+    
+    def draw_compact_stats(self, x: int, y: int, width: int):
+        """Estadísticas principales con reglas exactas."""
+        stats_bg = pygame.Rect(x - 8, y - 5, width + 16, 130)
+        pygame.draw.rect(self.screen, (250, 250, 255), stats_bg, border_radius=6)
+        pygame.draw.rect(self.screen, UI_BORDER, stats_bg, 2, border_radius=6)
+        
+        title = self.header_font.render("ESTADÍSTICAS", True, UI_TEXT_HEADER)
+        self.screen.blit(title, (x + 5, y))
+        
+        stats_y = y + 25
+        col_left = x + 5
+        col_right = x + width // 2 + 5
+        
+        # Columna izquierda
+        rep_color = UI_SUCCESS if self.reputation >= 80 else UI_WARNING if self.reputation >= 50 else UI_CRITICAL
+        self.draw_compact_stat(col_left, stats_y, f"Reputación: {self.reputation}/100", rep_color)
+        
+        time_left = self.max_game_time - self.game_time
+        time_color = UI_SUCCESS if time_left > 300 else UI_WARNING if time_left > 120 else UI_CRITICAL
+        self.draw_compact_stat(col_left, stats_y + 20, f"Tiempo: {self.format_time(time_left)}", time_color)
+        
+        district = self._get_district_name(self.player_pos.x, self.player_pos.y)
+        self.draw_compact_stat(col_left, stats_y + 40, f"Distrito: {district}", BLUE)
+        
+        speed = self.calculate_actual_speed()
+        speed_color = UI_SUCCESS if speed >= 2.5 else UI_WARNING if speed >= 2.0 else UI_CRITICAL
+        self.draw_compact_stat(col_left, stats_y + 60, f"Velocidad: {speed:.1f} c/s", speed_color)
+        
+        # Columna derecha
+        inv_weight = self.inventory.total_weight
+        inv_color = UI_WARNING if inv_weight >= self.max_weight * 0.8 else UI_TEXT_NORMAL
+        self.draw_compact_stat(col_right, stats_y, f"Inventario: {inv_weight}/{self.max_weight}kg", inv_color)
+        
+        active_orders = self.available_orders.size()
+        orders_color = UI_SUCCESS if active_orders > 0 else UI_TEXT_SECONDARY
+        self.draw_compact_stat(col_right, stats_y + 20, f"Activos: {active_orders}/10", orders_color)
+        
+        self.draw_compact_stat(col_right, stats_y + 40, f"Pendientes: {len(self.pending_orders)}", UI_TEXT_NORMAL)
+        self.draw_compact_stat(col_right, stats_y + 60, f"Completados: {len(self.completed_orders)}", UI_SUCCESS)
+    
+    
+    def draw_compact_player_status(self, x: int, y: int, width: int):
+        """Estado del jugador con reglas exactas del documento."""
+        status_bg = pygame.Rect(x - 8, y - 5, width + 16, 110)
+        pygame.draw.rect(self.screen, (255, 250, 240), status_bg, border_radius=6)
+        pygame.draw.rect(self.screen, UI_BORDER, status_bg, 2, border_radius=6)
+        
+        title = self.header_font.render("ESTADO JUGADOR", True, UI_TEXT_HEADER)
+        self.screen.blit(title, (x + 5, y))
+        
+        bar_y = y + 25
+        bar_width = width - 20
+        bar_height = 20
+        
+        label = self.font.render("RESISTENCIA:", True, UI_TEXT_NORMAL)
+        self.screen.blit(label, (x + 5, bar_y))
+        
+        bar_bg = pygame.Rect(x + 10, bar_y + 20, bar_width - 10, bar_height)
+        pygame.draw.rect(self.screen, DARK_GRAY, bar_bg, border_radius=3)
+        
+        stamina_progress = self.stamina / self.max_stamina
+        fill_width = max(3, int((bar_width - 10) * stamina_progress))
+        
+        if self.stamina > 30: 
+            fill_color = UI_SUCCESS
+        elif self.stamina > 0:
+            fill_color = UI_WARNING
+        else: 
+            fill_color = UI_CRITICAL
+        
+        if fill_width > 0:
+            fill_rect = pygame.Rect(x + 12, bar_y + 22, fill_width - 4, bar_height - 4)
+            pygame.draw.rect(self.screen, fill_color, fill_rect, border_radius=2)
+        
+        threshold_x = x + 10 + int((30 / self.max_stamina) * (bar_width - 10))
+        pygame.draw.line(self.screen, (255, 100, 100), 
+                        (threshold_x, bar_y + 20), 
+                        (threshold_x, bar_y + 20 + bar_height), 2)
+        
+        pygame.draw.rect(self.screen, UI_BORDER, bar_bg, 2, border_radius=3)
+        
+        stamina_text = f"{self.stamina:.0f}/{self.max_stamina}"
+        text_surface = self.small_font.render(stamina_text, True, BLACK)
+        text_rect = text_surface.get_rect(center=(x + bar_width // 2, bar_y + 30))
+        self.screen.blit(text_surface, text_rect)
+        
+        status_y = bar_y + 45
+        if self.stamina <= 0:
+            status_text = "EXHAUSTO (¡BLOQUEADO!)"
+            status_color = UI_CRITICAL
+        elif self.stamina <= 30:
+            status_text = f"CANSADO ({self.stamina:.0f}/30)"
+            status_color = UI_WARNING
+        else:
+            status_text = "NORMAL"
+            status_color = UI_SUCCESS
+        
+        status_surface = self.font.render(status_text, True, status_color)
+        self.screen.blit(status_surface, (x + 5, status_y))
+        
+        if self.stamina <= 0:
+            recovery_text = "Recupera hasta 30 para moverte"
+            recovery_surface = self.small_font.render(recovery_text, True, UI_CRITICAL)
+            self.screen.blit(recovery_surface, (x + 5, status_y + 20))
+        elif self.stamina <= 30:
+            recovery_text = f"Para moverte: {30 - self.stamina:.0f} más"
+            recovery_surface = self.small_font.render(recovery_text, True, UI_WARNING)
+            self.screen.blit(recovery_surface, (x + 5, status_y + 20))
+        
+        if self.delivery_streak > 0 and self.stamina > 0:
+            streak_text = f"Racha: {self.delivery_streak}/3"
+            streak_surface = self.small_font.render(streak_text, True, UI_WARNING)
+            self.screen.blit(streak_surface, (x + width - 80, status_y))
+    
+    def draw_compact_weather(self, x: int, y: int, width: int):
+        """Indicador del clima con imagen ajustada al marco."""
+        weather_bg = pygame.Rect(x - 8, y - 5, width + 16, 110)
+        pygame.draw.rect(self.screen, UI_HIGHLIGHT, weather_bg, border_radius=6)
+        pygame.draw.rect(self.screen, UI_BORDER, weather_bg, 2, border_radius=6)
+        
+        title = self.header_font.render("CLIMA DINÁMICO", True, UI_TEXT_HEADER)
+        self.screen.blit(title, (x + 5, y))
+        
+        current_weather = self.weather_system.current_condition
+        image_size = 75 
+        weather_image_pos = (x + 12, y + 27) 
+        
+        if current_weather in self.weather_images:
+            scaled_image = pygame.transform.scale(self.weather_images[current_weather], (image_size, image_size))
+            self.screen.blit(scaled_image, weather_image_pos)
+            
+            image_rect = pygame.Rect(weather_image_pos[0], weather_image_pos[1], image_size, image_size)
+            pygame.draw.rect(self.screen, UI_BORDER, image_rect, 2, border_radius=5)
+        else:
+            weather_color = self.weather_system.get_weather_color()
+            circle_rect = pygame.Rect(weather_image_pos[0], weather_image_pos[1], image_size, image_size)
+            pygame.draw.ellipse(self.screen, weather_color, circle_rect)
+            pygame.draw.ellipse(self.screen, UI_BORDER, circle_rect, 2)
+        
+        weather_name = self.weather_system.get_weather_description()
+        name_text = self.font.render(weather_name, True, UI_TEXT_NORMAL)
+        self.screen.blit(name_text, (x + image_size + 25, y + 27))
+        
+        speed_mult = self.weather_system.get_speed_multiplier()
+        stamina_penalty = self.weather_system.get_stamina_penalty()
+        
+        speed_color = UI_SUCCESS if speed_mult >= 0.9 else UI_WARNING if speed_mult >= 0.8 else UI_CRITICAL
+        stamina_color = UI_SUCCESS if stamina_penalty <= 0.05 else UI_WARNING if stamina_penalty <= 0.1 else UI_CRITICAL
+        
+        speed_text = f"Velocidad: {speed_mult:.0%}"
+        stamina_text = f"Resistencia: -{stamina_penalty*100:.0f}%"
+        
+        speed_surface = self.small_font.render(speed_text, True, speed_color)
+        stamina_surface = self.small_font.render(stamina_text, True, stamina_color)
+        
+        self.screen.blit(speed_surface, (x + image_size + 25, y + 50))
+        self.screen.blit(stamina_surface, (x + image_size + 25, y + 70))
+    
+    def draw_compact_legend(self, x: int, y: int, width: int):
+        """Leyenda del mapa con reglas del juego."""
+        legend_bg = pygame.Rect(x - 8, y - 5, width + 16, 75)
+        pygame.draw.rect(self.screen, (255, 255, 240), legend_bg, border_radius=6)
+        pygame.draw.rect(self.screen, UI_BORDER, legend_bg, 2, border_radius=6)
+        
+        title = self.header_font.render("LEYENDA DEL MAPA", True, UI_TEXT_HEADER)
+        self.screen.blit(title, (x + 5, y))
+        
+        items = [
+            ("Calles", LIGHT_GRAY, "🖼️ PNG" if "C" in self.tile_images else "Caminable"),
+            ("Parques", GREEN, "🖼️ PNG +15/s" if "P" in self.tile_images else "Recupera +15/s"),
+            ("Edificios", DARK_GRAY, "🖼️ PNG" if "B" in self.tile_images else "BLOQUEADO"),
+            ("Descanso", PURPLE, "Recupera +15/s")
+        ]
+        
+        for i, (name, color, desc) in enumerate(items):
+            row = i % 2
+            col = i // 2
+            item_x = x + 5 + col * (width // 2)
+            item_y = y + 20 + row * 18
+            
+            color_rect = pygame.Rect(item_x, item_y, 10, 10)
+            pygame.draw.rect(self.screen, color, color_rect)
+            pygame.draw.rect(self.screen, UI_BORDER, color_rect, 1)
+            
+            # Color especial para tiles con imágenes
+            if "🖼️" in desc:
+                text = self.small_font.render(f"{name}", True, UI_SUCCESS)
+            else:
+                text = self.small_font.render(f"{name}", True, UI_TEXT_NORMAL)
+            self.screen.blit(text, (item_x + 15, item_y - 2))
+    
+    def draw_compact_controls(self, x: int, y: int, width: int):
+        """Controles únicos sin duplicación."""
+        controls_bg = pygame.Rect(x - 8, y - 5, width + 16, 230)
+        pygame.draw.rect(self.screen, (240, 245, 255), controls_bg, border_radius=6)
+        pygame.draw.rect(self.screen, UI_BORDER, controls_bg, 2, border_radius=6)
+        
+        title = self.header_font.render("CONTROLES & ALGORITMOS", True, UI_TEXT_HEADER)
+        self.screen.blit(title, (x + 5, y))
+        
+        algo_title = self.font.render("Algoritmos:", True, UI_SUCCESS)
+        self.screen.blit(algo_title, (x + 5, y + 25))
+        
+        algorithms = [
+            "P: Prioridad",
+            "T: Tiempo restante", 
+            "D: Distancia (InsertionSort)"
+        ]
+        
+        for i, algo in enumerate(algorithms):
+            text = self.small_font.render(algo, True, UI_TEXT_NORMAL)
+            self.screen.blit(text, (x + 5, y + 45 + i * 16))
+        
+        control_title = self.font.render("Controles:", True, UI_TEXT_HEADER)
+        self.screen.blit(control_title, (x + 5, y + 105))
+        
+        controls = [
+            "WASD/Flechas: Moverse | E: Interactuar",
+            "I: Inventario | O: Pedidos",
+            "F5: Guardar | F9: Cargar",
+            "B: Volver (menú cargar)",
+            "P/T/D: Algoritmos de ordenamiento"
+        ]
+        
+        for i, control in enumerate(controls):
+            text = self.small_font.render(control, True, UI_TEXT_NORMAL)
+            self.screen.blit(text, (x + 5, y + 125 + i * 16))
+
+      
+
+    def draw_compact_progress(self, x: int, y: int, width: int):
+        """Progreso del juego."""
+        progress_bg = pygame.Rect(x - 8, y - 5, width + 16, 80)
+        pygame.draw.rect(self.screen, (255, 255, 240), progress_bg, border_radius=6)
+        pygame.draw.rect(self.screen, UI_BORDER, progress_bg, 2, border_radius=6)
+        
+        title = self.header_font.render("PROGRESO", True, UI_TEXT_HEADER)
+        self.screen.blit(title, (x + 5, y))
+        
+        efficiency = self.calculate_efficiency()
+        
+        progress_info = [
+            f"Completados: {len(self.completed_orders)}",
+            f"Tiempo jugado: {self.format_time(self.game_time)}",
+            f"Eficiencia: {efficiency:.1f}%"
+        ]
+        
+        for i, info in enumerate(progress_info):
+            color = UI_SUCCESS if "Completados" in info else UI_TEXT_NORMAL
+            text = self.small_font.render(info, True, color)
+            self.screen.blit(text, (x + 5, y + 20 + i * 16))
+    
+    def draw_compact_stat(self, x: int, y: int, text: str, color: tuple):
+        """Dibuja una estadística de forma compacta."""
+        text_surface = self.small_font.render(text, True, color)
+        self.screen.blit(text_surface, (x, y))
+    
+    def draw_compact_tips(self, x: int, y: int, width: int):
+        """Consejos basados en las reglas del documento."""
+        tips_bg = pygame.Rect(x - 8, y - 5, width + 16, 90)
+        pygame.draw.rect(self.screen, (240, 255, 240), tips_bg, border_radius=6)
+        pygame.draw.rect(self.screen, UI_BORDER, tips_bg, 2, border_radius=6)
+        
+        title = self.header_font.render("REGLAS DEL JUEGO", True, UI_TEXT_HEADER)
+        self.screen.blit(title, (x + 5, y))
+        
+        tips = [
+            "• Resistencia >30 para moverse",
+            "•  META: $3000 (Mayor desafío)",
+            "•  P2: 4min |  P1: 7min |  P0: 9min",
+            "•  Mayor prioridad = Mayor pago"
+        ]
+        
+        for i, tip in enumerate(tips):
+            text = self.small_font.render(tip, True, UI_TEXT_NORMAL)
+            self.screen.blit(text, (x + 5, y + 20 + i * 15))
+    
+    def draw_compact_progress(self, x: int, y: int, width: int):
+        """Progreso del juego."""
+        progress_bg = pygame.Rect(x - 8, y - 5, width + 16, 80)
+        pygame.draw.rect(self.screen, (255, 255, 240), progress_bg, border_radius=6)
+        pygame.draw.rect(self.screen, UI_BORDER, progress_bg, 2, border_radius=6)
+        
+        title = self.header_font.render("PROGRESO", True, UI_TEXT_HEADER)
+        self.screen.blit(title, (x + 5, y))
+        
+        efficiency = self.calculate_efficiency()
+        
+        progress_info = [
+            f"Completados: {len(self.completed_orders)}",
+            f"Tiempo jugado: {self.format_time(self.game_time)}",
+            f"Eficiencia: {efficiency:.1f}%"
+        ]
+        
+        for i, info in enumerate(progress_info):
+            color = UI_SUCCESS if "Completados" in info else UI_TEXT_NORMAL
+            text = self.small_font.render(info, True, color)
+            self.screen.blit(text, (x + 5, y + 20 + i * 16))
+    
+    def draw_compact_stat(self, x: int, y: int, text: str, color: tuple):
+        """Dibuja una estadística de forma compacta."""
+        text_surface = self.small_font.render(text, True, color)
+        self.screen.blit(text_surface, (x, y))
+
+    def draw_inventory_overlay(self):
+        """Overlay del inventario con información detallada."""
+        overlay_x = self.map_offset_x + self.map_pixel_width + 40
+        overlay_y = 400
+        overlay_width = 650
+        overlay_height = 520
+        
+        overlay_rect = pygame.Rect(overlay_x, overlay_y, overlay_width, overlay_height)
+        # Muestra cuentas regresivas: se publica completo mientras está abierto
+        self.renderer.mark("overlays", "inventory", overlay_rect)
+        pygame.draw.rect(self.screen, UI_BACKGROUND, overlay_rect, border_radius=12)
+        pygame.draw.rect(self.screen, UI_BORDER, overlay_rect, 3, border_radius=12)
+        
+        # Título
+        title_bg = pygame.Rect(overlay_x, overlay_y, overlay_width, 45)
+        pygame.draw.rect(self.screen, UI_HIGHLIGHT, title_bg, border_radius=12)
+        title = self.large_font.render("INVENTARIO ACTUAL", True, UI_TEXT_HEADER)
+        title_rect = title.get_rect(center=(overlay_x + overlay_width // 2, overlay_y + 22))
+        self.screen.blit(title, title_rect)
+        
+        if not self.inventory:
+            no_items_text = self.font.render("No hay pedidos en inventario", True, UI_TEXT_SECONDARY)
+            text_rect = no_items_text.get_rect(center=(overlay_rect.centerx, overlay_rect.centery))
+            self.screen.blit(no_items_text, text_rect)
+        else:
+            # Solo la ventana visible
+            scroll = self.inventory_scroll = self._scroll_to_selection(
+                min(self.selected_inventory_index, len(self.inventory) - 1), self.inventory_scroll)
+            for i, order in enumerate(islice(self.inventory, scroll, scroll + self.OVERLAY_ROWS)):
+                y_pos = overlay_rect.y + 55 + i * 65
+                
+                if scroll + i == self.selected_inventory_index:
+                    selection_rect = pygame.Rect(overlay_rect.x + 8, y_pos - 3, overlay_width - 16, 60)
+                    pygame.draw.rect(self.screen, UI_HIGHLIGHT, selection_rect, border_radius=5)
+                    pygame.draw.rect(self.screen, UI_BORDER, selection_rect, 2, border_radius=5)
+                
+                time_remaining = self.get_order_time_remaining(order)
+                urgency_color = URGENCY_COLORS[self.urgency_level(time_remaining, order.duration_minutes * 60)]
+                time_text = self.format_time_remaining(time_remaining)
+                district = self._get_district_name(order.dropoff.x, order.dropoff.y)
+                
+                priority_text = f"P{order.priority}" if order.priority > 0 else "Normal"
+                
+                # Información del pedido
+                text1 = self.font.render(f"{order.id} ({priority_text}) - {time_text}", True, urgency_color)
+                self.screen.blit(text1, (overlay_rect.x + 15, y_pos))
+                
+                text2 = self.small_font.render(f"Peso: {order.weight}kg - Pago: ${order.payout} - {district}", True, UI_TEXT_NORMAL)
+                self.screen.blit(text2, (overlay_rect.x + 15, y_pos + 20))
+                
+                distance = self.travel_distance(self.player_pos, order.dropoff)
+                text3 = self.small_font.render(f"Destino: ({order.dropoff.x}, {order.dropoff.y}) - Distancia: {distance:.0f} celdas", True, UI_TEXT_SECONDARY)
+                self.screen.blit(text3, (overlay_rect.x + 15, y_pos + 40))
+        
+        # Instrucciones
+        instructions_bg = pygame.Rect(overlay_x, overlay_y + overlay_height - 50, overlay_width, 45)
+        pygame.draw.rect(self.screen, (240, 240, 245), instructions_bg, border_radius=12)
+        
+        instructions = [
+            "↑/↓: Navegar | ENTER: Entregar (si estás en destino) | I: Cerrar",
+            "P/T: Ordenar por prioridad/tiempo restante según algoritmos implementados"
+        ]
+        
+        for i, instruction in enumerate(instructions):
+            color = UI_SUCCESS if "algoritmos" in instruction else UI_TEXT_NORMAL
+            text = self.small_font.render(instruction, True, color)
+            self.screen.blit(text, (overlay_rect.x + 15, overlay_rect.y + overlay_height - 42 + i * 14))
+
+    def draw_orders_overlay(self):
+        """Overlay de pedidos con algoritmos de ordenamiento."""
+        overlay_x = self.map_offset_x + self.map_pixel_width + 40
+        overlay_y = 50
+        overlay_width = 750
+        overlay_height = 650
+        
+        overlay_rect = pygame.Rect(overlay_x, overlay_y, overlay_width, overlay_height)
+        self.renderer.mark("overlays", "orders", overlay_rect)
+        pygame.draw.rect(self.screen, UI_BACKGROUND, overlay_rect, border_radius=12)
+        pygame.draw.rect(self.screen, UI_BORDER, overlay_rect, 3, border_radius=12)
+        
+        # Título
+        title_bg = pygame.Rect(overlay_x, overlay_y, overlay_width, 50)
+        pygame.draw.rect(self.screen, UI_HIGHLIGHT, title_bg, border_radius=12)
+        title = self.large_font.render("PEDIDOS - ALGORITMOS IMPLEMENTADOS", True, UI_TEXT_HEADER)
+        title_rect = title.get_rect(center=(overlay_x + overlay_width // 2, overlay_y + 25))
+        self.screen.blit(title, title_rect)
+        
+        if not self.available_orders.size():
+            no_orders_text = self.font.render("No hay pedidos disponibles", True, UI_TEXT_SECONDARY)
+            text_rect = no_orders_text.get_rect(center=(overlay_rect.centerx, overlay_rect.centery))
+            self.screen.blit(no_orders_text, text_rect)
+        else:
+            # Solo la ventana visible (selección top-k)
+            scroll = self.orders_scroll = self._scroll_to_selection(
+                min(self.selected_order_index, self.available_orders.size() - 1), self.orders_scroll)
+            for i, order in enumerate(self.available_orders.window(scroll, self.OVERLAY_ROWS)):
+                y_pos = overlay_rect.y + 60 + i * 80
+                
+                if scroll + i == self.selected_order_index:
+                    selection_rect = pygame.Rect(overlay_rect.x + 8, y_pos - 3, overlay_width - 16, 75)
+                    pygame.draw.rect(self.screen, UI_HIGHLIGHT, selection_rect, border_radius=5)
+                    pygame.draw.rect(self.screen, UI_BORDER, selection_rect, 2, border_radius=5)
+                
+                time_remaining = self.get_order_time_remaining(order)
+                urgency_color = URGENCY_COLORS[self.urgency_level(time_remaining, order.duration_minutes * 60)]
+                time_text = self.format_time_remaining(time_remaining)
+                
+                pickup_district = self._get_district_name(order.pickup.x, order.pickup.y)
+                dropoff_district = self._get_district_name(order.dropoff.x, order.dropoff.y)
+                
+                priority_text = f"P{order.priority}" if order.priority > 0 else "Normal"
+                
+                # Información del pedido
+                text1 = self.font.render(f"{order.id} ({priority_text}) - ${order.payout} | {time_text}", True, urgency_color)
+                self.screen.blit(text1, (overlay_rect.x + 15, y_pos))
+                
+                text2 = self.small_font.render(f"Peso: {order.weight}kg | Duración: {order.duration_minutes:.1f}min", True, UI_TEXT_NORMAL)
+                self.screen.blit(text2, (overlay_rect.x + 15, y_pos + 20))
+                
+                pickup_distance = self.travel_distance(self.player_pos, order.pickup)
+                text3 = self.small_font.render(f"Recoger: ({order.pickup.x}, {order.pickup.y}) [{pickup_district}] - {pickup_distance:.0f} celdas", True, UI_TEXT_NORMAL)
+                self.screen.blit(text3, (overlay_rect.x + 15, y_pos + 40))
+                
+                total_route_distance = self.travel_distance(order.pickup, order.dropoff)
+                text4 = self.small_font.render(f"Entregar: ({order.dropoff.x}, {order.dropoff.y}) [{dropoff_district}] - Ruta: {total_route_distance:.0f} celdas", True, UI_TEXT_SECONDARY)
+                self.screen.blit(text4, (overlay_rect.x + 15, y_pos + 60))
+        
+        instructions_bg = pygame.Rect(overlay_x, overlay_y + overlay_height - 80, overlay_width, 75)
+        pygame.draw.rect(self.screen, (240, 240, 245), instructions_bg, border_radius=12)
+        
+        instructions = [
+            "↑/↓: Navegar | ENTER: Aceptar pedido | O: Cerrar",
+            "",
+            " ALGORITMOS DE ORDENAMIENTO IMPLEMENTADOS:",
+            "D: Ordenar por DISTANCIA (Insertion Sort) | Shift+D: automático",
+            "Usa P/T en inventario para ordenar por prioridad/tiempo "
+        ]
+        
+        for i, instruction in enumerate(instructions):
+            if not instruction:
+                continue
+            if "ALGORITMOS" in instruction:
+                color = UI_SUCCESS
+            elif "✅" in instruction:
+                color = UI_WARNING
+            else:
+                color = UI_TEXT_NORMAL
+            
+            text = self.small_font.render(instruction, True, color)
+            self.screen.blit(text, (overlay_rect.x + 15, overlay_rect.y + overlay_height - 70 + i * 14))
+
+    def draw_pause_overlay(self):
+        """Overlay de pausa."""
+        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+        overlay.set_alpha(180)
+        overlay.fill((0, 0, 50))
+        self.screen.blit(overlay, (0, 0))
+        self.renderer.mark("overlays", "pause", overlay.get_rect(),
+                           (self.money, self.goal, self.format_time(self.max_game_time - self.game_time),
+                            self.reputation))
+        
+        pause_rect = pygame.Rect(WINDOW_WIDTH // 2 - 250, WINDOW_HEIGHT // 2 - 120, 500, 240)
+        pygame.draw.rect(self.screen, UI_BACKGROUND, pause_rect, border_radius=15)
+        pygame.draw.rect(self.screen, UI_BORDER, pause_rect, 4, border_radius=15)
+        
+        pause_text = self.title_font.render("JUEGO PAUSADO", True, UI_TEXT_HEADER)
+        text_rect = pause_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 40))
+        self.screen.blit(pause_text, text_rect)
+        
+        instruction_text = self.large_font.render("Presiona ESPACIO para continuar", True, UI_TEXT_NORMAL)
+        text_rect = instruction_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 10))
+        self.screen.blit(instruction_text, text_rect)
+        
+        state_info = [
+            f"Dinero: ${self.money}/${self.goal}",
+            f"Tiempo restante: {self.format_time(self.max_game_time - self.game_time)}",
+            f"Reputación: {self.reputation}/100"
+        ]
+        
+        for i, info in enumerate(state_info):
+            text = self.font.render(info, True, UI_TEXT_SECONDARY)
+            text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 40 + i * 25))
+            self.screen.blit(text, text_rect)
+    
+    def draw_game_over_overlay(self):
+        """Overlay de fin de juego con estadísticas completas."""
+        overlay = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+        overlay.set_alpha(220)
+        overlay.fill((20, 20, 40))
+        self.screen.blit(overlay, (0, 0))
+        self.renderer.mark("overlays", "game_over", overlay.get_rect(),
+                           (self.victory, self.money, self.reputation, len(self.completed_orders),
+                            self.format_time(self.game_time)))
+        
+        game_over_rect = pygame.Rect(WINDOW_WIDTH // 2 - 350, WINDOW_HEIGHT // 2 - 280, 700, 560)
+        pygame.draw.rect(self.screen, UI_BACKGROUND, game_over_rect, border_radius=20)
+        pygame.draw.rect(self.screen, UI_BORDER, game_over_rect, 5, border_radius=20)
+        
+        if self.victory:
+            title_text = self.title_font.render("¡VICTORIA!", True, UI_SUCCESS)
+            message = f"¡Felicidades! Alcanzaste la meta de ${self.goal}"
+        else:
+            title_text = self.title_font.render("JUEGO TERMINADO", True, UI_CRITICAL)
+            if self.reputation < 20:
+                message = "Reputación demasiado baja"
+            else:
+                message = f"Tiempo agotado. Necesitabas ${self.goal - self.money} más"
+        
+        title_rect = title_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 240))
+        self.screen.blit(title_text, title_rect)
+        
+        final_score = self._calculate_final_score()
+        self.save_score(final_score)
+        
+        final_district = self._get_district_name(self.player_pos.x, self.player_pos.y)
+        efficiency = self.calculate_efficiency()
+        
+        stats = [
+            message,
+            "",
+            f"PUNTAJE FINAL: {final_score}",
+            f"Dinero obtenido: ${self.money} / ${self.goal}",
+            f"Reputación final: {self.reputation}/100",
+            f"Pedidos completados: {len(self.completed_orders)}",
+            f"Eficiencia: {efficiency:.1f}%",
+            f"Ciudad: {self.city_name} ({self.city_width}x{self.city_height})",
+            f"Posición final: ({self.player_pos.x}, {self.player_pos.y}) - Distrito {final_district}",
+            f"Mejor racha consecutiva: {getattr(self, 'best_streak', self.delivery_streak)}",
+            f"Tiempo total jugado: {self.format_time(self.game_time)}"
+        ]
+        
+        for i, stat in enumerate(stats):
+            if not stat:
+                continue
+                
+            if "PUNTAJE FINAL" in stat:
+                color = UI_SUCCESS if self.victory else UI_CRITICAL
+                font = self.large_font
+            elif "Dinero obtenido" in stat:
+                progress = (self.money / self.goal) * 100
+                color = UI_SUCCESS if progress >= 100 else UI_WARNING if progress >= 80 else UI_CRITICAL
+                font = self.font
+            elif "Reputación" in stat:
+                color = UI_SUCCESS if self.reputation >= 80 else UI_WARNING if self.reputation >= 50 else UI_CRITICAL
+                font = self.font
+            else:
+                color = UI_TEXT_NORMAL
+                font = self.font
+            
+            text = font.render(stat, True, color)
+            text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 - 180 + i * 30))
+            self.screen.blit(text, text_rect)
+        
+        exit_text = self.font.render("Presiona ESC para salir al menú principal", True, UI_TEXT_SECONDARY)
+        exit_rect = exit_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + 220))
+        self.screen.blit(exit_text, exit_rect)
+    
+    def format_time(self, seconds: float) -> str:
+        """Formatea el tiempo en MM:SS."""
+        if seconds < 0:
+            seconds = 0
+        minutes = int(seconds // 60)
+        seconds = int(seconds % 60)
+        return f"{minutes:02d}:{seconds:02d}"
+    
+    def calculate_efficiency(self) -> float:
+        """Calcula la eficiencia del jugador."""
+        if self.game_time <= 0:
+            return 0.0
+        
+        completed = len(self.completed_orders)
+        efficiency = (completed / max(1, self.game_time / 60)) * 100
+        
+        return min(100.0, efficiency)
+    
+    def simulation_tick(self, keys, dt: float = SIM_DT):
+        """Un tick de paso fijo: entrada y lógica avanzan exactamente dt segundos."""
+        self.previous_player_pos = self.player_pos
+        if self.game_state == "playing":
+            self.handle_input(keys, dt)
+        self.update(dt)
+        if self.autosave is not None and self.game_state == "playing" and not self.game_over:
+            self.autosave.tick(self)
+
+    def run(self):
+        """Bucle principal del juego."""
+        last_time = time.perf_counter()
+        accumulator = 0.0
+        
+        print("=" * 90)
+        print("COURIER QUEST")
+        print("=" * 90)
+        
+        while self.running:
+            current_time = time.perf_counter()
+            frame_time = min(current_time - last_time, MAX_FRAME_TIME)
+            last_time = current_time
+            accumulator += frame_time
+            
+            events = pygame.event.get()
+            for event in events:
+                if event.type == pygame.QUIT:
+                    self.running = False
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_ESCAPE:
+                        if self.game_state == "playing":
+                            if self.game_over:
+                                self.game_state = "menu"
+                                self.game_over = False
+                                self.victory = False
+                            else:
+                                self.paused = not self.paused
+                        elif self.game_state == "menu":
+                            self.running = False
+            
+            self.handle_events(events)
+            keys = pygame.key.get_pressed()
+            while accumulator >= SIM_DT:
+                self.simulation_tick(keys, SIM_DT)
+                accumulator -= SIM_DT
+            
+            self._collect_save_results()
+            self.render_alpha = accumulator / SIM_DT
+            self.draw()
+            self.clock.tick(FPS)
+        
+        # No cerrar con un guardado a medio escribir
+        self.autosave.close()
+        self.file_manager.flush_saves(timeout=5.0)
+        pygame.quit()
+
+# =============================================================================
+# MODO HEADLESS (SIMULACIÓN SIN VENTANA)
+# =============================================================================
+
+# Acciones de movimiento reconocidas por HeadlessCourierQuest
+HEADLESS_MOVES = {
+    'left': (-1, 0),
+    'right': (1, 0),
+    'up': (0, -1),
+    'down': (0, 1)
+}
+
+
+class HeadlessCourierQuest(CourierQuest):
+    """Motor del juego sin ventana, fuentes ni imágenes, guiado por un guion de acciones.
+
+    Ejecuta la misma lógica que CourierQuest (movimiento, interacción, liberación
+    y expiración de pedidos, clima y puntaje) usando el tiempo simulado como
+    reloj. No usa la red: el mapa y los pedidos vienen de los argumentos o de
+    la caché/respaldo local. El puntaje final queda en final_score y no se
+    escribe en la tabla de puntajes (data/puntajes.db).
+
+    Acciones válidas: None o 'wait', 'left', 'right', 'up', 'down',
+    ('move', dx, dy), 'interact', ('accept', indice), ('deliver', indice),
+    'undo', 'sort_priority', 'sort_deadline', 'sort_distance' y
+    'auto_sort_distance' (activa/desactiva el orden automático por distancia).
+    """
+
+    def __init__(self, map_data: Optional[dict] = None, orders: Optional[List[Order]] = None,
+                 seed: Optional[int] = None, quiet: bool = True):
+        if seed is not None:
+            random.seed(seed)
+        self.quiet = quiet
+        self.final_score = None
+
+        self.api_manager = TigerAPIManager(load_images=False)
+        self.weather_system = EnhancedWeatherSystem()
+
+        with self._output():
+            self._init_simulation_state()
+
+            if map_data is None:
+                map_data = self.api_manager._get_fallback_map()
+            if orders is None:
+                orders = self.api_manager._get_fallback_orders()
+            # Los pedidos se mutan durante la jornada: se trabaja sobre copias
+            orders = [copy.deepcopy(order) for order in orders if isinstance(order, Order)]
+
+            self._apply_world_data(map_data, orders)
+        self.game_state = "playing"
+
+    def _output(self):
+        """Contexto que silencia los print() del juego cuando quiet=True."""
+        if not self.quiet:
+            return contextlib.nullcontext()
+        return contextlib.redirect_stdout(_NullWriter())
+
+    def save_score(self, score: int = None):
+        """Calcula el puntaje final sin tocar la tabla de puntajes."""
+        self.final_score = self._calculate_final_score()
+        return True
+
+    def save_game(self, slot: int = 1):
+        """Guarda de forma síncrona: sin frames que proteger, el archivo existe al volver."""
+        with self._output():
+            ok = self.file_manager.save_game_with_validation(self._snapshot_game_state(), slot)
+        if ok:
+            self.add_game_message(f"Juego guardado en slot {slot} ({self.city_name} {self.city_width}x{self.city_height})", 2.0, GREEN)
+        else:
+            self.add_game_message(f"Error guardando en slot {slot}", 3.0, RED)
+        return ok
+
+    def apply_action(self, action, dt: float):
+        """Aplica una acción del guion como lo harían las teclas en un frame."""
+        direction = (0, 0)
+
+        if action is None or action == 'wait':
+            pass
+        elif action in HEADLESS_MOVES:
+            direction = HEADLESS_MOVES[action]
+        elif action == 'interact':
+            self.interact_at_position()
+        elif action == 'undo':
+            self.undo_move()
+        elif action == 'sort_priority':
+            self._sort_inventory_by_priority()
+        elif action == 'sort_deadline':
+            self._sort_inventory_by_deadline()
+        elif action == 'sort_distance':
+            self._sort_orders_by_distance()
+        elif action == 'auto_sort_distance':
+            self._toggle_auto_sort_by_distance()
+        elif isinstance(action, tuple) and action and action[0] == 'move':
+            direction = (action[1], action[2])
+        elif isinstance(action, tuple) and action and action[0] == 'accept':
+            self.selected_order_index = action[1]
+            self.accept_selected_order()
+        elif isinstance(action, tuple) and action and action[0] == 'deliver':
+            self.selected_inventory_index = action[1]
+            self.deliver_selected_order()
+        else:
+            raise ValueError(f"Acción headless desconocida: {action!r}")
+
+        # Igual que el bucle real: el movimiento se procesa en todos los frames
+        self.apply_move_input(direction, dt)
+
+    def step(self, action=None, dt: float = SIM_DT):
+        """Avanza un frame: aplica la acción y actualiza la simulación."""
+        with self._output():
+            self.apply_action(action, dt)
+            self.update(dt)
+
+    def run_shift(self, actions, dt: float = SIM_DT, max_steps: Optional[int] = None) -> Dict[str, Any]:
+        """Ejecuta una jornada completa y devuelve su resumen.
+
+        actions puede ser un iterable de acciones (al agotarse se espera hasta
+        el final de la jornada) o una función policy(game) -> acción.
+        """
+        if callable(actions):
+            next_action = lambda: actions(self)
+        else:
+            iterator = iter(actions)
+            next_action = lambda: next(iterator, None)
+
+        steps = 0
+        with self._output():
+            while not self.game_over and (max_steps is None or steps < max_steps):
+                self.apply_action(next_action(), dt)
+                self.update(dt)
+                steps += 1
+
+        return self.get_summary(steps)
+
+    def get_summary(self, steps: int = 0) -> Dict[str, Any]:
+        score = self.final_score if self.final_score is not None else self._calculate_final_score()
+        return {
+            "score": score,
+            "money": self.money,
+            "reputation": self.reputation,
+            "completed_orders": len(self.completed_orders),
+            "expired_orders": self.expired_orders_count,
+            "score_components": self._final_score_components(),
+            "victory": self.victory,
+            "game_over": self.game_over,
+            "game_time": round(self.game_time, 2),
+            "steps": steps
+        }
+
+
+class _NullWriter:
+    """Destino de stdout que descarta todo (más barato que abrir os.devnull)."""
+
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def random_walk_policy(seed: Optional[int] = None):
+    """Política de prueba para el modo headless: camina al azar e interactúa."""
+    rng = random.Random(seed)
+    choices = list(HEADLESS_MOVES) + ['interact', 'wait']
+
+    def policy(game):
+        return rng.choice(choices)
+
+    return policy
+
+
+def run_headless_shifts(count: int, seed: int = 0, dt: float = SIM_DT) -> List[Dict[str, Any]]:
+    """Ejecuta varias jornadas headless con la política aleatoria."""
+    results = []
+    for i in range(count):
+        game = HeadlessCourierQuest(seed=seed + i)
+        results.append(game.run_shift(random_walk_policy(seed + i), dt=dt))
+    return results
+
+
+def greedy_courier_policy(seed: Optional[int] = None):
+    """Bot sencillo: va por la ruta real al objetivo más cercano (entrega o recogida que quepa) e interactúa."""
+    rng = random.Random(seed)
+
+    def policy(game):
+        pos = game.player_pos
+
+        for order in game.inventory:
+            if order.dropoff.x == pos.x and order.dropoff.y == pos.y:
+                return 'interact'
+
+        capacity = game.inventory.remaining_capacity(game.max_weight)
+        targets = [order.dropoff for order in game.inventory]
+        for order in game.available_orders.items:
+            if order.weight > capacity or game.get_order_time_remaining(order) <= 0:
+                continue
+            if order.pickup.x == pos.x and order.pickup.y == pos.y:
+                return 'interact'
+            targets.append(order.pickup)
+
+        if not targets:
+            return 'wait'
+
+        target = min(targets, key=lambda t: game.travel_distance(pos, t))
+        pathfinder = game.get_pathfinder()
+        distance = pathfinder.travel_cost(pos, target)
+
+        closer = []
+        walkable = []
+        for action, (dx, dy) in HEADLESS_MOVES.items():
+            next_pos = Position(pos.x + dx, pos.y + dy)
+            if not game._is_position_walkable(next_pos.x, next_pos.y):
+                continue
+            walkable.append(action)
+            if pathfinder.travel_cost(next_pos, target) < distance:
+                closer.append(action)
+
+        if closer:
+            return rng.choice(closer)
+        return rng.choice(walkable) if walkable else 'wait'
+
+    return policy
+
+
+# Políticas disponibles por nombre (útil desde la línea de comandos y en procesos hijos)
+HEADLESS_POLICIES = {
+    'random': random_walk_policy,
+    'greedy': greedy_courier_policy
+}
+
+
+def _simulate_shift(task: tuple) -> Dict[str, Any]:
+    """Trabajo de un proceso del pool: simula una jornada completa con una semilla."""
+    seed, policy_factory, dt = task
+    if isinstance(policy_factory, str):
+        policy_factory = HEADLESS_POLICIES[policy_factory]
+
+    game = HeadlessCourierQuest(seed=seed)
+    summary = game.run_shift(policy_factory(seed), dt=dt)
+    summary["seed"] = seed
+    return summary
+
+
+def run_batch_shifts(count: int, base_seed: int = 0, seeds: Optional[List[int]] = None,
+                     policy='greedy', processes: Optional[int] = None,
+                     dt: float = SIM_DT) -> Dict[str, Any]:
+    """Simula N jornadas en un pool de procesos y devuelve el informe agregado.
+
+    policy es un nombre de HEADLESS_POLICIES o una fábrica policy(seed) -> política
+    definida a nivel de módulo (debe poder enviarse a los procesos hijos).
+    Con processes=1 todo se ejecuta en el proceso actual.
+    """
+    if seeds is None:
+        seeds = [base_seed + i for i in range(count)]
+    tasks = [(seed, policy, dt) for seed in seeds]
+    processes = processes or os.cpu_count() or 1
+
+    if processes == 1 or len(tasks) <= 1:
+        results = [_simulate_shift(task) for task in tasks]
+    else:
+        chunksize = max(1, len(tasks) // (processes * 4))
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.map(_simulate_shift, tasks, chunksize=chunksize)
+
+    return summarize_batch(results)
+
+
+def _distribution(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"mean": 0.0, "stdev": 0.0, "min": 0.0, "median": 0.0, "max": 0.0}
+    return {
+        "mean": statistics.fmean(values),
+        "stdev": statistics.pstdev(values),
+        "min": min(values),
+        "median": statistics.median(values),
+        "max": max(values)
+    }
+
+
+def summarize_batch(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Agrega los resúmenes de jornadas headless en un informe para balanceo."""
+    component_names = results[0]["score_components"].keys() if results else []
+
+    # Histograma de reputación final en tramos de 10 (el último incluye el 100)
+    labels = [f"{low}-{low + 9}" for low in range(0, 90, 10)] + ["90-100"]
+    reputation_histogram = dict.fromkeys(labels, 0)
+    for result in results:
+        reputation_histogram[labels[min(9, max(0, result["reputation"]) // 10)]] += 1
+
+    return {
+        "shifts": len(results),
+        "victory_rate": (sum(1 for r in results if r["victory"]) / len(results)) if results else 0.0,
+        "score": _distribution([r["score"] for r in results]),
+        "score_components": {
+            name: _distribution([r["score_components"][name] for r in results])
+            for name in component_names
+        },
+        "deliveries": _distribution([r["completed_orders"] for r in results]),
+        "expiries": _distribution([r["expired_orders"] for r in results]),
+        "reputation": _distribution([r["reputation"] for r in results]),
+        "reputation_histogram": reputation_histogram,
+        "game_time": _distribution([r["game_time"] for r in results]),
+        "results": results
+    }
+
+# =============================================================================
+# FUNCIÓN PRINCIPAL
+# =============================================================================
+def main():
+    """Función principal del programa."""
+    print("=" * 90)
+    print(" COURIER QUEST - VERSIÓN ULTRA VELOCIDAD")
+    print("   Proyecto EIF-207 Estructuras de Datos")
+    print("   API REAL + EXTREMA URGENCIA (30 SEGUNDOS)")
+    print("=" * 90)
+    print()
+    
+    if "--batch" in sys.argv:
+        index = sys.argv.index("--batch")
+        count = int(sys.argv[index + 1]) if len(sys.argv) > index + 1 and sys.argv[index + 1].isdigit() else 100
+        policy = sys.argv[sys.argv.index("--policy") + 1] if "--policy" in sys.argv else 'greedy'
+        start = time.time()
+        report = run_batch_shifts(count, policy=policy)
+        report.pop("results")
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        print(f" {count} jornadas ({policy}) en {time.time() - start:.2f}s")
+        return
+    
+    if "--headless" in sys.argv:
+        index = sys.argv.index("--headless")
+        count = int(sys.argv[index + 1]) if len(sys.argv) > index + 1 and sys.argv[index + 1].isdigit() else 1
+        start = time.time()
+        results = run_headless_shifts(count)
+        for i, result in enumerate(results):
+            print(f" Jornada {i + 1}: {result}")
+        print(f" {count} jornadas headless en {time.time() - start:.2f}s")
+        return
+    
+    try:
+        game = CourierQuest()
+        game.run()
+        
+    except Exception as e:
+        print(f"Error ejecutando el juego: {e}")
+        import traceback
+        traceback.print_exc()
+        input("Presiona ENTER para salir...")
+
+if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,96 @@
+"""Pruebas de guardado: diario de autoguardado y slots.
+
+Se ejecutan con `python -m unittest discover tests` desde CourierQuest/.
+Cada prueba trabaja en un directorio temporal propio.
+"""
+
+import importlib.util
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+GAME_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api v2.py")
+
+
+def load_game_module():
+    if "courier_quest" not in sys.modules:
+        spec = importlib.util.spec_from_file_location("courier_quest", GAME_FILE)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["courier_quest"] = module
+        spec.loader.exec_module(module)
+    return sys.modules["courier_quest"]
+
+
+cq = load_game_module()
+
+
+class SaveTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.mkdtemp(prefix="cq_test_")
+        os.chdir(self._tmp)
+
+    def tearDown(self):
+        os.chdir(self._cwd)
+        shutil.rmtree(self._tmp, ignore_errors=True)
+
+
+class AutosaveJournalTests(SaveTestCase):
+
+    def test_recovers_orders_sharing_an_id(self):
+        orders = cq.TigerAPIManager(load_images=False)._get_fallback_orders()
+        for index, order in enumerate(orders):
+            order.id = f"DUP_{index % 3}"
+        game = cq.HeadlessCourierQuest(orders=orders, seed=2)
+        policy = cq.HEADLESS_POLICIES['greedy'](2)
+        journal = cq.AutosaveJournal(game.file_manager, interval=1.0, keyframe_every=5)
+
+        for _ in range(20000):
+            game.step(policy(game))
+            journal.tick(game)
+            if game.game_over:
+                break
+        journal.record(game)
+        expected = game._snapshot_game_state()
+        journal.close()
+        game.file_manager.flush_saves()
+
+        handled = [order.id for order in expected.inventory + expected.completed_orders]
+        self.assertGreater(len(handled), len(set(handled)), "ningún id repetido llegó a recogerse")
+        recovered = journal.recover()
+        self.assertIsNotNone(recovered)
+        self.assertEqual(recovered.inventory, expected.inventory)
+        self.assertEqual(recovered.completed_orders, expected.completed_orders)
+        # La cola y los pendientes se reordenan al cargar; solo importa su contenido
+        for group in ("available_orders", "pending_orders"):
+            self.assertCountEqual(getattr(recovered, group), getattr(expected, group), group)
+
+
+class SaveSlotTests(SaveTestCase):
+
+    def test_load_waits_for_pending_save_of_same_slot(self):
+        game = cq.HeadlessCourierQuest(seed=3)
+        policy = cq.HEADLESS_POLICIES['greedy'](3)
+        game.save_game(1)
+        for _ in range(600):
+            game.step(policy(game))
+        # Un trabajo lento delante deja el guardado en cola mientras se carga
+        game.file_manager.submit_background(("test", "slow"), lambda: time.sleep(0.3))
+        game.file_manager.save_game_async(game._snapshot_game_state(), 1)
+
+        loaded = cq.HeadlessCourierQuest(seed=3)
+        loaded.file_manager = game.file_manager
+        self.assertTrue(loaded._load_game(1))
+        self.assertEqual(loaded.game_time, game.game_time)
+        self.assertEqual(loaded.player_pos, game.player_pos)
+        self.assertEqual(list(loaded.inventory), list(game.inventory))
+
+if __name__ == "__main__":
+    unittest.main()